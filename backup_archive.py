@@ -0,0 +1,255 @@
+import os
+import bz2
+import gzip
+import lzma
+import zlib
+import json
+import time
+import hashlib
+import threading
+from datetime import datetime
+
+from backup_store import MANIFEST_VERSION
+from file_utils import atomic_write
+
+# 압축 아카이브 백업
+#
+# 구조:
+#   <root>/<name>/<snapshot_id>.gz|.xz|.bz2   압축된 백업 파일
+#   <root>/<name>/<snapshot_id>.json          매니페스트 (원본 크기, SHA-256, 코덱)
+#
+# 원본을 고정 크기 블록으로 읽으면서 압축하므로 파일 전체를 메모리에 올리지 않는다.
+# 복구도 같은 방식으로 블록 단위로 풀어 쓴다. 압축 형식은 표준 형식(gzip/xz/bzip2)이라
+# 다른 도구로도 열 수 있다.
+
+ARCHIVE_BLOCK_SIZE = 1024 * 1024
+
+# 코덱: (확장자, 기본 압축 레벨, 레벨 범위)
+# zlib은 deflate 스트림을 gzip 컨테이너에 담는다 (CRC 포함)
+CODECS = {
+    "zlib": (".gz", 6, (0, 9)),
+    "lzma": (".xz", 6, (0, 9)),
+    "bz2": (".bz2", 9, (1, 9)),
+}
+DEFAULT_CODEC = "zlib"
+
+
+def _check_codec(codec, level):
+    if codec not in CODECS:
+        raise ValueError(f"지원하지 않는 압축 코덱: {codec}")
+    _ext, default_level, (low, high) = CODECS[codec]
+    if level is None:
+        return default_level
+    if not low <= level <= high:
+        raise ValueError(f"{codec} 압축 레벨은 {low}~{high} 사이여야 합니다: {level}")
+    return level
+
+
+def codec_of(path):
+    """파일 확장자로 코덱 판별 (모르는 확장자면 None)"""
+    for codec, (ext, _level, _range) in CODECS.items():
+        if path.endswith(ext):
+            return codec
+    return None
+
+
+def _open_compressed(path, mode, codec, level=None):
+    """path는 파일 경로 또는 열린 파일 객체 (atomic_write)"""
+    if codec == "zlib":
+        # mtime=0: 같은 내용이면 같은 아카이브가 나오도록 헤더에 시각을 넣지 않음
+        if 'w' in mode:
+            if hasattr(path, "write"):
+                return gzip.GzipFile(fileobj=path, mode=mode, compresslevel=level, mtime=0)
+            return gzip.GzipFile(path, mode, compresslevel=level, mtime=0)
+        return gzip.open(path, mode)
+    if codec == "lzma":
+        return lzma.open(path, mode, preset=level) if 'w' in mode else lzma.open(path, mode)
+    return bz2.open(path, mode, compresslevel=level) if 'w' in mode else bz2.open(path, mode)
+
+
+def compress_file(src_path, dst_path, codec=DEFAULT_CODEC, level=None, block_size=ARCHIVE_BLOCK_SIZE):
+    """src_path를 블록 단위로 압축하여 dst_path에 기록
+
+    반환: 통계 dict (codec, level, size, compressed_size, sha256, elapsed)
+    """
+    level = _check_codec(codec, level)
+    start = time.perf_counter()
+    file_hash = hashlib.sha256()
+    size = 0
+    with open(src_path, 'rb') as src, atomic_write(dst_path) as f, _open_compressed(f, 'wb', codec, level) as out:
+        while True:
+            data = src.read(block_size)
+            if not data:
+                break
+            file_hash.update(data)
+            size += len(data)
+            out.write(data)
+    return {
+        "codec": codec,
+        "level": level,
+        "size": size,
+        "compressed_size": os.path.getsize(dst_path),
+        "sha256": file_hash.hexdigest(),
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def decompress_file(src_path, dst_path, codec=None, block_size=ARCHIVE_BLOCK_SIZE):
+    """압축 파일을 블록 단위로 풀어 dst_path에 기록. 반환: (원본 크기, SHA-256)"""
+    codec = codec or codec_of(src_path)
+    if codec is None:
+        raise ValueError(f"압축 형식을 알 수 없습니다: {src_path}")
+    with atomic_write(dst_path) as out:
+        size, sha256 = _decompress_into(src_path, out, codec, block_size)
+    return size, sha256
+
+
+def _decompress_into(src_path, out, codec, block_size=ARCHIVE_BLOCK_SIZE):
+    """압축을 풀어 열린 파일 out에 쓰기. 반환: (원본 크기, SHA-256)"""
+    file_hash = hashlib.sha256()
+    size = 0
+    with _open_compressed(src_path, 'rb', codec) as src:
+        while True:
+            data = src.read(block_size)
+            if not data:
+                break
+            file_hash.update(data)
+            size += len(data)
+            out.write(data)
+    return size, file_hash.hexdigest()
+
+
+def _hash_compressed(src_path, codec, block_size=ARCHIVE_BLOCK_SIZE):
+    """압축을 풀면서 SHA-256만 계산 (검증용, 디스크에 쓰지 않음)"""
+    file_hash = hashlib.sha256()
+    with _open_compressed(src_path, 'rb', codec) as src:
+        while True:
+            data = src.read(block_size)
+            if not data:
+                break
+            file_hash.update(data)
+    return file_hash.hexdigest()
+
+
+class BackupArchive:
+    """압축 아카이브 백업 폴더 (BackupStore와 같은 매니페스트 인터페이스)"""
+
+    _write_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+
+    def _name_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _new_snapshot_id(self, name):
+        snapshot_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        name_dir = self._name_dir(name)
+        suffix = 1
+        candidate = snapshot_id
+        while (os.path.exists(os.path.join(name_dir, f"{candidate}.json"))
+               or os.path.exists(os.path.join(name_dir, f"{candidate}.json.tmp"))):
+            candidate = f"{snapshot_id}_{suffix}"
+            suffix += 1
+        return candidate
+
+    def archive_path(self, manifest):
+        return os.path.join(self._name_dir(manifest["name"]), manifest["archive"])
+
+    def put_file(self, src_path, name, codec=DEFAULT_CODEC, level=None, metadata=None):
+        """파일을 압축 저장하고 매니페스트 기록. 반환: 매니페스트 dict (elapsed 포함)"""
+        level = _check_codec(codec, level)
+        ext = CODECS[codec][0]
+        name_dir = self._name_dir(name)
+        os.makedirs(name_dir, exist_ok=True)
+        with self._write_lock:
+            snapshot_id = self._new_snapshot_id(name)
+            # 매니페스트보다 먼저 자리를 잡아 두어 동시에 같은 ID를 쓰지 않게 한다
+            manifest_path = os.path.join(name_dir, f"{snapshot_id}.json")
+            open(manifest_path + ".tmp", 'w').close()
+
+        try:
+            stats = compress_file(src_path, os.path.join(name_dir, snapshot_id + ext), codec, level)
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "name": name,
+                "snapshot_id": snapshot_id,
+                "created": datetime.now().isoformat(timespec='seconds'),
+                "source": src_path,
+                "size": stats["size"],
+                "sha256": stats["sha256"],
+                "archive": snapshot_id + ext,
+                "codec": codec,
+                "level": stats["level"],
+                "compressed_size": stats["compressed_size"],
+            }
+            if metadata:
+                manifest["metadata"] = metadata
+            with atomic_write(manifest_path, 'w', encoding='utf-8') as f:
+                json.dump(manifest, f, separators=(',', ':'))
+        finally:
+            if os.path.exists(manifest_path + ".tmp"):
+                os.remove(manifest_path + ".tmp")
+
+        result = dict(manifest)
+        result["elapsed"] = stats["elapsed"]
+        return result
+
+    def list_names(self):
+        """아카이브가 있는 백업 이름 목록"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(entry for entry in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, entry)))
+
+    def list_snapshots(self, name):
+        """스냅샷 ID 목록 (오래된 순)"""
+        name_dir = self._name_dir(name)
+        if not os.path.isdir(name_dir):
+            return []
+        return sorted(entry[:-5] for entry in os.listdir(name_dir) if entry.endswith(".json"))
+
+    def load_manifest(self, name, snapshot_id=None):
+        """매니페스트 로드 (snapshot_id가 없으면 최신)"""
+        if snapshot_id is None:
+            snapshots = self.list_snapshots(name)
+            if not snapshots:
+                return None
+            snapshot_id = snapshots[-1]
+        manifest_path = os.path.join(self._name_dir(name), f"{snapshot_id}.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def restore_file(self, manifest, dst_path):
+        """아카이브를 풀어 dst_path에 기록 (SHA-256 검증)"""
+        with atomic_write(dst_path) as out:
+            _size, sha256 = _decompress_into(self.archive_path(manifest), out, manifest["codec"])
+            if sha256 != manifest["sha256"]:
+                raise ValueError(f"아카이브 해시 불일치: {manifest['snapshot_id']}")
+        return dst_path
+
+    def verify(self, manifest):
+        """아카이브가 손상되지 않았는지 확인 (압축 CRC와 원본 SHA-256)"""
+        try:
+            return _hash_compressed(self.archive_path(manifest), manifest["codec"]) == manifest["sha256"]
+        except (OSError, EOFError, ValueError, lzma.LZMAError, zlib.error):
+            return False
+
+    def delete_snapshots(self, name, snapshot_ids):
+        """아카이브와 매니페스트 삭제. 반환: 삭제한 개수"""
+        deleted = 0
+        for snapshot_id in snapshot_ids:
+            manifest = self.load_manifest(name, snapshot_id)
+            if manifest is None:
+                continue
+            # 매니페스트를 먼저 지워 중간에 실패해도 목록에 반쪽짜리 스냅샷이 남지 않게 한다
+            os.remove(os.path.join(self._name_dir(name), f"{snapshot_id}.json"))
+            if os.path.exists(self.archive_path(manifest)):
+                os.remove(self.archive_path(manifest))
+            deleted += 1
+        name_dir = self._name_dir(name)
+        if os.path.isdir(name_dir) and not os.listdir(name_dir):
+            os.rmdir(name_dir)
+        return deleted
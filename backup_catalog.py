@@ -0,0 +1,175 @@
+import os
+import json
+import sqlite3
+
+# 백업 카탈로그 (<백업 폴더>/.backup_catalog.sqlite)
+#
+# 백업할 때마다 브라우저, 프로필, 형식, 스냅샷 ID, 시각, 크기, 해시, 위치를 한 줄씩 기록한다.
+# 목록 조회와 "X 시각 이전의 최신 백업" 조회를 인덱스로 처리하므로 스냅샷이 수만 개인
+# 네트워크 드라이브에서도 폴더를 하나하나 os.listdir 하지 않는다.
+#
+# 위치(location)는 백업 폴더 기준 상대 경로로 저장해 드라이브 문자가 바뀌어도 그대로 쓸 수 있다.
+# WAL 모드는 네트워크 파일 시스템에서 동작하지 않으므로 기본 저널(DELETE)을 사용한다.
+
+CATALOG_FILENAME = ".backup_catalog.sqlite"
+CATALOG_VERSION = 1
+CONNECT_TIMEOUT = 30
+
+# 단일 파일(copy) 백업은 스냅샷 ID가 없으므로 빈 문자열로 저장 (UNIQUE 제약에서 NULL은 서로 다르게 취급됨)
+NO_SNAPSHOT = ""
+
+_COLUMNS = ("browser", "profile", "backup_name", "format", "snapshot_id", "created",
+            "size", "sha256", "content", "location", "extra")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backups (
+    id INTEGER PRIMARY KEY,
+    browser TEXT NOT NULL,
+    profile TEXT,
+    backup_name TEXT NOT NULL,
+    format TEXT NOT NULL,
+    snapshot_id TEXT NOT NULL,
+    created TEXT NOT NULL,
+    size INTEGER,
+    sha256 TEXT,
+    content TEXT,
+    location TEXT,
+    extra TEXT,
+    UNIQUE (backup_name, format, snapshot_id)
+);
+CREATE INDEX IF NOT EXISTS backups_browser_created ON backups (browser, created);
+CREATE INDEX IF NOT EXISTS backups_name_created ON backups (backup_name, created);
+CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT);
+"""
+
+
+class BackupCatalog:
+    """백업 폴더의 백업 목록 인덱스
+
+    항목은 dict: browser, profile, backup_name, format, snapshot_id (copy 백업은 None),
+    created (ISO 8601 초 단위), size, sha256, content, location (절대 경로) 와 형식별 추가 값.
+    """
+
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+        self.path = os.path.join(backup_dir, CATALOG_FILENAME)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=CONNECT_TIMEOUT)
+        conn.row_factory = sqlite3.Row
+        conn.executescript(_SCHEMA)
+        return conn
+
+    def _row_values(self, entry):
+        known = set(_COLUMNS)
+        extra = {k: v for k, v in entry.items() if k not in known}
+        location = entry.get("location")
+        if location:
+            location = os.path.relpath(location, self.backup_dir)
+        return (entry["browser"], entry.get("profile"), entry["backup_name"], entry["format"],
+                entry.get("snapshot_id") or NO_SNAPSHOT, entry["created"], entry.get("size"),
+                entry.get("sha256"), entry.get("content"), location,
+                json.dumps(extra, ensure_ascii=False) if extra else None)
+
+    def _entry(self, row):
+        entry = {key: row[key] for key in _COLUMNS if key != "extra"}
+        entry["snapshot_id"] = entry["snapshot_id"] or None
+        if entry["location"]:
+            entry["location"] = os.path.normpath(os.path.join(self.backup_dir, entry["location"]))
+        if row["extra"]:
+            entry.update(json.loads(row["extra"]))
+        return entry
+
+    def is_built(self):
+        """기존 백업을 한 번 이상 모두 등록했는지 여부 (카탈로그 파일이 없으면 False)"""
+        if not os.path.exists(self.path):
+            return False
+        conn = self._connect()
+        try:
+            row = conn.execute("SELECT value FROM meta WHERE key = 'version'").fetchone()
+            return row is not None and int(row["value"]) == CATALOG_VERSION
+        finally:
+            conn.close()
+
+    def add(self, entry):
+        """항목 추가 (같은 백업 이름/형식/스냅샷 ID가 있으면 교체)"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute(f"INSERT OR REPLACE INTO backups ({', '.join(_COLUMNS)}) "
+                             f"VALUES ({', '.join('?' * len(_COLUMNS))})", self._row_values(entry))
+        finally:
+            conn.close()
+
+    def remove(self, keys):
+        """항목 삭제. keys: (backup_name, format, snapshot_id) 목록 (한 트랜잭션으로 처리)"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.executemany("DELETE FROM backups WHERE backup_name = ? AND format = ? AND snapshot_id = ?",
+                                 [(name, backup_format, snapshot_id or NO_SNAPSHOT)
+                                  for name, backup_format, snapshot_id in keys])
+        finally:
+            conn.close()
+
+    def replace_all(self, entries):
+        """카탈로그 내용을 entries로 교체 (폴더 전체를 다시 읽은 결과로 재구성할 때 사용)"""
+        conn = self._connect()
+        try:
+            with conn:
+                conn.execute("DELETE FROM backups")
+                conn.executemany(f"INSERT OR REPLACE INTO backups ({', '.join(_COLUMNS)}) "
+                                 f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                                 [self._row_values(entry) for entry in entries])
+                conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('version', ?)",
+                             (str(CATALOG_VERSION),))
+        finally:
+            conn.close()
+
+    def query(self, browser=None, backup_name=None, before=None, after=None, formats=None,
+              newest_first=False, limit=None):
+        """조건에 맞는 항목 목록
+
+        before/after: ISO 8601 시각 문자열 (before는 미만, after는 이상)
+        formats: 포함할 형식 목록 (None이면 전체)
+        """
+        clauses, params = [], []
+        if browser is not None:
+            clauses.append("browser = ?")
+            params.append(browser)
+        if backup_name is not None:
+            clauses.append("backup_name = ?")
+            params.append(backup_name)
+        if before is not None:
+            clauses.append("created < ?")
+            params.append(before)
+        if after is not None:
+            clauses.append("created >= ?")
+            params.append(after)
+        if formats:
+            clauses.append(f"format IN ({', '.join('?' * len(formats))})")
+            params.extend(formats)
+
+        order = "DESC" if newest_first else "ASC"
+        sql = "SELECT * FROM backups"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        if newest_first:
+            sql += f" ORDER BY created {order}, snapshot_id {order}"
+        else:
+            sql += f" ORDER BY backup_name, created {order}, snapshot_id {order}"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+
+        conn = self._connect()
+        try:
+            return [self._entry(row) for row in conn.execute(sql, params)]
+        finally:
+            conn.close()
+
+    def latest(self, backup_name=None, browser=None, before=None, formats=None):
+        """조건에 맞는 가장 최근 항목 (없으면 None)"""
+        entries = self.query(browser=browser, backup_name=backup_name, before=before, formats=formats,
+                             newest_first=True, limit=1)
+        return entries[0] if entries else None
@@ -0,0 +1,104 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from bookmarks_core import discover_profiles, perform_backup, log_message, OperationResult
+from firefox_places import DEFAULT_PAGES_PER_STEP, DEFAULT_STEP_SLEEP, MODE_DATABASE
+from backup_archive import DEFAULT_CODEC
+
+# 여러 브라우저/프로필 일괄 백업 엔진
+# 발견된 모든 프로필을 제한된 크기의 스레드 풀에서 동시에 백업한다.
+# 북마크 파일 백업은 대부분 디스크 I/O와 hashlib(GIL 해제)이라 스레드로 충분히 병렬화된다.
+
+DEFAULT_MAX_WORKERS = 4
+
+
+class BatchBackupResult:
+    """일괄 백업 결과 (프로필별 결과 + 전체 소요 시간)"""
+
+    def __init__(self):
+        self.results = []
+        self.elapsed = 0.0
+
+    @property
+    def succeeded(self):
+        return sum(1 for r in self.results if r.success and not r.skipped)
+
+    @property
+    def skipped(self):
+        return sum(1 for r in self.results if r.skipped)
+
+    @property
+    def failed(self):
+        return sum(1 for r in self.results if not r.success)
+
+    def __bool__(self):
+        return all(self.results)
+
+    def to_dict(self):
+        return {
+            "elapsed": self.elapsed,
+            "total": len(self.results),
+            "succeeded": self.succeeded,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "results": [r.to_dict() for r in self.results],
+        }
+
+
+def backup_profile(profile, backup_dir, backup_format, force, backup_options):
+    """프로필 하나 백업 (예외도 실패 결과로 바꾸고 소요 시간 기록)"""
+    start = time.perf_counter()
+    try:
+        result = perform_backup(profile.browser, backup_dir, backup_format, force=force, profile=profile,
+                                **backup_options)
+    except Exception as e:
+        # perform_backup은 예외를 결과로 돌려주지만, 예상치 못한 오류도 배치 전체를 멈추지 않게 한다
+        log_message(f"[오류] {profile.display_name} 백업 실패: {e}")
+        result = OperationResult("backup", profile.browser, profile.profile)
+        result.message = str(e)
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def backup_all_profiles(backup_dir, backup_format="store", force=False, max_workers=DEFAULT_MAX_WORKERS,
+                        profiles=None, user_root=None, browsers=None,
+                        pages_per_step=DEFAULT_PAGES_PER_STEP, step_sleep=DEFAULT_STEP_SLEEP,
+                        firefox_mode=MODE_DATABASE, archive_codec=DEFAULT_CODEC, archive_level=None):
+    """모든 브라우저의 모든 프로필을 병렬로 백업
+
+    profiles: 백업할 BrowserProfile 목록 (없으면 discover_profiles로 검색)
+    user_root: 프로필 검색 루트 (없으면 사용자 폴더)
+    browsers: 검색할 브라우저 이름 목록 (없으면 전체)
+    pages_per_step, step_sleep, firefox_mode: Firefox places.sqlite 백업 설정 (perform_backup 참고)
+    archive_codec, archive_level: "archive" 형식의 압축 설정 (perform_backup 참고)
+    """
+    batch = BatchBackupResult()
+    start = time.perf_counter()
+
+    if profiles is None:
+        profiles = discover_profiles(user_root, browsers)
+    if not profiles:
+        log_message("[정보] 백업할 브라우저 프로필이 없습니다.")
+        return batch
+
+    backup_options = {"pages_per_step": pages_per_step, "step_sleep": step_sleep,
+                      "firefox_mode": firefox_mode, "archive_codec": archive_codec,
+                      "archive_level": archive_level}
+    workers = max(1, min(max_workers, len(profiles)))
+    log_message(f"[정보] 프로필 {len(profiles)}개 일괄 백업 시작 (동시 작업 {workers}개)")
+
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="backup") as pool:
+        futures = [pool.submit(backup_profile, profile, backup_dir, backup_format, force,
+                               backup_options)
+                   for profile in profiles]
+        for future in as_completed(futures):
+            batch.results.append(future.result())
+
+    # 결과는 프로필 검색 순서대로 정렬
+    order = {(p.browser, p.profile): i for i, p in enumerate(profiles)}
+    batch.results.sort(key=lambda r: order.get((r.browser, r.profile), len(order)))
+    batch.elapsed = time.perf_counter() - start
+
+    log_message(f"[정보] 일괄 백업 완료: 성공 {batch.succeeded}, 변경 없음 {batch.skipped}, "
+                f"실패 {batch.failed} ({batch.elapsed:.2f}초)")
+    return batch
@@ -0,0 +1,486 @@
+import os
+import json
+import shutil
+import hashlib
+import zlib
+import time
+import threading
+from datetime import datetime
+from file_utils import atomic_write, file_lock
+
+# 콘텐츠 주소 기반(content-addressed) 중복 제거 백업 저장소
+#
+# 구조:
+#   <root>/objects/ab/abcdef...   청크 (SHA-256 이름, 한 번만 저장)
+#   <root>/snapshots/<name>/<snapshot_id>.json   스냅샷 매니페스트
+#   <root>/.lock   저장(공유 잠금)과 gc(배타 잠금)가 겹치지 않도록 하는 잠금 파일
+#
+# 북마크 JSON처럼 줄 단위 텍스트는 줄 내용으로 경계를 정하는
+# content-defined chunking을 사용해 중간에 항목이 추가되어도
+# 뒤쪽 청크가 그대로 재사용되도록 한다.
+# places.sqlite 같은 SQLite 파일은 페이지 크기에 맞춘 고정 청크를 사용한다.
+
+STORE_DIRNAME = "store"
+ARCHIVE_DIRNAME = "archives"
+INCREMENTAL_DIRNAME = "incremental"
+INDEX_FILENAME = ".backup_index.json"
+LOCK_FILENAME = ".lock"
+MANIFEST_VERSION = 1
+
+READ_BLOCK_SIZE = 1024 * 1024
+MIN_CHUNK_SIZE = 16 * 1024
+MAX_CHUNK_SIZE = 256 * 1024
+# 줄 해시의 하위 비트가 모두 0이면 청크 경계 (평균 약 1/1024 줄마다)
+BOUNDARY_MASK = 0x3FF
+SQLITE_CHUNK_SIZE = 64 * 1024
+SQLITE_HEADER = b"SQLite format 3\x00"
+HASH_BLOCK_SIZE = 1024 * 1024
+
+
+def file_sha256(path):
+    """파일 전체를 스트리밍으로 해싱"""
+    file_hash = hashlib.sha256()
+    with open(path, 'rb') as f:
+        while True:
+            data = f.read(HASH_BLOCK_SIZE)
+            if not data:
+                break
+            file_hash.update(data)
+    return file_hash.hexdigest()
+
+
+def wal_signature(src_path):
+    """SQLite -wal 파일의 [크기, 수정 시각] (없거나 비어 있으면 None)
+
+    WAL 모드 DB는 본 파일이 그대로여도 -wal에 변경이 쌓이므로 변경 감지에 함께 사용한다.
+    빈 -wal은 읽기 전용 연결만으로도 생기므로 없는 것과 같이 취급한다.
+    """
+    try:
+        st = os.stat(src_path + "-wal")
+    except OSError:
+        return None
+    if st.st_size == 0:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+def copy_with_hash(src_path, dst_path):
+    """파일을 복사하면서 SHA-256 계산 (메타데이터 포함, shutil.copy2와 동일)
+
+    임시 파일에 복사한 뒤 교체하므로 복사 도중 중단되어도 이전 dst_path가 남는다.
+    """
+    file_hash = hashlib.sha256()
+    with open(src_path, 'rb') as src, atomic_write(dst_path) as dst:
+        while True:
+            data = src.read(HASH_BLOCK_SIZE)
+            if not data:
+                break
+            file_hash.update(data)
+            dst.write(data)
+    shutil.copystat(src_path, dst_path)
+    return file_hash.hexdigest()
+
+
+def _is_sqlite_file(path):
+    try:
+        with open(path, 'rb') as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def _sqlite_chunk_size(path):
+    """SQLite 페이지 크기의 배수가 되는 청크 크기 반환"""
+    try:
+        with open(path, 'rb') as f:
+            header = f.read(100)
+        page_size = int.from_bytes(header[16:18], 'big')
+        if page_size == 1:
+            page_size = 65536
+        if page_size >= 512:
+            return max(page_size, (SQLITE_CHUNK_SIZE // page_size) * page_size)
+    except (OSError, ValueError):
+        pass
+    return SQLITE_CHUNK_SIZE
+
+
+def iter_fixed_chunks(fileobj, chunk_size):
+    """고정 크기 청크 생성기"""
+    while True:
+        data = fileobj.read(chunk_size)
+        if not data:
+            break
+        yield data
+
+
+def iter_text_chunks(fileobj):
+    """줄 내용 기반(content-defined) 청크 생성기
+
+    MIN_CHUNK_SIZE 이상 모인 뒤, 줄의 CRC32 하위 비트가 0인 줄에서 자른다.
+    경계가 위치가 아닌 내용으로 정해지므로 삽입/삭제 후에도 곧 다시 정렬된다.
+    """
+    pending = []
+    pending_size = 0
+    tail = b""
+
+    while True:
+        block = fileobj.read(READ_BLOCK_SIZE)
+        if not block:
+            break
+        lines = (tail + block).splitlines(keepends=True)
+        # 마지막 줄이 개행으로 끝나지 않았으면 다음 블록과 이어 붙인다
+        if lines and not lines[-1].endswith((b"\n", b"\r")):
+            tail = lines.pop()
+        else:
+            tail = b""
+
+        for line in lines:
+            pending.append(line)
+            pending_size += len(line)
+            if pending_size >= MAX_CHUNK_SIZE or (
+                    pending_size >= MIN_CHUNK_SIZE and
+                    zlib.crc32(line) & BOUNDARY_MASK == 0):
+                yield b"".join(pending)
+                pending = []
+                pending_size = 0
+
+        # 개행 없는 긴 데이터는 최대 크기에서 자른다
+        while len(tail) >= MAX_CHUNK_SIZE:
+            pending.append(tail[:MAX_CHUNK_SIZE])
+            tail = tail[MAX_CHUNK_SIZE:]
+            yield b"".join(pending)
+            pending = []
+            pending_size = 0
+
+    if tail:
+        pending.append(tail)
+    if pending:
+        yield b"".join(pending)
+
+
+def iter_file_chunks(path, fileobj):
+    """파일 형식에 맞는 청크 분할 방식 선택"""
+    if _is_sqlite_file(path):
+        return iter_fixed_chunks(fileobj, _sqlite_chunk_size(path))
+    return iter_text_chunks(fileobj)
+
+
+class BackupStore:
+    """청크 단위 중복 제거 백업 저장소"""
+
+    _write_lock = threading.Lock()
+
+    def __init__(self, root):
+        self.root = root
+        self.objects_dir = os.path.join(root, "objects")
+        self.snapshots_dir = os.path.join(root, "snapshots")
+
+    # 청크 객체
+    def _object_path(self, digest):
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def has_object(self, digest):
+        return os.path.exists(self._object_path(digest))
+
+    def _lock(self, exclusive=False):
+        """저장소 잠금 (put_file은 공유, gc는 배타)"""
+        os.makedirs(self.root, exist_ok=True)
+        return file_lock(os.path.join(self.root, LOCK_FILENAME), exclusive)
+
+    def _write_object(self, digest, data):
+        """청크 저장 (이미 있으면 건너뜀). 새로 저장했으면 True"""
+        path = self._object_path(digest)
+        try:
+            # 크기가 다르면 전원 차단 등으로 잘린 청크이므로 다시 쓴다
+            if os.path.getsize(path) == len(data):
+                # 다시 쓰인 청크로 표시해 이후 시작한 gc가 매니페스트를 쓰기 전에 지우지 않도록 한다
+                os.utime(path)
+                return False
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 매니페스트보다 먼저 디스크에 남도록 fsync 후 교체
+        with atomic_write(path) as f:
+            f.write(data)
+        return True
+
+    def read_object(self, digest):
+        with open(self._object_path(digest), 'rb') as f:
+            data = f.read()
+        if hashlib.sha256(data).hexdigest() != digest:
+            raise ValueError(f"손상된 청크: {digest}")
+        return data
+
+    # 스냅샷 매니페스트
+    def _snapshot_dir(self, name):
+        return os.path.join(self.snapshots_dir, name)
+
+    def _new_snapshot_id(self, name):
+        snapshot_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        snapshot_dir = self._snapshot_dir(name)
+        suffix = 1
+        candidate = snapshot_id
+        while os.path.exists(os.path.join(snapshot_dir, f"{candidate}.json")):
+            candidate = f"{snapshot_id}_{suffix}"
+            suffix += 1
+        return candidate
+
+    def put_file(self, src_path, name, metadata=None):
+        """파일을 청크로 나누어 저장하고 스냅샷 매니페스트를 기록
+
+        반환값: 매니페스트 dict (new_chunks / new_bytes 통계 포함)
+        """
+        with self._lock():
+            file_hash = hashlib.sha256()
+            chunks = []
+            new_chunks = 0
+            new_bytes = 0
+            total_size = 0
+
+            with open(src_path, 'rb') as f:
+                for data in iter_file_chunks(src_path, f):
+                    digest = hashlib.sha256(data).hexdigest()
+                    file_hash.update(data)
+                    total_size += len(data)
+                    chunks.append([digest, len(data)])
+                    if self._write_object(digest, data):
+                        new_chunks += 1
+                        new_bytes += len(data)
+
+            with self._write_lock:
+                snapshot_id = self._new_snapshot_id(name)
+                manifest = {
+                    "version": MANIFEST_VERSION,
+                    "name": name,
+                    "snapshot_id": snapshot_id,
+                    "created": datetime.now().isoformat(timespec='seconds'),
+                    "source": src_path,
+                    "size": total_size,
+                    "sha256": file_hash.hexdigest(),
+                    "chunks": chunks,
+                }
+                if metadata:
+                    manifest["metadata"] = metadata
+
+                snapshot_dir = self._snapshot_dir(name)
+                os.makedirs(snapshot_dir, exist_ok=True)
+                manifest_path = os.path.join(snapshot_dir, f"{snapshot_id}.json")
+                with atomic_write(manifest_path, 'w', encoding='utf-8') as f:
+                    json.dump(manifest, f, separators=(',', ':'))
+
+        result = dict(manifest)
+        result["new_chunks"] = new_chunks
+        result["new_bytes"] = new_bytes
+        return result
+
+    def list_names(self):
+        """스냅샷이 있는 백업 이름 목록"""
+        if not os.path.isdir(self.snapshots_dir):
+            return []
+        return sorted(os.listdir(self.snapshots_dir))
+
+    def list_snapshots(self, name):
+        """스냅샷 ID 목록 (오래된 순)"""
+        snapshot_dir = self._snapshot_dir(name)
+        if not os.path.isdir(snapshot_dir):
+            return []
+        return sorted(entry[:-5] for entry in os.listdir(snapshot_dir)
+                      if entry.endswith(".json"))
+
+    def load_manifest(self, name, snapshot_id=None):
+        """스냅샷 매니페스트 로드 (snapshot_id가 없으면 최신)"""
+        if snapshot_id is None:
+            snapshots = self.list_snapshots(name)
+            if not snapshots:
+                return None
+            snapshot_id = snapshots[-1]
+        manifest_path = os.path.join(self._snapshot_dir(name), f"{snapshot_id}.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def restore_file(self, manifest, dst_path):
+        """매니페스트로부터 파일을 재구성하여 dst_path에 기록 (SHA-256 검증)"""
+        file_hash = hashlib.sha256()
+        with atomic_write(dst_path) as out:
+            for digest, _size in manifest["chunks"]:
+                data = self.read_object(digest)
+                file_hash.update(data)
+                out.write(data)
+            if file_hash.hexdigest() != manifest["sha256"]:
+                raise ValueError(f"스냅샷 해시 불일치: {manifest['snapshot_id']}")
+        return dst_path
+
+    def verify(self, manifest):
+        """스냅샷의 모든 청크가 존재하고 손상되지 않았는지 확인"""
+        file_hash = hashlib.sha256()
+        try:
+            for digest, _size in manifest["chunks"]:
+                file_hash.update(self.read_object(digest))
+        except (OSError, ValueError):
+            return False
+        return file_hash.hexdigest() == manifest["sha256"]
+
+    def delete_snapshots(self, name, snapshot_ids):
+        """스냅샷 매니페스트 삭제. 청크는 gc()로 정리한다. 반환: 삭제한 개수"""
+        deleted = 0
+        for snapshot_id in snapshot_ids:
+            manifest_path = os.path.join(self._snapshot_dir(name), f"{snapshot_id}.json")
+            if os.path.exists(manifest_path):
+                os.remove(manifest_path)
+                deleted += 1
+        snapshot_dir = self._snapshot_dir(name)
+        if os.path.isdir(snapshot_dir) and not os.listdir(snapshot_dir):
+            os.rmdir(snapshot_dir)
+        return deleted
+
+    def gc(self):
+        """어느 스냅샷도 참조하지 않는 청크 삭제. 반환: 통계 dict (objects, bytes)
+
+        저장소를 배타 잠금하므로 진행 중인 put_file이 끝난 뒤에 시작하고, 그동안 새 저장은 기다린다.
+        (잠금을 쓰지 않는 이전 버전과 겹칠 때를 위해 gc 시작 이후에 쓰인 청크도 남긴다)
+        """
+        with self._lock(exclusive=True):
+            return self._gc()
+
+    def _gc(self):
+        started = time.time()
+        referenced = set()
+        for name in self.list_names():
+            for snapshot_id in self.list_snapshots(name):
+                manifest = self.load_manifest(name, snapshot_id)
+                if manifest is not None:
+                    referenced.update(digest for digest, _size in manifest["chunks"])
+
+        stats = {"objects": 0, "bytes": 0}
+        if not os.path.isdir(self.objects_dir):
+            return stats
+        for prefix in os.listdir(self.objects_dir):
+            prefix_dir = os.path.join(self.objects_dir, prefix)
+            if not os.path.isdir(prefix_dir):
+                continue
+            for entry in os.scandir(prefix_dir):
+                if entry.name in referenced or entry.name.endswith(".tmp"):
+                    continue
+                st = entry.stat()
+                if st.st_mtime >= started:
+                    continue
+                os.remove(entry.path)
+                stats["objects"] += 1
+                stats["bytes"] += st.st_size
+        return stats
+
+
+class ChangeIndex:
+    """백업 폴더의 변경 감지 인덱스 (.backup_index.json)
+
+    원본 파일의 크기/수정 시각을 먼저 비교하고, 수정 시각만 달라진 경우에만
+    스트리밍 해시로 내용을 비교한다. 변경이 없으면 백업을 건너뛸 수 있다.
+    항목은 백업 이름 + 형식 (+ 방식)마다 따로 기록해 같은 프로필을 여러 형식으로
+    백업해도(매시간 store + 매일 archive 등) 서로 덮어쓰지 않는다.
+    """
+
+    _lock = threading.Lock()
+
+    def __init__(self, backup_dir):
+        self.backup_dir = backup_dir
+        self.index_path = os.path.join(backup_dir, INDEX_FILENAME)
+
+    def _load(self):
+        try:
+            with open(self.index_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _target_exists(self, entry):
+        """인덱스 항목이 가리키는 백업이 아직 남아 있는지 확인"""
+        if entry.get("format") == "copy":
+            target = os.path.join(self.backup_dir, entry.get("target", ""))
+            try:
+                return os.path.getsize(target) == entry.get("target_size", entry.get("size"))
+            except OSError:
+                return False
+        if entry.get("format") in ("archive", "incremental"):
+            dirname = ARCHIVE_DIRNAME if entry.get("format") == "archive" else INCREMENTAL_DIRNAME
+            target = os.path.join(self.backup_dir, dirname,
+                                  entry.get("target", ""), f"{entry.get('snapshot_id')}.json")
+            return os.path.exists(target)
+        target = os.path.join(self.backup_dir, STORE_DIRNAME, "snapshots",
+                              entry.get("target", ""), f"{entry.get('snapshot_id')}.json")
+        return os.path.exists(target)
+
+    @staticmethod
+    def _entry_key(key, backup_format, variant=None):
+        # copy 형식은 백업 파일이 하나뿐이므로 방식과 관계없이 한 항목 (방식은 항목 안에서 비교)
+        if backup_format == "copy" or not variant:
+            return f"{key}|{backup_format}"
+        return f"{key}|{backup_format}|{variant}"
+
+    def get(self, key, backup_format, variant=None):
+        return self._load().get(self._entry_key(key, backup_format, variant))
+
+    def is_unchanged(self, key, src_path, backup_format, variant=None):
+        """마지막 백업 이후 원본이 바뀌지 않았으면 True
+
+        variant: 같은 원본을 다른 방식으로 백업하는 경우의 구분값 (Firefox 백업 방식 등)
+        """
+        entry = self.get(key, backup_format, variant)
+        if not entry or entry.get("format") != backup_format or entry.get("source") != src_path:
+            return False
+        if entry.get("variant") != variant:
+            return False
+
+        st = os.stat(src_path)
+        if st.st_size != entry.get("size"):
+            return False
+        if wal_signature(src_path) != entry.get("wal"):
+            return False
+        if not self._target_exists(entry):
+            return False
+        if st.st_mtime_ns == entry.get("mtime_ns"):
+            return True
+
+        # 수정 시각만 바뀐 경우: 원본 내용 해시 비교
+        # (SQLite 스냅샷/북마크 내보내기는 백업 해시가 원본과 다르므로 원본 해시를 따로 기록해 둔다)
+        source_sha256 = entry.get("source_sha256", entry.get("sha256"))
+        if file_sha256(src_path) != source_sha256:
+            return False
+        self.record(key, src_path, backup_format, entry.get("target"),
+                    entry.get("sha256"), entry.get("snapshot_id"), st, entry.get("wal"), variant,
+                    source_sha256)
+        return True
+
+    def record(self, key, src_path, backup_format, target, sha256, snapshot_id=None, st=None,
+               wal=None, variant=None, source_sha256=None):
+        """백업 결과를 인덱스에 기록
+
+        st, wal: 백업 직전에 읽은 원본/-wal 상태 (없으면 지금 읽음)
+        source_sha256: 원본 파일 해시 (없으면 sha256 - 원본을 그대로 백업한 경우)
+        """
+        if st is None:
+            st = os.stat(src_path)
+            wal = wal_signature(src_path)
+        entry_key = self._entry_key(key, backup_format, variant)
+        with self._lock:
+            index = self._load()
+            # 형식 구분 없이 이름만으로 기록하던 이전 항목
+            index.pop(key, None)
+            index[entry_key] = {
+                "source": src_path,
+                "format": backup_format,
+                "target": target,
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
+                "sha256": sha256,
+                "source_sha256": source_sha256 or sha256,
+                "snapshot_id": snapshot_id,
+                "wal": wal,
+                "variant": variant,
+            }
+            if backup_format == "copy":
+                # SQLite 스냅샷은 원본과 크기가 다를 수 있으므로 백업 파일 크기를 따로 기록
+                index[entry_key]["target_size"] = os.path.getsize(os.path.join(self.backup_dir, target))
+            with atomic_write(self.index_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,299 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import platform
+import tempfile
+import subprocess
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookmarks_core import (perform_backup, perform_restore, set_user_root, set_log_stream, BROWSER_EXE_MAP,
+                            RESTORE_MERGE)
+from bookmark_model import load_chromium_bookmarks, load_firefox_bookmarks
+from bookmark_diff import diff_trees
+from bookmark_merge import merge_trees
+from firefox_places import MODE_BOOKMARKS
+from fixtures import SHAPES, DEFAULT_FANOUT, DEFAULT_DEPTH, generate_profile, mutate_profile
+
+# 백업/복구/파싱/비교/병합 벤치마크 (가상 북마크, 브라우저 설치 불필요)
+#
+# 임시 폴더를 사용자 폴더 루트로 지정(set_user_root)하고 그 아래 기본 프로필 위치에 가상 북마크를 만든 뒤
+# perform_backup / perform_restore 등을 실제 실행 경로 그대로 측정한다.
+# 복구 중 브라우저 종료/재실행은 하지 않는다 (BROWSER_EXE_MAP을 비워 둠).
+#
+# 측정 값: 가장 빠른 실행 시간, 노드/초, MB/초, 최대 메모리 (tracemalloc, Python 할당만)
+# 결과는 benchmarks/results/에 JSON으로 저장되며 --compare로 이전 결과와 비교한다.
+#
+# 사용 예:
+#   python benchmarks/bench_backup.py
+#   python benchmarks/bench_backup.py --nodes 1000 1000000 --shapes deep --browsers Chrome
+#   python benchmarks/bench_backup.py --cases backup restore --formats store incremental --repeat 5
+#   python benchmarks/bench_backup.py --compare benchmarks/results/baseline.json --threshold 0.1
+
+DEFAULT_NODES = (1000, 10000, 100000)
+BROWSERS = ("Chrome", "Firefox")
+CASES = ("parse", "diff", "merge", "backup", "restore")
+FORMATS = ("store", "copy", "archive", "incremental")
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+DEFAULT_THRESHOLD = 0.2
+
+# 다음 백업/비교/병합에 쓰는 변경 비율 (북마크의 1%를 수정/삭제/추가)
+DEFAULT_CHANGE = 0.01
+
+
+def _measure(func, repeat, memory, setup=None):
+    """(가장 빠른 초, 최대 메모리 bytes 또는 None). setup은 매 실행 전에 호출되며 측정하지 않는다"""
+    times = []
+    for _ in range(repeat):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    peak = None
+    if memory:
+        # tracemalloc은 실행을 느리게 하므로 시간 측정과 따로 한 번 더 실행
+        if setup:
+            setup()
+        tracemalloc.start()
+        try:
+            func()
+            _current, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return min(times), peak
+
+
+def _check(result):
+    if not result.success:
+        raise RuntimeError(f"{result.operation} 실패: {result.message}")
+    return result
+
+
+def _backup_variants(browser, formats):
+    """(이름, 형식, perform_backup 추가 인자) 목록"""
+    variants = []
+    for backup_format in formats:
+        if backup_format == "incremental" and browser == "Firefox":
+            # places.sqlite는 증분 백업 대신 저장소 형식으로 백업되므로 따로 측정하지 않는다
+            continue
+        variants.append((backup_format, backup_format, {}))
+    if browser == "Firefox" and "store" in formats:
+        variants.append(("store-bookmarks", "store", {"firefox_mode": MODE_BOOKMARKS}))
+    return variants
+
+
+def run_profile(browser, shape, nodes, args, work_dir):
+    """한 브라우저/모양/크기 조합의 측정 결과 목록"""
+    user_root = os.path.join(work_dir, "root")
+    src_path, total = generate_profile(user_root, browser, nodes, shape, args.fanout, args.depth)
+    set_user_root(user_root)
+    size = os.path.getsize(src_path)
+
+    original_path = os.path.join(work_dir, "original")
+    changed_path = os.path.join(work_dir, "changed")
+    other_path = os.path.join(work_dir, "other")
+    shutil.copyfile(src_path, original_path)
+    mutate_profile(browser, original_path, changed_path, args.change, seed=1)
+    mutate_profile(browser, original_path, other_path, args.change, seed=2)
+
+    rows = []
+
+    def record(case, seconds, peak, backup_format=None):
+        row = {
+            "case": case,
+            "browser": browser,
+            "shape": shape,
+            "nodes": total,
+            "format": backup_format,
+            "size": size,
+            "seconds": seconds,
+            "nodes_per_sec": total / seconds if seconds else 0,
+            "mb_per_sec": size / seconds / 1024 / 1024 if seconds else 0,
+            "peak_bytes": peak,
+        }
+        rows.append(row)
+        if not args.json:
+            _print_row(row)
+
+    def reset_source():
+        shutil.copyfile(original_path, src_path)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(src_path + suffix):
+                os.remove(src_path + suffix)
+
+    load = load_firefox_bookmarks if browser == "Firefox" else load_chromium_bookmarks
+    if "parse" in args.cases:
+        record("parse", *_measure(lambda: load(original_path), args.repeat, args.memory))
+        if browser != "Firefox":
+            record("parse_streaming", *_measure(lambda: load_chromium_bookmarks(original_path, streaming=True),
+                                                args.repeat, args.memory))
+
+    if "diff" in args.cases or "merge" in args.cases:
+        base, current, backup = load(original_path), load(changed_path), load(other_path)
+        if "diff" in args.cases:
+            record("diff", *_measure(lambda: diff_trees(base, current), args.repeat, args.memory))
+        if "merge" in args.cases:
+            record("merge", *_measure(lambda: merge_trees(base, current, backup), args.repeat, args.memory))
+        del base, current, backup
+
+    if "backup" not in args.cases and "restore" not in args.cases:
+        return rows
+
+    for name, backup_format, options in _backup_variants(browser, args.formats):
+        backup_dir = os.path.join(work_dir, "backups", name)
+
+        def empty_backup_dir():
+            shutil.rmtree(backup_dir, ignore_errors=True)
+            reset_source()
+
+        def backup_once(force=True):
+            _check(perform_backup(browser, backup_dir, backup_format, force=force, **options))
+
+        def backup_then_change():
+            empty_backup_dir()
+            backup_once()
+            shutil.copyfile(changed_path, src_path)
+
+        if "backup" in args.cases:
+            record("backup_full", *_measure(backup_once, args.repeat, args.memory, empty_backup_dir), name)
+            # 변경된 북마크의 다음 백업 (중복 제거/증분 패치 경로)
+            record("backup_changed", *_measure(lambda: backup_once(force=False), args.repeat, args.memory,
+                                               backup_then_change), name)
+
+        if "restore" in args.cases:
+            backup_then_change()
+            backup_once()
+            reset_source()
+
+            def restore(mode=None):
+                kwargs = {"mode": mode} if mode else {}
+                _check(perform_restore(browser, backup_dir, restart_browser=False, **kwargs))
+
+            def clean_previous():
+                # 복구할 때마다 남기는 기존 북마크 .bak 파일 정리
+                folder = os.path.dirname(src_path)
+                for entry in os.listdir(folder):
+                    if entry.endswith(".bak"):
+                        os.remove(os.path.join(folder, entry))
+                reset_source()
+
+            record("restore", *_measure(restore, args.repeat, args.memory, clean_previous), name)
+            if backup_format == "store" and not options:
+                record("restore_merge", *_measure(lambda: restore(RESTORE_MERGE), args.repeat, args.memory,
+                                                  clean_previous), name)
+            clean_previous()
+        shutil.rmtree(backup_dir, ignore_errors=True)
+    return rows
+
+
+def _row_key(row):
+    return (row["case"], row["browser"], row["shape"], row["nodes"], row["format"])
+
+
+def _print_row(row, note=""):
+    peak = f"{row['peak_bytes'] / 1024 / 1024:>9.1f} MB" if row.get("peak_bytes") is not None else f"{'-':>12}"
+    name = row["case"] + (f"[{row['format']}]" if row["format"] else "")
+    print(f"{name:<32} {row['browser']:<8} {row['shape']:<5} {row['nodes']:>9,} {row['seconds']:>9.4f}s "
+          f"{row['nodes_per_sec']:>12,.0f}/s {row['mb_per_sec']:>8.1f} MB/s {peak}{note}", flush=True)
+
+
+def compare(rows, baseline_path, threshold):
+    """기준 결과와 비교해 threshold(비율)보다 느려지거나 메모리가 늘어난 항목 목록"""
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = {_row_key(row): row for row in json.load(f)["results"]}
+    regressions = []
+    for row in rows:
+        base = baseline.get(_row_key(row))
+        if base is None:
+            continue
+        changes = {"seconds": row["seconds"] / base["seconds"] - 1 if base["seconds"] else 0}
+        if row.get("peak_bytes") and base.get("peak_bytes"):
+            changes["peak_bytes"] = row["peak_bytes"] / base["peak_bytes"] - 1
+        worse = {key: value for key, value in changes.items() if value > threshold}
+        row["change"] = changes
+        if worse:
+            regressions.append((row, worse))
+    return regressions
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="백업/복구 벤치마크 (가상 북마크)")
+    parser.add_argument("--nodes", nargs="+", type=int, default=list(DEFAULT_NODES), help="북마크 수 (여러 개 가능)")
+    parser.add_argument("--shapes", nargs="+", choices=SHAPES, default=list(SHAPES), help="트리 모양")
+    parser.add_argument("--browsers", nargs="+", choices=BROWSERS, default=list(BROWSERS))
+    parser.add_argument("--cases", nargs="+", choices=CASES, default=list(CASES), help="측정할 작업")
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS), help="백업 형식")
+    parser.add_argument("--fanout", type=int, default=DEFAULT_FANOUT, help="폴더당 북마크 수")
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH, help="deep 모양의 폴더 깊이")
+    parser.add_argument("--change", type=float, default=DEFAULT_CHANGE, help="변경 비율 (다음 백업/비교/병합)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="최대 메모리 측정 안 함")
+    parser.add_argument("--output", help="결과 JSON 경로 (기본값: benchmarks/results/bench_backup_<시각>.json)")
+    parser.add_argument("--no-save", action="store_true", help="결과 파일을 저장하지 않음")
+    parser.add_argument("--compare", metavar="BASELINE", help="이전 결과 JSON과 비교 (느려지면 종료 코드 1)")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="회귀로 볼 증가 비율 (기본값: 0.2 = 20%%)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    set_log_stream(False)
+    saved_exe_map = dict(BROWSER_EXE_MAP)
+    BROWSER_EXE_MAP.clear()
+    rows = []
+    try:
+        for browser in args.browsers:
+            for shape in args.shapes:
+                for nodes in args.nodes:
+                    with tempfile.TemporaryDirectory(prefix="bench_backup_") as work_dir:
+                        rows.extend(run_profile(browser, shape, nodes, args, work_dir))
+    finally:
+        BROWSER_EXE_MAP.update(saved_exe_map)
+
+    report = {
+        "created": datetime.now().isoformat(timespec="seconds"),
+        "commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "args": {key: value for key, value in vars(args).items()
+                 if key not in ("output", "no_save", "compare", "json")},
+        "results": rows,
+    }
+
+    regressions = compare(rows, args.compare, args.threshold) if args.compare else []
+    if not args.no_save:
+        output = args.output or os.path.join(
+            RESULTS_DIR, f"bench_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json")
+        os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        if not args.json:
+            print(f"결과 저장: {output}")
+
+    if args.json:
+        json.dump(report, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    elif args.compare:
+        print(f"기준 결과와 비교 ({args.compare}, 허용 {args.threshold:.0%}):")
+        if not regressions:
+            print("  회귀 없음")
+        for row, worse in regressions:
+            _print_row(row, "  <- " + ", ".join(f"{key} +{value:.0%}" for key, value in worse.items()))
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from backup_archive import CODECS, compress_file, decompress_file
+from fixtures import generate_chromium
+
+# 압축 코덱 벤치마크 (크기, 압축/해제 속도)
+#
+# 사용 예:
+#   python benchmarks/bench_codecs.py
+#   python benchmarks/bench_codecs.py --file "%LOCALAPPDATA%\Google\Chrome\User Data\Default\Bookmarks"
+#   python benchmarks/bench_codecs.py --nodes 200000 --levels 1 6 9 --json
+
+DEFAULT_NODES = 50000
+
+
+def bench(src_path, codec, level, repeat, work_dir):
+    """(압축 크기, 압축 초, 해제 초) 중 가장 빠른 값"""
+    archive_path = os.path.join(work_dir, "archive" + CODECS[codec][0])
+    restored_path = os.path.join(work_dir, "restored")
+    compress_times, decompress_times = [], []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        stats = compress_file(src_path, archive_path, codec, level)
+        compress_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        _size, sha256 = decompress_file(archive_path, restored_path, codec)
+        decompress_times.append(time.perf_counter() - start)
+        if sha256 != stats["sha256"]:
+            raise RuntimeError(f"{codec} 레벨 {level}: 복원한 내용이 원본과 다릅니다.")
+    return stats["size"], stats["compressed_size"], min(compress_times), min(decompress_times)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="백업 아카이브 압축 코덱 비교")
+    parser.add_argument("--file", help="측정할 파일 (기본값: 가상 북마크 파일 생성)")
+    parser.add_argument("--nodes", type=int, default=DEFAULT_NODES, help="생성할 북마크 수")
+    parser.add_argument("--codecs", nargs="+", choices=list(CODECS), default=list(CODECS))
+    parser.add_argument("--levels", nargs="+", type=int, help="압축 레벨 (기본값: 코덱 기본값)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    with tempfile.TemporaryDirectory(prefix="bench_codecs_") as work_dir:
+        src_path = args.file
+        if not src_path:
+            src_path = os.path.join(work_dir, "Bookmarks")
+            generate_chromium(src_path, args.nodes)
+
+        rows = []
+        for codec in args.codecs:
+            low, high = CODECS[codec][2]
+            levels = [lv for lv in args.levels if low <= lv <= high] if args.levels else [None]
+            for level in levels:
+                size, compressed, c_time, d_time = bench(src_path, codec, level, args.repeat, work_dir)
+                rows.append({
+                    "codec": codec,
+                    "level": level if level is not None else CODECS[codec][1],
+                    "size": size,
+                    "compressed_size": compressed,
+                    "ratio": size / compressed if compressed else 0,
+                    "compress_mb_per_sec": size / c_time / 1024 / 1024,
+                    "decompress_mb_per_sec": size / d_time / 1024 / 1024,
+                })
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    print(f"원본: {rows[0]['size']:,} bytes" if rows else "측정 결과 없음")
+    print(f"{'codec':<6} {'level':>5} {'compressed':>12} {'ratio':>7} {'compress':>12} {'decompress':>12}")
+    for row in rows:
+        print(f"{row['codec']:<6} {row['level']:>5} {row['compressed_size']:>12,} {row['ratio']:>6.1f}x "
+              f"{row['compress_mb_per_sec']:>8.1f} MB/s {row['decompress_mb_per_sec']:>8.1f} MB/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
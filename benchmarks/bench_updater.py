@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from process_utils import wait_for_handoff
+from file_utils import replace_file
+
+# updater 인계(프로그램 종료 대기 -> 교체 -> 재시작) 시간 측정
+#
+# 가상 프로그램(지정한 시간 뒤에 끝나는 Python 프로세스)을 실행하고, updater.exe와 같은 순서로
+# wait_for_handoff(PID 전달) -> replace_file -> 재시작을 실행해 각 단계 시간을 잰다.
+# 이전 updater의 고정 대기(종료 대기 5초 + 재시작 전 2초 + 완료 후 2초)와 비교한다.
+# 브라우저/실제 실행 파일이 필요 없으므로 Linux에서도 실행할 수 있다.
+#
+# 실제 업데이트의 단계별 시간은 %TEMP%\updater_metrics.jsonl에 기록되며 --metrics로 요약한다.
+#
+# 사용 예:
+#   python benchmarks/bench_updater.py
+#   python benchmarks/bench_updater.py --exit-delays 0 0.5 2 --size 30 --repeat 5
+#   python benchmarks/bench_updater.py --metrics "%TEMP%\updater_metrics.jsonl"
+
+DEFAULT_EXIT_DELAYS = (0.0, 0.2, 1.0)
+DEFAULT_SIZE_MB = 20
+LEGACY_FIXED_SLEEP = 5 + 2 + 2
+UPDATER_SPANS = ("updater_wait", "updater_extract", "updater_replace", "updater_restart", "updater")
+
+
+def _spawn_app(exit_delay):
+    """exit_delay초 뒤에 끝나는 가상 프로그램"""
+    return subprocess.Popen([sys.executable, "-c", f"import time; time.sleep({exit_delay!r})"])
+
+
+def bench_handoff(work_dir, exit_delay, size):
+    """한 번 실행한 단계별 시간(초)"""
+    target = os.path.join(work_dir, "BrowserBookmarks.exe")
+    staged = target + ".new"
+    with open(target, "wb") as f:
+        f.write(b"\0" * size)
+    with open(staged, "wb") as f:
+        f.write(b"\1" * size)
+
+    app = _spawn_app(exit_delay)
+    started = time.perf_counter()
+    handoff = wait_for_handoff(target, app.pid, timeout=exit_delay + 10)
+    waited = time.perf_counter()
+    replace_file(staged, target, target + ".backup")
+    replaced = time.perf_counter()
+    restarted_app = subprocess.Popen([sys.executable, "-c", "pass"])
+    restarted = time.perf_counter()
+    restarted_app.wait()
+    app.wait()
+    if handoff["remaining"]:
+        raise RuntimeError(f"가상 프로그램이 끝나지 않았습니다: {handoff['remaining']}")
+    return {
+        "wait": waited - started,
+        "replace": replaced - waited,
+        "restart": restarted - replaced,
+        "total": restarted - started,
+    }
+
+
+def summarize_metrics(path):
+    """updater_metrics.jsonl의 updater 단계별 시간 (실행 횟수, 평균, 최대)"""
+    durations = {}
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            if record.get("span") in UPDATER_SPANS:
+                durations.setdefault(record["span"], []).append(record["duration"])
+    print(f"{'span':<18} {'runs':>5} {'mean':>9} {'max':>9}")
+    for name in UPDATER_SPANS:
+        values = durations.get(name)
+        if values:
+            print(f"{name:<18} {len(values):>5} {sum(values) / len(values):>8.3f}s {max(values):>8.3f}s")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="updater 인계 시간 측정")
+    parser.add_argument("--exit-delays", nargs="+", type=float, default=list(DEFAULT_EXIT_DELAYS),
+                        help="가상 프로그램이 끝나기까지 걸리는 시간(초)")
+    parser.add_argument("--size", type=int, default=DEFAULT_SIZE_MB, help="가상 실행 파일 크기(MB)")
+    parser.add_argument("--repeat", type=int, default=3, help="반복 횟수 (가장 빠른 값 사용)")
+    parser.add_argument("--metrics", help="실제 업데이트 기록(updater_metrics.jsonl) 요약")
+    parser.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    args = parser.parse_args(argv)
+
+    if args.metrics:
+        return summarize_metrics(args.metrics)
+
+    rows = []
+    with tempfile.TemporaryDirectory(prefix="bench_updater_") as work_dir:
+        for exit_delay in args.exit_delays:
+            runs = [bench_handoff(work_dir, exit_delay, args.size * 1024 * 1024) for _ in range(args.repeat)]
+            best = min(runs, key=lambda run: run["total"])
+            rows.append(dict(best, exit_delay=exit_delay,
+                             overhead=best["total"] - exit_delay,
+                             legacy_total=LEGACY_FIXED_SLEEP + best["replace"]))
+
+    if args.json:
+        json.dump(rows, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+        return 0
+
+    print(f"가상 실행 파일: {args.size} MB, 이전 updater 고정 대기: {LEGACY_FIXED_SLEEP}초")
+    print(f"{'exit':>6} {'wait':>8} {'replace':>8} {'restart':>8} {'total':>8} {'overhead':>9} {'legacy':>8}")
+    for row in rows:
+        print(f"{row['exit_delay']:>5.1f}s {row['wait']:>7.3f}s {row['replace']:>7.3f}s {row['restart']:>7.3f}s "
+              f"{row['total']:>7.3f}s {row['overhead']:>8.3f}s {row['legacy_total']:>7.2f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,313 @@
+import os
+import sys
+import json
+import random
+import sqlite3
+import shutil
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bookmarks_core import CHROMIUM_USER_DATA_DIRS, FIREFOX_APP_DIR
+from firefox_places import url_hash, TYPE_BOOKMARK, TYPE_FOLDER
+
+# 벤치마크용 가상 북마크 생성 (브라우저 없이 Linux에서도 실행 가능)
+#
+# 모양(shape)
+#   wide  북마크바 아래에 fanout개씩 북마크가 든 폴더를 나란히 둔다 (일반적인 사용자)
+#   deep  폴더마다 fanout개의 북마크와 하위 폴더 하나를 두어 depth 단계까지 내려가는 사슬을 반복
+#
+# 파일은 한 노드씩 바로 써 나가므로 100만 개도 메모리에 트리 전체를 올리지 않고 만든다.
+
+SHAPES = ("wide", "deep")
+DEFAULT_FANOUT = 20
+DEFAULT_DEPTH = 64
+
+BENCH_FIREFOX_PROFILE = "bench.default-release"
+
+_WORDS = ["news", "docs", "python", "recipe", "travel", "music", "video", "shop", "bank", "blog",
+          "forum", "wiki", "mail", "map", "weather", "sport", "game", "photo", "code", "book"]
+
+# Chromium 시각 (1601-01-01 기준 마이크로초), Firefox 시각 (1970-01-01 기준 마이크로초)
+CHROMIUM_TIME_BASE = 13300000000000000
+FIREFOX_TIME_BASE = 1700000000000000
+
+
+def _iter_shape(nodes, shape, fanout, depth, rng):
+    """("folder", 이름) / ("bookmark", 제목, URL) / ("end",) 이벤트 (북마크 nodes개)"""
+    if shape not in SHAPES:
+        raise ValueError(f"알 수 없는 모양: {shape}")
+    count = 0
+
+    def bookmark():
+        word = rng.choice(_WORDS)
+        title = " ".join(rng.choice(_WORDS).title() for _ in range(rng.randint(2, 6)))
+        url = f"https://{word}{count % 997}.example.com/{rng.choice(_WORDS)}/{count}?ref={rng.choice(_WORDS)}"
+        return ("bookmark", title, url)
+
+    while count < nodes:
+        levels = 1 if shape == "wide" else depth
+        opened = 0
+        for _level in range(levels):
+            if count >= nodes:
+                break
+            yield ("folder", rng.choice(_WORDS).title())
+            opened += 1
+            for _ in range(min(fanout, nodes - count)):
+                yield bookmark()
+                count += 1
+        for _ in range(opened):
+            yield ("end",)
+
+
+def profile_path(user_root, browser):
+    """user_root 아래의 브라우저 기본 프로필 북마크 파일 경로 (bookmarks_core.get_browser_paths와 같은 위치)"""
+    if browser == "Firefox":
+        return os.path.join(user_root, *FIREFOX_APP_DIR, "Profiles", BENCH_FIREFOX_PROFILE, "places.sqlite")
+    return os.path.join(user_root, *CHROMIUM_USER_DATA_DIRS[browser], "Default", "Bookmarks")
+
+
+# Chromium Bookmarks JSON
+def generate_chromium(path, nodes, shape="wide", fanout=DEFAULT_FANOUT, depth=DEFAULT_DEPTH, seed=0):
+    """Chromium Bookmarks 파일 생성. 반환: 전체 노드 수 (폴더 포함)"""
+    rng = random.Random(seed)
+    next_id = 4
+    total = 0
+
+    def new_id():
+        nonlocal next_id
+        next_id += 1
+        return str(next_id)
+
+    def guid():
+        value = f"{rng.getrandbits(128):032x}"
+        return f"{value[:8]}-{value[8:12]}-4{value[13:16]}-a{value[17:20]}-{value[20:]}"
+
+    def root(node_id, name, children):
+        return {"children": children, "date_added": str(CHROMIUM_TIME_BASE), "date_modified": "0",
+                "guid": f"0000000{node_id}-0000-4000-a000-00000000000{node_id}", "id": str(node_id),
+                "name": name, "type": "folder"}
+
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{\n   "checksum": "",\n   "roots": {\n      "bookmark_bar": {\n         "children": [ ')
+        # 폴더 메타데이터는 하위 노드를 모두 쓴 뒤 닫는 괄호와 함께 쓴다
+        stack = [[False, None]]
+        for event in _iter_shape(nodes, shape, fanout, depth, rng):
+            if event[0] == "end":
+                _has_children, meta = stack.pop()
+                f.write(" ], " + json.dumps(meta, ensure_ascii=False)[1:])
+                continue
+            if stack[-1][0]:
+                f.write(", ")
+            stack[-1][0] = True
+            total += 1
+            if event[0] == "folder":
+                meta = {"date_added": str(CHROMIUM_TIME_BASE), "date_modified": "0", "guid": guid(),
+                        "id": new_id(), "name": event[1], "type": "folder"}
+                f.write('{"children": [ ')
+                stack.append([False, meta])
+            else:
+                node = {"date_added": str(CHROMIUM_TIME_BASE + rng.randint(0, 10 ** 12)), "guid": guid(),
+                        "id": new_id(), "name": event[1], "type": "url", "url": event[2]}
+                f.write(json.dumps(node, ensure_ascii=False))
+        bar = json.dumps(root(1, "Bookmarks bar", []), ensure_ascii=False)
+        f.write(" ], " + bar[bar.index('"date_added"'):])
+        f.write(',\n      "other": ' + json.dumps(root(2, "Other bookmarks", []), ensure_ascii=False))
+        f.write(',\n      "synced": ' + json.dumps(root(3, "Mobile bookmarks", []), ensure_ascii=False))
+        f.write('\n   },\n   "version": 1\n}\n')
+    return total
+
+
+def mutate_chromium(src_path, dst_path, fraction=0.01, seed=1):
+    """북마크의 fraction만큼 제목/URL 변경, 삭제, 추가한 사본 생성 (다음 백업, 비교, 병합용)"""
+    rng = random.Random(seed)
+    with open(src_path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    max_id = 0
+    folders = []
+    stack = [data["roots"][key] for key in ("bookmark_bar", "other", "synced")]
+    while stack:
+        folder = stack.pop()
+        folders.append(folder)
+        max_id = max(max_id, int(folder["id"]))
+        kept = []
+        for child in folder.get("children", []):
+            max_id = max(max_id, int(child["id"]))
+            if child["type"] == "folder":
+                stack.append(child)
+            elif rng.random() < fraction:
+                action = rng.randrange(3)
+                if action == 0:
+                    child["name"] += " (수정)"
+                elif action == 1:
+                    child["url"] += "&changed=1"
+                else:
+                    continue
+            kept.append(child)
+        folder["children"] = kept
+
+    added = max(1, int(sum(len(f["children"]) for f in folders) * fraction / 3))
+    for n in range(added):
+        max_id += 1
+        rng.choice(folders)["children"].append({
+            "date_added": str(CHROMIUM_TIME_BASE), "guid": f"{rng.getrandbits(128):032x}", "id": str(max_id),
+            "name": f"새 북마크 {n}", "type": "url", "url": f"https://added{seed}.example.net/{n}"})
+    os.makedirs(os.path.dirname(os.path.abspath(dst_path)), exist_ok=True)
+    # json.dump(파일)는 순수 Python 인코더를 써서 깊은 트리에서 매우 느리므로 dumps(C 인코더) 사용
+    with open(dst_path, "w", encoding="utf-8") as f:
+        f.write(json.dumps(data, ensure_ascii=False))
+
+
+# Firefox places.sqlite
+_PLACES_SCHEMA = """
+CREATE TABLE moz_places (id INTEGER PRIMARY KEY, url LONGVARCHAR, title LONGVARCHAR, rev_host LONGVARCHAR,
+    visit_count INTEGER DEFAULT 0, hidden INTEGER DEFAULT 0 NOT NULL, typed INTEGER DEFAULT 0 NOT NULL,
+    frecency INTEGER DEFAULT -1 NOT NULL, last_visit_date INTEGER, guid TEXT, foreign_count INTEGER DEFAULT 0 NOT NULL,
+    url_hash INTEGER DEFAULT 0 NOT NULL, description TEXT, preview_image_url TEXT, origin_id INTEGER);
+CREATE TABLE moz_bookmarks (id INTEGER PRIMARY KEY, type INTEGER, fk INTEGER DEFAULT NULL, parent INTEGER,
+    position INTEGER, title LONGVARCHAR, keyword_id INTEGER, folder_type TEXT, dateAdded INTEGER,
+    lastModified INTEGER, guid TEXT, syncStatus INTEGER NOT NULL DEFAULT 0, syncChangeCounter INTEGER NOT NULL DEFAULT 1);
+CREATE TABLE moz_keywords (id INTEGER PRIMARY KEY AUTOINCREMENT, keyword TEXT UNIQUE, place_id INTEGER, post_data TEXT);
+CREATE TABLE moz_historyvisits (id INTEGER PRIMARY KEY, from_visit INTEGER, place_id INTEGER, visit_date INTEGER,
+    visit_type INTEGER, session INTEGER);
+CREATE UNIQUE INDEX moz_places_url_uniqueindex ON moz_places (url_hash, url);
+CREATE INDEX moz_places_guid_uniqueindex ON moz_places (guid);
+CREATE INDEX moz_bookmarks_itemindex ON moz_bookmarks (fk, type);
+CREATE INDEX moz_bookmarks_parentindex ON moz_bookmarks (parent, position);
+CREATE UNIQUE INDEX moz_bookmarks_guid_uniqueindex ON moz_bookmarks (guid);
+"""
+
+_PLACES_ROOTS = ((1, "root________", 0, 0, ""), (2, "menu________", 1, 0, "menu"),
+                 (3, "toolbar_____", 1, 1, "toolbar"), (4, "tags________", 1, 2, "tags"),
+                 (5, "unfiled_____", 1, 3, "unfiled"), (6, "mobile______", 1, 4, "mobile"))
+
+# executemany 한 번에 넣을 행 수
+_INSERT_BATCH = 20000
+
+
+def _places_guid(rng):
+    alphabet = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789-_"
+    return "".join(rng.choice(alphabet) for _ in range(12))
+
+
+def _rev_host(url):
+    return url.split("/", 3)[2][::-1] + "."
+
+
+def generate_places(path, nodes, shape="wide", fanout=DEFAULT_FANOUT, depth=DEFAULT_DEPTH, history=0, seed=0):
+    """Firefox places.sqlite 생성 (북마크는 도구 모음 아래). history: 북마크가 아닌 방문 기록 URL 수
+
+    반환: 전체 북마크 노드 수 (폴더 포함, 루트 제외)
+    """
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+
+    conn = sqlite3.connect(path)
+    try:
+        conn.executescript(_PLACES_SCHEMA)
+        conn.executemany("INSERT INTO moz_bookmarks (id, type, parent, position, title, dateAdded, lastModified, guid) "
+                         "VALUES (?, 2, ?, ?, ?, ?, ?, ?)",
+                         [(i, parent, pos, title, FIREFOX_TIME_BASE, FIREFOX_TIME_BASE, guid)
+                          for i, guid, parent, pos, title in _PLACES_ROOTS])
+        places, bookmarks = [], []
+        next_id = len(_PLACES_ROOTS) + 1
+        stack = [[3, 0]]    # [폴더 id, 다음 위치]
+        total = 0
+
+        def flush():
+            conn.executemany("INSERT INTO moz_places (id, url, title, rev_host, guid, url_hash, foreign_count) "
+                             "VALUES (?, ?, ?, ?, ?, ?, 1)", places)
+            conn.executemany("INSERT INTO moz_bookmarks (id, type, fk, parent, position, title, dateAdded, "
+                             "lastModified, guid) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", bookmarks)
+            places.clear()
+            bookmarks.clear()
+
+        for event in _iter_shape(nodes, shape, fanout, depth, rng):
+            if event[0] == "end":
+                stack.pop()
+                continue
+            parent = stack[-1]
+            added = FIREFOX_TIME_BASE + total
+            if event[0] == "folder":
+                bookmarks.append((next_id, TYPE_FOLDER, None, parent[0], parent[1], event[1], added, added,
+                                  _places_guid(rng)))
+                stack.append([next_id, 0])
+            else:
+                places.append((next_id, event[2], event[1], _rev_host(event[2]), _places_guid(rng), url_hash(event[2])))
+                bookmarks.append((next_id, TYPE_BOOKMARK, next_id, parent[0], parent[1], event[1], added, added,
+                                  _places_guid(rng)))
+            parent[1] += 1
+            next_id += 1
+            total += 1
+            if len(bookmarks) >= _INSERT_BATCH:
+                flush()
+        flush()
+
+        for n in range(history):
+            url = f"https://history{n}.example.org/{'x' * rng.randrange(50, 200)}"
+            places.append((next_id, url, f"page {n}", _rev_host(url), _places_guid(rng), url_hash(url)))
+            next_id += 1
+            if len(places) >= _INSERT_BATCH:
+                conn.executemany("INSERT INTO moz_places (id, url, title, rev_host, guid, url_hash, visit_count) "
+                                 "VALUES (?, ?, ?, ?, ?, ?, 3)", places)
+                places.clear()
+        if places:
+            conn.executemany("INSERT INTO moz_places (id, url, title, rev_host, guid, url_hash, visit_count) "
+                             "VALUES (?, ?, ?, ?, ?, ?, 3)", places)
+        conn.commit()
+    finally:
+        conn.close()
+    return total
+
+
+def mutate_places(src_path, dst_path, fraction=0.01, seed=1):
+    """places.sqlite의 북마크 fraction만큼 제목 변경, 삭제, 추가한 사본 생성"""
+    rng = random.Random(seed)
+    os.makedirs(os.path.dirname(os.path.abspath(dst_path)), exist_ok=True)
+    shutil.copyfile(src_path, dst_path)
+    conn = sqlite3.connect(dst_path)
+    try:
+        ids = [row[0] for row in conn.execute("SELECT id FROM moz_bookmarks WHERE type = ?", (TYPE_BOOKMARK,))]
+        chosen = rng.sample(ids, max(1, int(len(ids) * fraction))) if ids else []
+        renamed, deleted = chosen[0::2], chosen[1::2]
+        conn.executemany("UPDATE moz_bookmarks SET title = title || ' (수정)' WHERE id = ?", [(i,) for i in renamed])
+        conn.executemany("DELETE FROM moz_bookmarks WHERE id = ?", [(i,) for i in deleted])
+
+        next_id = conn.execute("SELECT max(id) FROM moz_bookmarks").fetchone()[0] + 1
+        next_place = conn.execute("SELECT coalesce(max(id), 0) FROM moz_places").fetchone()[0] + 1
+        position = conn.execute("SELECT count(*) FROM moz_bookmarks WHERE parent = 3").fetchone()[0]
+        for n in range(max(1, len(chosen) // 3)):
+            url = f"https://added{seed}.example.net/{n}"
+            conn.execute("INSERT INTO moz_places (id, url, title, rev_host, guid, url_hash, foreign_count) "
+                         "VALUES (?, ?, ?, ?, ?, ?, 1)",
+                         (next_place, url, url, _rev_host(url), _places_guid(rng), url_hash(url)))
+            conn.execute("INSERT INTO moz_bookmarks (id, type, fk, parent, position, title, dateAdded, lastModified, "
+                         "guid) VALUES (?, ?, ?, 3, ?, ?, ?, ?, ?)",
+                         (next_id, TYPE_BOOKMARK, next_place, position, f"새 북마크 {n}", FIREFOX_TIME_BASE,
+                          FIREFOX_TIME_BASE, _places_guid(rng)))
+            next_id += 1
+            next_place += 1
+            position += 1
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def generate_profile(user_root, browser, nodes, shape="wide", fanout=DEFAULT_FANOUT, depth=DEFAULT_DEPTH, seed=0):
+    """user_root 아래 브라우저 기본 프로필 위치에 북마크 파일 생성. 반환: (경로, 전체 노드 수)"""
+    path = profile_path(user_root, browser)
+    if browser == "Firefox":
+        total = generate_places(path, nodes, shape, fanout, depth, seed=seed)
+    else:
+        total = generate_chromium(path, nodes, shape, fanout, depth, seed)
+    return path, total
+
+
+def mutate_profile(browser, src_path, dst_path, fraction=0.01, seed=1):
+    if browser == "Firefox":
+        mutate_places(src_path, dst_path, fraction, seed)
+    else:
+        mutate_chromium(src_path, dst_path, fraction, seed)
@@ -0,0 +1,192 @@
+import os
+import time
+import shutil
+import tempfile
+
+from bookmark_model import load_bookmarks
+from bookmarks_core import BROWSER_PATHS, extract_backup
+
+# 북마크 스냅샷 비교 (구조적 diff)
+#
+# 두 BookmarkTree의 노드를 guid로 먼저 짝짓고, 남은 북마크는 URL, 남은 폴더는 경로로 짝짓는다.
+# 모든 조회가 색인(dict)이므로 노드 수에 비례하는 시간(O(n))에 끝난다.
+#
+# 변경 종류:
+#   added / removed: 한쪽에만 있는 노드
+#   moved: 부모 폴더가 바뀐 노드 (같은 폴더 안의 순서 변경은 제외)
+#   renamed: 제목이 바뀐 노드
+#   url_changed: 주소가 바뀐 북마크
+
+CHANGE_KINDS = ("added", "removed", "moved", "renamed", "url_changed")
+
+
+class BookmarkDiff:
+    """두 북마크 트리의 차이
+
+    added: 새 트리의 노드 목록, removed: 이전 트리의 노드 목록
+    moved / renamed / url_changed: (이전 노드, 새 노드) 목록
+    """
+
+    def __init__(self, old_tree, new_tree):
+        self.old_tree = old_tree
+        self.new_tree = new_tree
+        self.added = []
+        self.removed = []
+        self.moved = []
+        self.renamed = []
+        self.url_changed = []
+        self.elapsed = 0.0
+
+    def __bool__(self):
+        return any(getattr(self, kind) for kind in CHANGE_KINDS)
+
+    def summary(self):
+        """변경 종류별 개수"""
+        return {kind: len(getattr(self, kind)) for kind in CHANGE_KINDS}
+
+    def _path(self, tree, node):
+        return "/".join(title for title in tree.path(node.id) if title)
+
+    def to_dict(self):
+        old, new = self.old_tree, self.new_tree
+        return {
+            "summary": self.summary(),
+            "elapsed": self.elapsed,
+            "added": [{"path": self._path(new, n), "url": n.url, "guid": n.guid} for n in self.added],
+            "removed": [{"path": self._path(old, n), "url": n.url, "guid": n.guid} for n in self.removed],
+            "moved": [{"from": self._path(old, o), "to": self._path(new, n), "url": n.url, "guid": n.guid}
+                      for o, n in self.moved],
+            "renamed": [{"from": o.title, "to": n.title, "path": self._path(new, n), "guid": n.guid}
+                        for o, n in self.renamed],
+            "url_changed": [{"path": self._path(new, n), "from": o.url, "to": n.url, "guid": n.guid}
+                            for o, n in self.url_changed],
+        }
+
+    def lines(self, limit=None):
+        """사람이 읽는 형식의 변경 목록 (limit: 종류별 최대 줄 수)"""
+        old, new = self.old_tree, self.new_tree
+        sections = (
+            ("+", self.added, lambda n: f"{self._path(new, n)}" + (f" <{n.url}>" if n.url else "")),
+            ("-", self.removed, lambda n: f"{self._path(old, n)}" + (f" <{n.url}>" if n.url else "")),
+            (">", self.moved, lambda p: f"{self._path(old, p[0])} -> {self._path(new, p[1])}"),
+            ("*", self.renamed, lambda p: f"{self._path(new, p[1])}: '{p[0].title}' -> '{p[1].title}'"),
+            ("~", self.url_changed, lambda p: f"{self._path(new, p[1])}: {p[0].url} -> {p[1].url}"),
+        )
+        result = []
+        for mark, items, fmt in sections:
+            shown = items if limit is None else items[:limit]
+            result.extend(f"{mark} {fmt(item)}" for item in shown)
+            if len(items) > len(shown):
+                result.append(f"{mark} ... 외 {len(items) - len(shown):,}개")
+        return result
+
+
+def _kind(node):
+    return node.url is not None
+
+
+def match_nodes(old_tree, new_tree):
+    """이전 트리 노드 id -> 새 트리 노드 id 대응표 (guid, URL, 폴더 경로 순으로 짝짓기)"""
+    matches = {}
+    matched_new = set()
+    unmatched = []
+
+    # 루트 폴더는 루트 키로 짝짓는다 (제목은 언어에 따라 다르고 guid가 없는 파일도 있음)
+    for key, old_id in old_tree.roots.items():
+        new_id = new_tree.roots.get(key)
+        if new_id is not None:
+            matches[old_id] = new_id
+            matched_new.add(new_id)
+
+    for node in old_tree.nodes:
+        if node.id in matches:
+            continue
+        other = new_tree.by_guid.get(node.guid) if node.guid else None
+        if other is not None and other.id not in matched_new and _kind(other) == _kind(node):
+            matches[node.id] = other.id
+            matched_new.add(other.id)
+        else:
+            unmatched.append(node)
+    if not unmatched:
+        return matches
+
+    # guid가 다시 만들어진 경우 (동기화, 가져오기 등): 북마크는 URL, 폴더는 제목 경로로 짝짓기
+    folder_paths = {}
+    for node in new_tree.nodes:
+        if node.url is None and node.id not in matched_new:
+            folder_paths.setdefault(tuple(new_tree.path(node.id)), []).append(node.id)
+
+    for node in unmatched:
+        if node.url is not None:
+            candidates = [n.id for n in new_tree.find_by_url(node.url) if n.id not in matched_new]
+        else:
+            candidates = [i for i in folder_paths.get(tuple(old_tree.path(node.id)), ()) if i not in matched_new]
+        if candidates:
+            matches[node.id] = candidates[0]
+            matched_new.add(candidates[0])
+    return matches
+
+
+def diff_trees(old_tree, new_tree):
+    """두 BookmarkTree를 비교하여 BookmarkDiff 반환"""
+    start = time.perf_counter()
+    diff = BookmarkDiff(old_tree, new_tree)
+    matches = match_nodes(old_tree, new_tree)
+    new_by_id = new_tree.by_id
+
+    for node in old_tree.nodes:
+        new_id = matches.get(node.id)
+        if new_id is None:
+            # 루트 폴더는 브라우저가 항상 만드므로 변경으로 보지 않는다
+            if not node.root:
+                diff.removed.append(node)
+            continue
+        other = new_by_id[new_id]
+        if node.parent is not None and matches.get(node.parent) != other.parent:
+            diff.moved.append((node, other))
+        if node.title != other.title:
+            diff.renamed.append((node, other))
+        if node.url != other.url:
+            diff.url_changed.append((node, other))
+
+    matched_new = set(matches.values())
+    diff.added = [node for node in new_tree.nodes if node.id not in matched_new and not node.root]
+    diff.elapsed = time.perf_counter() - start
+    return diff
+
+
+def load_backup_tree(browser_name, backup_dir, snapshot_id=None, profile=None):
+    """백업 스냅샷을 임시 폴더에 꺼내 BookmarkTree로 로드. (트리, 스냅샷 ID) 반환"""
+    work_dir = tempfile.mkdtemp(prefix="bookmarks_diff_")
+    try:
+        path = os.path.join(work_dir, "bookmarks")
+        used_snapshot = extract_backup(browser_name, backup_dir, path, snapshot_id, profile)
+        tree = load_bookmarks(path)
+        tree.source = used_snapshot or path
+        return tree, used_snapshot
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def load_current_tree(browser_name, profile=None):
+    """브라우저의 현재 북마크를 BookmarkTree로 로드"""
+    if profile is not None:
+        path, label = profile.path, profile.display_name
+    else:
+        path, label = BROWSER_PATHS.get(browser_name), browser_name
+    if not path or not os.path.exists(path):
+        raise FileNotFoundError(f"{label} 북마크 파일을 찾을 수 없습니다.")
+    return load_bookmarks(path)
+
+
+def diff_backup(browser_name, backup_dir, snapshot_id=None, against=None, profile=None):
+    """백업 스냅샷과 현재 북마크(또는 against 스냅샷)를 비교
+
+    반환되는 diff는 백업 -> 현재 방향이다 (added: 백업 이후 추가된 항목).
+    """
+    old_tree, _ = load_backup_tree(browser_name, backup_dir, snapshot_id, profile)
+    if against:
+        new_tree, _ = load_backup_tree(browser_name, backup_dir, against, profile)
+    else:
+        new_tree = load_current_tree(browser_name, profile)
+    return diff_trees(old_tree, new_tree)
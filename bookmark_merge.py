@@ -0,0 +1,395 @@
+import os
+import time
+import tempfile
+
+import firefox_places
+from bookmark_model import (
+    BookmarkNode, BookmarkTree, load_bookmarks, write_chromium_bookmarks, write_firefox_export
+)
+from bookmark_diff import match_nodes
+
+# 북마크 3-way 병합 (공통 조상 base, 현재 current, 백업 backup)
+#
+# 세 트리의 노드를 match_nodes로 짝지어 "항목(entity)"으로 묶은 뒤, 항목마다
+# 존재 여부 / 제목 / 주소 / 부모 폴더를 3-way 규칙으로 정한다.
+#   - 한쪽만 base에서 바뀌었으면 바뀐 쪽을 따른다.
+#   - 양쪽이 다르게 바뀌었으면 충돌로 기록하고 prefer 쪽을 따른다.
+#   - base가 없으면 양쪽 항목을 모두 남기는 합집합 병합이 된다 (다른 값은 prefer 쪽).
+# 폴더 안 순서는 prefer 쪽 순서를 따르고, 다른 쪽에만 있는 항목은 그쪽의 바로 앞 형제 뒤에 끼워 넣는다.
+# 모든 조회가 색인(dict)이므로 노드 수에 비례하는 시간(O(n))에 끝난다.
+
+PREFER_BACKUP = "backup"
+PREFER_CURRENT = "current"
+PREFER_CHOICES = (PREFER_BACKUP, PREFER_CURRENT)
+
+# 충돌 종류
+CONFLICT_KINDS = ("title", "url", "parent", "delete_modify", "orphan")
+
+# 부모를 잃은 항목을 붙일 루트 (Chromium / Firefox)
+_FALLBACK_ROOTS = ("other", "unfiled")
+
+
+class _Entity:
+    """세 트리에서 같은 북마크로 짝지어진 노드 묶음"""
+
+    __slots__ = ("base", "current", "backup", "keep", "parent", "title", "url", "order")
+
+    def __init__(self, base=None, current=None, backup=None):
+        self.base = base
+        self.current = current
+        self.backup = backup
+        self.keep = True
+        self.parent = None
+        self.title = None
+        self.url = None
+        self.order = 0
+
+    def side(self, prefer):
+        """prefer 쪽 노드 (없으면 다른 쪽, 그것도 없으면 base)"""
+        first, second = (self.backup, self.current) if prefer == PREFER_BACKUP else (self.current, self.backup)
+        return first or second or self.base
+
+
+class MergeResult:
+    """병합 결과
+
+    tree: 병합된 BookmarkTree
+    conflicts: 충돌 목록 (kind, guid, title, base, current, backup, resolution)
+    stats: 항목 수 통계
+    """
+
+    def __init__(self, tree, prefer, three_way):
+        self.tree = tree
+        self.prefer = prefer
+        self.three_way = three_way
+        self.conflicts = []
+        self.stats = {}
+        self.elapsed = 0.0
+
+    def summary(self):
+        counts = {kind: 0 for kind in CONFLICT_KINDS}
+        for conflict in self.conflicts:
+            counts[conflict["kind"]] += 1
+        return dict(self.stats, conflicts=counts)
+
+    def to_dict(self):
+        return {
+            "prefer": self.prefer,
+            "three_way": self.three_way,
+            "summary": self.summary(),
+            "conflicts": self.conflicts,
+            "elapsed": self.elapsed,
+        }
+
+
+def _build_entities(base, current, backup):
+    """세 트리의 노드를 항목으로 묶는다. (항목 목록, 트리별 노드 id -> 항목 dict)"""
+    entities = []
+    by_current, by_backup, by_base = {}, {}, {}
+
+    if base is not None:
+        base_to_current = match_nodes(base, current)
+        base_to_backup = match_nodes(base, backup)
+        for node in base.nodes:
+            entity = _Entity(base=node)
+            current_id = base_to_current.get(node.id)
+            backup_id = base_to_backup.get(node.id)
+            if current_id is not None:
+                entity.current = current.by_id[current_id]
+                by_current[current_id] = entity
+            if backup_id is not None:
+                entity.backup = backup.by_id[backup_id]
+                by_backup[backup_id] = entity
+            by_base[node.id] = entity
+            entities.append(entity)
+
+    # base에 없는 항목: 양쪽에서 새로 추가된 노드끼리 다시 짝짓기
+    current_to_backup = match_nodes(current, backup)
+    for node in current.nodes:
+        if node.id in by_current:
+            continue
+        entity = _Entity(current=node)
+        backup_id = current_to_backup.get(node.id)
+        if backup_id is not None and backup_id not in by_backup:
+            entity.backup = backup.by_id[backup_id]
+            by_backup[backup_id] = entity
+        by_current[node.id] = entity
+        entities.append(entity)
+
+    for node in backup.nodes:
+        if node.id not in by_backup:
+            entity = _Entity(backup=node)
+            by_backup[node.id] = entity
+            entities.append(entity)
+
+    return entities, {"base": by_base, "current": by_current, "backup": by_backup}
+
+
+class _Merger:
+    def __init__(self, base, current, backup, prefer):
+        self.trees = {"base": base, "current": current, "backup": backup}
+        self.prefer = prefer
+        self.other = PREFER_CURRENT if prefer == PREFER_BACKUP else PREFER_BACKUP
+        self.entities, self.index = _build_entities(base, current, backup)
+        self.conflicts = []
+
+    def _parent_entity(self, side, node):
+        if node is None or node.parent is None:
+            return None
+        return self.index[side].get(node.parent)
+
+    def _conflict(self, kind, entity, base, current, backup, resolution):
+        node = entity.side(self.prefer)
+        self.conflicts.append({
+            "kind": kind,
+            "guid": node.guid,
+            "title": node.title,
+            "base": base,
+            "current": current,
+            "backup": backup,
+            "resolution": resolution,
+        })
+
+    def _merge_value(self, kind, entity, base_value, current_value, backup_value):
+        """한 필드의 3-way 병합"""
+        if entity.current is None:
+            return backup_value
+        if entity.backup is None or current_value == backup_value:
+            return current_value
+        if entity.base is not None:
+            if current_value == base_value:
+                return backup_value
+            if backup_value == base_value:
+                return current_value
+        resolved = backup_value if self.prefer == PREFER_BACKUP else current_value
+        if kind == "parent":
+            base_value, current_value, backup_value = (
+                self._entity_path(v) for v in (base_value, current_value, backup_value))
+        self._conflict(kind, entity, base_value, current_value, backup_value, self.prefer)
+        return resolved
+
+    def _entity_path(self, entity):
+        if entity is None:
+            return None
+        node = entity.side(self.prefer)
+        for side in (self.prefer, self.other, "base"):
+            if getattr(entity, side) is node:
+                return "/".join(title for title in self.trees[side].path(node.id) if title)
+
+    def _modified(self, entity, node, side):
+        """base 이후 node(side 쪽)의 제목/주소/부모가 바뀌었는지"""
+        base = entity.base
+        if node.title != base.title or node.url != base.url:
+            return True
+        return self._parent_entity(side, node) is not self._parent_entity("base", base)
+
+    def decide_existence(self):
+        for entity in self.entities:
+            node = entity.side(self.prefer)
+            if node.root or entity.base is None:
+                continue
+            if entity.current is None and entity.backup is None:
+                entity.keep = False
+            elif entity.current is None or entity.backup is None:
+                side = PREFER_CURRENT if entity.current is not None else PREFER_BACKUP
+                survivor = getattr(entity, side)
+                if self._modified(entity, survivor, side):
+                    # 한쪽에서 지웠지만 다른 쪽에서 고친 항목은 남긴다
+                    self._conflict("delete_modify", entity, entity.base.title,
+                                   survivor.title if side == PREFER_CURRENT else None,
+                                   survivor.title if side == PREFER_BACKUP else None, side)
+                else:
+                    entity.keep = False
+
+    def merge_fields(self):
+        for entity in self.entities:
+            if not entity.keep:
+                continue
+            base, current, backup = entity.base, entity.current, entity.backup
+            entity.title = self._merge_value(
+                "title", entity, base and base.title, current and current.title, backup and backup.title)
+            entity.url = self._merge_value(
+                "url", entity, base and base.url, current and current.url, backup and backup.url)
+            entity.parent = self._merge_value(
+                "parent", entity, self._parent_entity("base", base),
+                self._parent_entity("current", current), self._parent_entity("backup", backup))
+
+    def fix_parents(self, fallback):
+        """지워진 폴더 안에 남은 항목은 가장 가까운 남은 조상 폴더로 옮긴다"""
+        for entity in self.entities:
+            if not entity.keep or entity.parent is None or entity.parent.keep:
+                continue
+            parent = entity.parent
+            while parent is not None and not parent.keep:
+                node = parent.side(self.prefer)
+                side = next(s for s in (self.prefer, self.other, "base") if getattr(parent, s) is node)
+                parent = self._parent_entity(side, node)
+            entity.parent = parent or fallback
+
+    def ordered_children(self, children_of):
+        """폴더별 자식 항목 순서 결정"""
+        for position, entity in enumerate(self.entities):
+            entity.order = position
+        result = {}
+        for parent, children in children_of.items():
+            child_set = set(children)
+            ordered = []
+            placed = set()
+            preferred = getattr(parent, self.prefer)
+            if preferred is not None:
+                for node in self.trees[self.prefer].children(preferred.id):
+                    entity = self.index[self.prefer][node.id]
+                    if entity in child_set and entity not in placed:
+                        ordered.append(entity)
+                        placed.add(entity)
+
+            # 다른 쪽에만 있는 항목은 그쪽의 앞 형제 뒤에 끼워 넣는다
+            inserts = {}
+            other = getattr(parent, self.other)
+            if other is not None:
+                anchor = None
+                for node in self.trees[self.other].children(other.id):
+                    entity = self.index[self.other][node.id]
+                    if entity in placed:
+                        anchor = entity
+                    elif entity in child_set:
+                        inserts.setdefault(anchor, []).append(entity)
+                        placed.add(entity)
+                        anchor = entity
+
+            merged = []
+            for anchor in [None] + ordered:
+                if anchor is not None:
+                    merged.append(anchor)
+                stack = inserts.get(anchor, [])[::-1]
+                while stack:
+                    inserted = stack.pop()
+                    merged.append(inserted)
+                    stack.extend(inserts.get(inserted, [])[::-1])
+
+            # 부모 폴더 양쪽 어디에도 없던 항목 (부모를 잃고 옮겨진 항목 등)
+            rest = sorted((e for e in children if e not in placed), key=lambda e: e.order)
+            result[parent] = merged + rest
+        return result
+
+
+def _fallback_root(top_roots, merger):
+    by_key = {}
+    for entity in merger.entities:
+        node = entity.side(merger.prefer)
+        if node.root and entity.keep:
+            by_key.setdefault(node.root, entity)
+    for key in _FALLBACK_ROOTS:
+        if key in by_key:
+            return by_key[key]
+    return top_roots[0] if top_roots else None
+
+
+def merge_trees(base, current, backup, prefer=PREFER_BACKUP):
+    """세 BookmarkTree를 병합하여 MergeResult 반환 (base가 None이면 합집합 병합)"""
+    if prefer not in PREFER_CHOICES:
+        raise ValueError(f"알 수 없는 prefer 값: {prefer}")
+    start = time.perf_counter()
+    merger = _Merger(base, current, backup, prefer)
+    merger.decide_existence()
+    merger.merge_fields()
+
+    kept = [entity for entity in merger.entities if entity.keep]
+    top_roots = [e for e in kept if e.parent is None and e.side(prefer).root]
+    fallback = _fallback_root(top_roots, merger)
+    merger.fix_parents(fallback)
+
+    children_of = {}
+    for entity in kept:
+        if entity.parent is not None:
+            children_of.setdefault(entity.parent, []).append(entity)
+    ordered = merger.ordered_children(children_of)
+
+    # 루트부터 순회하며 새 트리 작성. 도달하지 못한 항목(순환 이동 등)은 fallback 루트에 붙인다
+    tree = BookmarkTree(source="merge")
+    # 현재 트리의 id는 그대로 둔다 (Firefox moz_items_annos 등이 id로 항목을 가리킴).
+    # 백업에서 되살린 항목만 두 트리의 최대 id 다음부터 새 id를 받는다
+    numeric_ids = [int(node.id) for source in (current, backup) for node in source.nodes
+                   if str(node.id).isdigit()]
+    next_id = max(numeric_ids, default=0) + 1
+    used_guids = set()
+    new_ids = {}
+
+    def emit(entity, parent_id, index):
+        nonlocal next_id
+        node = entity.side(prefer)
+        if entity.current is not None:
+            node_id = entity.current.id
+        else:
+            node_id = str(next_id)
+            next_id += 1
+        guid = node.guid if node.guid and node.guid not in used_guids else None
+        if guid:
+            used_guids.add(guid)
+        new_ids[entity] = node_id
+        tree.add(BookmarkNode(
+            id=node_id, guid=guid, parent=parent_id, index=index, type=node.type,
+            title=entity.title if entity.title is not None else node.title,
+            url=entity.url, date_added=node.date_added, date_modified=node.date_modified,
+            root=node.root,
+        ))
+        return node_id
+
+    def walk(entity, parent_id, index):
+        stack = [(entity, parent_id, index)]
+        while stack:
+            current_entity, current_parent, current_index = stack.pop()
+            if current_entity in new_ids:
+                continue
+            node_id = emit(current_entity, current_parent, current_index)
+            children = ordered.get(current_entity, [])
+            for child_index in range(len(children) - 1, -1, -1):
+                stack.append((children[child_index], node_id, child_index))
+
+    for entity in top_roots:
+        walk(entity, None, 0)
+
+    if fallback is not None:
+        fallback_children = len(ordered.get(fallback, []))
+        for entity in kept:
+            if entity in new_ids:
+                continue
+            # 순환 안의 항목 하나를 fallback 루트로 옮기면 나머지는 그 아래에 따라온다
+            merger._conflict("orphan", entity, None, None, None, prefer)
+            walk(entity, new_ids[fallback], fallback_children)
+            fallback_children += 1
+
+    result = MergeResult(tree, prefer, base is not None)
+    result.conflicts = merger.conflicts
+    result.stats = {
+        "nodes": len(tree),
+        "from_both": sum(1 for e in kept if e.current is not None and e.backup is not None),
+        "only_current": sum(1 for e in kept if e.backup is None),
+        "only_backup": sum(1 for e in kept if e.current is None),
+        "dropped": len(merger.entities) - len(kept),
+    }
+    result.elapsed = time.perf_counter() - start
+    return result
+
+
+def merge_bookmark_files(current_path, backup_path, base_path=None, prefer=PREFER_BACKUP):
+    """북마크 파일(Chromium Bookmarks, places.sqlite, Firefox 내보내기)을 읽어 병합"""
+    current = load_bookmarks(current_path)
+    backup = load_bookmarks(backup_path)
+    base = load_bookmarks(base_path) if base_path else None
+    return merge_trees(base, current, backup, prefer)
+
+
+def apply_merge(result, dst_path):
+    """병합 결과를 dst_path에 기록. places.sqlite는 북마크 테이블만 교체한다"""
+    if firefox_places.is_sqlite_source(dst_path):
+        fd, export_path = tempfile.mkstemp(prefix="bookmarks_merge_", suffix=".json",
+                                           dir=os.path.dirname(dst_path))
+        os.close(fd)
+        try:
+            write_firefox_export(result.tree, export_path)
+            return firefox_places.import_bookmarks(export_path, dst_path)
+        finally:
+            os.remove(export_path)
+    write_chromium_bookmarks(result.tree, dst_path)
+    return {"bookmarks": len(result.tree)}
@@ -0,0 +1,501 @@
+import json
+import codecs
+import re
+import uuid
+import hashlib
+from file_utils import atomic_write
+from json.decoder import scanstring
+
+import firefox_places
+
+# 북마크 트리 모델 및 Chromium(Edge/Chrome) Bookmarks / Firefox 북마크 로더
+#
+# 노드는 __slots__ 클래스로 필요한 필드만 보관하고, 트리는 id / guid / URL 색인을 가진다.
+# 스트리밍 모드는 json.load로 전체 dict를 만들지 않고 파일을 조금씩 읽으며 노드를 만든다.
+
+STREAM_CHUNK_SIZE = 256 * 1024
+
+TYPE_URL = "url"
+TYPE_FOLDER = "folder"
+TYPE_SEPARATOR = "separator"
+
+# Chromium Bookmarks 루트 (체크섬 계산 순서)
+CHROMIUM_ROOT_KEYS = ("bookmark_bar", "other", "synced")
+
+# Chromium JSON에서 노드로 읽어 들이는 키 (나머지 meta_info 등은 건너뜀)
+_NODE_FIELDS = frozenset(("id", "guid", "name", "url", "type", "date_added", "date_modified"))
+
+
+class BookmarkNode:
+    """북마크/폴더 노드 하나
+
+    parent: 부모 노드 id (루트 폴더는 None)
+    index: 부모 폴더 안에서의 위치
+    root: 루트 폴더인 경우 루트 키 (bookmark_bar, other, synced / Firefox는 menu, toolbar 등)
+    date_added, date_modified: 원본 값 그대로 (Chromium은 1601년 기준, Firefox는 1970년 기준 마이크로초)
+    """
+
+    __slots__ = ("id", "guid", "parent", "index", "type", "title", "url",
+                 "date_added", "date_modified", "root")
+
+    def __init__(self, id=None, guid=None, parent=None, index=0, type=TYPE_URL, title="", url=None,
+                 date_added=0, date_modified=0, root=None):
+        self.id = id
+        self.guid = guid
+        self.parent = parent
+        self.index = index
+        self.type = type
+        self.title = title
+        self.url = url
+        self.date_added = date_added
+        self.date_modified = date_modified
+        self.root = root
+
+    @property
+    def is_folder(self):
+        return self.type == TYPE_FOLDER
+
+    def to_dict(self):
+        return {slot: getattr(self, slot) for slot in self.__slots__}
+
+    def __repr__(self):
+        return f"BookmarkNode(id={self.id!r}, type={self.type!r}, title={self.title!r}, url={self.url!r})"
+
+
+class BookmarkTree:
+    """북마크 노드 집합과 색인 (id, guid, URL)"""
+
+    def __init__(self, source=None):
+        self.source = source
+        self.nodes = []
+        self.by_id = {}
+        self.by_guid = {}
+        self.roots = {}
+        # URL -> id (중복 URL은 id 목록). 대부분 URL이 한 번만 나오므로 목록 생성을 피한다
+        self._by_url = {}
+        self._children = None
+
+    def add(self, node):
+        self.nodes.append(node)
+        self.by_id[node.id] = node
+        if node.guid:
+            self.by_guid[node.guid] = node
+        if node.root:
+            self.roots[node.root] = node.id
+        if node.url is not None:
+            existing = self._by_url.get(node.url)
+            if existing is None:
+                self._by_url[node.url] = node.id
+            elif isinstance(existing, list):
+                existing.append(node.id)
+            else:
+                self._by_url[node.url] = [existing, node.id]
+        self._children = None
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __iter__(self):
+        return iter(self.nodes)
+
+    def get(self, node_id):
+        return self.by_id.get(node_id)
+
+    def find_by_url(self, url):
+        """URL이 같은 노드 목록"""
+        ids = self._by_url.get(url)
+        if ids is None:
+            return []
+        if not isinstance(ids, list):
+            ids = [ids]
+        return [self.by_id[i] for i in ids]
+
+    def urls(self):
+        return self._by_url.keys()
+
+    def children(self, node_id):
+        """폴더의 자식 노드 목록 (위치 순). 색인은 처음 호출할 때 만든다"""
+        if self._children is None:
+            children = {}
+            for node in self.nodes:
+                if node.parent is not None:
+                    children.setdefault(node.parent, []).append(node)
+            for child_list in children.values():
+                child_list.sort(key=lambda n: n.index)
+            self._children = children
+        return self._children.get(node_id, [])
+
+    def path(self, node_id):
+        """루트부터 노드까지의 제목 목록"""
+        titles = []
+        node = self.by_id.get(node_id)
+        while node is not None:
+            titles.append(node.title)
+            node = self.by_id.get(node.parent) if node.parent is not None else None
+        titles.reverse()
+        return titles
+
+    def search(self, text):
+        """제목 또는 URL에 text가 포함된 북마크 (대소문자 무시)"""
+        text = text.lower()
+        return [node for node in self.nodes
+                if node.url is not None and (text in node.title.lower() or text in node.url.lower())]
+
+    def count(self):
+        """(북마크 수, 폴더 수)"""
+        folders = sum(1 for node in self.nodes if node.is_folder)
+        return len(self.nodes) - folders, folders
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _make_node(fields, parent, index, root=None):
+    return BookmarkNode(
+        id=fields.get("id"),
+        guid=fields.get("guid"),
+        parent=parent,
+        index=index,
+        type=fields.get("type", TYPE_FOLDER if "children" in fields else TYPE_URL),
+        title=fields.get("name", ""),
+        url=fields.get("url"),
+        date_added=_to_int(fields.get("date_added")),
+        date_modified=_to_int(fields.get("date_modified")),
+        root=root,
+    )
+
+
+# 일반 모드 (json.load)
+def _iter_dict_nodes(data):
+    roots = data.get("roots", {})
+    for root_key, root in roots.items():
+        if not isinstance(root, dict):
+            continue
+        # (노드 dict, 부모 id, 위치, 루트 키) 스택으로 순회
+        stack = [(root, None, 0, root_key)]
+        while stack:
+            fields, parent, index, key = stack.pop()
+            node = _make_node(fields, parent, index, key)
+            yield node
+            children = fields.get("children") or []
+            for child_index in range(len(children) - 1, -1, -1):
+                stack.append((children[child_index], node.id, child_index, None))
+
+
+# 스트리밍 모드
+class _JsonTokenizer:
+    """파일을 조금씩 읽으며 JSON 토큰을 반환하는 토크나이저"""
+
+    _WHITESPACE = re.compile(r'[ \t\n\r]*')
+    _NUMBER = re.compile(r'-?(?:0|[1-9]\d*)(?:\.\d+)?(?:[eE][-+]?\d+)?')
+    _NUMBER_END = re.compile(r'[^0-9+\-.eE]')
+    _LITERALS = {"t": ("true", True), "f": ("false", False), "n": ("null", None)}
+
+    def __init__(self, fp, chunk_size=STREAM_CHUNK_SIZE):
+        self.fp = fp
+        self.chunk_size = chunk_size
+        self.decoder = codecs.getincrementaldecoder('utf-8-sig')()
+        self.buf = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        """버퍼에 데이터를 더 읽어 온다. 더 읽을 것이 없으면 False"""
+        if self.eof:
+            return False
+        data = self.fp.read(self.chunk_size)
+        if not data:
+            self.eof = True
+            self.buf = self.buf[self.pos:] + self.decoder.decode(b"", final=True)
+        else:
+            self.buf = self.buf[self.pos:] + self.decoder.decode(data)
+        self.pos = 0
+        return True
+
+    def next(self):
+        """(종류, 값) 반환. 종류: { } [ ] : , str num lit"""
+        while True:
+            self.pos = self._WHITESPACE.match(self.buf, self.pos).end()
+            if self.pos < len(self.buf):
+                break
+            if not self._fill():
+                raise ValueError("JSON이 예상보다 일찍 끝났습니다.")
+
+        ch = self.buf[self.pos]
+        if ch in '{}[]:,':
+            self.pos += 1
+            return ch, None
+
+        if ch == '"':
+            while True:
+                try:
+                    value, end = scanstring(self.buf, self.pos + 1)
+                    self.pos = end
+                    return "str", value
+                except json.JSONDecodeError:
+                    if not self._fill():
+                        raise
+
+        if ch in self._LITERALS:
+            literal, value = self._LITERALS[ch]
+            while len(self.buf) - self.pos < len(literal) and self._fill():
+                pass
+            if self.buf.startswith(literal, self.pos):
+                self.pos += len(literal)
+                return "lit", value
+            raise ValueError(f"잘못된 JSON 값 (위치 {self.pos})")
+
+        # 숫자가 버퍼 끝에 걸쳐 있을 수 있으므로 숫자가 아닌 문자가 보일 때까지 읽는다
+        while not self._NUMBER_END.search(self.buf, self.pos) and self._fill():
+            pass
+        match = self._NUMBER.match(self.buf, self.pos)
+        if not match or match.end() == self.pos:
+            raise ValueError(f"잘못된 JSON 문자 {ch!r} (위치 {self.pos})")
+        self.pos = match.end()
+        text = match.group()
+        return "num", float(text) if any(c in text for c in '.eE') else int(text)
+
+    def expect(self, kind):
+        token, value = self.next()
+        if token != kind:
+            raise ValueError(f"JSON 구조 오류: {kind!r} 필요, {token!r} 발견")
+        return value
+
+    def skip_value(self, token=None):
+        """값 하나를 읽고 버린다 (meta_info 등 사용하지 않는 필드)"""
+        if token is None:
+            token, _ = self.next()
+        if token not in '{[':
+            return
+        depth = 1
+        while depth:
+            token, _ = self.next()
+            if token in '{[':
+                depth += 1
+            elif token in '}]':
+                depth -= 1
+
+    def scalar_value(self):
+        """스칼라 값 하나를 읽는다. 객체/배열이면 건너뛰고 None"""
+        token, value = self.next()
+        if token in ("str", "num", "lit"):
+            return value
+        self.skip_value(token)
+        return None
+
+    def iter_object_keys(self):
+        """'{' 다음부터 객체의 키를 차례로 반환 (값은 호출자가 읽어야 함)"""
+        token, value = self.next()
+        if token == '}':
+            return
+        while True:
+            if token != "str":
+                raise ValueError("JSON 구조 오류: 객체 키 필요")
+            self.expect(':')
+            yield value
+            token, _ = self.next()
+            if token == '}':
+                return
+            if token != ',':
+                raise ValueError("JSON 구조 오류: ',' 또는 '}' 필요")
+            token, value = self.next()
+
+
+def _stream_node(tok, parent_node, parent_pending, index, root=None):
+    """'{'를 읽은 직후부터 노드 객체 하나를 읽으며 완성된 노드를 생성(yield)
+
+    Chromium은 키를 정렬해서 쓰므로 "children"이 "id"보다 먼저 나온다.
+    부모 id를 아직 모르는 자식은 parent_pending에 모아 두었다가 부모가 끝날 때 내보낸다.
+    """
+    node = BookmarkNode(index=index, root=root)
+    node_type = None
+    pending = []
+
+    for key in tok.iter_object_keys():
+        if key == "children":
+            node_type = node_type or TYPE_FOLDER
+            tok.expect('[')
+            child_count = 0
+            token, _ = tok.next()
+            while token != ']':
+                if token == '{':
+                    yield from _stream_node(tok, node, pending, child_count)
+                    child_count += 1
+                elif token != ',':
+                    tok.skip_value(token)
+                token, _ = tok.next()
+        elif key in _NODE_FIELDS:
+            value = tok.scalar_value()
+            if key == "id":
+                node.id = value
+            elif key == "guid":
+                node.guid = value
+            elif key == "name":
+                node.title = value or ""
+            elif key == "url":
+                node.url = value
+            elif key == "type":
+                node_type = value
+            elif key == "date_added":
+                node.date_added = _to_int(value)
+            elif key == "date_modified":
+                node.date_modified = _to_int(value)
+        else:
+            tok.skip_value()
+
+    node.type = node_type or TYPE_URL
+
+    for child in pending:
+        child.parent = node.id
+        yield child
+
+    if parent_node is None:
+        yield node
+    elif parent_node.id is not None:
+        node.parent = parent_node.id
+        yield node
+    else:
+        parent_pending.append(node)
+
+
+def iter_chromium_nodes(path, chunk_size=STREAM_CHUNK_SIZE):
+    """Chromium Bookmarks 파일을 스트리밍으로 읽어 노드를 하나씩 생성
+
+    전체 JSON dict를 만들지 않으며, 부모 id가 확정된 노드부터 내보낸다.
+    """
+    with open(path, 'rb') as fp:
+        tok = _JsonTokenizer(fp, chunk_size)
+        tok.expect('{')
+        for key in tok.iter_object_keys():
+            if key != "roots":
+                tok.skip_value()
+                continue
+            tok.expect('{')
+            for root_key in tok.iter_object_keys():
+                token, _ = tok.next()
+                if token == '{':
+                    yield from _stream_node(tok, None, None, 0, root_key)
+                else:
+                    tok.skip_value(token)
+
+
+def load_chromium_bookmarks(path, streaming=False, chunk_size=STREAM_CHUNK_SIZE):
+    """Chromium Bookmarks 파일을 BookmarkTree로 로드
+
+    streaming=True이면 json.load 없이 파일을 조금씩 읽는다 (대용량 파일용).
+    """
+    tree = BookmarkTree(path)
+    if streaming:
+        nodes = iter_chromium_nodes(path, chunk_size)
+    else:
+        with open(path, 'r', encoding='utf-8-sig') as f:
+            nodes = _iter_dict_nodes(json.load(f))
+    for node in nodes:
+        tree.add(node)
+    return tree
+
+
+# Firefox (places.sqlite 또는 북마크 내보내기 JSON)
+_FIREFOX_TYPES = {
+    firefox_places.TYPE_BOOKMARK: TYPE_URL,
+    firefox_places.TYPE_FOLDER: TYPE_FOLDER,
+    firefox_places.TYPE_SEPARATOR: TYPE_SEPARATOR,
+}
+
+
+def _firefox_node(row):
+    node_id, guid, node_type, parent, position, title, url, date_added, date_modified = row
+    root = firefox_places.ROOT_GUIDS.get(guid)
+    return BookmarkNode(
+        id=str(node_id),
+        guid=guid,
+        # 최상위 root________ 폴더는 부모가 0
+        parent=str(parent) if parent else None,
+        index=position or 0,
+        type=_FIREFOX_TYPES.get(node_type, TYPE_URL),
+        title=title or "",
+        url=url,
+        date_added=date_added or 0,
+        date_modified=date_modified or 0,
+        root=root,
+    )
+
+
+def load_firefox_bookmarks(path):
+    """Firefox places.sqlite 또는 북마크 내보내기 JSON을 BookmarkTree로 로드"""
+    tree = BookmarkTree(path)
+    if firefox_places.is_places_database(path):
+        with firefox_places.open_places(path) as conn:
+            for row in firefox_places.iter_bookmark_rows(conn):
+                tree.add(_firefox_node(row))
+    else:
+        data = firefox_places.load_bookmarks_export(path)
+        columns = data.get("columns", firefox_places.BOOKMARK_COLUMNS)
+        order = [columns.index(name) for name in firefox_places.BOOKMARK_COLUMNS]
+        for values in data.get("bookmarks", []):
+            tree.add(_firefox_node([values[i] for i in order]))
+    return tree
+
+
+# 쓰기
+def _chromium_dict(tree, node, checksum):
+    """Chromium 노드 dict. checksum은 Chromium BookmarkCodec과 같은 순서로 갱신"""
+    fields = {
+        "date_added": str(node.date_added),
+        "guid": node.guid or str(uuid.uuid4()),
+        "id": node.id,
+        "name": node.title,
+    }
+    checksum.update(node.id.encode('utf-8'))
+    checksum.update(node.title.encode('utf-16-le'))
+    if node.is_folder:
+        checksum.update(b"folder")
+        fields["children"] = [_chromium_dict(tree, child, checksum) for child in tree.children(node.id)]
+        fields["date_modified"] = str(node.date_modified)
+        fields["type"] = TYPE_FOLDER
+    else:
+        checksum.update(b"url")
+        checksum.update(node.url.encode('utf-8'))
+        fields["type"] = TYPE_URL
+        fields["url"] = node.url
+    return fields
+
+
+def write_chromium_bookmarks(tree, path):
+    """BookmarkTree를 Chromium Bookmarks 파일로 기록 (체크섬 포함)
+
+    meta_info 등 트리 모델에 없는 필드는 기록되지 않는다.
+    """
+    checksum = hashlib.md5()
+    roots = {}
+    root_keys = list(CHROMIUM_ROOT_KEYS) + [key for key in tree.roots if key not in CHROMIUM_ROOT_KEYS]
+    for key in root_keys:
+        root_id = tree.roots.get(key)
+        if root_id is not None:
+            roots[key] = _chromium_dict(tree, tree.by_id[root_id], checksum)
+    data = {"checksum": checksum.hexdigest(), "roots": roots, "version": 1}
+
+    with atomic_write(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=3, ensure_ascii=False)
+
+
+def write_firefox_export(tree, path):
+    """BookmarkTree를 Firefox 북마크 내보내기 JSON으로 기록 (키워드 제외)"""
+    type_codes = {TYPE_URL: firefox_places.TYPE_BOOKMARK, TYPE_FOLDER: firefox_places.TYPE_FOLDER,
+                  TYPE_SEPARATOR: firefox_places.TYPE_SEPARATOR}
+    rows = ([int(node.id), node.guid, type_codes.get(node.type, firefox_places.TYPE_BOOKMARK),
+             int(node.parent) if node.parent is not None else 0, node.index, node.title, node.url,
+             node.date_added, node.date_modified]
+            for node in tree.nodes)
+    firefox_places.write_bookmarks_export(path, rows)
+
+
+def load_bookmarks(path, streaming=False):
+    """파일 형식을 확인하여 Chromium Bookmarks 또는 Firefox(DB/내보내기) 북마크를 로드"""
+    if firefox_places.is_places_database(path) or firefox_places.is_bookmarks_export(path):
+        return load_firefox_bookmarks(path)
+    return load_chromium_bookmarks(path, streaming)
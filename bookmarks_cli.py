@@ -0,0 +1,493 @@
+import sys
+import json
+import signal
+import argparse
+import importlib
+from datetime import datetime
+
+from bookmarks_core import (
+    ConfigManager, BROWSER_PATHS, perform_backup, perform_restore, discover_profiles,
+    list_backups, find_backup, rebuild_catalog, verify_backups, compact_backups, prune_backups, set_log_stream,
+    set_user_root, log_message, add_log_sink, remove_log_sink, RESTORE_MODES
+)
+from metrics import configure_from_dict as configure_metrics
+
+# 명령줄(headless) 실행
+# tkinter를 import하지 않으므로 스케줄러, 컨테이너 등 디스플레이 없는 환경에서 사용할 수 있다.
+# profiles, list 같은 명령이 sqlite3/lzma 등을 읽지 않도록 backup_engine, scheduler, watcher,
+# bookmark_diff, bookmark_merge, backup_archive, retention, log_pipeline, firefox_places는
+# 쓰는 명령 안에서 import한다. 옵션 기본값도 명령을 실행할 때 설정/모듈 기본값에서 읽는다.
+#
+# 사용 예:
+#   python bookmarks_cli.py backup --browser Chrome --dir D:\Backup
+#   python bookmarks_cli.py backup --all-profiles --workers 8
+#   python bookmarks_cli.py backup --format archive --codec lzma --level 9
+#   python bookmarks_cli.py backup --browser Edge --format incremental
+#   python bookmarks_cli.py compact --browser Edge
+#   python bookmarks_cli.py prune --keep-last 10 --daily 7 --weekly 4 --monthly 12 --dry-run
+#   python bookmarks_cli.py prune --max-bytes 2G
+#   python bookmarks_cli.py daemon --log-file
+#   python bookmarks_cli.py daemon --status
+#   python bookmarks_cli.py watch --browser Chrome --debounce 10
+#   python bookmarks_cli.py restore --browser Edge --snapshot 20250101120000000000
+#   python bookmarks_cli.py restore --browser Chrome --mode merge --base 20241201090000000000
+#   python bookmarks_cli.py restore --browser Chrome --before 2025-01-01
+#   python bookmarks_cli.py list --json
+#   python bookmarks_cli.py list --browser Chrome --after 2024-12-01 --before 2025-01-01
+#   python bookmarks_cli.py verify
+#   python bookmarks_cli.py diff --browser Chrome --snapshot 20250101120000000000
+
+# 종료 코드
+EXIT_OK = 0
+EXIT_FAILURE = 1
+EXIT_USAGE = 2  # argparse 사용법 오류
+
+# perform_backup 옵션 -> 설정 키 (명령줄에서 지정하지 않으면 설정값, 설정에도 없으면 모듈 기본값)
+BACKUP_OPTION_KEYS = {
+    "pages_per_step": "firefox_pages_per_step",
+    "step_sleep": "firefox_step_sleep",
+    "firefox_mode": "firefox_backup_mode",
+    "archive_codec": "archive_codec",
+    "archive_level": "archive_level",
+}
+
+
+def _browser_names(browser):
+    if browser == "all":
+        return list(BROWSER_PATHS.keys())
+    return [browser]
+
+
+def _parse_time(value):
+    """--before/--after 값 (ISO 8601 날짜 또는 시각)을 카탈로그 비교용 문자열로 변환"""
+    try:
+        return datetime.fromisoformat(value).isoformat(timespec='seconds')
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"날짜 형식이 올바르지 않습니다 (예: 2025-01-01, 2025-01-01T09:30): {value}")
+
+
+SIZE_UNITS = {"K": 1024, "M": 1024 ** 2, "G": 1024 ** 3, "T": 1024 ** 4}
+
+
+def _parse_size(value):
+    """--max-bytes 값 (바이트 수 또는 K/M/G/T 단위)"""
+    text = value.strip().upper().rstrip("B")
+    try:
+        if text and text[-1] in SIZE_UNITS:
+            return int(float(text[:-1]) * SIZE_UNITS[text[-1]])
+        return int(text)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"용량 형식이 올바르지 않습니다 (예: 500M, 2G): {value}")
+
+
+def _lazy_choice(module_name, attr):
+    """선택지를 가진 모듈을 옵션이 주어졌을 때만 import해 값을 확인하는 argparse type"""
+    def check(value):
+        choices = getattr(importlib.import_module(module_name), attr)
+        if value not in choices:
+            raise argparse.ArgumentTypeError(f"{value} (선택: {', '.join(choices)})")
+        return value
+    return check
+
+
+def _given(**options):
+    """명령줄에서 지정한 옵션만 (None은 함수 기본값을 쓰도록 뺀다)"""
+    return {key: value for key, value in options.items() if value is not None}
+
+
+def _print_results(args, payload, lines):
+    """--json이면 JSON, 아니면 사람이 읽는 형식으로 출력"""
+    if args.json:
+        json.dump(payload, sys.stdout, indent=2, ensure_ascii=False)
+        sys.stdout.write("\n")
+    else:
+        for line in lines:
+            print(line)
+
+
+def _result_line(result):
+    status = "건너뜀" if result.skipped else ("성공" if result.success else "실패")
+    target = result.snapshot_id or result.path or result.message
+    name = f"{result.browser} ({result.profile})" if result.profile else result.browser
+    return f"{name}\t{status}\t{target}"
+
+
+def cmd_backup(args):
+    backup_options = _config_backup_options(args.config_manager, args)
+    if args.all_profiles:
+        from backup_engine import backup_all_profiles
+        browsers = None if args.browser == "all" else [args.browser]
+        batch = backup_all_profiles(args.dir, args.format, force=args.force, browsers=browsers,
+                                    **_given(max_workers=args.workers), **backup_options)
+        lines = [_result_line(r) for r in batch.results]
+        lines.append(f"합계: 성공 {batch.succeeded}, 변경 없음 {batch.skipped}, "
+                     f"실패 {batch.failed} ({batch.elapsed:.2f}초)")
+        _print_results(args, batch.to_dict(), lines)
+        return EXIT_OK if batch else EXIT_FAILURE
+
+    results = []
+    for browser in _browser_names(args.browser):
+        results.append(perform_backup(browser, args.dir, args.format, force=args.force, **backup_options))
+
+    _print_results(args, [r.to_dict() for r in results], [_result_line(r) for r in results])
+    return EXIT_OK if all(results) else EXIT_FAILURE
+
+
+def _find_profile(args):
+    """--profile로 지정한 BrowserProfile (지정하지 않으면 None, 없으면 LookupError)"""
+    if not args.profile:
+        return None
+    matches = [p for p in discover_profiles(browsers=[args.browser]) if p.profile == args.profile]
+    if not matches:
+        raise LookupError(f"{args.browser} 프로필을 찾을 수 없습니다: {args.profile}")
+    return matches[0]
+
+
+def cmd_restore(args):
+    try:
+        profile = _find_profile(args)
+    except LookupError as e:
+        log_message(f"[오류] {e}")
+        return EXIT_FAILURE
+
+    snapshot_id = args.snapshot
+    if args.before:
+        entry = find_backup(args.dir, args.browser, args.before, profile)
+        if entry is None:
+            log_message(f"[오류] {args.browser} {args.before} 이전의 스냅샷이 없습니다.")
+            return EXIT_FAILURE
+        snapshot_id = entry["snapshot_id"]
+
+    result = perform_restore(args.browser, args.dir, snapshot_id=snapshot_id,
+                             restart_browser=not args.no_restart, profile=profile,
+                             mode=args.mode, base_snapshot=args.base, **_given(prefer=args.prefer))
+    status = "성공" if result.success else "실패"
+    _print_results(args, result.to_dict(),
+                   [f"{result.browser}\t{status}\t{result.path or result.message}"])
+    return EXIT_OK if result else EXIT_FAILURE
+
+
+def cmd_profiles(args):
+    browsers = None if args.browser == "all" else [args.browser]
+    profiles = discover_profiles(browsers=browsers)
+    lines = [f"{p.browser}\t{p.profile}\t{p.backup_name}\t{p.path}" for p in profiles]
+    _print_results(args, [p.to_dict() for p in profiles], lines)
+    return EXIT_OK
+
+
+def cmd_list(args):
+    if args.rebuild:
+        rebuild_catalog(args.dir)
+
+    entries = []
+    for browser in _browser_names(args.browser):
+        entries.extend(list_backups(args.dir, browser, before=args.before, after=args.after))
+
+    lines = [f"{e['browser']}\t{e['profile'] or '-'}\t{e['format']}\t{e['snapshot_id'] or '-'}\t{e['created']}\t{e['size']:,} bytes"
+             for e in entries]
+    _print_results(args, entries, lines)
+    return EXIT_OK
+
+
+def cmd_verify(args):
+    results = []
+    for browser in _browser_names(args.browser):
+        results.extend(verify_backups(args.dir, browser, args.snapshot))
+
+    labels = {True: "정상", False: "손상", None: "확인 불가"}
+    lines = [f"{r['browser']}\t{r['profile'] or '-'}\t{r['format']}\t{r['snapshot_id'] or '-'}\t{labels[r['ok']]}"
+             for r in results]
+    _print_results(args, results, lines)
+    return EXIT_FAILURE if any(r["ok"] is False for r in results) else EXIT_OK
+
+
+def cmd_compact(args):
+    results = []
+    for browser in _browser_names(args.browser):
+        results.extend(compact_backups(args.dir, browser))
+
+    lines = [f"{r['browser']}\t{r['profile'] or '-'}\t체크포인트 {r['converted']}개\t"
+             f"{r['bytes_before']:,} -> {r['bytes_after']:,} bytes" for r in results]
+    _print_results(args, results, lines)
+    return EXIT_OK
+
+
+def cmd_prune(args):
+    from retention import RetentionPolicy
+    rules = {key: getattr(args, key) for key in ("keep_last", "hourly", "daily", "weekly", "monthly", "max_bytes")}
+    if any(value is not None for value in rules.values()):
+        policy = RetentionPolicy(**rules)
+    else:
+        policy = RetentionPolicy.from_dict(args.config_retention)
+
+    browsers = None if args.browser == "all" else [args.browser]
+    report = prune_backups(args.dir, policy, browsers=browsers, dry_run=args.dry_run,
+                           restore_backups=not args.no_bak)
+
+    lines = [f"{e['browser']}\t{e['profile'] or '-'}\t{e['format']}\t{e['snapshot_id'] or e['location']}\t"
+             f"{e['created']}\t{e['bytes']:,} bytes" for e in report["deleted"]]
+    action = "삭제 예정" if args.dry_run else "삭제"
+    lines.append(f"합계: {action} {len(report['deleted']):,}개, 유지 {report['kept']:,}개, "
+                 f"{report['freed_bytes']:,} bytes")
+    _print_results(args, report, lines)
+    return EXIT_OK
+
+
+def _status_lines(status):
+    lines = []
+    for job in status:
+        duration = f"{job['last_duration']:.2f}초" if job.get('last_duration') is not None else "-"
+        lines.append(f"{job['name']}\t{job.get('last_status') or '-'}\t마지막 {job.get('last_run') or '-'} ({duration})\t"
+                     f"다음 {job.get('next_run') or '-'}\t실행 {job.get('runs', 0)}회")
+    return lines
+
+
+def _config_backup_options(config_manager, args=None):
+    """설정 파일의 Firefox/압축 백업 설정. args에 명령줄에서 지정한 값이 있으면 그 값을 쓴다"""
+    options = {}
+    for option, key in BACKUP_OPTION_KEYS.items():
+        value = getattr(args, option, None)
+        options[option] = config_manager.get(key) if value is None else value
+    return options
+
+
+def _stop_on_sigterm(runner):
+    # 서비스 관리자의 종료 요청도 Ctrl+C처럼 실행 중인 백업을 마치고 끝낸다
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, lambda _signum, _frame: runner.stop())
+
+
+def _open_log_file(args):
+    """--log-file이 있으면 로그 파일 sink 등록 (없으면 None)"""
+    if args.log_file is None:
+        return None
+    from log_pipeline import RotatingFileSink
+    sink = RotatingFileSink(args.log_file or None)
+    add_log_sink(sink)
+    return sink
+
+
+def _close_log_file(sink):
+    if sink is not None:
+        remove_log_sink(sink)
+        sink.close()
+
+
+def cmd_daemon(args):
+    from scheduler import Scheduler, load_jobs, load_state
+    from retention import RetentionPolicy
+    if args.status:
+        status = list(load_state().values())
+        _print_results(args, status, _status_lines(status))
+        return EXIT_OK
+
+    config_manager = args.config_manager
+    jobs, max_workers = load_jobs(config_manager)
+    scheduler = Scheduler(jobs, args.workers or max_workers, _config_backup_options(config_manager),
+                          RetentionPolicy.from_dict(config_manager.get("retention")))
+
+    if args.once:
+        status = scheduler.run_once()
+        _print_results(args, status, _status_lines(status))
+        return EXIT_FAILURE if any(job["last_status"] != "ok" for job in status) else EXIT_OK
+
+    _stop_on_sigterm(scheduler)
+    log_file = _open_log_file(args)
+    try:
+        scheduler.run_forever()
+    except KeyboardInterrupt:
+        scheduler.stop()
+    finally:
+        _close_log_file(log_file)
+    return EXIT_OK
+
+
+def cmd_watch(args):
+    from watcher import BookmarkWatcher
+    from backup_engine import backup_profile
+    browsers = None if args.browser == "all" else [args.browser]
+    profiles = discover_profiles(browsers=browsers)
+    if not profiles:
+        log_message("[오류] 감시할 브라우저 프로필이 없습니다.")
+        return EXIT_FAILURE
+
+    backup_options = _config_backup_options(args.config_manager)
+
+    def on_change(profile):
+        backup_profile(profile, args.dir, args.format, False, backup_options)
+
+    watcher = BookmarkWatcher(profiles, on_change, polling=args.polling, max_workers=args.workers,
+                              **_given(debounce=args.debounce, max_delay=args.max_delay,
+                                       poll_interval=args.poll_interval))
+    _stop_on_sigterm(watcher)
+    log_file = _open_log_file(args)
+    try:
+        watcher.run_forever()
+    except KeyboardInterrupt:
+        watcher.stop()
+    finally:
+        _close_log_file(log_file)
+    return EXIT_OK
+
+
+def cmd_diff(args):
+    from bookmark_diff import diff_backup
+    try:
+        profile = _find_profile(args)
+    except LookupError as e:
+        log_message(f"[오류] {e}")
+        return EXIT_FAILURE
+
+    diff = diff_backup(args.browser, args.dir, args.snapshot, args.against, profile)
+    summary = diff.summary()
+    lines = diff.lines(limit=args.limit)
+    lines.append("합계: " + ", ".join(f"{kind} {count:,}" for kind, count in summary.items())
+                 + f" ({diff.elapsed * 1000:.0f} ms)")
+    _print_results(args, diff.to_dict(), lines)
+    return EXIT_OK
+
+
+def build_parser(default_dir, config_manager):
+    parser = argparse.ArgumentParser(
+        prog="bookmarks_cli",
+        description="브라우저 북마크 백업/복구 (명령줄 모드)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    browser_choices = list(BROWSER_PATHS.keys())
+
+    def add_common(sub, allow_all=True):
+        choices = browser_choices + (["all"] if allow_all else [])
+        sub.add_argument("--browser", choices=choices, default="all" if allow_all else None,
+                         required=not allow_all, help="대상 브라우저")
+        sub.add_argument("--dir", default=default_dir, help=f"백업 폴더 (기본값: {default_dir})")
+        sub.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+        sub.add_argument("--quiet", action="store_true", help="진행 로그 출력 안 함")
+        sub.add_argument("--root", help="브라우저 프로필을 찾을 사용자 폴더 (기본값: %%USERPROFILE%%)")
+
+    backup = subparsers.add_parser("backup", help="북마크 백업")
+    add_common(backup)
+    backup.add_argument("--format", choices=["store", "copy", "archive", "incremental"],
+                        default=config_manager.get("backup_format", "store"),
+                        help="백업 형식: store (중복 제거 저장소), copy (단일 파일), archive (압축 아카이브), "
+                             "incremental (Chromium 북마크 증분 패치)")
+    backup.add_argument("--codec", dest="archive_codec", metavar="CODEC",
+                        type=_lazy_choice("backup_archive", "CODECS"),
+                        help="archive 형식의 압축 코덱: zlib, lzma, bz2 (기본값: 설정 archive_codec)")
+    backup.add_argument("--level", dest="archive_level", metavar="LEVEL", type=int,
+                        help="archive 형식의 압축 레벨 (기본값: 설정 archive_level 또는 코덱 기본값)")
+    backup.add_argument("--force", action="store_true", help="변경이 없어도 백업")
+    backup.add_argument("--all-profiles", action="store_true", help="모든 프로필을 병렬로 백업")
+    backup.add_argument("--workers", type=int, help="--all-profiles의 동시 백업 작업 수")
+    backup.add_argument("--pages-per-step", type=int,
+                        help="Firefox DB 온라인 백업 단계당 페이지 수 (-1이면 한 번에 전체)")
+    backup.add_argument("--step-sleep", type=float,
+                        help="Firefox DB 온라인 백업 단계 사이 대기 시간(초)")
+    backup.add_argument("--firefox-mode", metavar="MODE", type=_lazy_choice("firefox_places", "BACKUP_MODES"),
+                        help="Firefox 백업 방식: database (places.sqlite 전체) 또는 bookmarks (북마크만)")
+    backup.set_defaults(func=cmd_backup, config_manager=config_manager)
+
+    restore = subparsers.add_parser("restore", help="북마크 복구")
+    add_common(restore, allow_all=False)
+    restore_target = restore.add_mutually_exclusive_group()
+    restore_target.add_argument("--snapshot", help="복구할 스냅샷 ID (기본값: 최신)")
+    restore_target.add_argument("--before", type=_parse_time,
+                                help="이 시각 이전의 가장 최근 스냅샷으로 복구 (예: 2025-01-01)")
+    restore.add_argument("--profile", help="복구할 프로필 이름 (기본값: 기본 프로필)")
+    restore.add_argument("--no-restart", action="store_true", help="복구 후 브라우저를 다시 실행하지 않음")
+    restore.add_argument("--mode", choices=RESTORE_MODES, default=config_manager.get("restore_mode"),
+                         help="복구 방식: overwrite (파일 교체) 또는 merge (현재 북마크와 병합)")
+    restore.add_argument("--base", help="merge 방식의 공통 조상 스냅샷 ID (없으면 양쪽 항목을 모두 남김)")
+    restore.add_argument("--prefer", metavar="SIDE", type=_lazy_choice("bookmark_merge", "PREFER_CHOICES"),
+                         help="병합 충돌 시 따를 쪽: backup 또는 current (기본값: backup)")
+    restore.set_defaults(func=cmd_restore)
+
+    profiles = subparsers.add_parser("profiles", help="발견된 브라우저 프로필 목록")
+    add_common(profiles)
+    profiles.set_defaults(func=cmd_profiles)
+
+    list_cmd = subparsers.add_parser("list", help="백업 목록")
+    add_common(list_cmd)
+    list_cmd.add_argument("--before", type=_parse_time, help="이 시각 이전의 백업만 (예: 2025-01-01)")
+    list_cmd.add_argument("--after", type=_parse_time, help="이 시각 이후의 백업만")
+    list_cmd.add_argument("--rebuild", action="store_true", help="백업 폴더를 다시 읽어 카탈로그 재구성")
+    list_cmd.set_defaults(func=cmd_list)
+
+    verify = subparsers.add_parser("verify", help="백업 무결성 검증")
+    add_common(verify)
+    verify.add_argument("--snapshot", help="검증할 스냅샷 ID (기본값: 전체)")
+    verify.set_defaults(func=cmd_verify)
+
+    compact = subparsers.add_parser("compact", help="증분 백업의 오래된 체크포인트 압축")
+    add_common(compact)
+    compact.set_defaults(func=cmd_compact)
+
+    prune = subparsers.add_parser("prune", help="보관 정책에 따라 오래된 백업과 복구 전 .bak 파일 삭제")
+    add_common(prune)
+    prune.add_argument("--keep-last", type=int, help="가장 최근 N개 유지")
+    prune.add_argument("--hourly", type=int, help="최근 N개 시간대마다 1개 유지")
+    prune.add_argument("--daily", type=int, help="최근 N일 동안 하루 1개 유지")
+    prune.add_argument("--weekly", type=int, help="최근 N주 동안 주 1개 유지")
+    prune.add_argument("--monthly", type=int, help="최근 N개월 동안 달 1개 유지")
+    prune.add_argument("--max-bytes", type=_parse_size, help="프로필별 최대 백업 용량 (예: 500M, 2G)")
+    prune.add_argument("--dry-run", action="store_true", help="삭제하지 않고 대상만 출력")
+    prune.add_argument("--no-bak", action="store_true", help="브라우저 프로필 폴더의 복구 전 .bak 파일은 건드리지 않음")
+    prune.set_defaults(func=cmd_prune, config_retention=config_manager.get("retention"))
+
+    daemon = subparsers.add_parser("daemon", help="app_config.json의 \"schedule\" 설정에 따라 주기적으로 백업")
+    daemon.add_argument("--json", action="store_true", help="결과를 JSON으로 출력")
+    daemon.add_argument("--quiet", action="store_true", help="진행 로그 출력 안 함")
+    daemon.add_argument("--root", help="브라우저 프로필을 찾을 사용자 폴더 (기본값: %%USERPROFILE%%)")
+    daemon.add_argument("--workers", type=int, help="동시 백업 작업 수 (기본값: schedule.max_workers)")
+    daemon.add_argument("--once", action="store_true", help="모든 작업을 한 번씩 실행하고 종료")
+    daemon.add_argument("--status", action="store_true", help="작업별 마지막 실행 시각/소요 시간 출력")
+    daemon.add_argument("--log-file", nargs="?", const="", metavar="PATH",
+                        help="로그를 파일에도 기록 (경로 생략 시 %%APPDATA%%\\BrowserBookmarks\\logs\\bookmarks.log)")
+    daemon.set_defaults(func=cmd_daemon, config_manager=config_manager)
+
+    watch = subparsers.add_parser("watch", help="북마크 파일이 바뀔 때마다 백업")
+    add_common(watch)
+    watch.add_argument("--format", choices=["store", "copy", "archive", "incremental"],
+                       default=config_manager.get("backup_format", "store"), help="백업 형식")
+    watch.add_argument("--debounce", type=float,
+                       help="마지막 변경 후 이 시간(초) 동안 조용하면 백업 (기본값: 5)")
+    watch.add_argument("--max-delay", type=float,
+                       help="변경이 계속되어도 이 시간(초)이 지나면 백업 (기본값: 60)")
+    watch.add_argument("--poll-interval", type=float,
+                       help="폴링 방식의 확인 간격(초) (기본값: 2)")
+    watch.add_argument("--polling", action="store_true", help="inotify 대신 폴링으로 감시")
+    watch.add_argument("--workers", type=int, default=1, help="동시 백업 작업 수 (기본값: 1)")
+    watch.add_argument("--log-file", nargs="?", const="", metavar="PATH",
+                       help="로그를 파일에도 기록 (경로 생략 시 %%APPDATA%%\\BrowserBookmarks\\logs\\bookmarks.log)")
+    watch.set_defaults(func=cmd_watch, config_manager=config_manager)
+
+    diff = subparsers.add_parser("diff", help="백업과 현재 북마크 비교")
+    add_common(diff, allow_all=False)
+    diff.add_argument("--snapshot", help="비교할 스냅샷 ID (기본값: 최신)")
+    diff.add_argument("--against", help="현재 북마크 대신 비교할 다른 스냅샷 ID")
+    diff.add_argument("--profile", help="비교할 프로필 이름 (기본값: 기본 프로필)")
+    diff.add_argument("--limit", type=int, default=50, help="변경 종류별 최대 출력 줄 수 (기본값: 50)")
+    diff.set_defaults(func=cmd_diff)
+
+    return parser
+
+
+def main(argv=None):
+    config_manager = ConfigManager()
+    parser = build_parser(config_manager.get("last_backup_dir"), config_manager)
+    args = parser.parse_args(argv)
+
+    # 진행 로그는 stderr로 보내 stdout(결과/JSON)과 섞이지 않게 한다
+    set_log_stream(False if args.quiet else sys.stderr)
+    if args.root:
+        set_user_root(args.root)
+    configure_metrics(config_manager.get("metrics"))
+
+    try:
+        return args.func(args)
+    except Exception as e:
+        log_message(f"[오류] {args.command} 실패: {e}")
+        return EXIT_FAILURE
+
+
+if __name__ == "__main__":
+    sys.exit(main())
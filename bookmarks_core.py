@@ -0,0 +1,1295 @@
+import os
+import re
+import sys
+import shutil
+import json
+import threading
+import functools
+import configparser
+from collections.abc import MutableMapping
+from datetime import datetime
+
+from backup_store import (BackupStore, ChangeIndex, STORE_DIRNAME, ARCHIVE_DIRNAME, INCREMENTAL_DIRNAME,
+                          copy_with_hash, file_sha256, wal_signature)
+from metrics import span, inc, STATUS_OK, STATUS_ERROR
+from file_utils import atomic_write, replace_file, link_or_copy
+
+# 시작 시간을 줄이기 위해 sqlite3, firefox_places, backup_archive(lzma/bz2), incremental_backup,
+# backup_catalog, process_utils, retention은 쓰는 함수 안에서 import한다
+
+# 북마크 백업/복구 핵심 로직
+# tkinter에 의존하지 않으므로 GUI(winBookmarks.py)와 CLI(bookmarks_cli.py)가 함께 사용한다.
+# 사용자 알림은 reporter 콜백으로, 결과는 OperationResult로 전달한다.
+
+# 복구 방식: overwrite (백업으로 파일 교체) / merge (현재 북마크와 3-way 병합)
+RESTORE_OVERWRITE = "overwrite"
+RESTORE_MERGE = "merge"
+RESTORE_MODES = (RESTORE_OVERWRITE, RESTORE_MERGE)
+
+
+def get_appdata_path():
+    """
+    %APPDATA% 경로 반환
+    """
+    # %APPDATA%가 없는 환경(컨테이너 등 headless 실행)에서는 홈 디렉토리 아래 사용
+    appdata = os.environ.get('APPDATA') or os.path.join(os.path.expanduser('~'), '.config')
+    app_folder = os.path.join(appdata, 'BrowserBookmarks')
+    os.makedirs(app_folder, exist_ok=True)
+    return app_folder
+
+# 다른 모듈에 정의된 설정 기본값: 설정 키 -> (모듈, 이름)
+# 설정을 읽을 때마다 그 모듈(sqlite3, lzma 등)을 불러오지 않도록 처음 필요할 때 읽는다
+MODULE_DEFAULTS = {
+    "firefox_pages_per_step": ("firefox_places", "DEFAULT_PAGES_PER_STEP"),
+    "firefox_step_sleep": ("firefox_places", "DEFAULT_STEP_SLEEP"),
+    "firefox_backup_mode": ("firefox_places", "MODE_DATABASE"),
+    "archive_codec": ("backup_archive", "DEFAULT_CODEC"),
+}
+
+def _module_default(key):
+    import importlib
+    module_name, name = MODULE_DEFAULTS[key]
+    return getattr(importlib.import_module(module_name), name)
+
+# 설정 파일 관리
+class ConfigManager:
+    def __init__(self):
+        self.config_dir = get_appdata_path()
+        self.config_file = os.path.join(self.config_dir, "app_config.json")
+        self.default_config = {
+            "language": "ko",
+            "dark_mode": False,
+            "last_backup_dir": os.path.join(os.getcwd(), "Bookmarks_Backup"),
+            "last_browser": "Edge",
+            "window_width": 600,
+            "window_height": 500,
+            "auto_update_check": True,
+            "backup_format": "store",
+            # firefox_pages_per_step, firefox_step_sleep, firefox_backup_mode, archive_codec의 기본값은
+            # MODULE_DEFAULTS (get에서 처음 필요할 때 읽음)
+            "restore_mode": RESTORE_OVERWRITE,
+            "archive_level": None,
+            # 보관 정책 (keep_last, hourly, daily, weekly, monthly, max_bytes). 비어 있으면 정리하지 않음
+            "retention": {},
+            # 예약 백업 (scheduler.py 참고). bookmarks_cli.py daemon으로 실행
+            "schedule": {"max_workers": 4, "jobs": []},
+            # 소요 시간/용량 내보내기 (metrics.py 참고): {"jsonl": 경로, "prometheus": 경로}
+            "metrics": {},
+            # 최신 릴리스 확인 캐시 (release_check.py 참고): {"min_interval", "retry_delay", "max_backoff", "timeout"} (초)
+            "update_check": {},
+            # 업데이트 다운로드 (update_downloader.py 참고): {"chunk_size", "timeout", "retries", "retry_delay"}
+            "update_download": {}
+        }
+        self.config = self.load_config()
+
+    def load_config(self):
+        if os.path.exists(self.config_file):
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    loaded_config = json.load(f)
+                    # 기본 설정과 병합
+                    return {**self.default_config, **loaded_config}
+            except Exception as e:
+                print(f"설정 로드 실패: {e}")
+                return self.default_config.copy()
+        return self.default_config.copy()
+
+    def save_config(self):
+        try:
+            # 쓰는 도중 종료되어도 app_config.json이 비거나 잘리지 않도록 임시 파일에 쓴 뒤 교체
+            with atomic_write(self.config_file, 'w', encoding='utf-8') as f:
+                json.dump(self.config, f, indent=4, ensure_ascii=False)
+        except Exception as e:
+            print(f"설정 저장 실패: {e}")
+
+    def get(self, key, default=None):
+        if key not in self.config and key in MODULE_DEFAULTS:
+            return _module_default(key)
+        return self.config.get(key, default)
+
+    def set(self, key, value):
+        self.config[key] = value
+        self.save_config()
+
+
+# 브라우저별 북마크 경로 정의
+# 사용자 폴더 루트는 BROWSERBOOKMARKS_USER_ROOT 환경 변수로 바꿀 수 있다 (테스트/벤치마크용)
+USER_ROOT_ENV = "BROWSERBOOKMARKS_USER_ROOT"
+CHROMIUM_USER_DATA_DIRS = {
+    "Edge": ('AppData', 'Local', 'Microsoft', 'Edge', 'User Data'),
+    "Chrome": ('AppData', 'Local', 'Google', 'Chrome', 'User Data'),
+}
+CHROMIUM_SKIP_PROFILES = ("System Profile", "Guest Profile")
+FIREFOX_APP_DIR = ('AppData', 'Roaming', 'Mozilla', 'Firefox')
+PROFILE_NAME_SEPARATOR = "__"
+
+def get_user_root():
+    """브라우저 프로필을 찾을 사용자 폴더 루트"""
+    return os.environ.get(USER_ROOT_ENV) or os.environ.get('USERPROFILE') or os.path.expanduser('~')
+
+def get_browser_paths(user_root=None):
+    """각 브라우저의 기본 북마크 파일 경로를 반환"""
+    user_profile = user_root or get_user_root()
+
+    paths = {
+        "Edge": os.path.join(user_profile, *CHROMIUM_USER_DATA_DIRS["Edge"], 'Default', 'Bookmarks'),
+        "Chrome": os.path.join(user_profile, *CHROMIUM_USER_DATA_DIRS["Chrome"], 'Default', 'Bookmarks'),
+        "Firefox": None,
+    }
+
+    firefox_profile_root = os.path.join(user_profile, *FIREFOX_APP_DIR, 'Profiles')
+
+    if os.path.exists(firefox_profile_root):
+        latest_profile_path = None
+        latest_mtime = 0
+
+        for profile_name in os.listdir(firefox_profile_root):
+            profile_path = os.path.join(firefox_profile_root, profile_name)
+            places_sqlite_path = os.path.join(profile_path, 'places.sqlite')
+
+            if os.path.isdir(profile_path) and os.path.exists(places_sqlite_path):
+                try:
+                    mtime = os.path.getmtime(places_sqlite_path)
+                    if mtime > latest_mtime:
+                        latest_mtime = mtime
+                        latest_profile_path = places_sqlite_path
+                except OSError:
+                    continue
+
+        if latest_profile_path:
+            paths["Firefox"] = latest_profile_path
+
+    return paths
+
+BROWSER_NAMES = ("Edge", "Chrome", "Firefox")
+
+class LazyBrowserPaths(MutableMapping):
+    """브라우저 이름 -> 기본 북마크 경로
+
+    키(브라우저 이름)는 고정이고, 경로는 처음 읽을 때 get_browser_paths()로 계산한다.
+    import할 때 Firefox 프로필 폴더를 검색하지 않으므로 GUI/CLI 시작이 빨라진다.
+    """
+
+    def __init__(self, names=BROWSER_NAMES):
+        self._names = tuple(names)
+        self._paths = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        with self._lock:
+            if self._paths is None:
+                self._paths = get_browser_paths()
+            return self._paths
+
+    def reset(self):
+        """다음에 읽을 때 경로를 다시 계산"""
+        with self._lock:
+            self._paths = None
+
+    def __getitem__(self, browser_name):
+        return self._load()[browser_name]
+
+    def __setitem__(self, browser_name, path):
+        self._load()[browser_name] = path
+
+    def __delitem__(self, browser_name):
+        del self._load()[browser_name]
+
+    def __iter__(self):
+        # 브라우저 목록만 필요할 때(메뉴, 명령행 선택지)는 경로를 계산하지 않는다
+        paths = self._paths
+        return iter(list(paths) if paths is not None else self._names)
+
+    def __len__(self):
+        paths = self._paths
+        return len(paths) if paths is not None else len(self._names)
+
+    def __repr__(self):
+        return f"{type(self).__name__}({dict(self)!r})"
+
+BROWSER_PATHS = LazyBrowserPaths()
+
+def set_user_root(user_root):
+    """프로필 검색 루트를 바꾸고 BROWSER_PATHS를 다시 계산 (테스트/벤치마크용)"""
+    os.environ[USER_ROOT_ENV] = user_root
+    BROWSER_PATHS.reset()
+
+BACKUP_FILENAME_MAP = {
+    "Edge": "Edge_Bookmarks",
+    "Chrome": "Chrome_Bookmarks",
+    "Firefox": "firefox_places.sqlite"
+}
+BROWSER_EXE_MAP = {
+    "Edge": "msedge.exe",
+    "Chrome": "chrome.exe",
+    "Firefox": "firefox.exe"
+}
+
+
+# 브라우저 프로필
+class BrowserProfile:
+    """백업 대상 브라우저 프로필 하나
+
+    backup_name: 백업 폴더 안에서 사용할 이름. 기본 프로필(BROWSER_PATHS)은
+    기존과 같은 BACKUP_FILENAME_MAP 이름을, 나머지는 "<이름>__<프로필>"을 사용한다.
+    """
+
+    def __init__(self, browser, profile, path, backup_name):
+        self.browser = browser
+        self.profile = profile
+        self.path = path
+        self.backup_name = backup_name
+
+    @property
+    def is_default(self):
+        return self.backup_name == BACKUP_FILENAME_MAP.get(self.browser)
+
+    @property
+    def display_name(self):
+        return self.browser if self.is_default else f"{self.browser} ({self.profile})"
+
+    def to_dict(self):
+        return {
+            "browser": self.browser,
+            "profile": self.profile,
+            "path": self.path,
+            "backup_name": self.backup_name,
+        }
+
+
+def _profile_backup_name(browser, profile, path, default_paths):
+    base = BACKUP_FILENAME_MAP[browser]
+    if default_paths.get(browser) and os.path.normcase(path) == os.path.normcase(default_paths[browser]):
+        return base
+    safe_profile = "".join(c if c.isalnum() or c in " ._-" else "_" for c in profile)
+    return f"{base}{PROFILE_NAME_SEPARATOR}{safe_profile}"
+
+
+def _chromium_profile_sort_key(name):
+    # Default, Profile 1, Profile 2, ..., Profile 10 순서
+    if name == "Default":
+        return (0, 0, name)
+    if name.startswith("Profile ") and name[8:].isdigit():
+        return (1, int(name[8:]), name)
+    return (2, 0, name)
+
+
+def _firefox_profile_dirs(firefox_dir):
+    """profiles.ini와 Profiles 폴더에서 Firefox 프로필 폴더 수집"""
+    found = {}
+    profiles_ini = os.path.join(firefox_dir, 'profiles.ini')
+    if os.path.exists(profiles_ini):
+        parser = configparser.ConfigParser(interpolation=None)
+        try:
+            parser.read(profiles_ini, encoding='utf-8')
+            for section in parser.sections():
+                if not section.startswith("Profile") or not parser.has_option(section, "Path"):
+                    continue
+                path = parser.get(section, "Path")
+                if parser.get(section, "IsRelative", fallback="1") == "1":
+                    path = os.path.join(firefox_dir, *path.replace('\\', '/').split('/'))
+                found[os.path.normcase(os.path.abspath(path))] = path
+        except (configparser.Error, OSError) as e:
+            log_message(f"[정보] profiles.ini 읽기 실패: {e}")
+
+    profiles_root = os.path.join(firefox_dir, 'Profiles')
+    if os.path.isdir(profiles_root):
+        for entry in os.listdir(profiles_root):
+            path = os.path.join(profiles_root, entry)
+            found.setdefault(os.path.normcase(os.path.abspath(path)), path)
+
+    return sorted(found.values())
+
+
+def discover_profiles(user_root=None, browsers=None):
+    """모든 브라우저의 모든 프로필 검색
+
+    Edge/Chrome: User Data 아래 Default, Profile N 등 Bookmarks 파일이 있는 폴더
+    Firefox: profiles.ini에 등록되었거나 Profiles 폴더에 있는 places.sqlite 보유 프로필
+    """
+    user_root = user_root or get_user_root()
+    default_paths = get_browser_paths(user_root)
+    profiles = []
+
+    for browser, parts in CHROMIUM_USER_DATA_DIRS.items():
+        if browsers and browser not in browsers:
+            continue
+        user_data = os.path.join(user_root, *parts)
+        if not os.path.isdir(user_data):
+            continue
+        names = [entry for entry in os.listdir(user_data)
+                 if entry not in CHROMIUM_SKIP_PROFILES
+                 and os.path.isfile(os.path.join(user_data, entry, 'Bookmarks'))]
+        for name in sorted(names, key=_chromium_profile_sort_key):
+            path = os.path.join(user_data, name, 'Bookmarks')
+            profiles.append(BrowserProfile(browser, name, path,
+                                           _profile_backup_name(browser, name, path, default_paths)))
+
+    if not browsers or "Firefox" in browsers:
+        for profile_dir in _firefox_profile_dirs(os.path.join(user_root, *FIREFOX_APP_DIR)):
+            path = os.path.join(profile_dir, 'places.sqlite')
+            if os.path.isfile(path):
+                name = os.path.basename(os.path.normpath(profile_dir))
+                profiles.append(BrowserProfile("Firefox", name, path,
+                                               _profile_backup_name("Firefox", name, path, default_paths)))
+
+    return profiles
+
+
+def _resolve_target(browser_name, profile):
+    """(북마크 파일 경로, 백업 이름, 로그 표시 이름)"""
+    if profile is not None:
+        return profile.path, profile.backup_name, profile.display_name
+    return BROWSER_PATHS.get(browser_name), BACKUP_FILENAME_MAP.get(browser_name), browser_name
+
+
+def _backup_names(backup_dir, store, browser_name):
+    """백업 폴더에 있는 해당 브라우저의 백업 이름 목록 (모든 프로필)"""
+    base = BACKUP_FILENAME_MAP.get(browser_name)
+    names = set(store.list_names())
+    for _format, source in _snapshot_sources(backup_dir)[1:]:
+        names.update(source.list_names())
+    if os.path.isdir(backup_dir):
+        names.update(entry for entry in os.listdir(backup_dir)
+                     if os.path.isfile(os.path.join(backup_dir, entry)))
+    return sorted(name for name in names
+                  if name == base or name.startswith(base + PROFILE_NAME_SEPARATOR))
+
+
+SNAPSHOT_FORMATS = ("store", "archive", "incremental")
+
+
+def _snapshot_sources(backup_dir):
+    """스냅샷 형식 백업 [(형식, 저장소)]: 중복 제거 저장소, 압축 아카이브, 증분 백업"""
+    from backup_archive import BackupArchive
+    from incremental_backup import IncrementalStore
+    return [
+        ("store", BackupStore(os.path.join(backup_dir, STORE_DIRNAME))),
+        ("archive", BackupArchive(os.path.join(backup_dir, ARCHIVE_DIRNAME))),
+        ("incremental", IncrementalStore(os.path.join(backup_dir, INCREMENTAL_DIRNAME))),
+    ]
+
+
+def _find_snapshot(backup_dir, backup_name, snapshot_id=None):
+    """저장소/압축 아카이브/증분 백업에서 스냅샷 찾기. (저장소, 매니페스트) 반환
+
+    snapshot_id가 없으면 전체 중 최신 스냅샷. 없으면 (None, None)
+    최신 스냅샷은 카탈로그에서 찾고, 카탈로그에 없거나 읽을 수 없으면 폴더를 직접 확인한다.
+    """
+    import sqlite3
+    if snapshot_id is None and os.path.isdir(backup_dir):
+        try:
+            entry = _open_catalog(backup_dir).latest(backup_name, formats=SNAPSHOT_FORMATS)
+        except (sqlite3.Error, OSError) as e:
+            log_message(f"[오류] 백업 카탈로그를 읽을 수 없어 폴더를 직접 확인합니다: {e}")
+            entry = None
+        if entry is not None:
+            source = dict(_snapshot_sources(backup_dir))[entry['format']]
+            manifest = source.load_manifest(backup_name, entry['snapshot_id'])
+            if manifest is not None:
+                return source, manifest
+
+    candidates = []
+    for _format, source in _snapshot_sources(backup_dir):
+        manifest = source.load_manifest(backup_name, snapshot_id)
+        if manifest is not None:
+            candidates.append((source, manifest))
+    if not candidates:
+        return None, None
+    return max(candidates, key=lambda c: c[1]['snapshot_id'])
+
+
+def _profile_of(browser_name, backup_name):
+    base = BACKUP_FILENAME_MAP.get(browser_name)
+    if backup_name == base:
+        return None
+    return backup_name[len(base) + len(PROFILE_NAME_SEPARATOR):]
+
+
+# 백업 카탈로그
+def _catalog_entry(browser_name, backup_name, backup_format, manifest, source):
+    """스냅샷 매니페스트로 카탈로그 항목 만들기"""
+    entry = {
+        "browser": browser_name,
+        "profile": _profile_of(browser_name, backup_name),
+        "backup_name": backup_name,
+        "format": backup_format,
+        "snapshot_id": manifest["snapshot_id"],
+        "created": manifest.get("created"),
+        "size": manifest.get("size"),
+        "sha256": manifest.get("sha256"),
+        "content": manifest.get("metadata", {}).get("content"),
+        "location": source.root,
+    }
+    if backup_format == "archive":
+        entry.update(codec=manifest.get("codec"), compressed_size=manifest.get("compressed_size"),
+                     location=source.archive_path(manifest))
+    elif backup_format == "incremental":
+        entry.update(kind=manifest.get("kind"), data_size=manifest.get("data_size"))
+    return entry
+
+
+def _copy_entry(browser_name, backup_name, path, sha256=None, created=None):
+    """단일 파일 백업의 카탈로그 항목 (created가 없으면 파일 수정 시각)"""
+    st = os.stat(path)
+    return {
+        "browser": browser_name,
+        "profile": _profile_of(browser_name, backup_name),
+        "backup_name": backup_name,
+        "format": "copy",
+        "snapshot_id": None,
+        "created": created or datetime.fromtimestamp(st.st_mtime).isoformat(timespec='seconds'),
+        "size": st.st_size,
+        "sha256": sha256,
+        "location": path,
+    }
+
+
+def _scan_backups(backup_dir, browser_name):
+    """백업 폴더를 직접 읽어 만든 카탈로그 항목 목록 (모든 프로필)"""
+    sources = _snapshot_sources(backup_dir)
+    entries = []
+    for backup_name in _backup_names(backup_dir, sources[0][1], browser_name):
+        legacy_path = os.path.join(backup_dir, backup_name)
+        if os.path.isfile(legacy_path):
+            entries.append(_copy_entry(browser_name, backup_name, legacy_path))
+
+        snapshots = []
+        for backup_format, source in sources:
+            for snapshot_id in source.list_snapshots(backup_name):
+                manifest = source.load_manifest(backup_name, snapshot_id)
+                if manifest is not None:
+                    snapshots.append(_catalog_entry(browser_name, backup_name, backup_format, manifest, source))
+        snapshots.sort(key=lambda e: e["snapshot_id"])
+        entries.extend(snapshots)
+    return entries
+
+
+def rebuild_catalog(backup_dir):
+    """백업 폴더 전체를 읽어 카탈로그를 다시 만든다. 등록한 항목 수 반환"""
+    from backup_catalog import BackupCatalog
+    entries = []
+    for browser_name in BACKUP_FILENAME_MAP:
+        entries.extend(_scan_backups(backup_dir, browser_name))
+    BackupCatalog(backup_dir).replace_all(entries)
+    log_message(f"[정보] 백업 카탈로그 재구성: {len(entries):,}개 ({backup_dir})")
+    return len(entries)
+
+
+_catalog_lock = threading.Lock()
+
+def _open_catalog(backup_dir):
+    """백업 폴더의 카탈로그 (처음 사용할 때 기존 백업을 한 번 모두 등록)"""
+    from backup_catalog import BackupCatalog
+    catalog = BackupCatalog(backup_dir)
+    with _catalog_lock:
+        if not catalog.is_built():
+            rebuild_catalog(backup_dir)
+    return catalog
+
+
+def _record_catalog(backup_dir, entry):
+    """카탈로그에 백업 기록. 실패해도 백업 자체는 성공으로 둔다 (다음 재구성 때 다시 등록됨)"""
+    import sqlite3
+    try:
+        _open_catalog(backup_dir).add(entry)
+    except (sqlite3.Error, OSError) as e:
+        log_message(f"[오류] 백업 카탈로그 기록 실패: {e}")
+
+
+# 전역 로그 함수
+# 표준 출력(또는 set_log_stream으로 지정한 스트림)에 기록하고, 등록된 sink(GUI 로그 창 등)에 전달
+_log_stream = None
+_log_sinks = []
+
+def set_log_stream(stream):
+    """로그 출력 스트림 지정 (None이면 sys.stdout, False면 출력 안 함)"""
+    global _log_stream
+    _log_stream = stream
+
+def add_log_sink(sink):
+    """로그 메시지를 받을 콜백 등록: sink(full_message)"""
+    _log_sinks.append(sink)
+
+def remove_log_sink(sink):
+    if sink in _log_sinks:
+        _log_sinks.remove(sink)
+
+def log_message(message):
+    timestamp = datetime.now().strftime("[%H:%M:%S]")
+    full_message = f"{timestamp} {message}\n"
+
+    stream = sys.stdout if _log_stream is None else _log_stream
+    if stream:
+        try:
+            stream.buffer.write(full_message.encode('utf-8'))
+            stream.flush()
+        except Exception:
+            print(full_message.strip(), file=stream)
+
+    for sink in list(_log_sinks):
+        try:
+            sink(full_message)
+        except Exception:
+            pass
+
+
+# 작업 결과
+class OperationResult:
+    """백업/복구 작업 결과
+
+    bool()로 평가하면 성공 여부를 반환하므로 기존 True/False 반환값과 호환된다.
+    """
+
+    def __init__(self, operation, browser, profile=None):
+        self.operation = operation
+        self.browser = browser
+        self.profile = profile
+        self.success = False
+        self.skipped = False
+        self.path = None
+        self.snapshot_id = None
+        self.message = ""
+        self.details = {}
+        self.elapsed = None
+
+    def __bool__(self):
+        return self.success
+
+    def to_dict(self):
+        return {
+            "operation": self.operation,
+            "browser": self.browser,
+            "profile": self.profile,
+            "success": self.success,
+            "skipped": self.skipped,
+            "path": self.path,
+            "snapshot_id": self.snapshot_id,
+            "message": self.message,
+            "details": self.details,
+            "elapsed": self.elapsed,
+        }
+
+
+def _notify(reporter, level, message):
+    """reporter 콜백으로 사용자 알림 전달. level: "info", "warning", "error" """
+    if reporter:
+        try:
+            reporter(level, message)
+        except Exception as e:
+            log_message(f"[오류] 알림 표시 실패: {e}")
+
+
+STATUS_SKIPPED = "skipped"
+STATUS_NOT_RUNNING = "not_running"
+
+def _measured(operation):
+    """OperationResult를 반환하는 작업의 소요 시간과 처리 용량을 metrics에 기록"""
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(browser_name, *args, **kwargs):
+            with span(operation, browser=browser_name) as s:
+                result = func(browser_name, *args, **kwargs)
+                s.status = STATUS_SKIPPED if result.skipped else (STATUS_OK if result.success else STATUS_ERROR)
+                for key in ("format", "mode"):
+                    if key in result.details:
+                        s.labels[key] = result.details[key]
+                s.fields.update({"profile": result.profile, "snapshot_id": result.snapshot_id})
+                if not result.success:
+                    s.fields["error"] = result.message
+                elif not result.skipped:
+                    size = result.details.get("size") or 0
+                    written = next((result.details[key] for key in ("new_bytes", "compressed_size", "size")
+                                    if result.details.get(key) is not None), 0)
+                    s.fields.update({"size": size, "written": written})
+                    # source: 처리한 북마크 파일 크기, written: 실제로 디스크에 새로 쓴 크기
+                    inc("source_bytes_total", size, operation=operation, browser=browser_name)
+                    inc("written_bytes_total", written, operation=operation, browser=browser_name)
+            if result.elapsed is None:
+                result.elapsed = s.duration
+            return result
+        return wrapper
+    return decorate
+
+def _fail(result, reporter, level, message):
+    result.success = False
+    result.message = message
+    _notify(reporter, level, message)
+    return result
+
+
+# 핵심 로직 함수
+def _snapshot_sqlite(src_path, backup_dir, label, pages_per_step, step_sleep):
+    """places.sqlite를 백업 폴더 안 임시 파일로 스냅샷. (임시 파일 경로, 통계) 반환"""
+    from firefox_places import snapshot_places
+    snapshot_path = os.path.join(backup_dir, f".snapshot.{os.getpid()}.{threading.get_ident()}.sqlite")
+    stats = snapshot_places(src_path, snapshot_path, pages_per_step, step_sleep)
+    log_message(f"[정보] {label} DB 스냅샷 ({stats['method']}): {stats['pages']:,} 페이지, "
+                f"{stats['bytes']:,} bytes, {stats['elapsed']:.2f}초 "
+                f"({stats['pages_per_sec']:,.0f} 페이지/초, {stats['bytes_per_sec'] / 1024 / 1024:.1f} MB/초)")
+    return snapshot_path, stats
+
+
+def _export_firefox_bookmarks(src_path, backup_dir, label):
+    """places.sqlite의 북마크만 백업 폴더 안 임시 JSON으로 내보내기. (임시 파일 경로, 통계) 반환"""
+    from firefox_places import export_bookmarks
+    export_path = os.path.join(backup_dir, f".export.{os.getpid()}.{threading.get_ident()}.json")
+    stats = export_bookmarks(src_path, export_path)
+    ratio = stats['source_bytes'] / stats['bytes'] if stats['bytes'] else 0
+    log_message(f"[정보] {label} 북마크 내보내기: 북마크 {stats['bookmarks']:,}개, 폴더 {stats['folders']:,}개, "
+                f"{stats['bytes']:,} bytes (원본 DB의 1/{ratio:.0f}), {stats['elapsed']:.2f}초")
+    return export_path, stats
+
+
+def _has_pending_wal(db_path):
+    """체크포인트되지 않은 -wal이 남아 있는지 (DB 파일만 옮기면 그 변경이 빠짐)"""
+    try:
+        return os.path.getsize(db_path + "-wal") > 0
+    except OSError:
+        return False
+
+
+def _restore_places(staging_path, dst_path, result, backup_path=None):
+    """places.sqlite 복구: DB 스냅샷이면 파일 교체, 북마크 내보내기면 현재 DB에 가져오기
+
+    staging_path: dst_path와 같은 폴더에 꺼내 둔 백업 내용
+    backup_path: 교체할 때 기존 DB를 복사 없이 보관할 경로 (replace_file 참고)
+    """
+    from firefox_places import is_places_database, import_bookmarks
+    if is_places_database(staging_path):
+        # 남아 있는 -wal이 복구한 DB 위에 다시 적용되지 않도록 지운다 (이전 DB는 .bak에 보관됨)
+        for suffix in ("-wal", "-shm"):
+            if os.path.exists(dst_path + suffix):
+                os.remove(dst_path + suffix)
+        replace_file(staging_path, dst_path, backup_path)
+        return
+
+    if not os.path.exists(dst_path):
+        raise FileNotFoundError("북마크를 가져올 places.sqlite가 없습니다. Firefox를 한 번 실행해 보세요.")
+    stats = import_bookmarks(staging_path, dst_path)
+    log_message(f"[정보] 북마크 {stats['bookmarks']:,}개 가져오기 완료 (새 URL {stats['new_places']:,}개, "
+                f"{stats['elapsed']:.2f}초)")
+    result.details["import"] = stats
+
+
+@_measured("backup")
+def perform_backup(browser_name, backup_dir, backup_format="store", force=False, reporter=None,
+                   profile=None, pages_per_step=None, step_sleep=None, firefox_mode=None, archive_codec=None,
+                   archive_level=None):
+    """지정된 브라우저의 북마크 파일을 지정된 디렉토리에 백업.
+
+    backup_format: "store" (중복 제거 저장소에 스냅샷 추가), "copy" (단일 파일 덮어쓰기),
+                   "archive" (압축 아카이브 추가) 또는 "incremental" (Chromium 북마크 증분 패치)
+    force: 마지막 백업 이후 변경이 없어도 백업
+    reporter: 사용자 알림 콜백 reporter(level, message)
+    profile: 백업할 BrowserProfile (없으면 BROWSER_PATHS의 기본 프로필)
+    pages_per_step, step_sleep: places.sqlite 온라인 백업의 단계당 페이지 수와 단계 사이 대기(초)
+    firefox_mode: "database" (places.sqlite 전체 스냅샷) 또는 "bookmarks" (북마크만 JSON으로 내보내기)
+    archive_codec, archive_level: "archive" 형식의 압축 코덱 (zlib, lzma, bz2)과 레벨 (None이면 코덱 기본값)
+    pages_per_step, step_sleep, firefox_mode, archive_codec이 None이면 firefox_places/backup_archive의 기본값
+    """
+    from firefox_places import (is_sqlite_source, DEFAULT_PAGES_PER_STEP, DEFAULT_STEP_SLEEP,
+                                MODE_DATABASE, MODE_BOOKMARKS)
+    pages_per_step = DEFAULT_PAGES_PER_STEP if pages_per_step is None else pages_per_step
+    step_sleep = DEFAULT_STEP_SLEEP if step_sleep is None else step_sleep
+    firefox_mode = firefox_mode or MODE_DATABASE
+    result = OperationResult("backup", browser_name, profile.profile if profile else None)
+    src_path, backup_filename, label = _resolve_target(browser_name, profile)
+
+    if not src_path or not os.path.exists(src_path):
+        display_path = src_path if src_path else "자동 감지 실패"
+        log_message(f"[오류] {label} 북마크 파일을 찾을 수 없습니다.")
+        return _fail(result, reporter, "error",
+                     f"{label} 북마크 파일을 찾을 수 없습니다.\n경로 확인:\n{display_path}")
+
+    if not backup_dir:
+        return _fail(result, reporter, "warning", "백업 폴더를 선택해주세요.")
+
+    os.makedirs(backup_dir, exist_ok=True)
+
+    is_places = is_sqlite_source(src_path)
+    variant = firefox_mode if is_places and firefox_mode != MODE_DATABASE else None
+    if backup_format == "incremental" and is_places:
+        # 증분 패치는 Chromium Bookmarks JSON 구조 기준이므로 places.sqlite는 중복 제거 저장소에 백업
+        log_message(f"[정보] {label}은(는) 증분 백업을 지원하지 않아 저장소 형식으로 백업합니다.")
+        backup_format = "store"
+    result.details["format"] = backup_format
+
+    snapshot_path = None
+    try:
+        # 마지막 백업 이후 변경 없으면 건너뜀
+        change_index = ChangeIndex(backup_dir)
+        if not force and change_index.is_unchanged(backup_filename, src_path, backup_format, variant):
+            log_message(f"[정보] {label} 북마크 변경 없음 - 백업 건너뜀")
+            result.success = True
+            result.skipped = True
+            result.message = "변경 없음"
+            return result
+
+        # 스냅샷 전에 원본 상태를 기록해 두어야 그 사이의 변경을 다음 백업에서 놓치지 않는다
+        src_stat = os.stat(src_path)
+        src_wal = wal_signature(src_path)
+        # 스냅샷/내보내기 결과는 원본과 내용이 다르므로 수정 시각만 바뀐 경우의 비교용으로 원본 해시를 따로 기록
+        src_sha256 = file_sha256(src_path) if is_places else None
+
+        # SQLite(places.sqlite)는 실행 중에도 일관되도록 온라인 백업 API로 먼저 스냅샷
+        # 북마크만 백업하는 경우에는 moz_bookmarks/moz_places에서 북마크 트리만 내보낸다
+        data_path = src_path
+        metadata = {"browser": browser_name, "profile": result.profile}
+        if is_places and firefox_mode == MODE_BOOKMARKS:
+            snapshot_path, stats = _export_firefox_bookmarks(src_path, backup_dir, label)
+            data_path = snapshot_path
+            result.details["export"] = stats
+            metadata["content"] = MODE_BOOKMARKS
+        elif is_places:
+            snapshot_path, stats = _snapshot_sqlite(src_path, backup_dir, label, pages_per_step, step_sleep)
+            data_path = snapshot_path
+            result.details["snapshot"] = stats
+            metadata["content"] = MODE_DATABASE
+
+        if backup_format == "copy":
+            dst_path = os.path.join(backup_dir, backup_filename)
+            if snapshot_path:
+                sha256 = file_sha256(snapshot_path)
+                replace_file(snapshot_path, dst_path)
+                snapshot_path = None
+            else:
+                sha256 = copy_with_hash(src_path, dst_path)
+            change_index.record(backup_filename, src_path, backup_format, backup_filename, sha256,
+                                st=src_stat, wal=src_wal, variant=variant, source_sha256=src_sha256)
+            catalog_entry = _copy_entry(browser_name, backup_filename, dst_path, sha256,
+                                        datetime.now().isoformat(timespec='seconds'))
+            log_message(f"[성공] {label} 백업 완료: {dst_path}")
+            result.path = dst_path
+            result.details.update({"sha256": sha256, "size": os.path.getsize(dst_path)})
+        elif backup_format == "archive":
+            from backup_archive import BackupArchive, DEFAULT_CODEC
+            archive = BackupArchive(os.path.join(backup_dir, ARCHIVE_DIRNAME))
+            manifest = archive.put_file(data_path, backup_filename, archive_codec or DEFAULT_CODEC, archive_level,
+                                        metadata)
+            change_index.record(backup_filename, src_path, backup_format, backup_filename,
+                                manifest['sha256'], manifest['snapshot_id'], src_stat, src_wal, variant,
+                                src_sha256)
+            catalog_entry = _catalog_entry(browser_name, backup_filename, backup_format, manifest, archive)
+            ratio = manifest['size'] / manifest['compressed_size'] if manifest['compressed_size'] else 0
+            speed = manifest['size'] / manifest['elapsed'] / 1024 / 1024 if manifest['elapsed'] else 0
+            log_message(f"[성공] {label} 백업 완료: 아카이브 {manifest['archive']} "
+                        f"({manifest['codec']} 레벨 {manifest['level']}, {manifest['size']:,} -> "
+                        f"{manifest['compressed_size']:,} bytes, {ratio:.1f}배, {speed:.1f} MB/초)")
+            result.path = archive.archive_path(manifest)
+            result.snapshot_id = manifest['snapshot_id']
+            result.details.update({
+                "sha256": manifest['sha256'],
+                "size": manifest['size'],
+                "codec": manifest['codec'],
+                "level": manifest['level'],
+                "compressed_size": manifest['compressed_size'],
+            })
+        elif backup_format == "incremental":
+            from incremental_backup import IncrementalStore
+            incremental = IncrementalStore(os.path.join(backup_dir, INCREMENTAL_DIRNAME))
+            manifest = incremental.put_file(src_path, backup_filename, metadata)
+            change_index.record(backup_filename, src_path, backup_format, backup_filename,
+                                file_sha256(src_path), manifest['snapshot_id'], src_stat, src_wal, variant)
+            catalog_entry = _catalog_entry(browser_name, backup_filename, backup_format, manifest, incremental)
+            kind = "체크포인트" if manifest['kind'] == "full" else "패치"
+            log_message(f"[성공] {label} 백업 완료: 증분 스냅샷 {manifest['snapshot_id']} ({kind}, "
+                        f"변경 노드 {manifest['changes']['set']:,}개, 삭제 {manifest['changes']['delete']:,}개, "
+                        f"{manifest['data_size']:,} bytes 기록)")
+            if manifest['compacted'] and manifest['compacted']['converted']:
+                compacted = manifest['compacted']
+                log_message(f"[정보] 오래된 체크포인트 {compacted['converted']}개를 패치로 압축 "
+                            f"({compacted['bytes_before']:,} -> {compacted['bytes_after']:,} bytes)")
+            result.path = incremental.root
+            result.snapshot_id = manifest['snapshot_id']
+            result.details.update({
+                "sha256": manifest['sha256'],
+                "size": manifest['size'],
+                "kind": manifest['kind'],
+                "changes": manifest['changes'],
+                "new_bytes": manifest['new_bytes'],
+            })
+        else:
+            store = BackupStore(os.path.join(backup_dir, STORE_DIRNAME))
+            manifest = store.put_file(data_path, backup_filename, metadata)
+            change_index.record(backup_filename, src_path, backup_format, backup_filename,
+                                manifest['sha256'], manifest['snapshot_id'], src_stat, src_wal, variant,
+                                src_sha256)
+            catalog_entry = _catalog_entry(browser_name, backup_filename, "store", manifest, store)
+            log_message(f"[성공] {label} 백업 완료: 스냅샷 {manifest['snapshot_id']} "
+                        f"(신규 청크 {manifest['new_chunks']}/{len(manifest['chunks'])}개, "
+                        f"{manifest['new_bytes']:,}/{manifest['size']:,} bytes 기록)")
+            result.path = store.root
+            result.snapshot_id = manifest['snapshot_id']
+            result.details.update({
+                "sha256": manifest['sha256'],
+                "size": manifest['size'],
+                "chunks": len(manifest['chunks']),
+                "new_chunks": manifest['new_chunks'],
+                "new_bytes": manifest['new_bytes'],
+            })
+        _record_catalog(backup_dir, catalog_entry)
+        result.success = True
+        result.message = "백업 완료"
+        return result
+    except Exception as e:
+        log_message(f"[오류] {label} 백업 실패: {e}")
+        return _fail(result, reporter, "error", f"{label} 백업 중 오류 발생: {e}")
+    finally:
+        if snapshot_path and os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+def _merge_restore(source, manifest, base_source, base_manifest, src_path, dst_path, prefer, result,
+                   reporter):
+    """백업을 현재 북마크와 병합하여 dst_path에 기록 (base_manifest: 공통 조상 스냅샷)"""
+    # bookmark_merge는 bookmark_diff를 통해 이 모듈을 import하므로 여기서 불러온다
+    from bookmark_merge import merge_bookmark_files, apply_merge
+
+    staged = []
+    try:
+        backup_path = f"{dst_path}.{os.getpid()}.staging"
+        staged.append(backup_path)
+        if manifest is not None:
+            source.restore_file(manifest, backup_path)
+        else:
+            shutil.copyfile(src_path, backup_path)
+
+        base_path = None
+        if base_manifest is not None:
+            base_path = f"{dst_path}.{os.getpid()}.base"
+            staged.append(base_path)
+            base_source.restore_file(base_manifest, base_path)
+
+        merged = merge_bookmark_files(dst_path, backup_path, base_path, prefer)
+        apply_merge(merged, dst_path)
+    finally:
+        for path in staged:
+            if os.path.exists(path):
+                os.remove(path)
+
+    stats = merged.stats
+    log_message(f"[정보] 병합 완료 ({'3-way' if merged.three_way else '합집합'}): 노드 {stats['nodes']:,}개, "
+                f"백업에서 되살림 {stats['only_backup']:,}개, 현재만 {stats['only_current']:,}개, "
+                f"제외 {stats['dropped']:,}개, 충돌 {len(merged.conflicts):,}개, {merged.elapsed:.2f}초")
+    result.details["merge"] = merged.to_dict()
+    if merged.conflicts:
+        side = "백업" if prefer == "backup" else "현재 북마크"
+        _notify(reporter, "warning", f"병합 중 충돌 {len(merged.conflicts):,}개가 있어 {side} 쪽 값을 사용했습니다.")
+
+
+@_measured("restore")
+def perform_restore(browser_name, restore_dir, snapshot_id=None, restart_browser=True, reporter=None,
+                    profile=None, mode=RESTORE_OVERWRITE, base_snapshot=None, prefer="backup"):
+    """지정된 브라우저의 북마크 파일을 백업 디렉토리에서 복구합니다.
+
+    저장소에 스냅샷이 있으면 snapshot_id(없으면 최신) 스냅샷을 재구성하고,
+    없으면 기존 단일 파일 백업({BACKUP_FILENAME_MAP})을 사용합니다.
+    profile: 복구할 BrowserProfile (없으면 BROWSER_PATHS의 기본 프로필)
+    mode: "overwrite" (파일 교체) 또는 "merge" (백업 이후 추가된 북마크를 남기는 병합)
+    base_snapshot: 병합의 공통 조상 스냅샷 ID (없으면 합집합 병합)
+    prefer: 병합 충돌 시 따를 쪽 ("backup" 또는 "current")
+    """
+    from process_utils import get_inspector, wait_for_unlock, DEFAULT_EXIT_TIMEOUT, DEFAULT_UNLOCK_TIMEOUT
+    from firefox_places import snapshot_places, is_sqlite_source, is_places_database
+    result = OperationResult("restore", browser_name, profile.profile if profile else None)
+    dst_path, backup_filename, label = _resolve_target(browser_name, profile)
+    src_path = os.path.join(restore_dir, backup_filename)
+    browser_exe = BROWSER_EXE_MAP.get(browser_name)
+
+    # 저장소 스냅샷과 압축 아카이브 중 snapshot_id(없으면 최신)
+    store, manifest = _find_snapshot(restore_dir, backup_filename, snapshot_id)
+
+    if manifest is None and (snapshot_id or not os.path.exists(src_path)):
+        log_message(f"[오류] {label} 복구 파일이 백업 폴더에 없습니다.")
+        return _fail(result, reporter, "error",
+                     f"복구 파일이 백업 폴더에 없습니다.\n필요한 파일: {backup_filename}")
+
+    base_store, base_manifest = None, None
+    if mode == RESTORE_MERGE and base_snapshot:
+        base_store, base_manifest = _find_snapshot(restore_dir, backup_filename, base_snapshot)
+        if base_manifest is None:
+            log_message(f"[오류] {label} 병합 기준 스냅샷이 없습니다: {base_snapshot}")
+            return _fail(result, reporter, "error", f"병합 기준 스냅샷을 찾을 수 없습니다: {base_snapshot}")
+
+    if not dst_path or not os.path.exists(os.path.dirname(dst_path)):
+        log_message(f"[오류] {label} 복구 대상 경로를 찾을 수 없습니다.")
+        return _fail(result, reporter, "error",
+                     f"{label} 복구 대상 경로를 찾을 수 없습니다.\n브라우저를 한 번 실행해 보세요.")
+
+
+    # 복구 전 프로세스 종료 로직
+    # 실행 중일 때만 종료하고, 고정 시간 대신 프로세스가 끝나고 파일 잠금이 풀릴 때까지만 기다린다
+    try:
+        if browser_exe:
+            inspector = get_inspector()
+            with span("browser_kill", browser=browser_name) as kill_span:
+                pids = inspector.find(browser_exe)
+                if pids:
+                    log_message(f"[정보] {browser_name} 프로세스 ({browser_exe}, {len(pids)}개) 종료 시도...")
+                    inspector.terminate(pids)
+                else:
+                    kill_span.status = STATUS_NOT_RUNNING
+            if not pids:
+                log_message(f"[정보] {browser_name} 프로세스가 실행 중이 아닙니다.")
+            else:
+                with span("browser_kill_wait", browser=browser_name) as wait_span:
+                    remaining = inspector.wait_for_exit(pids, DEFAULT_EXIT_TIMEOUT)
+                    unlocked = wait_for_unlock(dst_path, DEFAULT_UNLOCK_TIMEOUT)
+                    if remaining or not unlocked:
+                        wait_span.status = STATUS_ERROR
+                if remaining:
+                    log_message(f"[오류] {browser_name} 프로세스 {len(remaining)}개가 "
+                                f"{DEFAULT_EXIT_TIMEOUT:g}초 안에 종료되지 않았습니다.")
+                    _notify(reporter, "warning", "브라우저 프로세스 종료에 실패했습니다. 수동으로 종료해 주세요.")
+                elif not unlocked:
+                    log_message(f"[오류] {label} 북마크 파일이 아직 사용 중입니다.")
+                else:
+                    log_message(f"[정보] {browser_name} 프로세스 종료 완료 ({wait_span.duration:.2f}초).")
+    except Exception as e:
+        log_message(f"[오류] 프로세스 종료 중 예외 발생: {e}")
+        _notify(reporter, "warning", "브라우저 프로세스 종료에 실패했습니다. 수동으로 종료해 주세요.")
+
+
+    # 복구 실행
+    is_places = is_sqlite_source(dst_path)
+    staging_path = None
+    try:
+        if manifest is not None:
+            log_message(f"[정보] 스냅샷 {manifest['snapshot_id']}에서 복구")
+            result.snapshot_id = manifest['snapshot_id']
+
+        if mode == RESTORE_MERGE and not os.path.exists(dst_path):
+            log_message(f"[정보] {label} 현재 북마크 파일이 없어 병합 대신 백업으로 교체합니다.")
+            mode = RESTORE_OVERWRITE
+        result.details["mode"] = mode
+
+        # 교체할 내용은 대상과 같은 폴더에 먼저 꺼내 둔다 (도중에 실패해도 기존 파일은 그대로)
+        if mode == RESTORE_OVERWRITE:
+            staging_path = f"{dst_path}.{os.getpid()}.staging"
+            if manifest is not None:
+                store.restore_file(manifest, staging_path)
+            else:
+                shutil.copy2(src_path, staging_path)
+
+        # 기존 파일 보관: 파일을 통째로 교체하면 복사하지 않고 하드 링크/이름 변경으로 .bak을 만든다.
+        # places.sqlite를 그 자리에서 고치는 경우(병합, 북마크 가져오기)나 -wal에 변경이 남아 있으면
+        # -wal까지 포함되도록 온라인 백업으로 복사한다.
+        backup_old_path = swap_backup_path = None
+        if os.path.exists(dst_path):
+            backup_old_path = _new_restore_backup_path(dst_path)
+            replaces_file = staging_path is not None and (not is_places or is_places_database(staging_path))
+            if is_places and (not replaces_file or _has_pending_wal(dst_path)):
+                snapshot_places(dst_path, backup_old_path)
+            elif replaces_file:
+                swap_backup_path = backup_old_path
+            else:
+                # Chromium 병합 결과는 임시 파일 후 교체로 기록되므로 하드 링크로 충분
+                link_or_copy(dst_path, backup_old_path)
+            result.details["previous_backup"] = backup_old_path
+
+        if mode == RESTORE_MERGE:
+            _merge_restore(store, manifest, base_store, base_manifest, src_path, dst_path, prefer,
+                           result, reporter)
+        elif is_places:
+            # places.sqlite는 백업 내용(DB 스냅샷/북마크 내보내기)에 따라 복구 방법이 다르다
+            _restore_places(staging_path, dst_path, result, swap_backup_path)
+        else:
+            replace_file(staging_path, dst_path, swap_backup_path)
+        if backup_old_path:
+            log_message(f"[정보] 기존 북마크 백업: {backup_old_path}")
+        log_message(f"[성공] {label} 복구 완료: {dst_path}")
+        result.details["size"] = os.path.getsize(dst_path)
+        result.success = True
+        result.path = dst_path
+        result.message = "복구 완료"
+
+    except Exception as e:
+        log_message(f"[오류] {label} 복구 실패: {e}")
+        return _fail(result, reporter, "error", f"{label} 복구 중 오류 발생: {e}")
+    finally:
+        if staging_path and os.path.exists(staging_path):
+            os.remove(staging_path)
+
+    # 복구 후 프로세스 재실행 로직
+    if restart_browser and browser_exe:
+        try:
+            log_message(f"[정보] {browser_name} 재실행 시도...")
+            import subprocess
+            subprocess.Popen(['start', browser_exe], shell=True)
+            log_message(f"[성공] {browser_name} 재실행 완료.")
+        except Exception as e:
+            log_message(f"[오류] 브라우저 재실행 실패: {e}")
+            _notify(reporter, "warning", "브라우저 재실행에 실패했습니다. 수동으로 시작해 주세요.")
+
+    return result
+
+
+# 백업 목록 / 검증
+def extract_backup(browser_name, backup_dir, dst_path, snapshot_id=None, profile=None):
+    """백업(저장소 스냅샷 또는 단일 파일)을 dst_path에 꺼내기
+
+    snapshot_id가 없으면 최신 스냅샷을, 스냅샷이 없으면 단일 파일 백업을 사용한다.
+    반환: 사용한 스냅샷 ID (단일 파일 백업이면 None)
+    """
+    _path, backup_filename, label = _resolve_target(browser_name, profile)
+    store, manifest = _find_snapshot(backup_dir, backup_filename, snapshot_id)
+    if manifest is not None:
+        store.restore_file(manifest, dst_path)
+        return manifest['snapshot_id']
+
+    legacy_path = os.path.join(backup_dir, backup_filename)
+    if snapshot_id or not os.path.isfile(legacy_path):
+        raise FileNotFoundError(f"{label} 백업을 찾을 수 없습니다: {snapshot_id or backup_filename}")
+    shutil.copyfile(legacy_path, dst_path)
+    return None
+
+
+def list_backups(backup_dir, browser_name, before=None, after=None):
+    """백업 폴더에 있는 브라우저별 백업 목록 (모든 프로필, 오래된 순)
+
+    before/after: ISO 8601 시각 문자열로 기간 제한 (before는 미만, after는 이상)
+    카탈로그로 조회하고, 카탈로그를 쓸 수 없으면(읽기 전용 폴더 등) 폴더를 직접 읽는다.
+    """
+    import sqlite3
+    if not os.path.isdir(backup_dir):
+        return []
+    try:
+        return _open_catalog(backup_dir).query(browser=browser_name, before=before, after=after)
+    except (sqlite3.Error, OSError) as e:
+        log_message(f"[오류] 백업 카탈로그를 읽을 수 없어 폴더를 직접 확인합니다: {e}")
+    return [e for e in _scan_backups(backup_dir, browser_name)
+            if (before is None or e["created"] < before) and (after is None or e["created"] >= after)]
+
+
+def find_backup(backup_dir, browser_name, before=None, profile=None):
+    """before 시각 이전의 가장 최근 스냅샷 카탈로그 항목 (없으면 None)
+
+    profile: BrowserProfile (없으면 기본 프로필)
+    """
+    _path, backup_filename, _label = _resolve_target(browser_name, profile)
+    if not os.path.isdir(backup_dir):
+        return None
+    return _open_catalog(backup_dir).latest(backup_filename, before=before, formats=SNAPSHOT_FORMATS)
+
+
+def compact_backups(backup_dir, browser_name):
+    """증분 백업의 오래된 체크포인트를 패치로 압축. 백업 이름별 결과 dict 목록 반환"""
+    from incremental_backup import IncrementalStore
+    incremental = IncrementalStore(os.path.join(backup_dir, INCREMENTAL_DIRNAME))
+    names = set(_backup_names(backup_dir, BackupStore(os.path.join(backup_dir, STORE_DIRNAME)), browser_name))
+    results = []
+    for backup_name in incremental.list_names():
+        if backup_name not in names:
+            continue
+        stats = incremental.compact(backup_name)
+        if stats['converted']:
+            # 체크포인트가 패치로 바뀌었으므로 카탈로그의 kind/data_size 갱신
+            for snapshot_id in incremental.list_snapshots(backup_name):
+                manifest = incremental.load_manifest(backup_name, snapshot_id)
+                if manifest is not None:
+                    _record_catalog(backup_dir, _catalog_entry(browser_name, backup_name, "incremental",
+                                                               manifest, incremental))
+        log_message(f"[정보] {backup_name} 증분 백업 압축: 체크포인트 {stats['converted']}개, "
+                    f"{stats['bytes_before']:,} -> {stats['bytes_after']:,} bytes")
+        results.append(dict(stats, browser=browser_name, profile=_profile_of(browser_name, backup_name)))
+    return results
+
+
+# 보관 정책
+# 복구 전에 perform_restore가 남기는 기존 북마크 파일: {북마크 파일}.{YYYYmmddHHMMSSffffff}[_n].bak
+# (이전 버전은 초 단위 {YYYYmmddHHMMSS}.bak)
+RESTORE_BACKUP_TIME_FORMAT = "%Y%m%d%H%M%S%f"
+_RESTORE_BACKUP_RE = r"\.(\d{14})(\d{6})?(?:_\d+)?\.bak$"
+
+
+def _new_restore_backup_path(dst_path):
+    """기존 .bak을 덮어쓰지 않는 복구 전 보관 파일 이름 (같은 시각이면 _1, _2 ...를 붙임)"""
+    timestamp = datetime.now().strftime(RESTORE_BACKUP_TIME_FORMAT)
+    candidate = f"{dst_path}.{timestamp}.bak"
+    suffix = 1
+    while os.path.exists(candidate):
+        candidate = f"{dst_path}.{timestamp}_{suffix}.bak"
+        suffix += 1
+    return candidate
+
+
+def _restore_backup_files(browser_name):
+    """브라우저 프로필 폴더에 남아 있는 복구 전 .bak 파일 항목 목록 (모든 프로필)"""
+    targets = {os.path.normcase(p.path): (p.path, p.profile) for p in discover_profiles(browsers=[browser_name])}
+    default_path = BROWSER_PATHS.get(browser_name)
+    if default_path and os.path.normcase(default_path) not in targets:
+        targets[os.path.normcase(default_path)] = (default_path, None)
+
+    entries = []
+    for path, profile in targets.values():
+        folder, base = os.path.split(path)
+        if not os.path.isdir(folder):
+            continue
+        pattern = re.compile(re.escape(base) + _RESTORE_BACKUP_RE)
+        for entry in os.scandir(folder):
+            match = pattern.match(entry.name)
+            if not match or not entry.is_file():
+                continue
+            created = datetime.strptime(match.group(1) + (match.group(2) or "000000"), RESTORE_BACKUP_TIME_FORMAT)
+            entries.append({
+                "browser": browser_name,
+                "profile": profile,
+                "backup_name": path,
+                "format": "bak",
+                "snapshot_id": None,
+                "created": created.isoformat(timespec='seconds'),
+                "size": entry.stat().st_size,
+                "location": entry.path,
+            })
+    return entries
+
+
+def _stored_bytes(store, manifests, entry, seen):
+    """항목이 백업 폴더에서 차지하는 용량
+
+    저장소 스냅샷은 seen에 없는 청크만 더하고 seen에 추가한다 (청크를 공유하는 스냅샷끼리 중복 계산하지 않음).
+    """
+    if entry["format"] == "archive":
+        return entry.get("compressed_size") or 0
+    if entry["format"] == "incremental":
+        return entry.get("data_size") or 0
+    if entry["format"] != "store":
+        return entry.get("size") or 0
+    key = (entry["backup_name"], entry["snapshot_id"])
+    if key not in manifests:
+        manifests[key] = store.load_manifest(*key)
+    if manifests[key] is None:
+        return 0
+    size = 0
+    for digest, length in manifests[key]["chunks"]:
+        if digest not in seen:
+            seen.add(digest)
+            size += length
+    return size
+
+
+def prune_backups(backup_dir, policy, browsers=None, dry_run=False, restore_backups=True):
+    """보관 정책(retention.RetentionPolicy)에 맞지 않는 스냅샷과 복구 전 .bak 파일 삭제
+
+    백업 이름(프로필)마다, .bak 파일은 원본 파일마다 정책을 따로 적용한다.
+    삭제는 형식별로 모아 한 번에 처리하고, 저장소 청크 정리(gc)는 마지막에 한 번만 한다.
+    dry_run: 지우지 않고 삭제 대상만 보고
+    restore_backups: 브라우저 프로필 폴더의 .bak 파일도 정리
+    반환: 보고서 dict (dry_run, policy, kept, deleted, freed_bytes)
+    """
+    import sqlite3
+    from retention import select as select_retained
+    report = {"dry_run": dry_run, "policy": policy.to_dict(), "kept": 0, "deleted": [], "freed_bytes": 0}
+    if policy.is_empty:
+        log_message("[정보] 보관 정책이 설정되지 않아 삭제할 백업이 없습니다.")
+        return report
+
+    sources = dict(_snapshot_sources(backup_dir))
+    store = sources["store"]
+    groups = {}
+    for browser_name in browsers or list(BACKUP_FILENAME_MAP):
+        if os.path.isdir(backup_dir):
+            for entry in list_backups(backup_dir, browser_name):
+                if entry["format"] in SNAPSHOT_FORMATS:
+                    groups.setdefault(entry["backup_name"], []).append(entry)
+        if restore_backups:
+            for entry in _restore_backup_files(browser_name):
+                groups.setdefault(entry["backup_name"], []).append(entry)
+
+    manifests = {}
+    store_estimate = 0
+    for entries in groups.values():
+        seen = set()
+        keep, remove = select_retained(entries, policy,
+                                       lambda entry: _stored_bytes(store, manifests, entry, seen))
+        report["kept"] += len(keep)
+        # 삭제로 확보되는 용량: 남는 스냅샷이 쓰지 않는 청크만
+        kept_chunks = set()
+        for entry, _reasons in keep:
+            _stored_bytes(store, manifests, entry, kept_chunks)
+        for entry in remove:
+            entry = dict(entry, bytes=_stored_bytes(store, manifests, entry, kept_chunks))
+            report["deleted"].append(entry)
+            if entry["format"] == "store":
+                store_estimate += entry["bytes"]
+            else:
+                report["freed_bytes"] += entry["bytes"]
+
+    if dry_run:
+        report["freed_bytes"] += store_estimate
+        log_message(f"[정보] 보관 정책 미리보기 ({policy.describe()}): 삭제 대상 {len(report['deleted']):,}개, "
+                    f"유지 {report['kept']:,}개, 약 {report['freed_bytes']:,} bytes 확보 예정")
+        return report
+
+    plan = {}
+    for entry in report["deleted"]:
+        if entry["format"] == "bak":
+            os.remove(entry["location"])
+            log_message(f"[정보] 복구 전 백업 파일 삭제: {entry['location']}")
+        else:
+            plan.setdefault((entry["format"], entry["backup_name"]), []).append(entry["snapshot_id"])
+
+    rebased = []
+    for (backup_format, backup_name), snapshot_ids in sorted(plan.items()):
+        stats = sources[backup_format].delete_snapshots(backup_name, snapshot_ids)
+        if backup_format == "incremental" and stats["rebased"]:
+            rebased.append(backup_name)
+        log_message(f"[정보] {backup_name} {backup_format} 스냅샷 {len(snapshot_ids):,}개 삭제")
+
+    if any(backup_format == "store" for backup_format, _name in plan):
+        gc_stats = store.gc()
+        report["freed_bytes"] += gc_stats["bytes"]
+        log_message(f"[정보] 저장소 청크 정리: {gc_stats['objects']:,}개, {gc_stats['bytes']:,} bytes")
+
+    try:
+        catalog = _open_catalog(backup_dir) if plan else None
+        if catalog is not None:
+            catalog.remove([(e["backup_name"], e["format"], e["snapshot_id"])
+                            for e in report["deleted"] if e["format"] != "bak"])
+            # 다시 쓴 증분 스냅샷은 kind/data_size가 바뀌었으므로 갱신
+            incremental = sources["incremental"]
+            browser_of = {e["backup_name"]: e["browser"] for e in report["deleted"]}
+            for backup_name in rebased:
+                for snapshot_id in incremental.list_snapshots(backup_name):
+                    manifest = incremental.load_manifest(backup_name, snapshot_id)
+                    if manifest is not None:
+                        catalog.add(_catalog_entry(browser_of[backup_name], backup_name, "incremental",
+                                                   manifest, incremental))
+    except (sqlite3.Error, OSError) as e:
+        log_message(f"[오류] 백업 카탈로그 갱신 실패 (list --rebuild로 다시 만들 수 있습니다): {e}")
+
+    log_message(f"[성공] 보관 정책 적용 ({policy.describe()}): {len(report['deleted']):,}개 삭제, "
+                f"유지 {report['kept']:,}개, {report['freed_bytes']:,} bytes 확보")
+    return report
+
+
+def verify_backups(backup_dir, browser_name, snapshot_id=None):
+    """백업 무결성 검증. 항목별 결과 dict 목록 반환"""
+    sources = _snapshot_sources(backup_dir)
+    store = sources[0][1]
+    change_index = ChangeIndex(backup_dir)
+    results = []
+
+    for backup_name in _backup_names(backup_dir, store, browser_name):
+        profile = _profile_of(browser_name, backup_name)
+        for backup_format, source in sources:
+            snapshot_ids = source.list_snapshots(backup_name)
+            if snapshot_id:
+                snapshot_ids = [sid for sid in snapshot_ids if sid == snapshot_id]
+            for sid in snapshot_ids:
+                manifest = source.load_manifest(backup_name, sid)
+                ok = manifest is not None and source.verify(manifest)
+                results.append({"browser": browser_name, "profile": profile, "format": backup_format,
+                                "snapshot_id": sid, "ok": ok})
+
+        # 단일 파일 백업은 변경 감지 인덱스에 기록된 해시와 비교
+        legacy_path = os.path.join(backup_dir, backup_name)
+        if not snapshot_id and os.path.isfile(legacy_path):
+            entry = change_index.get(backup_name, "copy")
+            if entry and entry.get("sha256"):
+                ok = file_sha256(legacy_path) == entry["sha256"]
+            else:
+                ok = None
+            results.append({"browser": browser_name, "profile": profile, "format": "copy",
+                            "snapshot_id": None, "ok": ok})
+    return results
@@ -0,0 +1,273 @@
+import os
+import sys
+import zlib
+import struct
+import hashlib
+import argparse
+import itertools
+from file_utils import atomic_write
+
+# 실행 파일 차분 업데이트 (rsync 방식 블록 해시)
+#
+#   make_delta(old_exe, new_exe, delta_path)     # 릴리스 빌드에서 이전 버전 -> 새 버전 차분 생성
+#   apply_delta(old_exe, delta_path, new_path)   # 앱에서 현재 실행 파일에 적용 (SHA-256 확인)
+#
+# 이전 파일을 block_size 단위로 나눠 (약한 체크섬, MD5)로 색인하고, 새 파일을 1바이트씩 밀며
+# 롤링 체크섬이 같은 블록을 찾아 "이전 파일의 offset부터 length바이트 복사"로 바꾼다.
+# 일치하지 않는 부분은 그대로 넣고, 명령 목록 전체를 zlib으로 압축한다.
+#
+# 파일 형식
+#   MAGIC, block_size(I), 이전 크기(Q), 이전 SHA-256(32), 새 크기(Q), 새 SHA-256(32)
+#   zlib(명령...): b"C" + offset(Q) + length(I)  /  b"D" + length(I) + 데이터  /  b"E"
+#
+# 적용할 파일의 SHA-256이 헤더와 다르면(다른 버전에서 실행 중) DeltaMismatch를 발생시키므로
+# 호출하는 쪽은 전체 파일(ZIP) 다운로드로 돌아가면 된다.
+# updater.exe/빌드 스크립트에서도 쓰므로 file_utils 외의 다른 프로젝트 모듈을 import하지 않는다.
+
+MAGIC = b"BBDELTA1"
+DELTA_SUFFIX = ".delta"
+DEFAULT_BLOCK_SIZE = 4096
+
+_HEADER = struct.Struct(">IQ32sQ32s")
+_COPY = struct.Struct(">QI")
+_LENGTH = struct.Struct(">I")
+_OP_COPY = b"C"
+_OP_DATA = b"D"
+_OP_END = b"E"
+
+_READ_CHUNK = 1024 * 1024
+_MASK = 0xFFFF
+
+
+class DeltaError(Exception):
+    """차분 파일이 잘못됨"""
+
+
+class DeltaMismatch(DeltaError):
+    """적용하려는 파일 또는 결과가 차분 헤더의 SHA-256과 다름"""
+
+
+def delta_asset_name(from_version, prefix="BrowserBookmarks"):
+    """from_version에서 최신 버전으로 가는 차분 파일 이름 (릴리스 asset 이름)"""
+    return f"{prefix}_from_{from_version}{DELTA_SUFFIX}"
+
+
+def _sha256_file(path):
+    hasher = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(_READ_CHUNK), b""):
+            hasher.update(chunk)
+    return hasher.digest()
+
+
+def _weak(block):
+    """rsync 약한 체크섬 (a, b). b = sum((L - i) * x_i) = 누적합의 합"""
+    return sum(block) & _MASK, sum(itertools.accumulate(block)) & _MASK
+
+
+def _index_blocks(data, block_size):
+    """약한 체크섬 -> {MD5: offset} (같은 블록은 처음 나온 것만)"""
+    index = {}
+    for offset in range(0, len(data) - block_size + 1, block_size):
+        block = data[offset:offset + block_size]
+        a, b = _weak(block)
+        index.setdefault(a | b << 16, {}).setdefault(hashlib.md5(block).digest(), offset)
+    return index
+
+
+# 생성
+class _OpWriter:
+    """명령을 zlib으로 압축해 쓰기 (연속된 복사는 하나로 합침)"""
+
+    def __init__(self, f):
+        self.f = f
+        self.compressor = zlib.compressobj(9)
+        self.copy = None  # (offset, length) 아직 쓰지 않은 복사
+        self.copied = 0
+        self.literal = 0
+
+    def _write(self, data):
+        self.f.write(self.compressor.compress(data))
+
+    def _flush_copy(self):
+        if self.copy:
+            self._write(_OP_COPY + _COPY.pack(*self.copy))
+            self.copy = None
+
+    def add_copy(self, offset, length):
+        self.copied += length
+        if self.copy and self.copy[0] + self.copy[1] == offset and self.copy[1] + length <= 0xFFFFFFFF:
+            self.copy = (self.copy[0], self.copy[1] + length)
+        else:
+            self._flush_copy()
+            self.copy = (offset, length)
+
+    def add_data(self, data):
+        if not data:
+            return
+        self._flush_copy()
+        self.literal += len(data)
+        self._write(_OP_DATA + _LENGTH.pack(len(data)) + data)
+
+    def close(self):
+        self._flush_copy()
+        self._write(_OP_END)
+        self.f.write(self.compressor.flush())
+
+
+def make_delta(old_path, new_path, delta_path, block_size=DEFAULT_BLOCK_SIZE):
+    """old_path -> new_path 차분을 delta_path에 쓰기. {"copied", "literal", "size"} 반환"""
+    with open(old_path, "rb") as f:
+        old = f.read()
+    with open(new_path, "rb") as f:
+        new = f.read()
+
+    index = _index_blocks(old, block_size)
+    with atomic_write(delta_path) as f:
+        f.write(MAGIC + _HEADER.pack(block_size, len(old), hashlib.sha256(old).digest(),
+                                     len(new), hashlib.sha256(new).digest()))
+        ops = _OpWriter(f)
+        n = len(new)
+        i = literal_start = 0
+        if n >= block_size:
+            a, b = _weak(new[:block_size])
+        while i + block_size <= n:
+            candidates = index.get(a | b << 16)
+            if candidates is not None:
+                offset = candidates.get(hashlib.md5(new[i:i + block_size]).digest())
+                if offset is not None:
+                    ops.add_data(new[literal_start:i])
+                    ops.add_copy(offset, block_size)
+                    i += block_size
+                    literal_start = i
+                    if i + block_size <= n:
+                        a, b = _weak(new[i:i + block_size])
+                    continue
+            # 한 바이트 밀기
+            if i + block_size < n:
+                out_byte, in_byte = new[i], new[i + block_size]
+                a = (a - out_byte + in_byte) & _MASK
+                b = (b - block_size * out_byte + a) & _MASK
+            i += 1
+        ops.add_data(new[literal_start:])
+        ops.close()
+    return {"copied": ops.copied, "literal": ops.literal, "size": os.path.getsize(delta_path)}
+
+
+# 적용
+def read_header(delta_path):
+    """{"block_size", "old_size", "old_sha256", "new_size", "new_sha256"} (해시는 16진 문자열)"""
+    with open(delta_path, "rb") as f:
+        return _read_header(f)
+
+
+def _read_header(f):
+    raw = f.read(len(MAGIC) + _HEADER.size)
+    if len(raw) != len(MAGIC) + _HEADER.size or not raw.startswith(MAGIC):
+        raise DeltaError("차분 파일 형식이 아닙니다")
+    block_size, old_size, old_sha256, new_size, new_sha256 = _HEADER.unpack(raw[len(MAGIC):])
+    return {"block_size": block_size, "old_size": old_size, "old_sha256": old_sha256.hex(),
+            "new_size": new_size, "new_sha256": new_sha256.hex()}
+
+
+class _OpReader:
+    """zlib으로 압축된 명령을 필요한 만큼씩 풀어 읽기"""
+
+    def __init__(self, f):
+        self.f = f
+        self.decompressor = zlib.decompressobj()
+        self.buffer = bytearray()
+
+    def read(self, size):
+        while len(self.buffer) < size:
+            chunk = self.f.read(_READ_CHUNK)
+            if not chunk:
+                self.buffer += self.decompressor.flush()
+                if len(self.buffer) < size:
+                    raise DeltaError("차분 파일이 잘렸습니다")
+                break
+            try:
+                self.buffer += self.decompressor.decompress(chunk)
+            except zlib.error as e:
+                raise DeltaError(f"차분 파일이 손상되었습니다: {e}") from e
+        data = bytes(self.buffer[:size])
+        del self.buffer[:size]
+        return data
+
+
+def apply_delta(old_path, delta_path, new_path):
+    """old_path에 차분을 적용해 new_path 생성 (SHA-256 확인). 헤더 dict 반환
+
+    old_path가 차분을 만든 버전이 아니거나 결과가 헤더와 다르면 DeltaMismatch.
+    """
+    with open(delta_path, "rb") as delta:
+        header = _read_header(delta)
+        if os.path.getsize(old_path) != header["old_size"] or _sha256_file(old_path).hex() != header["old_sha256"]:
+            raise DeltaMismatch("현재 실행 파일이 차분을 만든 버전과 다릅니다")
+
+        ops = _OpReader(delta)
+        hasher = hashlib.sha256()
+        written = 0
+        with open(old_path, "rb") as old, atomic_write(new_path) as out:
+            while True:
+                op = ops.read(1)
+                if op == _OP_END:
+                    break
+                if op == _OP_COPY:
+                    offset, length = _COPY.unpack(ops.read(_COPY.size))
+                    if offset + length > header["old_size"]:
+                        raise DeltaError("복사 범위가 파일 밖입니다")
+                    old.seek(offset)
+                    while length:
+                        data = old.read(min(length, _READ_CHUNK))
+                        out.write(data)
+                        hasher.update(data)
+                        written += len(data)
+                        length -= len(data)
+                elif op == _OP_DATA:
+                    (length,) = _LENGTH.unpack(ops.read(_LENGTH.size))
+                    data = ops.read(length)
+                    out.write(data)
+                    hasher.update(data)
+                    written += length
+                else:
+                    raise DeltaError(f"알 수 없는 명령: {op!r}")
+            if written != header["new_size"] or hasher.hexdigest() != header["new_sha256"]:
+                raise DeltaMismatch("차분 적용 결과의 SHA-256이 다릅니다")
+    return header
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="delta_update", description="실행 파일 차분 생성/적용")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    make_parser = subparsers.add_parser("make", help="이전 파일 -> 새 파일 차분 생성")
+    make_parser.add_argument("old")
+    make_parser.add_argument("new")
+    make_parser.add_argument("delta")
+    make_parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE)
+    apply_parser = subparsers.add_parser("apply", help="차분 적용")
+    apply_parser.add_argument("old")
+    apply_parser.add_argument("delta")
+    apply_parser.add_argument("new")
+    info_parser = subparsers.add_parser("info", help="차분 헤더 보기")
+    info_parser.add_argument("delta")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "make":
+            stats = make_delta(args.old, args.new, args.delta, args.block_size)
+            print(f"{args.delta}: {stats['size']:,}바이트 (복사 {stats['copied']:,}, 새 데이터 {stats['literal']:,})")
+        elif args.command == "apply":
+            header = apply_delta(args.old, args.delta, args.new)
+            print(f"{args.new}: {header['new_size']:,}바이트, SHA-256 {header['new_sha256']}")
+        else:
+            for key, value in read_header(args.delta).items():
+                print(f"{key}: {value}")
+    except (OSError, DeltaError) as e:
+        print(f"[오류] {e}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+import os
+import shutil
+import threading
+from contextlib import contextmanager
+
+# 충돌(전원 차단, 강제 종료)에도 깨지지 않는 파일 쓰기/교체
+#
+#   with atomic_write(path, "w", encoding="utf-8") as f:   # 같은 폴더 임시 파일에 쓰고 fsync 후 교체
+#       f.write(text)
+#   replace_file(staged, path, backup_path)                # 준비된 파일로 교체, 기존 파일은 복사 없이 보관
+#   with file_lock(lock_path, exclusive=True):             # 프로세스 간 공유/배타 잠금
+#       ...
+#
+# 교체는 항상 같은 폴더 안의 os.replace(이름 변경)이므로 대상 파일은 이전 내용 또는 새 내용 중 하나로만 보인다.
+# 이름 변경 전에 새 파일을, 이름 변경 후에 폴더를 fsync해 디스크에 남도록 한다 (Windows는 폴더 fsync 불가).
+# updater.exe에서도 쓰므로 다른 프로젝트 모듈을 import하지 않는다.
+
+
+def fsync_file(path):
+    """파일 내용을 디스크에 기록 (Windows의 FlushFileBuffers는 쓰기 권한이 필요)"""
+    fd = os.open(path, os.O_RDWR | getattr(os, "O_BINARY", 0))
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def fsync_dir(path):
+    """path가 있는 폴더의 항목 변경(이름 변경/생성)을 디스크에 기록. 지원하지 않는 환경에서는 무시"""
+    if os.name == "nt":
+        return
+    try:
+        fd = os.open(os.path.dirname(os.path.abspath(path)), os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def atomic_write(path, mode="wb", encoding=None, newline=None):
+    """path를 새로 쓰는 파일 객체. with 블록이 끝나면 fsync 후 교체하고, 예외가 나면 기존 파일을 그대로 둔다"""
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp_path, mode, encoding=encoding, newline=newline) as f:
+            yield f
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        fsync_dir(path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def link_or_copy(src, dst):
+    """src를 dst에 하드 링크로 보관 (지원하지 않는 파일 시스템이면 복사)
+
+    src가 나중에 os.replace로 교체될 때만 써야 한다. 그 자리에서 고쳐 쓰면 dst도 같이 바뀐다.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def replace_file(src, dst, backup_path=None):
+    """같은 폴더의 src로 dst를 교체 (src는 사라짐)
+
+    backup_path가 있으면 기존 dst를 복사하지 않고 보관한다: 하드 링크를 만들고, 안 되면 이름을 바꿔 둔다.
+    (이름을 바꾸는 경우 교체에 실패하면 되돌린다)
+    """
+    fsync_file(src)
+    moved_aside = False
+    if backup_path and os.path.exists(dst):
+        if os.path.exists(backup_path):
+            os.remove(backup_path)
+        try:
+            os.link(dst, backup_path)
+        except OSError:
+            os.replace(dst, backup_path)
+            moved_aside = True
+    try:
+        os.replace(src, dst)
+    except OSError:
+        if moved_aside and not os.path.exists(dst):
+            os.replace(backup_path, dst)
+        raise
+    fsync_dir(dst)
+
+
+# 프로세스 간 잠금
+_LOCKFILE_EXCLUSIVE_LOCK = 0x2
+
+
+def _win_lock_api():
+    import ctypes
+    from ctypes import wintypes
+
+    class OVERLAPPED(ctypes.Structure):
+        _fields_ = [("Internal", ctypes.c_size_t), ("InternalHigh", ctypes.c_size_t),
+                    ("Offset", wintypes.DWORD), ("OffsetHigh", wintypes.DWORD), ("hEvent", wintypes.HANDLE)]
+
+    kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    kernel32.LockFileEx.argtypes = (wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+                                    wintypes.DWORD, ctypes.POINTER(OVERLAPPED))
+    kernel32.UnlockFileEx.argtypes = (wintypes.HANDLE, wintypes.DWORD, wintypes.DWORD, wintypes.DWORD,
+                                      ctypes.POINTER(OVERLAPPED))
+    return ctypes, kernel32, OVERLAPPED
+
+
+@contextmanager
+def file_lock(path, exclusive=False):
+    """path 잠금 파일로 프로세스/스레드 간 잠금 (공유 잠금끼리는 동시에, 배타 잠금은 혼자)
+
+    잠글 수 있을 때까지 기다린다. Windows는 LockFileEx, 그 밖에는 flock을 쓴다.
+    """
+    fd = os.open(path, os.O_RDWR | os.O_CREAT | getattr(os, "O_BINARY", 0))
+    try:
+        if os.name == "nt":
+            import msvcrt
+            ctypes, kernel32, OVERLAPPED = _win_lock_api()
+            handle = msvcrt.get_osfhandle(fd)
+            flags = _LOCKFILE_EXCLUSIVE_LOCK if exclusive else 0
+            if not kernel32.LockFileEx(handle, flags, 0, 1, 0, ctypes.byref(OVERLAPPED())):
+                raise ctypes.WinError(ctypes.get_last_error())
+            try:
+                yield
+            finally:
+                kernel32.UnlockFileEx(handle, 0, 1, 0, ctypes.byref(OVERLAPPED()))
+        else:
+            import fcntl
+            fcntl.flock(fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+    finally:
+        os.close(fd)
@@ -0,0 +1,417 @@
+import os
+import time
+import json
+import base64
+import shutil
+import sqlite3
+import tempfile
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from file_utils import atomic_write, fsync_file, fsync_dir
+
+# Firefox places.sqlite 스냅샷 및 북마크 내보내기/가져오기
+# Firefox는 places.sqlite를 WAL 모드로 사용하므로 파일만 복사하면 -wal에 남은
+# 최근 변경이 빠지거나 쓰는 도중의 페이지가 섞일 수 있다.
+# sqlite3 온라인 백업 API로 실행 중인 DB에서도 일관된 스냅샷을 만든다.
+
+WAL_SUFFIX = "-wal"
+DEFAULT_PAGES_PER_STEP = 256
+DEFAULT_STEP_SLEEP = 0.005  # 단계 사이 대기(초). 브라우저가 쓰기 잠금을 얻을 틈을 준다
+CONNECT_TIMEOUT = 1.0
+BUSY_TIMEOUT = 2.0  # 원본이 이 시간 이상 계속 잠겨 있으면 복사본 방식으로 전환
+SQLITE_BUSY = 5
+SQLITE_LOCKED = 6
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+# 백업 방식 (설정 firefox_backup_mode)
+MODE_DATABASE = "database"    # places.sqlite 전체 스냅샷 (방문 기록 포함)
+MODE_BOOKMARKS = "bookmarks"  # 북마크 트리만 JSON으로 내보내기
+BACKUP_MODES = (MODE_DATABASE, MODE_BOOKMARKS)
+
+
+def _readonly_uri(path):
+    # urllib.request는 import가 느리므로(http.client, email 등) 실제로 필요할 때 불러온다
+    from urllib.request import pathname2url
+    return f"file:{pathname2url(os.path.abspath(path))}?mode=ro"
+
+
+def _online_backup(src_path, dst_path, pages_per_step, step_sleep, progress, readonly=True):
+    """온라인 백업 API로 src_path를 dst_path에 복사. (페이지 수, 페이지 크기) 반환"""
+    pages = [0]
+    busy_since = [None]
+
+    def on_progress(status, remaining, total):
+        # backup()은 BUSY/LOCKED이면 끝없이 재시도하므로 일정 시간 이상 잠겨 있으면 중단한다
+        if status in (SQLITE_BUSY, SQLITE_LOCKED):
+            now = time.monotonic()
+            if busy_since[0] is None:
+                busy_since[0] = now
+            elif now - busy_since[0] > BUSY_TIMEOUT:
+                raise sqlite3.OperationalError("database is locked")
+            return
+        busy_since[0] = None
+        pages[0] = total
+        if progress:
+            progress(total - remaining, total)
+
+    if readonly:
+        src = sqlite3.connect(_readonly_uri(src_path), uri=True, timeout=CONNECT_TIMEOUT)
+    else:
+        src = sqlite3.connect(src_path, timeout=CONNECT_TIMEOUT)
+    try:
+        page_size = src.execute("PRAGMA page_size").fetchone()[0]
+        dst = sqlite3.connect(dst_path)
+        try:
+            src.backup(dst, pages=pages_per_step, progress=on_progress, sleep=step_sleep)
+            # 스냅샷은 -wal/-shm 없이 파일 하나로 완결되도록 롤백 저널 모드로 바꾼다
+            # (복구 후 Firefox가 다시 WAL 모드로 전환한다)
+            dst.execute("PRAGMA journal_mode=DELETE")
+        finally:
+            dst.close()
+    finally:
+        src.close()
+    return pages[0], page_size
+
+
+def _copy_with_wal(src_path, work_dir):
+    """잠긴 DB의 본 파일과 -wal을 함께 임시 폴더로 복사"""
+    copy_path = os.path.join(work_dir, os.path.basename(src_path))
+    shutil.copyfile(src_path, copy_path)
+    if os.path.exists(src_path + WAL_SUFFIX):
+        shutil.copyfile(src_path + WAL_SUFFIX, copy_path + WAL_SUFFIX)
+    return copy_path
+
+
+def snapshot_places(src_path, dst_path, pages_per_step=DEFAULT_PAGES_PER_STEP,
+                    step_sleep=DEFAULT_STEP_SLEEP, progress=None):
+    """실행 중인 Firefox의 places.sqlite를 dst_path에 일관된 스냅샷으로 저장
+
+    먼저 읽기 전용 연결로 온라인 백업을 시도하고, 브라우저가 DB를 배타적으로
+    잠근 경우에는 본 파일과 -wal을 임시 폴더에 복사한 뒤 그 복사본에서 백업한다
+    (-wal 내용이 스냅샷에 반영된다).
+
+    pages_per_step: 한 단계에 복사할 페이지 수 (-1이면 한 번에 전체)
+    step_sleep: 단계 사이 대기 시간(초)
+    progress: 진행 콜백 progress(복사한 페이지 수, 전체 페이지 수)
+    반환: 통계 dict (method, pages, bytes, elapsed, pages_per_sec, bytes_per_sec)
+    """
+    tmp_path = f"{dst_path}.{os.getpid()}.tmp"
+    start = time.perf_counter()
+    method = "online"
+    try:
+        try:
+            pages, page_size = _online_backup(src_path, tmp_path, pages_per_step, step_sleep, progress)
+        except sqlite3.OperationalError:
+            # database is locked / unable to open 등: 복사본에서 다시 시도
+            method = "copy"
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            work_dir = tempfile.mkdtemp(prefix="places_")
+            try:
+                copy_path = _copy_with_wal(src_path, work_dir)
+                pages, page_size = _online_backup(copy_path, tmp_path, pages_per_step, step_sleep,
+                                                  progress, readonly=False)
+            finally:
+                shutil.rmtree(work_dir, ignore_errors=True)
+        # 백업 API는 경로로 쓰므로 atomic_write 대신 직접 fsync 후 교체
+        fsync_file(tmp_path)
+        os.replace(tmp_path, dst_path)
+        fsync_dir(dst_path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+    elapsed = time.perf_counter() - start
+    size = pages * page_size
+    return {
+        "method": method,
+        "pages": pages,
+        "page_size": page_size,
+        "bytes": size,
+        "elapsed": elapsed,
+        "pages_per_sec": pages / elapsed if elapsed > 0 else 0.0,
+        "bytes_per_sec": size / elapsed if elapsed > 0 else 0.0,
+    }
+
+
+def is_sqlite_source(path):
+    """SQLite 스냅샷이 필요한 원본인지 (places.sqlite 등)"""
+    return bool(path) and path.lower().endswith(".sqlite")
+
+
+def is_places_database(path):
+    """파일이 SQLite DB이면 True (북마크 내보내기 JSON이면 False)"""
+    with open(path, 'rb') as f:
+        return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+
+
+def is_bookmarks_export(path):
+    """파일이 export_bookmarks로 만든 JSON이면 True"""
+    with open(path, 'rb') as f:
+        head = f.read(64)
+    return head.startswith(b'{"format": "%s"' % BOOKMARKS_FORMAT.encode('ascii'))
+
+
+@contextmanager
+def open_places(src_path):
+    """places.sqlite 읽기용 연결. 브라우저가 잠근 경우 본 파일과 -wal 복사본에서 연다"""
+    conn = sqlite3.connect(_readonly_uri(src_path), uri=True, timeout=CONNECT_TIMEOUT)
+    work_dir = None
+    try:
+        try:
+            conn.execute("SELECT count(*) FROM moz_bookmarks").fetchone()
+        except sqlite3.OperationalError as e:
+            if "no such table" in str(e):
+                raise
+            conn.close()
+            work_dir = tempfile.mkdtemp(prefix="places_")
+            conn = sqlite3.connect(_copy_with_wal(src_path, work_dir), timeout=CONNECT_TIMEOUT)
+        yield conn
+    finally:
+        conn.close()
+        if work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+
+# 북마크만 내보내기 / 가져오기
+# places.sqlite에는 방문 기록 전체가 들어 있어 수백 MB가 될 수 있으므로,
+# moz_bookmarks/moz_places에서 북마크 트리만 뽑아 한 줄에 항목 하나인 JSON으로 저장한다.
+# (줄 단위라 저장소의 content-defined chunking으로 스냅샷 간 중복도 잘 제거된다)
+BOOKMARKS_FORMAT = "firefox-bookmarks"
+BOOKMARKS_VERSION = 1
+BOOKMARK_COLUMNS = ("id", "guid", "type", "parent", "position", "title", "url", "dateAdded", "lastModified")
+KEYWORD_COLUMNS = ("keyword", "url", "post_data")
+
+# moz_bookmarks.type
+TYPE_BOOKMARK = 1
+TYPE_FOLDER = 2
+TYPE_SEPARATOR = 3
+
+# 루트 폴더 guid -> 이름
+ROOT_GUIDS = {
+    "root________": "root",
+    "menu________": "menu",
+    "toolbar_____": "toolbar",
+    "unfiled_____": "unfiled",
+    "mobile______": "mobile",
+    "tags________": "tags",
+}
+
+# url_hash 계산 (Firefox mfbt HashString / places HashURL과 같은 방식)
+GOLDEN_RATIO_U32 = 0x9E3779B9
+MAX_CHARS_TO_HASH = 1500
+MAX_PREFIX_LENGTH = 50
+
+
+def _hash_bytes(data):
+    value = 0
+    for byte in data:
+        value = (GOLDEN_RATIO_U32 * ((((value << 5) | (value >> 27)) & 0xFFFFFFFF) ^ byte)) & 0xFFFFFFFF
+    return value
+
+
+def url_hash(url):
+    """moz_places.url_hash 값 (상위 16비트: 스킴 해시, 하위 32비트: URL 해시)"""
+    spec = url.encode('utf-8')
+    value = _hash_bytes(spec[:MAX_CHARS_TO_HASH])
+    colon = spec.find(b':')
+    if 0 <= colon < MAX_PREFIX_LENGTH:
+        value += (_hash_bytes(spec[:colon]) & 0xFFFF) << 32
+    return value
+
+
+def _rev_host(url):
+    """moz_places.rev_host 값 (호스트를 뒤집고 "."을 붙임)"""
+    try:
+        host = urlsplit(url).hostname or ""
+    except ValueError:
+        host = ""
+    return host[::-1] + "."
+
+
+def _new_guid():
+    """Places guid (12자 base64url)"""
+    return base64.urlsafe_b64encode(os.urandom(9)).decode('ascii')
+
+
+def iter_bookmark_rows(conn):
+    """moz_bookmarks 행을 BOOKMARK_COLUMNS 순서의 튜플로 반환"""
+    return conn.execute(
+        "SELECT b.id, b.guid, b.type, b.parent, b.position, b.title, p.url, b.dateAdded, b.lastModified "
+        "FROM moz_bookmarks b LEFT JOIN moz_places p ON p.id = b.fk ORDER BY b.id")
+
+
+def write_bookmarks_export(dst_path, bookmarks, keywords=None):
+    """북마크 행(BOOKMARK_COLUMNS 순서)을 내보내기 JSON으로 기록
+
+    keywords가 None이면 키워드 목록을 쓰지 않는다 (가져올 때 기존 키워드 유지).
+    반환: 형식별 항목 수 dict {TYPE_BOOKMARK: n, ...}와 키워드 수
+    """
+    counts = {TYPE_BOOKMARK: 0, TYPE_FOLDER: 0, TYPE_SEPARATOR: 0}
+    keyword_count = 0
+    with atomic_write(dst_path, 'w', encoding='utf-8', newline='\n') as f:
+        f.write('{"format": "%s", "version": %d,\n' % (BOOKMARKS_FORMAT, BOOKMARKS_VERSION))
+        f.write('"columns": %s,\n"bookmarks": [' % json.dumps(BOOKMARK_COLUMNS))
+        separator = "\n"
+        for row in bookmarks:
+            counts[row[2]] = counts.get(row[2], 0) + 1
+            f.write(separator + json.dumps(row, ensure_ascii=False))
+            separator = ",\n"
+        f.write('\n]')
+        if keywords is not None:
+            f.write(',\n"keyword_columns": %s,\n"keywords": [' % json.dumps(KEYWORD_COLUMNS))
+            separator = "\n"
+            for row in keywords:
+                keyword_count += 1
+                f.write(separator + json.dumps(row, ensure_ascii=False))
+                separator = ",\n"
+            f.write('\n]')
+        f.write('}\n')
+    return counts, keyword_count
+
+
+def export_bookmarks(src_path, dst_path):
+    """places.sqlite에서 북마크 트리만 JSON으로 내보내기
+
+    반환: 통계 dict (bookmarks, folders, keywords, bytes, source_bytes, elapsed)
+    """
+    start = time.perf_counter()
+
+    with open_places(src_path) as conn:
+        # 한 읽기 트랜잭션 안에서 조회해 북마크와 키워드가 같은 시점을 보도록 한다
+        conn.execute("BEGIN")
+        try:
+            keywords = conn.execute(
+                "SELECT k.keyword, p.url, k.post_data FROM moz_keywords k "
+                "JOIN moz_places p ON p.id = k.place_id ORDER BY k.keyword")
+            counts, keyword_count = write_bookmarks_export(dst_path, iter_bookmark_rows(conn), keywords)
+        finally:
+            conn.rollback()
+
+    size = os.path.getsize(dst_path)
+    source_size = os.path.getsize(src_path)
+    if os.path.exists(src_path + WAL_SUFFIX):
+        source_size += os.path.getsize(src_path + WAL_SUFFIX)
+    return {
+        "bookmarks": counts[TYPE_BOOKMARK],
+        "folders": counts[TYPE_FOLDER],
+        "separators": counts[TYPE_SEPARATOR],
+        "keywords": keyword_count,
+        "bytes": size,
+        "source_bytes": source_size,
+        "elapsed": time.perf_counter() - start,
+    }
+
+
+def load_bookmarks_export(path):
+    """export_bookmarks로 만든 JSON을 읽어 dict 반환 (형식 확인)"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    if data.get("format") != BOOKMARKS_FORMAT:
+        raise ValueError(f"Firefox 북마크 내보내기 파일이 아닙니다: {path}")
+    if data.get("version", 0) > BOOKMARKS_VERSION:
+        raise ValueError(f"지원하지 않는 북마크 내보내기 버전: {data.get('version')}")
+    return data
+
+
+def _table_columns(conn, table):
+    return {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+
+
+def _ensure_place(conn, url, place_ids, place_columns):
+    """URL의 moz_places id (없으면 새로 추가)"""
+    place_id = place_ids.get(url)
+    if place_id is not None:
+        return place_id
+    hashed = url_hash(url)
+    if "url_hash" in place_columns:
+        row = conn.execute("SELECT id FROM moz_places WHERE url_hash = ? AND url = ?", (hashed, url)).fetchone()
+    else:
+        row = conn.execute("SELECT id FROM moz_places WHERE url = ?", (url,)).fetchone()
+    if row:
+        place_id = row[0]
+    else:
+        values = {"url": url, "rev_host": _rev_host(url), "guid": _new_guid()}
+        if "url_hash" in place_columns:
+            values["url_hash"] = hashed
+        names = ", ".join(values)
+        marks = ", ".join("?" for _ in values)
+        place_id = conn.execute(f"INSERT INTO moz_places ({names}) VALUES ({marks})",
+                                list(values.values())).lastrowid
+    place_ids[url] = place_id
+    return place_id
+
+
+def import_bookmarks(export_path, db_path):
+    """내보낸 북마크 JSON으로 places.sqlite의 북마크 트리를 교체
+
+    방문 기록(moz_places의 나머지 항목)은 그대로 두고, moz_bookmarks와 moz_keywords만
+    바꾼 뒤 moz_places.foreign_count를 다시 계산한다. 브라우저가 종료된 상태에서 호출해야 한다.
+    반환: 통계 dict (bookmarks, keywords, new_places, elapsed)
+    """
+    start = time.perf_counter()
+    data = load_bookmarks_export(export_path)
+    columns = data.get("columns", BOOKMARK_COLUMNS)
+    keyword_columns = data.get("keyword_columns", KEYWORD_COLUMNS)
+
+    conn = sqlite3.connect(db_path, timeout=CONNECT_TIMEOUT, isolation_level=None)
+    try:
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            place_columns = _table_columns(conn, "moz_places")
+            bookmark_columns = _table_columns(conn, "moz_bookmarks")
+            places_before = conn.execute("SELECT count(*) FROM moz_places").fetchone()[0]
+            place_ids = {}
+
+            conn.execute("DELETE FROM moz_bookmarks")
+            for values in data.get("bookmarks", []):
+                row = dict(zip(columns, values))
+                url = row.pop("url", None)
+                row["fk"] = _ensure_place(conn, url, place_ids, place_columns) if url else None
+                if not row.get("guid"):
+                    row["guid"] = _new_guid()
+                # Sync가 복구한 항목을 새로 업로드하도록 상태 초기화
+                if "syncStatus" in bookmark_columns:
+                    row["syncStatus"] = 0
+                if "syncChangeCounter" in bookmark_columns:
+                    row["syncChangeCounter"] = 1
+                row = {k: v for k, v in row.items() if k in bookmark_columns}
+                names = ", ".join(row)
+                marks = ", ".join("?" for _ in row)
+                conn.execute(f"INSERT INTO moz_bookmarks ({names}) VALUES ({marks})", list(row.values()))
+
+            # 키워드 목록이 없는 내보내기(병합 결과 등)는 기존 키워드를 유지
+            keywords = data.get("keywords")
+            if keywords is not None:
+                conn.execute("DELETE FROM moz_keywords")
+            for values in keywords or []:
+                row = dict(zip(keyword_columns, values))
+                place_id = _ensure_place(conn, row["url"], place_ids, place_columns)
+                conn.execute("INSERT INTO moz_keywords (keyword, place_id, post_data) VALUES (?, ?, ?)",
+                             (row["keyword"], place_id, row.get("post_data")))
+
+            # foreign_count는 Firefox 실행 중에만 있는 임시 트리거가 관리하므로 직접 다시 계산
+            if "foreign_count" in place_columns:
+                conn.execute(
+                    "UPDATE moz_places SET foreign_count = "
+                    "(SELECT count(*) FROM moz_bookmarks WHERE fk = moz_places.id) + "
+                    "(SELECT count(*) FROM moz_keywords WHERE place_id = moz_places.id)")
+            # 지워진 북마크를 가리키는 항목 주석 정리
+            tables = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+            if "moz_items_annos" in tables:
+                conn.execute("DELETE FROM moz_items_annos WHERE item_id NOT IN (SELECT id FROM moz_bookmarks)")
+
+            places_after = conn.execute("SELECT count(*) FROM moz_places").fetchone()[0]
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+    finally:
+        conn.close()
+
+    return {
+        "bookmarks": len(data.get("bookmarks", [])),
+        "keywords": len(keywords or []),
+        "new_places": places_after - places_before,
+        "elapsed": time.perf_counter() - start,
+    }
@@ -0,0 +1,471 @@
+import os
+import gzip
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from datetime import datetime
+
+from backup_store import MANIFEST_VERSION
+from file_utils import atomic_write
+
+# Chromium(Edge/Chrome) Bookmarks 증분 백업
+#
+# 구조:
+#   <root>/<name>/<snapshot_id>.full.json.gz   전체 상태 (체크포인트)
+#   <root>/<name>/<snapshot_id>.patch.json     이전 스냅샷 대비 변경된 노드만 담은 패치
+#   <root>/<name>/<snapshot_id>.json           매니페스트 (parent, 크기, SHA-256 등)
+#
+# Bookmarks JSON을 노드 id -> 필드(children은 자식 키 목록) 형태로 펼친 "상태"로 다루고,
+# 패치는 바뀐 노드 전체(set)와 지워진 노드 키(delete)만 기록한다. meta_info 등 모든 필드를 보존한다.
+# 스냅샷은 가장 가까운 체크포인트에서 패치를 차례로 적용하여 재구성하며,
+# 재구성한 파일은 json.dumps(indent=3) 형식이므로 SHA-256은 이 형식 기준이다.
+#
+# 체크포인트는 패치 DEFAULT_FULL_EVERY개마다(또는 패치가 커지면) 새로 쓰고,
+# 압축(compact) 단계에서 오래된 체크포인트는 COMPACT_FULL_EVERY개마다 하나만 남기고 패치로 바꾼다.
+
+DEFAULT_FULL_EVERY = 20
+COMPACT_FULL_EVERY = 200
+# 체크포인트 이후 패치 누적 크기가 체크포인트 크기의 이 비율을 넘으면 새 체크포인트
+MAX_CHAIN_RATIO = 0.5
+# 재구성한 상태 캐시 (이름별 최근 스냅샷)
+STATE_CACHE_SIZE = 4
+
+KIND_FULL = "full"
+KIND_PATCH = "patch"
+
+
+def flatten_bookmarks(data):
+    """Bookmarks JSON dict -> 상태 dict {"top", "roots", "nodes"}
+
+    nodes의 키는 노드 id (중복 id는 "id#n"으로 구분), 폴더의 children은 자식 키 목록이다.
+    """
+    nodes = {}
+    roots = {}
+
+    def node_key(fields):
+        key = str(fields.get("id"))
+        if key in nodes:
+            suffix = 1
+            while f"{key}#{suffix}" in nodes:
+                suffix += 1
+            key = f"{key}#{suffix}"
+        return key
+
+    for root_key, root in (data.get("roots") or {}).items():
+        if not isinstance(root, dict):
+            roots[root_key] = ["value", root]
+            continue
+        roots[root_key] = node_key(root)
+        # (노드 dict, 키) 스택. 키를 먼저 정한 뒤 자식 목록을 채운다
+        stack = [(root, roots[root_key])]
+        nodes[roots[root_key]] = None
+        while stack:
+            fields, key = stack.pop()
+            flat = dict(fields)
+            children = fields.get("children")
+            if isinstance(children, list):
+                child_keys = []
+                for child in children:
+                    child_key = node_key(child)
+                    nodes[child_key] = None
+                    child_keys.append(child_key)
+                    stack.append((child, child_key))
+                flat["children"] = child_keys
+            nodes[key] = flat
+
+    # roots 자리는 None으로 남겨 원본의 키 순서를 유지
+    top = {k: (None if k == "roots" else v) for k, v in data.items()}
+    return {"top": top, "roots": roots, "nodes": nodes}
+
+
+def unflatten_bookmarks(state):
+    """상태 dict -> Bookmarks JSON dict"""
+    nodes = state["nodes"]
+
+    def build(key):
+        flat = nodes[key]
+        fields = dict(flat)
+        if isinstance(flat.get("children"), list):
+            fields["children"] = [build(child) for child in flat["children"]]
+        return fields
+
+    roots = {}
+    for root_key, value in state["roots"].items():
+        roots[root_key] = value[1] if isinstance(value, list) else build(value)
+    data = {k: (roots if k == "roots" else v) for k, v in state["top"].items()}
+    data.setdefault("roots", roots)
+    return data
+
+
+def serialize_state(state):
+    """상태를 Bookmarks 파일 내용(bytes)으로 직렬화"""
+    return json.dumps(unflatten_bookmarks(state), indent=3, ensure_ascii=False).encode('utf-8')
+
+
+def _children_splice(old_fields, new_fields):
+    """자식 목록만 바뀐 폴더면 [시작, 지울 개수, 새 자식 키 목록] (아니면 None)
+
+    앞뒤 공통 부분을 잘라 가운데 한 구간만 기록하므로 큰 폴더에 항목 하나를 넣거나 빼도 패치가 작다.
+    """
+    if old_fields is None or old_fields.keys() != new_fields.keys():
+        return None
+    old_children, new_children = old_fields.get("children"), new_fields.get("children")
+    if not isinstance(old_children, list) or not isinstance(new_children, list):
+        return None
+    if any(old_fields[k] != new_fields[k] for k in new_fields if k != "children"):
+        return None
+    start = 0
+    limit = min(len(old_children), len(new_children))
+    while start < limit and old_children[start] == new_children[start]:
+        start += 1
+    end_old, end_new = len(old_children), len(new_children)
+    while end_old > start and end_new > start and old_children[end_old - 1] == new_children[end_new - 1]:
+        end_old -= 1
+        end_new -= 1
+    return [start, end_old - start, new_children[start:end_new]]
+
+
+def diff_states(old, new):
+    """두 상태의 차이를 패치 dict로 반환"""
+    old_nodes, new_nodes = old["nodes"], new["nodes"]
+    patch = {"set": {}, "splice": {}, "delete": [key for key in old_nodes if key not in new_nodes]}
+    for key, fields in new_nodes.items():
+        old_fields = old_nodes.get(key)
+        if old_fields == fields:
+            continue
+        splice = _children_splice(old_fields, fields)
+        if splice is not None:
+            patch["splice"][key] = splice
+        else:
+            patch["set"][key] = fields
+    if old["top"] != new["top"]:
+        patch["top"] = new["top"]
+    if old["roots"] != new["roots"]:
+        patch["roots"] = new["roots"]
+    return patch
+
+
+def apply_patch(state, patch):
+    """상태에 패치를 적용 (state를 직접 수정)"""
+    nodes = state["nodes"]
+    for key in patch.get("delete", ()):
+        nodes.pop(key, None)
+    nodes.update(patch.get("set", {}))
+    for key, (start, count, children) in patch.get("splice", {}).items():
+        fields = dict(nodes[key])
+        fields["children"] = fields["children"][:start] + children + fields["children"][start + count:]
+        nodes[key] = fields
+    if "top" in patch:
+        state["top"] = patch["top"]
+    if "roots" in patch:
+        state["roots"] = patch["roots"]
+    return state
+
+
+def load_bookmarks_state(path):
+    """Bookmarks 파일을 읽어 상태 dict로 반환"""
+    with open(path, 'r', encoding='utf-8-sig') as f:
+        return flatten_bookmarks(json.load(f))
+
+
+class IncrementalStore:
+    """체크포인트 + 패치 방식의 Chromium 북마크 증분 백업 (BackupStore와 같은 매니페스트 인터페이스)"""
+
+    _write_lock = threading.Lock()
+    # (root, 이름) -> OrderedDict(snapshot_id -> 상태). 캐시된 상태는 수정하지 않는다
+    _cache = {}
+    _cache_lock = threading.Lock()
+
+    def __init__(self, root, full_every=DEFAULT_FULL_EVERY, compact_full_every=COMPACT_FULL_EVERY):
+        self.root = root
+        self.full_every = full_every
+        self.compact_full_every = compact_full_every
+
+    def _name_dir(self, name):
+        return os.path.join(self.root, name)
+
+    def _new_snapshot_id(self, name):
+        snapshot_id = datetime.now().strftime("%Y%m%d%H%M%S%f")
+        name_dir = self._name_dir(name)
+        suffix = 1
+        candidate = snapshot_id
+        while os.path.exists(os.path.join(name_dir, f"{candidate}.json")):
+            candidate = f"{snapshot_id}_{suffix}"
+            suffix += 1
+        return candidate
+
+    # 캐시
+    def _cache_get(self, name, snapshot_id):
+        with self._cache_lock:
+            entries = self._cache.get((self.root, name))
+            if entries is None or snapshot_id not in entries:
+                return None
+            entries.move_to_end(snapshot_id)
+            return entries[snapshot_id]
+
+    def _cache_put(self, name, snapshot_id, state):
+        with self._cache_lock:
+            entries = self._cache.setdefault((self.root, name), OrderedDict())
+            entries[snapshot_id] = state
+            entries.move_to_end(snapshot_id)
+            while len(entries) > STATE_CACHE_SIZE:
+                entries.popitem(last=False)
+
+    def _cache_drop(self, name):
+        with self._cache_lock:
+            self._cache.pop((self.root, name), None)
+
+    # 파일 입출력
+    def _write_json(self, path, obj, compress=False):
+        data = json.dumps(obj, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+        with atomic_write(path) as f:
+            if compress:
+                with gzip.GzipFile(fileobj=f, mode='wb', compresslevel=6, mtime=0) as gz:
+                    gz.write(data)
+            else:
+                f.write(data)
+        return os.path.getsize(path)
+
+    def _read_data(self, manifest):
+        path = os.path.join(self._name_dir(manifest["name"]), manifest["data"])
+        opener = gzip.open if manifest["kind"] == KIND_FULL else open
+        with opener(path, 'rb') as f:
+            return json.loads(f.read().decode('utf-8'))
+
+    def _write_snapshot(self, manifest, kind, payload):
+        """데이터 파일과 매니페스트 기록 (매니페스트를 마지막에 바꾸므로 중간에 실패해도 이전 상태 유지)"""
+        name_dir = self._name_dir(manifest["name"])
+        old_data = manifest.get("data")
+        data_name = f"{manifest['snapshot_id']}.{kind}.json" + (".gz" if kind == KIND_FULL else "")
+        manifest["kind"] = kind
+        manifest["data"] = data_name
+        manifest["data_size"] = self._write_json(os.path.join(name_dir, data_name), payload,
+                                                 compress=kind == KIND_FULL)
+        self._write_json(os.path.join(name_dir, f"{manifest['snapshot_id']}.json"), manifest)
+        if old_data and old_data != data_name and os.path.exists(os.path.join(name_dir, old_data)):
+            os.remove(os.path.join(name_dir, old_data))
+        return manifest
+
+    # 스냅샷
+    def list_names(self):
+        """증분 백업이 있는 백업 이름 목록"""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(entry for entry in os.listdir(self.root)
+                      if os.path.isdir(os.path.join(self.root, entry)))
+
+    def list_snapshots(self, name):
+        """스냅샷 ID 목록 (오래된 순)"""
+        name_dir = self._name_dir(name)
+        if not os.path.isdir(name_dir):
+            return []
+        return sorted(entry[:-5] for entry in os.listdir(name_dir)
+                      if entry.endswith(".json") and entry.count(".") == 1)
+
+    def load_manifest(self, name, snapshot_id=None):
+        """매니페스트 로드 (snapshot_id가 없으면 최신)"""
+        if snapshot_id is None:
+            snapshots = self.list_snapshots(name)
+            if not snapshots:
+                return None
+            snapshot_id = snapshots[-1]
+        manifest_path = os.path.join(self._name_dir(name), f"{snapshot_id}.json")
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+
+    def materialize(self, manifest, use_cache=True):
+        """스냅샷의 상태 재구성 (가장 가까운 체크포인트 또는 캐시에서 패치 적용)"""
+        name = manifest["name"]
+        chain = []
+        current = manifest
+        state = None
+        while True:
+            if use_cache:
+                cached = self._cache_get(name, current["snapshot_id"])
+                if cached is not None:
+                    # 캐시된 상태는 공유되므로 패치를 적용할 때만 복사
+                    state = cached if not chain else _copy_state(cached)
+                    break
+            if current["kind"] == KIND_FULL:
+                state = self._read_data(current)
+                chain.append(None)
+                break
+            chain.append(current)
+            parent = self.load_manifest(name, current["parent"])
+            if parent is None:
+                raise ValueError(f"증분 백업 체인이 끊어졌습니다: {current['parent']}")
+            current = parent
+
+        for step in reversed(chain):
+            if step is not None:
+                apply_patch(state, self._read_data(step))
+        if use_cache:
+            self._cache_put(name, manifest["snapshot_id"], state)
+        return state
+
+    def put_file(self, src_path, name, metadata=None):
+        """Bookmarks 파일을 증분 스냅샷으로 저장. 반환: 매니페스트 dict (new_bytes, changes 포함)"""
+        state = load_bookmarks_state(src_path)
+        content = serialize_state(state)
+
+        with self._write_lock:
+            os.makedirs(self._name_dir(name), exist_ok=True)
+            previous = self.load_manifest(name)
+            snapshot_id = self._new_snapshot_id(name)
+            manifest = {
+                "version": MANIFEST_VERSION,
+                "name": name,
+                "snapshot_id": snapshot_id,
+                "created": datetime.now().isoformat(timespec='seconds'),
+                "source": src_path,
+                "size": len(content),
+                "sha256": hashlib.sha256(content).hexdigest(),
+                "parent": None,
+                "depth": 0,
+                "chain_bytes": 0,
+            }
+            if metadata:
+                manifest["metadata"] = metadata
+
+            patch = None
+            if previous is not None:
+                patch = diff_states(self.materialize(previous), state)
+                patch_bytes = len(json.dumps(patch, separators=(',', ':'), ensure_ascii=False).encode('utf-8'))
+                checkpoint_bytes = previous.get("checkpoint_size") or previous.get("data_size", 0)
+                chain_bytes = previous.get("chain_bytes", 0) + patch_bytes
+                if previous.get("depth", 0) + 1 >= self.full_every or chain_bytes > checkpoint_bytes * MAX_CHAIN_RATIO:
+                    patch = None
+                else:
+                    manifest.update(parent=previous["snapshot_id"], depth=previous.get("depth", 0) + 1,
+                                    chain_bytes=chain_bytes, checkpoint_size=checkpoint_bytes)
+
+            if patch is None:
+                self._write_snapshot(manifest, KIND_FULL, state)
+                manifest["checkpoint_size"] = manifest["data_size"]
+                self._write_json(os.path.join(self._name_dir(name), f"{snapshot_id}.json"), manifest)
+                changes = {"set": len(state["nodes"]), "delete": 0}
+            else:
+                self._write_snapshot(manifest, KIND_PATCH, patch)
+                changes = {"set": len(patch["set"]) + len(patch["splice"]), "delete": len(patch["delete"])}
+            self._cache_put(name, snapshot_id, state)
+
+            # 체크포인트를 새로 쓰면 방금 끝난 체인의 체크포인트를 정리
+            compacted = None
+            if patch is None and previous is not None:
+                compacted = self.compact(name, keep_from=snapshot_id)
+
+        result = dict(manifest)
+        result["changes"] = changes
+        result["new_bytes"] = manifest["data_size"]
+        result["compacted"] = compacted
+        return result
+
+    def restore_file(self, manifest, dst_path):
+        """스냅샷을 재구성하여 dst_path에 기록 (SHA-256 검증)"""
+        content = serialize_state(self.materialize(manifest))
+        if hashlib.sha256(content).hexdigest() != manifest["sha256"]:
+            raise ValueError(f"증분 스냅샷 해시 불일치: {manifest['snapshot_id']}")
+        with atomic_write(dst_path) as f:
+            f.write(content)
+        return dst_path
+
+    def verify(self, manifest):
+        """캐시를 쓰지 않고 파일만으로 재구성하여 SHA-256 확인"""
+        try:
+            content = serialize_state(self.materialize(manifest, use_cache=False))
+        except (OSError, ValueError, KeyError, EOFError):
+            return False
+        return hashlib.sha256(content).hexdigest() == manifest["sha256"]
+
+    def delete_snapshots(self, name, snapshot_ids):
+        """스냅샷 삭제
+
+        삭제하는 스냅샷을 부모로 둔 스냅샷은 남는 가장 가까운 조상 기준 패치로(조상이 없으면 체크포인트로)
+        먼저 다시 쓴 뒤 파일을 지운다. 반환: 통계 dict (deleted, rebased)
+        """
+        stats = {"deleted": 0, "rebased": 0}
+        with self._write_lock:
+            manifests = {}
+            for snapshot_id in self.list_snapshots(name):
+                manifest = self.load_manifest(name, snapshot_id)
+                if manifest is not None:
+                    manifests[snapshot_id] = manifest
+            doomed = set(snapshot_ids) & set(manifests)
+            if not doomed:
+                return stats
+
+            # 오래된 순으로 다시 쓰므로 조상은 항상 먼저 정리되어 있다
+            for snapshot_id in sorted(manifests):
+                manifest = manifests[snapshot_id]
+                if snapshot_id in doomed or manifest["kind"] == KIND_FULL or manifest.get("parent") not in doomed:
+                    continue
+                ancestor = manifest["parent"]
+                while ancestor in doomed:
+                    ancestor = manifests[ancestor].get("parent")
+                state = self.materialize(manifest)
+                if ancestor is None or ancestor not in manifests:
+                    manifest.update(parent=None, depth=0, chain_bytes=0)
+                    self._write_snapshot(manifest, KIND_FULL, state)
+                    manifest["checkpoint_size"] = manifest["data_size"]
+                    self._write_json(os.path.join(self._name_dir(name), f"{snapshot_id}.json"), manifest)
+                else:
+                    manifest["parent"] = ancestor
+                    self._write_snapshot(manifest, KIND_PATCH,
+                                         diff_states(self.materialize(manifests[ancestor]), state))
+                stats["rebased"] += 1
+
+            name_dir = self._name_dir(name)
+            for snapshot_id in doomed:
+                # 매니페스트를 먼저 지워 중간에 실패해도 데이터 없는 스냅샷이 목록에 남지 않게 한다
+                os.remove(os.path.join(name_dir, f"{snapshot_id}.json"))
+                data_path = os.path.join(name_dir, manifests[snapshot_id]["data"])
+                if os.path.exists(data_path):
+                    os.remove(data_path)
+                stats["deleted"] += 1
+            self._cache_drop(name)
+            if not os.listdir(name_dir):
+                os.rmdir(name_dir)
+        return stats
+
+    def compact(self, name, keep_from=None):
+        """오래된 체크포인트를 패치로 바꿔 COMPACT_FULL_EVERY개마다 하나만 남긴다
+
+        keep_from: 이 스냅샷부터는 건드리지 않음 (기본값: 최신 체크포인트부터)
+        반환: 통계 dict (converted, bytes_before, bytes_after)
+        """
+        snapshot_ids = self.list_snapshots(name)
+        manifests = [self.load_manifest(name, sid) for sid in snapshot_ids]
+        manifests = [m for m in manifests if m is not None]
+        if keep_from is None:
+            fulls = [m["snapshot_id"] for m in manifests if m["kind"] == KIND_FULL]
+            keep_from = fulls[-1] if fulls else None
+
+        stats = {"converted": 0, "bytes_before": 0, "bytes_after": 0}
+        since_full = None
+        previous = None
+        for manifest in manifests:
+            if keep_from is not None and manifest["snapshot_id"] >= keep_from:
+                break
+            if manifest["kind"] == KIND_FULL:
+                if previous is not None and since_full is not None and since_full + 1 < self.compact_full_every:
+                    before = manifest["data_size"]
+                    patch = diff_states(self.materialize(previous), self.materialize(manifest))
+                    manifest.update(parent=previous["snapshot_id"])
+                    self._write_snapshot(manifest, KIND_PATCH, patch)
+                    stats["converted"] += 1
+                    stats["bytes_before"] += before
+                    stats["bytes_after"] += manifest["data_size"]
+                    since_full += 1
+                else:
+                    since_full = 0
+            elif since_full is not None:
+                since_full += 1
+            previous = manifest
+        return stats
+
+
+def _copy_state(state):
+    return {"top": state["top"], "roots": state["roots"], "nodes": dict(state["nodes"])}
@@ -0,0 +1,83 @@
+import os
+import queue
+import logging
+import logging.handlers
+
+from bookmarks_core import get_appdata_path
+
+# 비동기 로그 출력 (log_message의 sink)
+#
+# log_message는 백업/복구 작업 스레드에서도 호출되므로 sink는 큐에 넣기만 하고 바로 돌아온다.
+#   LogQueue          GUI용. Tk 메인 루프가 after()로 주기적으로 drain()해서 한 번에 위젯에 넣는다.
+#   RotatingFileSink  파일용. 별도 스레드(QueueListener)가 RotatingFileHandler로 기록한다.
+
+LOG_DIRNAME = "logs"
+LOG_FILENAME = "bookmarks.log"
+DEFAULT_LOG_MAX_BYTES = 1024 * 1024
+DEFAULT_LOG_BACKUP_COUNT = 5
+
+# 한 번에 꺼낼 최대 메시지 수 (너무 많으면 메인 루프가 멈춘 것처럼 보임)
+DEFAULT_DRAIN_BATCH = 500
+
+
+def default_log_path():
+    """기본 로그 파일 경로 (%APPDATA%/BrowserBookmarks/logs/bookmarks.log)"""
+    return os.path.join(get_appdata_path(), LOG_DIRNAME, LOG_FILENAME)
+
+
+class LogQueue:
+    """메시지를 큐에 모아 두는 sink. 아무 스레드에서나 호출 가능"""
+
+    def __init__(self):
+        self._queue = queue.SimpleQueue()
+
+    def __call__(self, full_message):
+        self._queue.put(full_message)
+
+    def drain(self, max_items=DEFAULT_DRAIN_BATCH):
+        """쌓인 메시지를 최대 max_items개까지 꺼내 목록으로 반환"""
+        messages = []
+        while len(messages) < max_items:
+            try:
+                messages.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return messages
+
+    def empty(self):
+        return self._queue.empty()
+
+
+class RotatingFileSink:
+    """로그 파일에 기록하는 sink. 크기가 max_bytes를 넘으면 .1, .2 ...로 돌려 쓴다
+
+    파일 쓰기는 백그라운드 스레드에서 하므로 호출한 스레드는 디스크/네트워크 드라이브를 기다리지 않는다.
+    종료할 때 close()를 호출해야 남은 메시지가 기록된다.
+    """
+
+    def __init__(self, path=None, max_bytes=DEFAULT_LOG_MAX_BYTES, backup_count=DEFAULT_LOG_BACKUP_COUNT):
+        self.path = path or default_log_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        handler = logging.handlers.RotatingFileHandler(self.path, maxBytes=max_bytes, backupCount=backup_count,
+                                                       encoding="utf-8", delay=True)
+        # 메시지에 이미 [시:분:초]가 있으므로 날짜만 붙인다
+        handler.setFormatter(logging.Formatter("%(asctime)s %(message)s", datefmt="%Y-%m-%d"))
+        self._queue = queue.SimpleQueue()
+        self._listener = logging.handlers.QueueListener(self._queue, handler)
+        self._listener.start()
+        self._closed = False
+
+    def __call__(self, full_message):
+        if self._closed:
+            return
+        self._queue.put(logging.makeLogRecord({"msg": full_message.rstrip("\n"), "levelno": logging.INFO,
+                                               "levelname": "INFO"}))
+
+    def close(self):
+        """남은 메시지를 모두 기록하고 파일을 닫음"""
+        if self._closed:
+            return
+        self._closed = True
+        self._listener.stop()
+        for handler in self._listener.handlers:
+            handler.close()
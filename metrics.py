@@ -0,0 +1,260 @@
+import os
+import json
+import time
+import threading
+from datetime import datetime
+from file_utils import atomic_write
+
+# 소요 시간/용량 측정 (백업, 복구, 브라우저 종료, 업데이트 확인/다운로드, updater)
+#
+#   with span("backup", browser="Chrome") as s:   # 소요 시간을 히스토그램에 기록
+#       ...
+#       s.status = "skipped"                       # 기본값 "ok", 예외가 나면 "error"
+#       s.fields["snapshot_id"] = ...              # JSON lines에만 기록되는 추가 값
+#   inc("written_bytes_total", 1024, operation="backup", browser="Chrome")  # 카운터
+#
+# 내보내기 (configure로 지정, 기본값은 둘 다 끔)
+#   jsonl       span이 끝날 때마다 한 줄씩 추가 (시각, 이름, 소요 시간, 상태, 레이블, 추가 값, 상위 span)
+#   prometheus  span이 끝날 때마다 Prometheus 텍스트 형식 파일을 통째로 교체
+#               (node_exporter textfile collector가 읽는 중에 반쯤 쓴 파일을 보지 않도록 임시 파일 후 교체)
+#
+# 레이블에는 브라우저/형식/상태처럼 값의 종류가 적은 것만 넣는다. 스냅샷 ID, 경로 등은 fields에 넣는다.
+# updater.exe에서도 쓰므로 file_utils 외의 다른 프로젝트 모듈을 import하지 않는다.
+
+METRIC_PREFIX = "bookmarks_"
+DURATION_METRIC = "operation_duration_seconds"
+
+# 히스토그램 구간 (초)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STATUS_OK = "ok"
+STATUS_ERROR = "error"
+
+
+def _label_key(labels):
+    return tuple(sorted((key, str(value)) for key, value in labels.items() if value is not None))
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in pairs) + "}"
+
+
+def _format_value(value):
+    if value == int(value):
+        return str(int(value))
+    return repr(float(value))
+
+
+class Histogram:
+    """누적 구간 개수, 합계, 개수"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.sum += value
+        self.count += 1
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets, self.counts)},
+        }
+
+
+class Span:
+    """측정 구간 (Metrics.span이 반환)"""
+
+    def __init__(self, metrics, name, labels, parent):
+        self.metrics = metrics
+        self.name = name
+        self.labels = labels
+        self.parent = parent
+        self.status = STATUS_OK
+        self.fields = {}
+        self.started = None
+        self.duration = None
+
+    def __enter__(self):
+        self.metrics._push(self)
+        self.started = datetime.now()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, _tb):
+        self.duration = time.perf_counter() - self._start
+        self.metrics._pop(self)
+        if exc_type is not None:
+            # 예외로 끝나도 with 블록 안에서 지정한 상태(예: "not_running")가 있으면 그대로 둔다
+            if self.status == STATUS_OK:
+                self.status = STATUS_ERROR
+            self.fields.setdefault("error", str(exc))
+        self.metrics._finish(self)
+        return False
+
+
+class Metrics:
+    """카운터/히스토그램 저장소 (여러 스레드에서 동시에 사용 가능)"""
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.jsonl_path = None
+        self.prometheus_path = None
+        self._counters = {}      # (이름, 레이블) -> 값
+        self._histograms = {}    # (이름, 레이블) -> Histogram
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def configure(self, jsonl_path=None, prometheus_path=None):
+        """내보낼 파일 지정 (None이면 해당 형식은 쓰지 않음)"""
+        self.jsonl_path = jsonl_path or None
+        self.prometheus_path = prometheus_path or None
+
+    # 측정
+    def span(self, name, **labels):
+        """소요 시간을 operation_duration_seconds{operation=name, status, ...}에 기록하는 컨텍스트 매니저"""
+        stack = getattr(self._local, "stack", None)
+        parent = stack[-1].name if stack else None
+        return Span(self, name, labels, parent)
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name, value, **labels):
+        key = (name, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram(self.buckets)
+            histogram.observe(value)
+
+    def _push(self, span):
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        self._local.stack.append(span)
+
+    def _pop(self, span):
+        stack = self._local.stack
+        if span in stack:
+            stack.remove(span)
+
+    def _finish(self, span):
+        self.observe(DURATION_METRIC, span.duration, operation=span.name, status=span.status, **span.labels)
+        # 내보내기 실패가 측정 대상 작업을 실패시키면 안 된다
+        try:
+            if self.jsonl_path:
+                self._append_jsonl(span)
+            if self.prometheus_path:
+                self.write_prometheus(self.prometheus_path)
+        except OSError:
+            pass
+
+    # 내보내기
+    def _append_jsonl(self, span):
+        record = {
+            "time": span.started.isoformat(timespec="milliseconds"),
+            "span": span.name,
+            "duration": round(span.duration, 6),
+            "status": span.status,
+            "labels": {key: value for key, value in span.labels.items() if value is not None},
+        }
+        if span.parent:
+            record["parent"] = span.parent
+        if span.fields:
+            record["fields"] = span.fields
+        line = json.dumps(record, ensure_ascii=False, default=str) + "\n"
+        os.makedirs(os.path.dirname(os.path.abspath(self.jsonl_path)), exist_ok=True)
+        with self._lock:
+            with open(self.jsonl_path, "a", encoding="utf-8") as f:
+                f.write(line)
+
+    def snapshot(self):
+        """현재 값 (JSON으로 직렬화 가능한 dict)"""
+        with self._lock:
+            return {
+                "counters": [{"name": name, "labels": dict(key), "value": value}
+                             for (name, key), value in sorted(self._counters.items())],
+                "histograms": [{"name": name, "labels": dict(key), **histogram.to_dict()}
+                               for (name, key), histogram in sorted(self._histograms.items(),
+                                                                    key=lambda item: item[0])],
+            }
+
+    def to_prometheus(self):
+        """Prometheus 텍스트 형식 (exposition format 0.0.4)"""
+        lines = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items(), key=lambda item: item[0])
+            last_name = None
+            for (name, key), value in counters:
+                metric = METRIC_PREFIX + name
+                if name != last_name:
+                    lines.append(f"# TYPE {metric} counter")
+                    last_name = name
+                lines.append(f"{metric}{_format_labels(key)} {_format_value(value)}")
+            last_name = None
+            for (name, key), histogram in histograms:
+                metric = METRIC_PREFIX + name
+                if name != last_name:
+                    lines.append(f"# TYPE {metric} histogram")
+                    last_name = name
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    lines.append(f"{metric}_bucket{_format_labels(key, [('le', bound)])} {count}")
+                lines.append(f"{metric}_bucket{_format_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{metric}_sum{_format_labels(key)} {histogram.sum!r}")
+                lines.append(f"{metric}_count{_format_labels(key)} {histogram.count}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        """Prometheus 텍스트 파일 쓰기 (임시 파일에 쓴 뒤 교체)"""
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        text = self.to_prometheus()
+        with atomic_write(path, "w", encoding="utf-8", newline="\n") as f:
+            f.write(text)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+
+# 프로세스 전체에서 쓰는 기본 저장소
+METRICS = Metrics()
+
+
+def span(name, **labels):
+    return METRICS.span(name, **labels)
+
+
+def inc(name, value=1, **labels):
+    METRICS.inc(name, value, **labels)
+
+
+def observe(name, value, **labels):
+    METRICS.observe(name, value, **labels)
+
+
+def configure(jsonl_path=None, prometheus_path=None):
+    METRICS.configure(jsonl_path, prometheus_path)
+
+
+def configure_from_dict(data):
+    """설정 파일의 "metrics" 값으로 내보내기 지정: {"jsonl": 경로, "prometheus": 경로}"""
+    data = data or {}
+    METRICS.configure(data.get("jsonl"), data.get("prometheus"))
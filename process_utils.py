@@ -0,0 +1,306 @@
+import os
+import sys
+import time
+import signal
+import sqlite3
+
+# 프로세스 확인 / 종료 대기 / 파일 잠금 해제 대기 (psutil 없이)
+#
+#   inspector = get_inspector()
+#   pids = inspector.find("chrome.exe")        # 실행 중인 프로세스 ID 목록
+#   inspector.terminate(pids)
+#   remaining = inspector.wait_for_exit(pids, timeout=10)   # 모두 끝나면 바로 반환
+#   wait_for_unlock(path, timeout=5)           # 파일을 다른 프로세스가 잡고 있지 않을 때까지 대기
+#   wait_for_handoff(exe_path, pid=app_pid)    # updater: 프로그램이 끝나고 실행 파일 잠금이 풀릴 때까지 대기
+#
+# Windows는 Toolhelp32 스냅샷과 프로세스 핸들(ctypes)을, Linux는 /proc을 사용한다.
+# Linux 구현은 테스트/벤치마크용으로, 이름이 "chrome.exe"인 프로세스도 그대로 찾는다.
+# updater.exe에서도 쓰므로 다른 프로젝트 모듈을 import하지 않는다.
+
+DEFAULT_EXIT_TIMEOUT = 10.0
+DEFAULT_UNLOCK_TIMEOUT = 5.0
+POLL_INTERVAL = 0.05
+
+SQLITE_HEADER = b"SQLite format 3\x00"
+SHARING_VIOLATION_ERRORS = (32, 33)  # ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION
+
+
+def _normalize_name(name):
+    name = os.path.basename(name).lower()
+    return name[:-4] if name.endswith(".exe") else name
+
+
+class ProcessInspector:
+    """프로세스를 조회할 수 없는 환경용 기본 구현 (항상 실행 중인 프로세스 없음)"""
+
+    name = "none"
+
+    def find(self, image_name):
+        """실행 파일 이름(예: chrome.exe)이 같은 프로세스 ID 목록 (현재 프로세스 제외)"""
+        return []
+
+    def is_running(self, pid):
+        return False
+
+    def terminate(self, pids, force=True):
+        """프로세스 종료 요청 (종료될 때까지 기다리지 않음). 이미 끝난 프로세스는 무시"""
+
+    def wait_for_exit(self, pids, timeout=DEFAULT_EXIT_TIMEOUT, interval=POLL_INTERVAL):
+        """pids가 모두 끝나거나 timeout초가 지날 때까지 대기. 아직 실행 중인 프로세스 ID 목록 반환"""
+        deadline = time.monotonic() + timeout
+        remaining = [pid for pid in pids if self.is_running(pid)]
+        while remaining and time.monotonic() < deadline:
+            time.sleep(min(interval, max(deadline - time.monotonic(), 0)))
+            remaining = [pid for pid in remaining if self.is_running(pid)]
+        return remaining
+
+
+class ProcInspector(ProcessInspector):
+    """Linux /proc"""
+
+    name = "proc"
+
+    def __init__(self, proc_root="/proc"):
+        self.proc_root = proc_root
+
+    def _read(self, pid, entry):
+        try:
+            with open(os.path.join(self.proc_root, str(pid), entry), "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _names(self, pid):
+        names = set()
+        comm = self._read(pid, "comm")
+        if comm:
+            names.add(_normalize_name(os.fsdecode(comm.strip())))
+        # comm은 15자에서 잘리므로 명령줄 첫 인자의 파일 이름도 비교
+        cmdline = self._read(pid, "cmdline")
+        if cmdline:
+            names.add(_normalize_name(os.fsdecode(cmdline.split(b"\0", 1)[0])))
+        return names
+
+    def find(self, image_name):
+        target = _normalize_name(image_name)
+        own = os.getpid()
+        pids = []
+        try:
+            entries = os.listdir(self.proc_root)
+        except OSError:
+            return []
+        for entry in entries:
+            if not entry.isdigit() or int(entry) == own:
+                continue
+            pid = int(entry)
+            if target in self._names(pid) and self.is_running(pid):
+                pids.append(pid)
+        return sorted(pids)
+
+    def is_running(self, pid):
+        stat = self._read(pid, "stat")
+        if stat is None:
+            return False
+        # "pid (comm) 상태 ..." - comm에 공백/괄호가 있을 수 있으므로 마지막 ")" 뒤를 읽는다
+        state = stat[stat.rfind(b")") + 2:stat.rfind(b")") + 3]
+        return state not in (b"Z", b"X", b"x")
+
+    def terminate(self, pids, force=True):
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGKILL if force else signal.SIGTERM)
+            except (ProcessLookupError, PermissionError):
+                pass
+
+
+class WindowsInspector(ProcessInspector):
+    """Windows Toolhelp32 스냅샷 + 프로세스 핸들"""
+
+    name = "windows"
+
+    TH32CS_SNAPPROCESS = 0x00000002
+    PROCESS_TERMINATE = 0x0001
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    SYNCHRONIZE = 0x00100000
+    STILL_ACTIVE = 259
+    WAIT_OBJECT_0 = 0
+    MAX_PATH = 260
+
+    def __init__(self):
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESSENTRY32W(ctypes.Structure):
+            _fields_ = [("dwSize", wintypes.DWORD), ("cntUsage", wintypes.DWORD),
+                        ("th32ProcessID", wintypes.DWORD), ("th32DefaultHeapID", ctypes.c_size_t),
+                        ("th32ModuleID", wintypes.DWORD), ("cntThreads", wintypes.DWORD),
+                        ("th32ParentProcessID", wintypes.DWORD), ("pcPriClassBase", wintypes.LONG),
+                        ("dwFlags", wintypes.DWORD), ("szExeFile", wintypes.WCHAR * self.MAX_PATH)]
+
+        self._ctypes = ctypes
+        self._entry_type = PROCESSENTRY32W
+        kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+        kernel32.CreateToolhelp32Snapshot.restype = wintypes.HANDLE
+        kernel32.CreateToolhelp32Snapshot.argtypes = (wintypes.DWORD, wintypes.DWORD)
+        kernel32.Process32FirstW.argtypes = (wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W))
+        kernel32.Process32NextW.argtypes = (wintypes.HANDLE, ctypes.POINTER(PROCESSENTRY32W))
+        kernel32.OpenProcess.restype = wintypes.HANDLE
+        kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+        kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+        kernel32.TerminateProcess.argtypes = (wintypes.HANDLE, wintypes.UINT)
+        kernel32.WaitForSingleObject.argtypes = (wintypes.HANDLE, wintypes.DWORD)
+        kernel32.WaitForSingleObject.restype = wintypes.DWORD
+        kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+        self._kernel32 = kernel32
+        self._invalid_handle = ctypes.c_void_p(-1).value
+
+    def find(self, image_name):
+        target = _normalize_name(image_name)
+        own = os.getpid()
+        snapshot = self._kernel32.CreateToolhelp32Snapshot(self.TH32CS_SNAPPROCESS, 0)
+        if not snapshot or snapshot == self._invalid_handle:
+            raise OSError(self._ctypes.get_last_error(), "CreateToolhelp32Snapshot 실패")
+        pids = []
+        try:
+            entry = self._entry_type()
+            entry.dwSize = self._ctypes.sizeof(entry)
+            ok = self._kernel32.Process32FirstW(snapshot, self._ctypes.byref(entry))
+            while ok:
+                if entry.th32ProcessID != own and _normalize_name(entry.szExeFile) == target:
+                    pids.append(entry.th32ProcessID)
+                ok = self._kernel32.Process32NextW(snapshot, self._ctypes.byref(entry))
+        finally:
+            self._kernel32.CloseHandle(snapshot)
+        return sorted(pids)
+
+    def is_running(self, pid):
+        handle = self._kernel32.OpenProcess(self.PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return False
+        try:
+            code = self._ctypes.c_ulong()
+            if not self._kernel32.GetExitCodeProcess(handle, self._ctypes.byref(code)):
+                return False
+            return code.value == self.STILL_ACTIVE
+        finally:
+            self._kernel32.CloseHandle(handle)
+
+    def terminate(self, pids, force=True):
+        # Windows에는 정상 종료 요청에 해당하는 API가 없으므로 force와 관계없이 TerminateProcess
+        for pid in pids:
+            handle = self._kernel32.OpenProcess(self.PROCESS_TERMINATE, False, pid)
+            if handle:
+                try:
+                    self._kernel32.TerminateProcess(handle, 1)
+                finally:
+                    self._kernel32.CloseHandle(handle)
+
+    def wait_for_exit(self, pids, timeout=DEFAULT_EXIT_TIMEOUT, interval=POLL_INTERVAL):
+        # 폴링 대신 프로세스 핸들이 신호 상태가 될 때까지 대기
+        deadline = time.monotonic() + timeout
+        remaining = []
+        for pid in pids:
+            handle = self._kernel32.OpenProcess(self.SYNCHRONIZE, False, pid)
+            if not handle:
+                continue
+            try:
+                wait_ms = int(max(deadline - time.monotonic(), 0) * 1000)
+                if self._kernel32.WaitForSingleObject(handle, wait_ms) != self.WAIT_OBJECT_0:
+                    remaining.append(pid)
+            finally:
+                self._kernel32.CloseHandle(handle)
+        return remaining
+
+
+_inspector = None
+
+
+def get_inspector():
+    """현재 환경에 맞는 ProcessInspector (한 번 만든 것을 재사용)"""
+    global _inspector
+    if _inspector is None:
+        if sys.platform == "win32":
+            try:
+                _inspector = WindowsInspector()
+            except (OSError, AttributeError):
+                _inspector = ProcessInspector()
+        elif os.path.isdir("/proc/self"):
+            _inspector = ProcInspector()
+        else:
+            _inspector = ProcessInspector()
+    return _inspector
+
+
+# 파일 잠금
+def is_file_locked(path):
+    """다른 프로세스가 파일을 잡고 있어 쓸 수 없으면 True (파일이 없으면 False)
+
+    Windows는 공유 위반으로 열기 자체가 실패하고, SQLite DB는 Firefox가 배타 잠금을 걸어 두므로 읽기를 시도한다.
+    읽기 전용 파일이나 폴더 접근 거부처럼 기다려도 풀리지 않는 오류는 잠금으로 보지 않는다.
+    """
+    try:
+        with open(path, "rb") as f:
+            is_sqlite = f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        return _is_sharing_violation(e)
+
+    if not is_sqlite:
+        if os.name == "nt" and os.access(path, os.W_OK):
+            # 실행 중인 exe처럼 읽기는 허용하고 쓰기만 막는 경우
+            try:
+                with open(path, "r+b"):
+                    pass
+            except OSError as e:
+                return _is_sharing_violation(e)
+        return False
+
+    from urllib.request import pathname2url  # import가 느리므로 필요할 때만
+    uri = "file:" + pathname2url(os.path.abspath(path)) + "?mode=ro"
+    try:
+        conn = sqlite3.connect(uri, uri=True, timeout=0)
+        try:
+            conn.execute("SELECT count(*) FROM sqlite_master").fetchone()
+        finally:
+            conn.close()
+    except sqlite3.OperationalError as e:
+        return "locked" in str(e) or "busy" in str(e)
+    return False
+
+
+def _is_sharing_violation(error):
+    """다른 프로세스가 파일을 열어 두어 생긴 오류인지 (Windows 공유/잠금 위반)"""
+    return getattr(error, "winerror", None) in SHARING_VIOLATION_ERRORS
+
+
+def wait_for_unlock(path, timeout=DEFAULT_UNLOCK_TIMEOUT, interval=POLL_INTERVAL):
+    """파일 잠금이 풀리면 바로 True, timeout초 안에 풀리지 않으면 False"""
+    deadline = time.monotonic() + timeout
+    while is_file_locked(path):
+        if time.monotonic() >= deadline:
+            return False
+        time.sleep(interval)
+    return True
+
+
+# 프로그램 -> updater 인계
+def wait_for_handoff(path, pid=None, timeout=DEFAULT_EXIT_TIMEOUT, inspector=None):
+    """실행 파일 path를 실행 중인 프로세스가 모두 끝나고 잠금이 풀릴 때까지 대기
+
+    pid는 updater를 실행한 프로그램이 넘겨 준 자기 프로세스 ID로, 이름으로 찾은 같은 실행 파일의
+    다른 인스턴스와 함께 기다린다. 고정 시간 대기 없이 끝나는 즉시 반환한다.
+    {"pids", "remaining", "unlocked", "exit_wait", "unlock_wait"} 반환 (대기 시간은 초)
+    """
+    inspector = inspector or get_inspector()
+    started = time.monotonic()
+    deadline = started + timeout
+    pids = set(inspector.find(os.path.basename(path)))
+    if pid is not None and pid != os.getpid():
+        pids.add(pid)
+    pids = sorted(pids)
+    remaining = inspector.wait_for_exit(pids, timeout)
+    exited = time.monotonic()
+    unlocked = wait_for_unlock(path, max(deadline - exited, 0))
+    return {"pids": pids, "remaining": remaining, "unlocked": unlocked,
+            "exit_wait": exited - started, "unlock_wait": time.monotonic() - exited}
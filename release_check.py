@@ -0,0 +1,144 @@
+import os
+import json
+import time
+import threading
+import email.utils
+import urllib.request
+import urllib.error
+from file_utils import atomic_write
+
+# GitHub 최신 릴리스 조회 결과 캐시 (%APPDATA%/BrowserBookmarks/release_check.json)
+#
+#   cache = ReleaseCheckCache(path, min_interval=6 * 3600)
+#   data, source = cache.fetch(VERSION_CHECK_URL)   # source: "cache" / "not_modified" / "network"
+#
+# - min_interval초 안에 다시 확인하면 네트워크 요청 없이 저장된 응답을 쓴다.
+# - 그 뒤에는 ETag(If-None-Match)/Last-Modified(If-Modified-Since)를 보내고,
+#   304 Not Modified면 본문을 받지 않고 저장된 응답을 쓴다 (GitHub 요청 한도에도 계산되지 않음).
+# - 실패하면 retry_delay * 2^(연속 실패 - 1)초(최대 max_backoff) 동안 다시 요청하지 않는다.
+#   403/429에 Retry-After나 X-RateLimit-Reset이 있으면 그 시각까지 기다린다.
+#   기다리는 동안이나 실패했을 때 저장된 응답이 있으면 그것을 쓴다.
+# - force=True(수동 확인)면 간격/대기를 무시하고 바로 조건부 요청을 보낸다.
+# file_utils 외의 다른 프로젝트 모듈을 import하지 않는다.
+
+CACHE_FILENAME = "release_check.json"
+DEFAULT_MIN_INTERVAL = 6 * 3600
+DEFAULT_RETRY_DELAY = 60
+DEFAULT_MAX_BACKOFF = 24 * 3600
+DEFAULT_TIMEOUT = 10
+
+SOURCE_CACHE = "cache"
+SOURCE_NOT_MODIFIED = "not_modified"
+SOURCE_NETWORK = "network"
+
+
+class ReleaseCheckError(Exception):
+    """확인 실패 (저장된 응답도 없음)"""
+
+
+class ReleaseCheckCache:
+    """조건부 요청 + 최소 확인 간격 + 실패 시 대기를 적용하는 JSON 조회"""
+
+    def __init__(self, path, min_interval=DEFAULT_MIN_INTERVAL, retry_delay=DEFAULT_RETRY_DELAY,
+                 max_backoff=DEFAULT_MAX_BACKOFF, timeout=DEFAULT_TIMEOUT):
+        self.path = path
+        self.min_interval = min_interval
+        self.retry_delay = retry_delay
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self._lock = threading.Lock()
+
+    # 저장
+    def load(self, url):
+        """url에 대해 저장된 상태 (다른 URL이거나 없으면 빈 dict)"""
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        return state if isinstance(state, dict) and state.get("url") == url else {}
+
+    def _save(self, state):
+        # 같은 파일을 여러 인스턴스가 읽으므로 임시 파일에 쓴 뒤 교체
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        try:
+            with atomic_write(self.path, "w", encoding="utf-8") as f:
+                f.write(json.dumps(state, ensure_ascii=False))
+        except OSError:
+            # 캐시 저장 실패가 업데이트 확인을 실패시키면 안 된다
+            pass
+
+    # 조회
+    def fetch(self, url, force=False, now=None):
+        """(응답 JSON, 출처) 반환. 요청이 실패하고 저장된 응답도 없으면 ReleaseCheckError"""
+        with self._lock:
+            now = time.time() if now is None else now
+            state = self.load(url)
+            cached = state.get("data")
+            if not force and cached is not None:
+                checked_at = state.get("checked_at", 0)
+                if 0 <= now - checked_at < self.min_interval:
+                    return cached, SOURCE_CACHE
+            if not force and now < state.get("retry_after", 0):
+                if cached is not None:
+                    return cached, SOURCE_CACHE
+                raise ReleaseCheckError(f"{int(state['retry_after'] - now)}초 뒤에 다시 확인합니다 "
+                                        f"(연속 실패 {state.get('failures', 0)}회)")
+
+            headers = {"Accept": "application/vnd.github+json", "User-Agent": "BrowserBookmarks"}
+            if cached is not None:
+                if state.get("etag"):
+                    headers["If-None-Match"] = state["etag"]
+                if state.get("last_modified"):
+                    headers["If-Modified-Since"] = state["last_modified"]
+            request = urllib.request.Request(url, headers=headers)
+            try:
+                with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                    data = json.loads(response.read().decode("utf-8"))
+                    response_headers = response.headers
+                source = SOURCE_NETWORK
+            except urllib.error.HTTPError as e:
+                if e.code == 304 and cached is not None:
+                    data, response_headers, source = cached, e.headers, SOURCE_NOT_MODIFIED
+                else:
+                    return self._failed(url, state, now, e, e.headers)
+            except (urllib.error.URLError, OSError, ValueError) as e:
+                return self._failed(url, state, now, e, None)
+
+            self._save({
+                "url": url,
+                "checked_at": now,
+                "etag": response_headers.get("ETag") or state.get("etag"),
+                "last_modified": response_headers.get("Last-Modified") or state.get("last_modified"),
+                "data": data,
+            })
+            return data, source
+
+    def _failed(self, url, state, now, error, headers):
+        failures = state.get("failures", 0) + 1
+        delay = min(self.retry_delay * (2 ** (failures - 1)), self.max_backoff)
+        server_wait = _server_retry_after(headers, now) if headers is not None else None
+        if server_wait is not None:
+            delay = min(max(delay, server_wait), self.max_backoff)
+        state = dict(state, url=url, failures=failures, retry_after=now + delay, last_error=str(error))
+        self._save(state)
+        if state.get("data") is not None:
+            return state["data"], SOURCE_CACHE
+        raise ReleaseCheckError(f"업데이트 확인 실패: {error}") from error
+
+
+def _server_retry_after(headers, now):
+    """Retry-After / X-RateLimit-Reset 헤더가 알려 주는 대기 시간(초), 없으면 None"""
+    retry_after = headers.get("Retry-After")
+    if retry_after:
+        if retry_after.strip().isdigit():
+            return int(retry_after)
+        try:
+            return max(email.utils.parsedate_to_datetime(retry_after).timestamp() - now, 0)
+        except (TypeError, ValueError):
+            pass
+    if headers.get("X-RateLimit-Remaining") == "0":
+        reset = headers.get("X-RateLimit-Reset", "")
+        if reset.isdigit():
+            return max(int(reset) - now, 0)
+    return None
@@ -0,0 +1,122 @@
+from datetime import datetime
+
+# 백업 보관 정책
+#
+# 스냅샷 목록(카탈로그 항목)에서 남길 것을 고른다. 규칙은 restic/borg의 forget 규칙과 같다.
+#   keep_last  가장 최근 N개
+#   hourly     최근 N개 시간대마다 그 시간대의 가장 최근 1개 (daily/weekly/monthly도 같은 방식)
+#   max_bytes  위 규칙으로 남긴 것 중 최근 것부터 용량을 더해 이 값을 넘는 오래된 것은 삭제
+#              (개수 규칙이 없으면 전체 중 용량 안에 드는 최근 것들을 남김)
+# 규칙은 합집합으로 적용되며, 가장 최근 스냅샷은 어떤 경우에도 남긴다.
+# 규칙이 하나도 없으면 아무것도 지우지 않는다.
+
+# 기간 규칙: (이름, 기간 키 함수)
+PERIODS = (
+    ("hourly", lambda t: (t.year, t.month, t.day, t.hour)),
+    ("daily", lambda t: (t.year, t.month, t.day)),
+    ("weekly", lambda t: tuple(t.isocalendar()[:2])),
+    ("monthly", lambda t: (t.year, t.month)),
+)
+
+REASON_LAST = "last"
+REASON_NEWEST = "newest"
+REASON_SIZE = "max_bytes"
+
+
+class RetentionPolicy:
+    """보관 규칙 (각 값이 0 또는 None이면 해당 규칙을 쓰지 않음)"""
+
+    def __init__(self, keep_last=0, hourly=0, daily=0, weekly=0, monthly=0, max_bytes=None):
+        self.keep_last = keep_last or 0
+        self.hourly = hourly or 0
+        self.daily = daily or 0
+        self.weekly = weekly or 0
+        self.monthly = monthly or 0
+        self.max_bytes = max_bytes or None
+
+    @classmethod
+    def from_dict(cls, data):
+        data = data or {}
+        return cls(**{key: data.get(key) for key in
+                      ("keep_last", "hourly", "daily", "weekly", "monthly", "max_bytes")})
+
+    def to_dict(self):
+        return {
+            "keep_last": self.keep_last,
+            "hourly": self.hourly,
+            "daily": self.daily,
+            "weekly": self.weekly,
+            "monthly": self.monthly,
+            "max_bytes": self.max_bytes,
+        }
+
+    @property
+    def has_count_rules(self):
+        return bool(self.keep_last or self.hourly or self.daily or self.weekly or self.monthly)
+
+    @property
+    def is_empty(self):
+        return not (self.has_count_rules or self.max_bytes)
+
+    def describe(self):
+        parts = [f"{key} {value}" for key, value in self.to_dict().items() if value]
+        return ", ".join(parts) if parts else "규칙 없음"
+
+
+def _parse_created(entry):
+    try:
+        return datetime.fromisoformat(entry["created"])
+    except (TypeError, ValueError, KeyError):
+        return datetime.min
+
+
+def select(entries, policy, size_of=None):
+    """남길 항목과 지울 항목 나누기
+
+    entries: created(ISO 8601)가 있는 dict 목록 (순서 무관)
+    size_of: 항목의 저장 용량 함수 (max_bytes용). 최근 것부터 차례로 호출되므로
+             "앞서 남긴 것과 공유하지 않는 용량"처럼 누적 방식으로 계산해도 된다.
+    반환: (keep, remove) - keep은 (항목, 사유 목록), remove는 항목 목록. 둘 다 최근 순
+    """
+    ordered = sorted(entries, key=lambda e: (e.get("created") or "", e.get("snapshot_id") or ""), reverse=True)
+    if policy.is_empty or not ordered:
+        return [(entry, []) for entry in ordered], []
+
+    # 개수 규칙 없이 max_bytes만 있으면 용량 안에 드는 만큼 모두 남긴다
+    reasons = [[] if policy.has_count_rules else [REASON_SIZE] for _ in ordered]
+    reasons[0].append(REASON_NEWEST)
+    for index in range(min(policy.keep_last, len(ordered))):
+        reasons[index].append(REASON_LAST)
+
+    times = [_parse_created(entry) for entry in ordered]
+    for period, key_of in PERIODS:
+        count = getattr(policy, period)
+        if not count:
+            continue
+        last_key = None
+        kept = 0
+        for index, created in enumerate(times):
+            if kept >= count:
+                break
+            key = key_of(created)
+            if key != last_key:
+                reasons[index].append(period)
+                last_key = key
+                kept += 1
+
+    keep, remove = [], []
+    total = 0
+    over_limit = False
+    for index, entry in enumerate(ordered):
+        if not reasons[index] or over_limit:
+            remove.append(entry)
+            continue
+        if policy.max_bytes and size_of is not None:
+            total += size_of(entry)
+            # 용량을 넘으면 이것부터 오래된 것은 모두 삭제 (가장 최근 스냅샷은 넘어도 남긴다)
+            if index > 0 and total > policy.max_bytes:
+                over_limit = True
+                remove.append(entry)
+                continue
+        keep.append((entry, reasons[index]))
+    return keep, remove
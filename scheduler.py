@@ -0,0 +1,409 @@
+import os
+import json
+import time
+import random
+import threading
+from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
+
+from bookmarks_core import (get_appdata_path, discover_profiles, log_message, prune_backups)
+from backup_engine import backup_profile, DEFAULT_MAX_WORKERS
+from retention import RetentionPolicy
+from file_utils import atomic_write
+
+# 주기적 백업 스케줄러 (bookmarks_cli.py daemon)
+#
+# app_config.json의 "schedule" 설정 예:
+#   "schedule": {
+#       "max_workers": 4,
+#       "jobs": [
+#           {"name": "hourly", "interval": 3600, "jitter": 300},
+#           {"name": "nightly", "cron": "30 2 * * *", "browsers": ["Firefox"], "format": "archive",
+#            "prune": true}
+#       ]
+#   }
+# 작업 항목: name, interval(초) 또는 cron(분 시 일 월 요일), jitter(초, 실행 시각을 0~jitter초 늦춤),
+#            browsers(없으면 전체), backup_dir/format(없으면 last_backup_dir/backup_format),
+#            force, prune(백업 후 "retention" 보관 정책 적용)
+#
+# - 모든 작업은 하나의 스레드 풀에서 프로필 단위로 실행한다.
+# - 같은 프로필은 동시에 한 작업만 백업한다 (이미 백업 중이면 이번 실행에서 건너뜀).
+# - 절전 등으로 실행 시각을 여러 번 놓쳐도 한 번만 실행하고 다음 시각은 현재 기준으로 다시 계산한다.
+# - 작업별 마지막 실행 시각/소요 시간/결과는 schedule_state.json에 기록한다 (daemon --status로 확인).
+
+STATE_FILENAME = "schedule_state.json"
+# 시계 변경이나 절전 복귀를 알아차리도록 대기는 최대 이 시간(초)으로 나눈다
+MAX_SLEEP = 60.0
+
+
+# 실행 주기
+class IntervalSchedule:
+    def __init__(self, seconds):
+        if seconds <= 0:
+            raise ValueError(f"실행 간격은 0보다 커야 합니다: {seconds}")
+        self.seconds = seconds
+
+    def next_after(self, moment):
+        return moment + timedelta(seconds=self.seconds)
+
+    def describe(self):
+        return f"{self.seconds}초마다"
+
+
+def _parse_cron_field(text, low, high):
+    """cron 필드 하나 -> 허용 값 집합 (*, */n, a-b, a-b/n, 목록)"""
+    values = set()
+    for part in text.split(","):
+        step = 1
+        if "/" in part:
+            part, step_text = part.split("/", 1)
+            step = int(step_text)
+            if step <= 0:
+                raise ValueError(f"cron 간격이 올바르지 않습니다: {text}")
+        if part == "*":
+            start, end = low, high
+        elif "-" in part:
+            start, end = (int(v) for v in part.split("-", 1))
+        else:
+            start = int(part)
+            end = high if step > 1 else start
+        if start < low or end > high or start > end:
+            raise ValueError(f"cron 값이 범위({low}-{high})를 벗어났습니다: {text}")
+        values.update(range(start, end + 1, step))
+    return values
+
+
+class CronSchedule:
+    """5개 필드 cron 식 (분 시 일 월 요일). 요일은 0-7 (0과 7은 일요일)
+
+    일과 요일을 둘 다 지정하면 일반 cron처럼 둘 중 하나만 맞아도 실행한다.
+    """
+
+    def __init__(self, expr):
+        fields = expr.split()
+        if len(fields) != 5:
+            raise ValueError(f"cron 식은 5개 필드여야 합니다: {expr}")
+        self.expr = expr
+        self.minutes = _parse_cron_field(fields[0], 0, 59)
+        self.hours = _parse_cron_field(fields[1], 0, 23)
+        self.days = _parse_cron_field(fields[2], 1, 31)
+        self.months = _parse_cron_field(fields[3], 1, 12)
+        # cron 요일(0=일요일)을 datetime.weekday()(0=월요일) 기준으로 변환
+        self.weekdays = {(d - 1) % 7 for d in _parse_cron_field(fields[4], 0, 7)}
+        self.any_day = fields[2] == "*"
+        self.any_weekday = fields[4] == "*"
+
+    def _day_matches(self, moment):
+        day_ok = moment.day in self.days
+        weekday_ok = moment.weekday() in self.weekdays
+        if self.any_day or self.any_weekday:
+            return day_ok and weekday_ok
+        return day_ok or weekday_ok
+
+    def next_after(self, moment):
+        """moment 이후(초과) 첫 실행 시각. 맞지 않는 월/일/시는 통째로 건너뛴다"""
+        candidate = moment.replace(second=0, microsecond=0) + timedelta(minutes=1)
+        limit = candidate + timedelta(days=366 * 5)
+        while candidate < limit:
+            if candidate.month not in self.months:
+                year, month = (candidate.year + 1, 1) if candidate.month == 12 else (candidate.year, candidate.month + 1)
+                candidate = candidate.replace(year=year, month=month, day=1, hour=0, minute=0)
+                continue
+            if not self._day_matches(candidate):
+                candidate = candidate.replace(hour=0, minute=0) + timedelta(days=1)
+                continue
+            if candidate.hour not in self.hours:
+                candidate = candidate.replace(minute=0) + timedelta(hours=1)
+                continue
+            if candidate.minute not in self.minutes:
+                candidate += timedelta(minutes=1)
+                continue
+            return candidate
+        raise ValueError(f"실행 시각을 찾을 수 없는 cron 식입니다: {self.expr}")
+
+    def describe(self):
+        return f"cron '{self.expr}'"
+
+
+# 작업
+class ScheduledJob:
+    """예약 백업 작업 하나와 실행 상태"""
+
+    def __init__(self, name, schedule, backup_dir, backup_format="store", browsers=None, jitter=0,
+                 force=False, prune=False):
+        self.name = name
+        self.schedule = schedule
+        self.backup_dir = backup_dir
+        self.backup_format = backup_format
+        self.browsers = browsers
+        self.jitter = jitter
+        self.force = force
+        self.prune = prune
+
+        self.next_run = None
+        self.running = False
+        self.last_run = None
+        self.last_duration = None
+        self.last_status = None
+        self.last_counts = None
+        self.runs = 0
+
+    @classmethod
+    def from_dict(cls, data, config_manager):
+        if data.get("cron"):
+            schedule = CronSchedule(data["cron"])
+        elif data.get("interval"):
+            schedule = IntervalSchedule(float(data["interval"]))
+        else:
+            raise ValueError(f"예약 작업에 interval 또는 cron이 없습니다: {data.get('name')}")
+        return cls(
+            name=data.get("name") or schedule.describe(),
+            schedule=schedule,
+            backup_dir=data.get("backup_dir") or config_manager.get("last_backup_dir"),
+            backup_format=data.get("format") or config_manager.get("backup_format", "store"),
+            browsers=data.get("browsers"),
+            jitter=float(data.get("jitter") or 0),
+            force=bool(data.get("force")),
+            prune=bool(data.get("prune")),
+        )
+
+    def plan_next(self, now, rng, after=None):
+        """다음 실행 시각 계산 (예정 시각 + 0~jitter초)
+
+        after: 이 시각 다음 예정 시각을 찾음 (기본값: 마지막 실행 시각).
+        실행 기록이 없는 간격 작업은 바로 실행한다.
+        """
+        after = after or self.last_run
+        if after is None:
+            base = now if isinstance(self.schedule, IntervalSchedule) else self.schedule.next_after(now)
+        else:
+            base = self.schedule.next_after(after)
+        if base <= now:
+            # 놓친 실행은 몇 번이든 지금 한 번만 실행
+            base = now
+        self.next_run = base + timedelta(seconds=rng.uniform(0, self.jitter) if self.jitter else 0)
+        return self.next_run
+
+    def status(self):
+        return {
+            "name": self.name,
+            "schedule": self.schedule.describe(),
+            "backup_dir": self.backup_dir,
+            "format": self.backup_format,
+            "running": self.running,
+            "runs": self.runs,
+            "last_run": self.last_run.isoformat(timespec='seconds') if self.last_run else None,
+            "last_duration": self.last_duration,
+            "last_status": self.last_status,
+            "last_counts": self.last_counts,
+            "next_run": self.next_run.isoformat(timespec='seconds') if self.next_run else None,
+        }
+
+
+def load_jobs(config_manager):
+    """app_config.json의 "schedule" 설정으로 작업 목록 생성. 반환: (작업 목록, 최대 동시 작업 수)"""
+    schedule = config_manager.get("schedule") or {}
+    jobs = [ScheduledJob.from_dict(data, config_manager) for data in schedule.get("jobs", [])]
+    names = [job.name for job in jobs]
+    if len(set(names)) != len(names):
+        raise ValueError("예약 작업 이름이 중복되었습니다.")
+    return jobs, int(schedule.get("max_workers") or DEFAULT_MAX_WORKERS)
+
+
+def load_state(state_path=None):
+    """저장된 작업별 실행 상태 {이름: 상태 dict}"""
+    state_path = state_path or os.path.join(get_appdata_path(), STATE_FILENAME)
+    try:
+        with open(state_path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+class Scheduler:
+    """예약 작업을 하나의 스레드 풀에서 실행하는 스케줄러
+
+    backup_options: perform_backup에 넘길 Firefox/압축 설정
+    retention: 작업의 prune 옵션에 쓸 RetentionPolicy
+    """
+
+    def __init__(self, jobs, max_workers=DEFAULT_MAX_WORKERS, backup_options=None, retention=None,
+                 state_path=None, seed=None):
+        self.jobs = jobs
+        self.max_workers = max(1, max_workers)
+        self.backup_options = backup_options or {}
+        self.retention = retention or RetentionPolicy()
+        self.state_path = state_path or os.path.join(get_appdata_path(), STATE_FILENAME)
+        self._rng = random.Random(seed)
+        self._pool = None
+        self._lock = threading.Lock()
+        self._profile_locks = {}
+        self._stop = threading.Event()
+
+    # 상태 저장
+    def _restore_state(self):
+        saved = load_state(self.state_path)
+        for job in self.jobs:
+            data = saved.get(job.name) or {}
+            if data.get("last_run"):
+                job.last_run = datetime.fromisoformat(data["last_run"])
+            job.last_duration = data.get("last_duration")
+            job.last_status = data.get("last_status")
+            job.last_counts = data.get("last_counts")
+            job.runs = data.get("runs", 0)
+
+    def _save_state(self):
+        with self._lock:
+            state = {job.name: job.status() for job in self.jobs}
+        try:
+            with atomic_write(self.state_path, 'w', encoding='utf-8') as f:
+                json.dump(state, f, indent=2, ensure_ascii=False)
+        except OSError as e:
+            log_message(f"[오류] 스케줄 상태 저장 실패: {e}")
+
+    def status(self):
+        """작업별 실행 상태 목록 (마지막 실행 시각/소요 시간/결과, 다음 실행 시각)"""
+        with self._lock:
+            return [job.status() for job in self.jobs]
+
+    # 실행
+    def _profile_lock(self, profile):
+        key = (profile.browser, os.path.normcase(profile.path))
+        with self._lock:
+            return self._profile_locks.setdefault(key, threading.Lock())
+
+    def _run_profile(self, job, profile):
+        lock = self._profile_lock(profile)
+        if not lock.acquire(blocking=False):
+            log_message(f"[정보] [{job.name}] {profile.display_name} 다른 작업이 백업 중이라 건너뜀")
+            return None
+        try:
+            return backup_profile(profile, job.backup_dir, job.backup_format, job.force, self.backup_options)
+        finally:
+            lock.release()
+
+    def _start_job(self, job, started):
+        """작업의 프로필별 백업을 풀에 넣는다. 마지막 프로필이 끝나면 그 스레드에서 _finish_job 호출"""
+        try:
+            profiles = discover_profiles(browsers=job.browsers)
+        except Exception as e:
+            log_message(f"[오류] [{job.name}] 프로필 검색 실패: {e}")
+            self._finish_job(job, started, None)
+            return
+        if not profiles:
+            log_message(f"[정보] [{job.name}] 백업할 브라우저 프로필이 없습니다.")
+            self._finish_job(job, started, [])
+            return
+
+        results = []
+        remaining = [len(profiles)]
+
+        def on_done(future):
+            error = future.exception()
+            if error is not None:
+                log_message(f"[오류] [{job.name}] 백업 작업 예외: {error}")
+            with self._lock:
+                results.append(future.result() if error is None else False)
+                remaining[0] -= 1
+                last = remaining[0] == 0
+            if last:
+                self._finish_job(job, started, results)
+
+        for profile in profiles:
+            self._pool.submit(self._run_profile, job, profile).add_done_callback(on_done)
+
+    def _finish_job(self, job, started, results):
+        """작업 결과 기록 (results: 프로필별 OperationResult, 건너뛴 프로필은 None, 예외는 False)"""
+        if results is None:
+            counts, status = None, "error"
+        else:
+            counts = {
+                "succeeded": sum(1 for r in results if r and not r.skipped),
+                "skipped": sum(1 for r in results if r and r.skipped),
+                "busy": sum(1 for r in results if r is None),
+                "failed": sum(1 for r in results if r is not None and not r),
+            }
+            status = "failed" if counts["failed"] else "ok"
+            if job.prune and results and not self.retention.is_empty:
+                try:
+                    prune_backups(job.backup_dir, self.retention, browsers=job.browsers)
+                except Exception as e:
+                    log_message(f"[오류] [{job.name}] 보관 정책 적용 실패: {e}")
+                    status = "error"
+
+        duration = time.perf_counter() - started
+        with self._lock:
+            job.running = False
+            job.last_duration = round(duration, 3)
+            job.last_status = status
+            job.last_counts = counts
+            job.runs += 1
+        log_message(f"[정보] [{job.name}] 예약 백업 종료: {status} ({duration:.2f}초)")
+        self._save_state()
+
+    def run_pending(self, now=None):
+        """실행 시각이 된 작업을 풀에 넣는다. 반환: 시작한 작업 수"""
+        now = now or datetime.now()
+        started = 0
+        for job in self.jobs:
+            with self._lock:
+                if job.next_run is None or job.next_run > now:
+                    continue
+                if job.running:
+                    # 이전 실행이 아직 끝나지 않았으면 이번 실행은 합쳐서 건너뜀
+                    log_message(f"[정보] [{job.name}] 이전 실행이 끝나지 않아 이번 실행을 건너뜀")
+                    job.plan_next(now, self._rng, after=now)
+                    continue
+                job.running = True
+                job.last_run = now
+                job.plan_next(now, self._rng)
+            log_message(f"[정보] [{job.name}] 예약 백업 시작 (다음 실행: {job.next_run:%Y-%m-%d %H:%M:%S})")
+            self._start_job(job, time.perf_counter())
+            started += 1
+        return started
+
+    def _seconds_until_next(self):
+        with self._lock:
+            pending = [job.next_run for job in self.jobs if job.next_run is not None]
+        if not pending:
+            return MAX_SLEEP
+        remaining = (min(pending) - datetime.now()).total_seconds()
+        return min(max(remaining, 0.0), MAX_SLEEP)
+
+    def run_forever(self):
+        """stop()이 호출될 때까지 실행"""
+        if not self.jobs:
+            log_message("[정보] 예약된 백업 작업이 없습니다. app_config.json의 \"schedule\" 설정을 확인하세요.")
+            return
+        self._restore_state()
+        now = datetime.now()
+        for job in self.jobs:
+            job.plan_next(now, self._rng)
+            log_message(f"[정보] [{job.name}] {job.schedule.describe()}, 다음 실행: {job.next_run:%Y-%m-%d %H:%M:%S}")
+
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduler")
+        try:
+            while not self._stop.is_set():
+                self.run_pending()
+                self._stop.wait(self._seconds_until_next())
+        finally:
+            log_message("[정보] 스케줄러 종료 중 (실행 중인 백업이 끝나기를 기다립니다)")
+            self._pool.shutdown(wait=True)
+            self._save_state()
+
+    def run_once(self):
+        """모든 작업을 지금 한 번씩 실행하고 끝날 때까지 기다림 (작업 스케줄러/cron에서 호출할 때)"""
+        self._restore_state()
+        now = datetime.now()
+        for job in self.jobs:
+            job.next_run = now
+        self._pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="scheduler")
+        try:
+            self.run_pending(now)
+        finally:
+            self._pool.shutdown(wait=True)
+            self._save_state()
+        return self.status()
+
+    def stop(self):
+        self._stop.set()
@@ -0,0 +1,113 @@
+import os
+import sys
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+
+import pytest
+
+# 저장소 루트의 모듈(backup_store, process_utils ...)과 벤치마크용 가상 북마크(fixtures)를 그대로 import
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests.append((self.path, dict(self.headers)))
+        route = self.server.routes.get(self.path)
+        if route is None:
+            self.send_error(404)
+            return
+        route(self)
+
+
+class LocalServer:
+    """테스트용 로컬 HTTP 서버. routes[path] = handler(request)로 응답을 정한다"""
+
+    def __init__(self):
+        self.httpd = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+        self.httpd.daemon_threads = True
+        self.httpd.routes = {}
+        self.httpd.requests = []
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+
+    @property
+    def routes(self):
+        return self.httpd.routes
+
+    @property
+    def requests(self):
+        return self.httpd.requests
+
+    def url(self, path):
+        return f"http://127.0.0.1:{self.httpd.server_port}{path}"
+
+    def serve_file(self, path, data, etag='"v1"', drop_after=None):
+        """Range/If-Range를 지원하는 파일. drop_after 바이트를 보낸 뒤 한 번 연결을 끊는다"""
+        drops = [drop_after] if drop_after else []
+
+        def handler(request):
+            start = 0
+            range_header = request.headers.get("Range")
+            if_range = request.headers.get("If-Range")
+            if range_header and (if_range is None or if_range == etag):
+                start = int(range_header.split("=", 1)[1].split("-", 1)[0])
+            body = data[start:]
+            if start:
+                request.send_response(206)
+                request.send_header("Content-Range", f"bytes {start}-{len(data) - 1}/{len(data)}")
+            else:
+                request.send_response(200)
+            request.send_header("Content-Length", str(len(body)))
+            request.send_header("ETag", etag)
+            request.send_header("Accept-Ranges", "bytes")
+            request.end_headers()
+            if drops:
+                request.wfile.write(body[:drops.pop()])
+                request.wfile.flush()
+                request.close_connection = True
+                return
+            request.wfile.write(body)
+
+        self.routes[path] = handler
+
+
+@pytest.fixture
+def http_server():
+    server = LocalServer()
+    server.thread.start()
+    yield server
+    server.httpd.shutdown()
+    server.httpd.server_close()
+
+
+@pytest.fixture
+def make_tree():
+    """{루트 키: [(guid, 제목, URL 또는 자식 목록), ...]} 형식으로 작은 BookmarkTree를 만든다"""
+    from bookmark_model import BookmarkNode, BookmarkTree, TYPE_FOLDER, TYPE_URL
+
+    def build(spec, first_id=1):
+        tree = BookmarkTree(source="test")
+        next_id = [first_id]
+
+        def add(guid, title, parent, index, content, root=None):
+            node_id = str(next_id[0])
+            next_id[0] += 1
+            folder = not isinstance(content, str)
+            tree.add(BookmarkNode(id=node_id, guid=guid, parent=parent, index=index,
+                                  type=TYPE_FOLDER if folder else TYPE_URL, title=title,
+                                  url=None if folder else content, root=root))
+            if folder:
+                for child_index, (child_guid, child_title, child_content) in enumerate(content):
+                    add(child_guid, child_title, node_id, child_index, child_content)
+
+        for index, (key, items) in enumerate(spec.items()):
+            add(None, key, None, index, items, root=key)
+        return tree
+
+    return build
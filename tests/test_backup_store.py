@@ -0,0 +1,131 @@
+import os
+import time
+import threading
+
+import pytest
+
+from backup_store import BackupStore, ChangeIndex, STORE_DIRNAME, file_sha256
+
+OLD_MTIME = time.time() - 3600
+
+
+def _write_source(path, lines=20000):
+    with open(path, "w", encoding="utf-8") as f:
+        for i in range(lines):
+            f.write(f'{{"id": {i}, "url": "https://example.com/{i}", "name": "bookmark {i}"}}\n')
+
+
+def _age_objects(store):
+    """모든 청크를 gc 대상이 되는 오래된 청크로 만들기"""
+    for prefix in os.listdir(store.objects_dir):
+        for entry in os.scandir(os.path.join(store.objects_dir, prefix)):
+            os.utime(entry.path, (OLD_MTIME, OLD_MTIME))
+
+
+def test_dedup_hit_refreshes_object_mtime(tmp_path):
+    store = BackupStore(str(tmp_path / "store"))
+    src = str(tmp_path / "Bookmarks")
+    _write_source(src)
+    manifest = store.put_file(src, "Chrome")
+    _age_objects(store)
+
+    again = store.put_file(src, "Chrome")
+
+    assert again["new_chunks"] == 0
+    for digest, _size in manifest["chunks"]:
+        assert os.stat(store._object_path(digest)).st_mtime > OLD_MTIME
+
+
+def test_truncated_object_is_rewritten(tmp_path):
+    # 전원 차단으로 잘린 청크를 다음 저장이 그대로 재사용하지 않는다
+    store = BackupStore(str(tmp_path / "store"))
+    src = str(tmp_path / "Bookmarks")
+    _write_source(src)
+    manifest = store.put_file(src, "Chrome")
+    digest = manifest["chunks"][0][0]
+    open(store._object_path(digest), "wb").close()
+
+    again = store.put_file(src, "Chrome")
+
+    assert again["new_chunks"] == 1
+    assert store.verify(again)
+
+
+def test_restore_keeps_destination_on_hash_mismatch(tmp_path):
+    store = BackupStore(str(tmp_path / "store"))
+    src = str(tmp_path / "Bookmarks")
+    _write_source(src)
+    manifest = dict(store.put_file(src, "Chrome"), sha256="0" * 64)
+    dst = tmp_path / "restored"
+    dst.write_text("current")
+
+    with pytest.raises(ValueError):
+        store.restore_file(manifest, str(dst))
+    assert dst.read_text() == "current"
+    assert sorted(os.listdir(tmp_path)) == ["Bookmarks", "restored", "store"]
+
+
+def test_gc_waits_for_running_put(tmp_path):
+    store = BackupStore(str(tmp_path / "store"))
+    src = str(tmp_path / "Bookmarks")
+    _write_source(src)
+    results = []
+
+    with store._lock(exclusive=True):
+        worker = threading.Thread(target=lambda: results.append(store.put_file(src, "Chrome")))
+        worker.start()
+        worker.join(0.2)
+        assert worker.is_alive()
+        assert store.list_snapshots("Chrome") == []
+    worker.join(10)
+
+    assert len(results) == 1
+    assert store.verify(results[0])
+
+
+def test_put_and_gc_concurrently_keep_snapshot_restorable(tmp_path):
+    store = BackupStore(str(tmp_path / "store"))
+    src = str(tmp_path / "Bookmarks")
+    _write_source(src)
+
+    for _ in range(10):
+        # 어느 스냅샷도 참조하지 않는 오래된 청크를 남긴 뒤, 같은 내용을 다시 저장하면서 gc
+        orphan = store.put_file(src, "Chrome")
+        store.delete_snapshots("Chrome", [orphan["snapshot_id"]])
+        _age_objects(store)
+
+        results = []
+        threads = [threading.Thread(target=lambda: results.append(store.put_file(src, "Chrome"))),
+                   threading.Thread(target=store.gc)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(10)
+
+        manifest = store.load_manifest("Chrome", results[0]["snapshot_id"])
+        assert store.verify(manifest)
+        restored = str(tmp_path / "restored")
+        store.restore_file(manifest, restored)
+        with open(restored, "rb") as a, open(src, "rb") as b:
+            assert a.read() == b.read()
+        store.delete_snapshots("Chrome", [manifest["snapshot_id"]])
+
+
+def test_change_index_compares_source_hash_when_backup_differs(tmp_path):
+    # SQLite 스냅샷처럼 백업 내용(sha256)이 원본과 다른 경우
+    backup_dir = tmp_path / "backup"
+    snapshot_dir = backup_dir / STORE_DIRNAME / "snapshots" / "firefox_places.sqlite"
+    snapshot_dir.mkdir(parents=True)
+    (snapshot_dir / "1.json").write_text("{}")
+    src = tmp_path / "places.sqlite"
+    src.write_bytes(b"source content")
+    index = ChangeIndex(str(backup_dir))
+    index.record("firefox_places.sqlite", str(src), "store", "firefox_places.sqlite", "0" * 64, "1",
+                 source_sha256=file_sha256(str(src)))
+
+    os.utime(src, (OLD_MTIME, OLD_MTIME))
+    assert index.is_unchanged("firefox_places.sqlite", str(src), "store")
+    assert index.get("firefox_places.sqlite", "store")["sha256"] == "0" * 64
+
+    src.write_bytes(b"source CONTENT")
+    assert not index.is_unchanged("firefox_places.sqlite", str(src), "store")
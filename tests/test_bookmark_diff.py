@@ -0,0 +1,99 @@
+from bookmark_diff import match_nodes, diff_trees
+
+BASE = {
+    "bookmark_bar": [
+        ("g-news", "News", "https://news.example/"),
+        ("g-work", "Work", [
+            ("g-wiki", "Wiki", "https://wiki.example/"),
+            ("g-mail", "Mail", "https://mail.example/"),
+        ]),
+    ],
+    "other": [],
+}
+
+
+def _by_guid(old, new, matches):
+    return {old.by_id[o].guid: new.by_id[n].guid for o, n in matches.items() if not old.by_id[o].root}
+
+
+def test_nodes_are_matched_by_guid_even_when_edited(make_tree):
+    old = make_tree(BASE)
+    new = make_tree({
+        "bookmark_bar": [
+            ("g-work", "Projects", [("g-mail", "Mail", "https://mail.example/inbox")]),
+            ("g-news", "News", "https://news.example/"),
+        ],
+        "other": [("g-wiki", "Wiki", "https://wiki.example/")],
+    }, first_id=100)
+
+    matches = match_nodes(old, new)
+
+    assert _by_guid(old, new, matches) == {g: g for g in ("g-news", "g-work", "g-wiki", "g-mail")}
+    # 루트는 id가 달라도 루트 키로 짝지어진다
+    assert matches[old.roots["other"]] == new.roots["other"]
+
+
+def test_regenerated_guids_fall_back_to_url_and_folder_path(make_tree):
+    old = make_tree(BASE)
+    new = make_tree({
+        "bookmark_bar": [
+            ("n-news", "News (renamed)", "https://news.example/"),
+            ("n-work", "Work", [
+                ("n-wiki", "Wiki", "https://wiki.example/"),
+                ("n-mail", "Mail", "https://mail.example/"),
+            ]),
+        ],
+        "other": [],
+    })
+
+    assert _by_guid(old, new, match_nodes(old, new)) == {
+        "g-news": "n-news", "g-work": "n-work", "g-wiki": "n-wiki", "g-mail": "n-mail"}
+
+
+def test_guid_reused_for_other_kind_is_not_matched(make_tree):
+    old = make_tree({"bookmark_bar": [("g-1", "Docs", "https://docs.example/")], "other": []})
+    new = make_tree({"bookmark_bar": [("g-1", "Docs", [])], "other": []})
+
+    assert _by_guid(old, new, match_nodes(old, new)) == {}
+
+
+def test_duplicate_urls_are_matched_once(make_tree):
+    old = make_tree({"bookmark_bar": [("a", "A", "https://x.example/"), ("b", "B", "https://x.example/")],
+                     "other": []})
+    new = make_tree({"bookmark_bar": [("c", "C", "https://x.example/")], "other": []})
+
+    matches = match_nodes(old, new)
+    assert list(_by_guid(old, new, matches).values()) == ["c"]
+
+
+def test_diff_trees_reports_each_kind_of_change(make_tree):
+    old = make_tree(BASE)
+    new = make_tree({
+        "bookmark_bar": [
+            ("g-news", "Headlines", "https://news.example/"),
+            ("g-work", "Work", [("g-wiki", "Wiki", "https://wiki.example/v2")]),
+        ],
+        "other": [
+            ("g-mail", "Mail", "https://mail.example/"),
+            ("g-new", "Shop", "https://shop.example/"),
+        ],
+    })
+
+    diff = diff_trees(old, new)
+
+    assert [n.guid for n in diff.added] == ["g-new"]
+    assert diff.removed == []
+    assert [(o.guid, n.guid) for o, n in diff.moved] == [("g-mail", "g-mail")]
+    assert [(o.title, n.title) for o, n in diff.renamed] == [("News", "Headlines")]
+    assert [(o.url, n.url) for o, n in diff.url_changed] == [("https://wiki.example/", "https://wiki.example/v2")]
+    assert diff.summary()
+
+
+def test_removed_nodes_do_not_include_roots(make_tree):
+    old = make_tree(BASE)
+    new = make_tree({"bookmark_bar": [("g-news", "News", "https://news.example/")]})
+
+    diff = diff_trees(old, new)
+
+    assert sorted(n.guid for n in diff.removed) == ["g-mail", "g-wiki", "g-work"]
+    assert not diff.added
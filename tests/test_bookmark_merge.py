@@ -0,0 +1,166 @@
+import pytest
+
+from bookmark_merge import merge_trees, PREFER_BACKUP, PREFER_CURRENT
+
+BASE = {
+    "bookmark_bar": [
+        ("g-news", "News", "https://news.example/"),
+        ("g-work", "Work", [
+            ("g-wiki", "Wiki", "https://wiki.example/"),
+            ("g-mail", "Mail", "https://mail.example/"),
+        ]),
+    ],
+    "other": [("g-shop", "Shop", "https://shop.example/")],
+}
+
+
+def _outline(tree):
+    """{루트 키: [(guid, 제목, URL 또는 자식 목록), ...]} (make_tree와 같은 형식)"""
+    def items(node_id):
+        return [(n.guid, n.title, items(n.id) if n.is_folder else n.url) for n in tree.children(node_id)]
+    return {key: items(node_id) for key, node_id in tree.roots.items()}
+
+
+def _edit(spec, guid, title=None, url=None):
+    """spec 사본에서 guid 항목의 제목/주소를 바꾼다"""
+    def walk(items):
+        result = []
+        for item_guid, item_title, content in items:
+            if not isinstance(content, str):
+                content = walk(content)
+            if item_guid == guid:
+                item_title = title if title is not None else item_title
+                content = url if url is not None else content
+            result.append((item_guid, item_title, content))
+        return result
+    return {key: walk(items) for key, items in spec.items()}
+
+
+def _remove(spec, guid):
+    def walk(items):
+        return [(g, t, c if isinstance(c, str) else walk(c)) for g, t, c in items if g != guid]
+    return {key: walk(items) for key, items in spec.items()}
+
+
+def test_identical_trees_merge_without_conflicts(make_tree):
+    result = merge_trees(make_tree(BASE), make_tree(BASE), make_tree(BASE))
+
+    assert _outline(result.tree) == BASE
+    assert result.conflicts == []
+
+
+def test_change_on_one_side_wins_regardless_of_prefer(make_tree):
+    current = _edit(BASE, "g-news", title="Headlines")
+    backup = _edit(BASE, "g-wiki", url="https://wiki.example/v2")
+    expected = _edit(current, "g-wiki", url="https://wiki.example/v2")
+
+    for prefer in (PREFER_BACKUP, PREFER_CURRENT):
+        result = merge_trees(make_tree(BASE), make_tree(current), make_tree(backup), prefer=prefer)
+        assert _outline(result.tree) == expected
+        assert result.conflicts == []
+
+
+@pytest.mark.parametrize("prefer, title", [(PREFER_BACKUP, "News (backup)"), (PREFER_CURRENT, "News (current)")])
+def test_conflicting_edits_follow_prefer(make_tree, prefer, title):
+    current = _edit(BASE, "g-news", title="News (current)")
+    backup = _edit(BASE, "g-news", title="News (backup)")
+
+    result = merge_trees(make_tree(BASE), make_tree(current), make_tree(backup), prefer=prefer)
+
+    assert _outline(result.tree) == _edit(BASE, "g-news", title=title)
+    assert result.conflicts == [{
+        "kind": "title", "guid": "g-news", "title": title, "base": "News",
+        "current": "News (current)", "backup": "News (backup)", "resolution": prefer,
+    }]
+    assert result.summary()["conflicts"]["title"] == 1
+
+
+def test_conflicting_moves_are_parent_conflicts(make_tree):
+    x = ("g-x", "X", "https://x.example/")
+    news, (_guid, _title, work) = BASE["bookmark_bar"]
+    base = {"bookmark_bar": BASE["bookmark_bar"], "other": BASE["other"] + [x]}
+    # 같은 항목을 한쪽은 Work 폴더로, 다른 쪽은 bookmark_bar로 옮긴다
+    current = {"bookmark_bar": [news, ("g-work", "Work", work + [x])], "other": BASE["other"]}
+    backup = {"bookmark_bar": BASE["bookmark_bar"] + [x], "other": BASE["other"]}
+
+    result = merge_trees(make_tree(base), make_tree(current), make_tree(backup), prefer=PREFER_CURRENT)
+
+    assert _outline(result.tree) == current
+    assert [(c["kind"], c["guid"], c["base"], c["current"], c["backup"]) for c in result.conflicts] == [
+        ("parent", "g-x", "other", "bookmark_bar/Work", "bookmark_bar")]
+
+
+def test_delete_without_edit_drops_the_item(make_tree):
+    current = _remove(BASE, "g-mail")
+
+    result = merge_trees(make_tree(BASE), make_tree(current), make_tree(BASE))
+
+    assert _outline(result.tree) == current
+    assert result.conflicts == []
+
+
+def test_delete_against_edit_keeps_the_edited_item(make_tree):
+    current = _edit(BASE, "g-shop", url="https://shop.example/sale")
+    backup = _remove(BASE, "g-shop")
+
+    for prefer in (PREFER_BACKUP, PREFER_CURRENT):
+        result = merge_trees(make_tree(BASE), make_tree(current), make_tree(backup), prefer=prefer)
+        assert _outline(result.tree) == current
+        assert [(c["kind"], c["guid"], c["resolution"]) for c in result.conflicts] == [
+            ("delete_modify", "g-shop", PREFER_CURRENT)]
+
+
+def test_deleted_folder_keeps_edited_child_in_nearest_parent(make_tree):
+    current = _remove(BASE, "g-work")
+    backup = _edit(BASE, "g-mail", title="Mail (new)")
+
+    result = merge_trees(make_tree(BASE), make_tree(current), make_tree(backup))
+
+    assert _outline(result.tree) == {
+        "bookmark_bar": [("g-news", "News", "https://news.example/"),
+                         ("g-mail", "Mail (new)", "https://mail.example/")],
+        "other": BASE["other"],
+    }
+    assert [c["kind"] for c in result.conflicts] == ["delete_modify"]
+
+
+def test_items_added_on_both_sides_are_kept_and_interleaved(make_tree):
+    current = {"bookmark_bar": BASE["bookmark_bar"] + [("g-c", "C", "https://c.example/")],
+               "other": BASE["other"]}
+    backup = {"bookmark_bar": [("g-b", "B", "https://b.example/")] + BASE["bookmark_bar"],
+              "other": BASE["other"]}
+
+    result = merge_trees(make_tree(BASE), make_tree(current), make_tree(backup))
+
+    assert [guid for guid, _title, _content in _outline(result.tree)["bookmark_bar"]] == [
+        "g-b", "g-news", "g-work", "g-c"]
+    assert result.conflicts == []
+
+
+def test_union_merge_without_base(make_tree):
+    current = _remove(_edit(BASE, "g-news", title="News (current)"), "g-shop")
+    backup = _remove(_edit(BASE, "g-news", title="News (backup)"), "g-wiki")
+
+    result = merge_trees(None, make_tree(current), make_tree(backup), prefer=PREFER_CURRENT)
+
+    # base가 없으면 지운 쪽을 알 수 없으므로 양쪽 항목을 모두 남긴다
+    assert _outline(result.tree) == _edit(BASE, "g-news", title="News (current)")
+    assert [(c["kind"], c["base"], c["resolution"]) for c in result.conflicts] == [
+        ("title", None, PREFER_CURRENT)]
+    assert not result.three_way
+
+
+def test_restored_items_get_new_ids_without_reusing_current_ones(make_tree):
+    current = _remove(BASE, "g-shop")
+
+    result = merge_trees(None, make_tree(current), make_tree(BASE))
+
+    ids = [node.id for node in result.tree.nodes]
+    assert len(ids) == len(set(ids))
+    shop = result.tree.by_guid["g-shop"]
+    assert int(shop.id) > max(int(node.id) for node in make_tree(current).nodes)
+
+
+def test_unknown_prefer_is_rejected(make_tree):
+    with pytest.raises(ValueError):
+        merge_trees(None, make_tree(BASE), make_tree(BASE), prefer="newest")
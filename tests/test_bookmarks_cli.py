@@ -0,0 +1,35 @@
+import os
+import sys
+import subprocess
+
+import bookmarks_cli
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_import_does_not_load_backup_format_modules():
+    # profiles, list 같은 명령에서 sqlite3/스케줄러/감시 모듈을 읽지 않는다
+    code = ("import sys, bookmarks_cli; "
+            "print(' '.join(m for m in ('sqlite3', 'firefox_places', 'backup_archive', 'scheduler', 'watcher', "
+            "'bookmark_merge', 'backup_engine', 'ctypes') if m in sys.modules))")
+    loaded = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert loaded.stdout.strip() == ""
+
+
+class _Config:
+    def __init__(self, values):
+        self.values = values
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+def test_backup_options_prefer_command_line_over_config():
+    parser = bookmarks_cli.build_parser("backup_dir", _Config({"firefox_step_sleep": 0.5, "archive_codec": "bz2"}))
+    args = parser.parse_args(["backup", "--codec", "lzma", "--pages-per-step", "-1"])
+
+    options = bookmarks_cli._config_backup_options(args.config_manager, args)
+
+    assert options["archive_codec"] == "lzma"
+    assert options["pages_per_step"] == -1
+    assert options["step_sleep"] == 0.5
@@ -0,0 +1,74 @@
+import os
+
+import pytest
+
+import bookmarks_core
+from fixtures import generate_profile
+from firefox_places import MODE_BOOKMARKS, MODE_DATABASE
+
+
+@pytest.fixture
+def user_root(tmp_path, monkeypatch):
+    monkeypatch.setenv("APPDATA", str(tmp_path / "appdata"))
+    bookmarks_core.set_log_stream(False)
+    root = str(tmp_path / "root")
+    yield root
+    bookmarks_core.set_log_stream(None)
+
+
+@pytest.mark.parametrize("firefox_mode", [MODE_DATABASE, MODE_BOOKMARKS])
+def test_firefox_backup_skipped_when_places_only_touched(tmp_path, user_root, firefox_mode):
+    src_path, _total = generate_profile(user_root, "Firefox", 200)
+    bookmarks_core.set_user_root(user_root)
+    backup_dir = str(tmp_path / "backup")
+
+    first = bookmarks_core.perform_backup("Firefox", backup_dir, firefox_mode=firefox_mode)
+    assert first.success and not first.skipped
+
+    # 내용은 그대로 두고 수정 시각만 변경
+    st = os.stat(src_path)
+    os.utime(src_path, ns=(st.st_atime_ns, st.st_mtime_ns + 5 * 10**9))
+    second = bookmarks_core.perform_backup("Firefox", backup_dir, firefox_mode=firefox_mode)
+    assert second.success and second.skipped
+
+
+def test_formats_keep_separate_change_index_entries(tmp_path, user_root):
+    # 스케줄러 예시처럼 같은 프로필을 매시간 store + 매일 archive로 백업
+    generate_profile(user_root, "Chrome", 200)
+    bookmarks_core.set_user_root(user_root)
+    backup_dir = str(tmp_path / "backup")
+
+    for backup_format in ("store", "archive", "copy"):
+        result = bookmarks_core.perform_backup("Chrome", backup_dir, backup_format)
+        assert result.success and not result.skipped
+    for backup_format in ("store", "archive", "copy"):
+        result = bookmarks_core.perform_backup("Chrome", backup_dir, backup_format)
+        assert result.success and result.skipped, backup_format
+
+    # store 백업 뒤에도 copy 백업의 검증 해시가 남아 있다
+    copies = [r for r in bookmarks_core.verify_backups(backup_dir, "Chrome") if r["format"] == "copy"]
+    assert copies and all(r["ok"] is True for r in copies)
+
+
+def test_repeated_restores_keep_every_previous_file(tmp_path, user_root):
+    src_path, _total = generate_profile(user_root, "Chrome", 200)
+    bookmarks_core.set_user_root(user_root)
+    backup_dir = str(tmp_path / "backup")
+    assert bookmarks_core.perform_backup("Chrome", backup_dir).success
+    contents = []
+
+    # 같은 초 안에 두 번 복구해도 처음 복구 전의 파일이 덮어쓰이지 않는다
+    for i in range(2):
+        with open(src_path, "a", encoding="utf-8") as f:
+            f.write(f"\n// edit {i}\n")
+        with open(src_path, "rb") as f:
+            contents.append(f.read())
+        assert bookmarks_core.perform_restore("Chrome", backup_dir, restart_browser=False).success
+
+    entries = bookmarks_core._restore_backup_files("Chrome")
+    assert len(entries) == 2
+    saved = []
+    for entry in entries:
+        with open(entry["location"], "rb") as f:
+            saved.append(f.read())
+    assert sorted(saved) == sorted(contents)
@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+from delta_update import (make_delta, apply_delta, read_header, delta_asset_name, DeltaError, DeltaMismatch,
+                          DELTA_SUFFIX)
+
+
+def _versions(tmp_path):
+    """앞부분은 같고 중간이 바뀌고 끝에 내용이 붙은 두 버전"""
+    base = os.urandom(256 * 1024)
+    old = tmp_path / "old.exe"
+    new = tmp_path / "new.exe"
+    old.write_bytes(base)
+    new.write_bytes(base[:100000] + b"patched" * 10 + base[100003:] + os.urandom(5000))
+    return old, new
+
+
+def test_round_trip(tmp_path):
+    old, new = _versions(tmp_path)
+    delta = tmp_path / "app.delta"
+
+    stats = make_delta(str(old), str(new), str(delta), block_size=1024)
+    assert stats["copied"] > 0 and stats["size"] < new.stat().st_size // 4
+
+    out = tmp_path / "out.exe"
+    header = apply_delta(str(old), str(delta), str(out))
+    assert out.read_bytes() == new.read_bytes()
+    assert header == read_header(str(delta))
+    assert header["new_size"] == new.stat().st_size
+
+
+def test_wrong_old_version_is_rejected(tmp_path):
+    old, new = _versions(tmp_path)
+    delta = tmp_path / "app.delta"
+    make_delta(str(old), str(new), str(delta))
+    other = tmp_path / "other.exe"
+    other.write_bytes(b"x" * old.stat().st_size)
+
+    with pytest.raises(DeltaMismatch):
+        apply_delta(str(other), str(delta), str(tmp_path / "out.exe"))
+    assert not (tmp_path / "out.exe").exists()
+
+
+def test_truncated_delta_leaves_no_output(tmp_path):
+    old, new = _versions(tmp_path)
+    delta = tmp_path / "app.delta"
+    make_delta(str(old), str(new), str(delta))
+    data = delta.read_bytes()
+    delta.write_bytes(data[:len(data) // 2])
+
+    out = tmp_path / "out.exe"
+    out.write_bytes(b"previous")
+    with pytest.raises(DeltaError):
+        apply_delta(str(old), str(delta), str(out))
+    assert out.read_bytes() == b"previous"
+    assert sorted(os.listdir(tmp_path)) == ["app.delta", "new.exe", "old.exe", "out.exe"]
+
+
+def test_not_a_delta_file(tmp_path):
+    path = tmp_path / "app.delta"
+    path.write_bytes(b"PK\x03\x04 not a delta")
+    with pytest.raises(DeltaError):
+        read_header(str(path))
+
+
+def test_asset_name():
+    assert delta_asset_name("1.2.0") == "BrowserBookmarks_from_1.2.0" + DELTA_SUFFIX
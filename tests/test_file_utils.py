@@ -0,0 +1,78 @@
+import os
+import threading
+
+import pytest
+
+import file_utils
+from file_utils import atomic_write, replace_file, file_lock
+
+
+def test_atomic_write_keeps_original_on_error(tmp_path):
+    path = tmp_path / "state.json"
+    path.write_text("old")
+
+    with pytest.raises(RuntimeError):
+        with atomic_write(str(path), "w", encoding="utf-8") as f:
+            f.write("partial")
+            raise RuntimeError("중단")
+    assert path.read_text() == "old"
+    assert os.listdir(tmp_path) == ["state.json"]
+
+
+def test_replace_file_keeps_backup(tmp_path):
+    src, dst, backup = tmp_path / "new.exe", tmp_path / "app.exe", tmp_path / "app.exe.backup"
+    src.write_bytes(b"new")
+    dst.write_bytes(b"old")
+    backup.write_bytes(b"stale")
+
+    replace_file(str(src), str(dst), str(backup))
+
+    assert dst.read_bytes() == b"new" and backup.read_bytes() == b"old"
+    assert not src.exists()
+
+
+def test_replace_file_rolls_back_when_replace_fails(tmp_path, monkeypatch):
+    src, dst, backup = tmp_path / "new.exe", tmp_path / "app.exe", tmp_path / "app.exe.backup"
+    src.write_bytes(b"new")
+    dst.write_bytes(b"old")
+
+    # 하드 링크가 안 되는 파일 시스템: 기존 파일을 백업 이름으로 옮긴 뒤 새 파일 교체가 실패
+    def no_link(*args):
+        raise OSError("link not supported")
+
+    real_replace = os.replace
+
+    def failing_replace(a, b):
+        if os.fspath(a) == str(src):
+            raise PermissionError("locked")
+        real_replace(a, b)
+
+    monkeypatch.setattr(file_utils.os, "link", no_link)
+    monkeypatch.setattr(file_utils.os, "replace", failing_replace)
+
+    with pytest.raises(PermissionError):
+        replace_file(str(src), str(dst), str(backup))
+
+    assert dst.read_bytes() == b"old"
+    assert src.read_bytes() == b"new"
+    assert not backup.exists()
+
+
+def test_exclusive_lock_waits_for_shared(tmp_path):
+    path = str(tmp_path / ".lock")
+    order = []
+    with file_lock(path):
+        with file_lock(path):
+            # 공유 잠금끼리는 서로 기다리지 않는다
+            pass
+
+        def writer():
+            with file_lock(path, exclusive=True):
+                order.append("exclusive")
+
+        thread = threading.Thread(target=writer)
+        thread.start()
+        thread.join(0.2)
+        order.append("shared released")
+    thread.join(5)
+    assert order == ["shared released", "exclusive"]
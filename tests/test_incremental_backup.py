@@ -0,0 +1,121 @@
+import os
+import json
+
+import pytest
+
+from fixtures import generate_chromium, mutate_chromium
+from incremental_backup import (IncrementalStore, flatten_bookmarks, diff_states, apply_patch, serialize_state,
+                                KIND_FULL, KIND_PATCH)
+
+
+def _chromium_bytes(data):
+    # Chromium과 같은 형식(indent=3)으로 쓰면 복원한 파일이 원본과 바이트 단위로 같아야 한다
+    return json.dumps(data, indent=3, ensure_ascii=False).encode("utf-8")
+
+
+def _versions(tmp_path, count, nodes=1000):
+    """조금씩 바뀌는 Bookmarks 파일 count개 (경로, 내용) 목록"""
+    versions = []
+    src = str(tmp_path / "gen" / "v0")
+    generate_chromium(src, nodes, seed=0)
+    for n in range(count):
+        with open(src, "r", encoding="utf-8") as f:
+            content = _chromium_bytes(json.load(f))
+        path = str(tmp_path / "src" / f"Bookmarks.{n}")
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as f:
+            f.write(content)
+        versions.append((path, content))
+        next_src = str(tmp_path / "gen" / f"v{n + 1}")
+        mutate_chromium(src, next_src, fraction=0.01, seed=n + 1)
+        src = next_src
+    return versions
+
+
+def _rebuilt(store, manifest):
+    """캐시를 쓰지 않고 파일에서 다시 재구성한 내용"""
+    return serialize_state(store.materialize(manifest, use_cache=False))
+
+
+def test_patch_chain_restores_every_version_byte_equal(tmp_path):
+    store = IncrementalStore(str(tmp_path / "inc"))
+    versions = _versions(tmp_path, 6)
+    manifests = [store.put_file(path, "Chrome") for path, _content in versions]
+
+    assert [m["kind"] for m in manifests] == [KIND_FULL] + [KIND_PATCH] * 5
+    assert [m["depth"] for m in manifests] == list(range(6))
+    assert all(m["new_bytes"] < manifests[0]["new_bytes"] for m in manifests[1:])
+
+    for manifest, (_path, content) in zip(manifests, versions):
+        assert _rebuilt(store, manifest) == content
+        assert store.verify(manifest)
+        dst = str(tmp_path / "restored" / manifest["snapshot_id"])
+        os.makedirs(os.path.dirname(dst), exist_ok=True)
+        store.restore_file(manifest, dst)
+        with open(dst, "rb") as f:
+            assert f.read() == content
+
+
+def test_checkpoints_and_compaction_keep_versions_restorable(tmp_path):
+    store = IncrementalStore(str(tmp_path / "inc"), full_every=3, compact_full_every=100)
+    versions = _versions(tmp_path, 8)
+    manifests = [store.put_file(path, "Chrome") for path, _content in versions]
+
+    assert [m["kind"] for m in manifests] == [KIND_FULL, KIND_PATCH, KIND_PATCH] * 2 + [KIND_FULL, KIND_PATCH]
+    # 새 체크포인트를 쓸 때마다 이전 체크포인트는 패치로 바뀐다
+    stored = [store.load_manifest("Chrome", m["snapshot_id"]) for m in manifests]
+    assert [m["kind"] for m in stored].count(KIND_FULL) == 2
+    for manifest, (_path, content) in zip(stored, versions):
+        assert _rebuilt(store, manifest) == content
+
+
+def test_deleting_a_middle_snapshot_rebases_its_child(tmp_path):
+    store = IncrementalStore(str(tmp_path / "inc"))
+    versions = _versions(tmp_path, 4)
+    manifests = [store.put_file(path, "Chrome") for path, _content in versions]
+
+    stats = store.delete_snapshots("Chrome", [manifests[0]["snapshot_id"], manifests[2]["snapshot_id"]])
+
+    assert stats == {"deleted": 2, "rebased": 2}
+    remaining = [store.load_manifest("Chrome", sid) for sid in store.list_snapshots("Chrome")]
+    assert [m["snapshot_id"] for m in remaining] == [manifests[1]["snapshot_id"], manifests[3]["snapshot_id"]]
+    assert remaining[0]["kind"] == KIND_FULL
+    assert remaining[1]["parent"] == manifests[1]["snapshot_id"]
+    assert _rebuilt(store, remaining[0]) == versions[1][1]
+    assert _rebuilt(store, remaining[1]) == versions[3][1]
+
+
+def test_corrupted_patch_fails_verification_and_keeps_destination(tmp_path):
+    store = IncrementalStore(str(tmp_path / "inc"))
+    versions = _versions(tmp_path, 2)
+    manifests = [store.put_file(path, "Chrome") for path, _content in versions]
+    patch_path = tmp_path / "inc" / "Chrome" / manifests[1]["data"]
+    patch = json.loads(patch_path.read_text(encoding="utf-8"))
+    key = next(iter(patch["set"]))
+    patch["set"][key]["name"] += " (corrupted)"
+    patch_path.write_text(json.dumps(patch), encoding="utf-8")
+    store._cache_drop("Chrome")
+    dst = tmp_path / "Bookmarks"
+    dst.write_bytes(b"current")
+
+    assert not store.verify(manifests[1])
+    with pytest.raises(ValueError):
+        store.restore_file(manifests[1], str(dst))
+    assert dst.read_bytes() == b"current"
+
+
+def test_child_insert_is_recorded_as_splice():
+    children = [{"id": str(n), "name": f"b{n}", "type": "url", "url": f"https://e.example/{n}"} for n in range(10, 60)]
+    old = {"roots": {"bookmark_bar": {"id": "1", "type": "folder", "children": children}}, "version": 1}
+    new = json.loads(json.dumps(old))
+    new["roots"]["bookmark_bar"]["children"].insert(20, {"id": "99", "name": "new", "type": "url",
+                                                         "url": "https://new.example/"})
+    del new["roots"]["bookmark_bar"]["children"][40]
+    old_state, new_state = flatten_bookmarks(old), flatten_bookmarks(new)
+
+    patch = diff_states(old_state, new_state)
+
+    assert list(patch["set"]) == ["99"]
+    assert patch["delete"] == ["49"]
+    assert patch["splice"] == {"1": [20, 20, ["99"] + [str(n) for n in range(30, 49)]]}
+    assert apply_patch(old_state, patch) == new_state
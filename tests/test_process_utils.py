@@ -0,0 +1,154 @@
+import os
+import sys
+import time
+import sqlite3
+import threading
+import subprocess
+
+import pytest
+
+import process_utils
+from process_utils import ProcInspector, is_file_locked, wait_for_unlock, wait_for_handoff
+
+pytestmark = pytest.mark.skipif(not os.path.isdir("/proc/self"), reason="/proc이 없는 플랫폼")
+
+
+def _spawn(tmp_path, seconds, name="dummyapp.exe"):
+    """name으로 실행되는 가상 프로그램 (Python 실행 파일에 대한 심볼릭 링크)"""
+    exe = tmp_path / name
+    if not exe.exists():
+        exe.symlink_to(sys.executable)
+    child = subprocess.Popen([str(exe), "-c", f"import time; time.sleep({seconds!r})"])
+    # fork 직후에는 아직 부모(pytest)의 이름이므로 exec될 때까지 기다린다
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        with open(f"/proc/{child.pid}/cmdline", "rb") as f:
+            if f.read().startswith(os.fsencode(exe)):
+                break
+        time.sleep(0.01)
+    return child
+
+
+def test_find_and_wait_for_exit(tmp_path):
+    inspector = ProcInspector()
+    child = _spawn(tmp_path, 30)
+    try:
+        assert child.pid in inspector.find("DummyApp.exe")
+        assert inspector.is_running(child.pid)
+        assert inspector.wait_for_exit([child.pid], timeout=0.2) == [child.pid]
+
+        inspector.terminate([child.pid])
+        # 회수하지 않은 종료 프로세스(zombie)도 끝난 것으로 본다
+        assert inspector.wait_for_exit([child.pid], timeout=5) == []
+        assert child.pid not in inspector.find("dummyapp.exe")
+    finally:
+        child.kill()
+        child.wait()
+
+
+def test_is_running_for_missing_pid(tmp_path):
+    assert not ProcInspector(str(tmp_path)).is_running(12345)
+    assert ProcInspector(str(tmp_path)).find("dummyapp.exe") == []
+
+
+def _locked_database(path):
+    conn = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    conn.execute("CREATE TABLE t (x)")
+    conn.execute("BEGIN EXCLUSIVE")
+    conn.execute("INSERT INTO t VALUES (1)")
+    return conn
+
+
+def test_wait_for_unlock_returns_when_released(tmp_path):
+    path = str(tmp_path / "places.sqlite")
+    conn = _locked_database(path)
+    assert is_file_locked(path)
+    timer = threading.Timer(0.3, conn.execute, ("COMMIT",))
+    timer.start()
+    try:
+        started = time.monotonic()
+        assert wait_for_unlock(path, timeout=5, interval=0.02)
+        assert 0.25 <= time.monotonic() - started < 5
+    finally:
+        timer.join()
+        conn.close()
+    assert not is_file_locked(path)
+
+
+def test_wait_for_unlock_times_out(tmp_path):
+    path = str(tmp_path / "places.sqlite")
+    conn = _locked_database(path)
+    try:
+        assert not wait_for_unlock(path, timeout=0.2, interval=0.05)
+    finally:
+        conn.close()
+    assert wait_for_unlock(str(tmp_path / "missing.exe"), timeout=0)
+
+
+def _failing_open(error):
+    def fake_open(*args, **kwargs):
+        raise error
+    return fake_open
+
+
+def test_permission_error_is_not_a_lock(tmp_path, monkeypatch):
+    # 읽기 전용 파일/폴더 접근 거부는 기다려도 풀리지 않으므로 바로 반환
+    path = tmp_path / "Bookmarks"
+    path.write_text("{}")
+    monkeypatch.setattr(process_utils, "open", _failing_open(PermissionError(13, "Access is denied")),
+                        raising=False)
+    started = time.monotonic()
+    assert not is_file_locked(str(path))
+    assert wait_for_unlock(str(path), timeout=5)
+    assert time.monotonic() - started < 1
+
+
+def test_sharing_violation_is_a_lock(tmp_path, monkeypatch):
+    path = tmp_path / "Bookmarks"
+    path.write_text("{}")
+    error = PermissionError(13, "The process cannot access the file because it is being used by another process")
+    error.winerror = 32
+    monkeypatch.setattr(process_utils, "open", _failing_open(error), raising=False)
+    assert is_file_locked(str(path))
+    assert not wait_for_unlock(str(path), timeout=0.1, interval=0.02)
+
+
+def test_wait_for_handoff_returns_when_app_exits(tmp_path):
+    target = tmp_path / "BrowserBookmarks.exe"
+    target.write_bytes(b"exe")
+    child = _spawn(tmp_path, 0.3)
+    try:
+        result = wait_for_handoff(str(target), pid=child.pid, timeout=10)
+    finally:
+        child.wait()
+    assert child.pid in result["pids"]
+    assert result["remaining"] == [] and result["unlocked"]
+    # 고정 대기 없이 프로그램이 끝나는 즉시 반환
+    assert 0.2 <= result["exit_wait"] < 5
+
+
+def test_wait_for_handoff_times_out(tmp_path):
+    target = tmp_path / "BrowserBookmarks.exe"
+    target.write_bytes(b"exe")
+    child = _spawn(tmp_path, 30)
+    try:
+        result = wait_for_handoff(str(target), pid=child.pid, timeout=0.3, inspector=ProcInspector())
+    finally:
+        child.kill()
+        child.wait()
+    assert result["remaining"] == [child.pid]
+    assert result["exit_wait"] < 5
+
+
+def test_wait_for_handoff_finds_instances_by_name(tmp_path):
+    # PID를 받지 못해도 같은 이름으로 실행 중인 프로그램을 기다린다
+    (tmp_path / "install").mkdir()
+    target = tmp_path / "install" / "BrowserBookmarks.exe"
+    target.write_bytes(b"exe")
+    child = _spawn(tmp_path, 0.3, name="BrowserBookmarks.exe")
+    try:
+        result = wait_for_handoff(str(target), timeout=10, inspector=ProcInspector())
+    finally:
+        child.wait()
+    assert result["pids"] == [child.pid] and result["remaining"] == []
+    assert result["exit_wait"] >= 0.2
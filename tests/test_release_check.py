@@ -0,0 +1,96 @@
+import json
+
+import pytest
+
+from release_check import ReleaseCheckCache, ReleaseCheckError, SOURCE_CACHE, SOURCE_NOT_MODIFIED, SOURCE_NETWORK
+
+RELEASE = {"tag_name": "v2.0.0", "assets": []}
+ETAG = '"release-1"'
+
+
+def _serve_release(http_server, path="/releases/latest"):
+    def handler(request):
+        if request.headers.get("If-None-Match") == ETAG:
+            request.send_response(304)
+            request.send_header("ETag", ETAG)
+            request.send_header("Content-Length", "0")
+            request.end_headers()
+            return
+        body = json.dumps(RELEASE).encode("utf-8")
+        request.send_response(200)
+        request.send_header("Content-Type", "application/json")
+        request.send_header("Content-Length", str(len(body)))
+        request.send_header("ETag", ETAG)
+        request.end_headers()
+        request.wfile.write(body)
+
+    http_server.routes[path] = handler
+    return http_server.url(path)
+
+
+def _serve_error(http_server, status, headers=None, path="/releases/latest"):
+    def handler(request):
+        request.send_response(status)
+        for name, value in (headers or {}).items():
+            request.send_header(name, value)
+        request.send_header("Content-Length", "0")
+        request.end_headers()
+
+    http_server.routes[path] = handler
+    return http_server.url(path)
+
+
+def test_min_interval_then_conditional_request(tmp_path, http_server):
+    url = _serve_release(http_server)
+    cache = ReleaseCheckCache(str(tmp_path / "release_check.json"), min_interval=3600)
+
+    assert cache.fetch(url, now=1000) == (RELEASE, SOURCE_NETWORK)
+    # 간격 안에서는 요청하지 않는다
+    assert cache.fetch(url, now=2000) == (RELEASE, SOURCE_CACHE)
+    assert len(http_server.requests) == 1
+
+    # 간격이 지나면 If-None-Match를 보내고 304면 저장된 응답을 쓴다
+    assert cache.fetch(url, now=1000 + 3600) == (RELEASE, SOURCE_NOT_MODIFIED)
+    assert http_server.requests[-1][1]["If-None-Match"] == ETAG
+    assert cache.load(url)["checked_at"] == 1000 + 3600
+
+
+def test_force_ignores_min_interval(tmp_path, http_server):
+    url = _serve_release(http_server)
+    cache = ReleaseCheckCache(str(tmp_path / "release_check.json"))
+    cache.fetch(url, now=1000)
+
+    assert cache.fetch(url, force=True, now=1001) == (RELEASE, SOURCE_NOT_MODIFIED)
+    assert len(http_server.requests) == 2
+
+
+def test_rate_limit_uses_cache_and_retry_after(tmp_path, http_server):
+    url = _serve_release(http_server)
+    cache = ReleaseCheckCache(str(tmp_path / "release_check.json"), min_interval=0, retry_delay=60)
+    cache.fetch(url, now=1000)
+
+    _serve_error(http_server, 429, {"Retry-After": "600"})
+    assert cache.fetch(url, now=2000) == (RELEASE, SOURCE_CACHE)
+    state = cache.load(url)
+    assert state["failures"] == 1 and state["retry_after"] == 2000 + 600
+
+    # 대기 시간 안에는 다시 요청하지 않는다
+    requests = len(http_server.requests)
+    assert cache.fetch(url, now=2300) == (RELEASE, SOURCE_CACHE)
+    assert len(http_server.requests) == requests
+
+
+def test_failure_without_cache_backs_off(tmp_path, http_server):
+    url = _serve_error(http_server, 503)
+    cache = ReleaseCheckCache(str(tmp_path / "release_check.json"), retry_delay=60)
+
+    with pytest.raises(ReleaseCheckError):
+        cache.fetch(url, now=1000)
+    with pytest.raises(ReleaseCheckError):
+        cache.fetch(url, now=1030)
+    assert len(http_server.requests) == 1
+
+    # 연속 실패마다 대기 시간이 두 배
+    with pytest.raises(ReleaseCheckError):
+        cache.fetch(url, now=1060)
+    assert cache.load(url)["retry_after"] == 1060 + 120
@@ -0,0 +1,110 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from scheduler import CronSchedule, IntervalSchedule, ScheduledJob, Scheduler, load_state
+
+# 2024-01-01은 월요일, 2024-01-13은 토요일
+MONDAY = datetime(2024, 1, 1)
+
+
+def _runs(schedule, moment, count):
+    runs = []
+    for _ in range(count):
+        moment = schedule.next_after(moment)
+        runs.append(moment)
+    return runs
+
+
+def _job(schedule, **options):
+    return ScheduledJob("job", schedule, "/backups", **options)
+
+
+def test_day_of_month_and_weekday_match_either():
+    # 일과 요일을 둘 다 지정하면 13일 또는 금요일
+    runs = _runs(CronSchedule("0 9 13 * 5"), MONDAY, 8)
+    assert [run.day for run in runs] == [5, 12, 13, 19, 26, 2, 9, 13]
+    assert all(run.hour == 9 and run.minute == 0 for run in runs)
+    assert runs[-1] == datetime(2024, 2, 13, 9, 0)
+
+
+@pytest.mark.parametrize("expr, days", [("0 9 * * 5", [5, 12, 19]), ("0 9 13 * *", [13, 13, 13])])
+def test_wildcard_day_field_restricts_by_the_other(expr, days):
+    runs = _runs(CronSchedule(expr), MONDAY, 3)
+    assert [run.day for run in runs] == days
+
+
+def test_weekday_seven_is_sunday():
+    sunday = CronSchedule("0 0 * * 7")
+    assert sunday.weekdays == CronSchedule("0 0 * * 0").weekdays == {6}
+    assert sunday.next_after(MONDAY) == datetime(2024, 1, 7)
+    assert [run.day for run in _runs(CronSchedule("0 0 * * 5-7"), MONDAY, 4)] == [5, 6, 7, 12]
+
+
+def test_step_fields():
+    schedule = CronSchedule("*/15 */6 * * *")
+    assert schedule.minutes == {0, 15, 30, 45}
+    assert schedule.hours == {0, 6, 12, 18}
+    assert schedule.next_after(datetime(2024, 1, 1, 6, 50)) == datetime(2024, 1, 1, 12, 0)
+    assert CronSchedule("5/20 * * * *").minutes == {5, 25, 45}
+    assert CronSchedule("10-30/10,59 * * * *").minutes == {10, 20, 30, 59}
+
+
+def test_next_after_is_strictly_later_and_skips_months():
+    schedule = CronSchedule("30 2 * * *")
+    assert schedule.next_after(datetime(2024, 1, 1, 2, 30)) == datetime(2024, 1, 2, 2, 30)
+    assert schedule.next_after(datetime(2024, 1, 1, 2, 29, 59)) == datetime(2024, 1, 1, 2, 30)
+    assert CronSchedule("0 0 29 2 *").next_after(datetime(2024, 3, 1)) == datetime(2028, 2, 29)
+
+
+@pytest.mark.parametrize("expr", ["* * * *", "*/0 * * * *", "60 * * * *", "0 5-1 * * *", "0 0 * * 8"])
+def test_invalid_cron_is_rejected(expr):
+    with pytest.raises(ValueError):
+        CronSchedule(expr)
+
+
+def test_first_plan_without_history():
+    now = datetime(2024, 1, 1, 10, 20)
+    rng = random.Random(0)
+    # 간격 작업은 바로, cron 작업은 다음 예정 시각에 실행
+    assert _job(IntervalSchedule(3600)).plan_next(now, rng) == now
+    assert _job(CronSchedule("0 * * * *")).plan_next(now, rng) == datetime(2024, 1, 1, 11, 0)
+
+
+def test_jitter_delays_within_range():
+    now = datetime(2024, 1, 1, 10, 20)
+    job = _job(CronSchedule("0 * * * *"), jitter=300)
+    rng = random.Random(0)
+    for _ in range(20):
+        delay = job.plan_next(now, rng) - datetime(2024, 1, 1, 11, 0)
+        assert timedelta(0) <= delay <= timedelta(seconds=300)
+
+
+def test_missed_runs_collapse_after_restoring_state(tmp_path):
+    state_path = str(tmp_path / "schedule_state.json")
+    now = datetime(2024, 1, 3, 10, 20)
+    rng = random.Random(0)
+
+    job = ScheduledJob("hourly", CronSchedule("0 * * * *"), "/backups")
+    job.last_run = now - timedelta(days=2)
+    job.runs = 7
+    Scheduler([job], state_path=state_path)._save_state()
+    assert load_state(state_path)["hourly"]["last_run"] == "2024-01-01T10:20:00"
+
+    restored = ScheduledJob("hourly", CronSchedule("0 * * * *"), "/backups")
+    scheduler = Scheduler([restored], state_path=state_path)
+    scheduler._restore_state()
+    assert restored.last_run == now - timedelta(days=2) and restored.runs == 7
+
+    # 놓친 48번의 실행은 지금 한 번으로 합치고, 그다음은 현재 기준 다음 정각
+    assert restored.plan_next(now, rng) == now
+    restored.last_run = now
+    assert restored.plan_next(now, rng) == datetime(2024, 1, 3, 11, 0)
+
+
+def test_recent_history_waits_for_next_slot():
+    now = datetime(2024, 1, 1, 10, 20)
+    job = _job(IntervalSchedule(3600))
+    job.last_run = now - timedelta(minutes=15)
+    assert job.plan_next(now, random.Random(0)) == now + timedelta(minutes=45)
@@ -0,0 +1,90 @@
+import os
+import json
+import hashlib
+
+import pytest
+
+from update_downloader import (UpdateDownloader, ChecksumMismatch, DownloadError, parse_checksums,
+                               find_checksum_asset, PARTIAL_SUFFIX, STATE_SUFFIX)
+
+DATA = os.urandom(300 * 1024)
+SHA256 = hashlib.sha256(DATA).hexdigest()
+
+
+def _downloader(tmp_path, **options):
+    return UpdateDownloader(str(tmp_path / "dl"), chunk_size=16 * 1024, retries=2, retry_delay=0, **options)
+
+
+def test_download_verifies_checksum(tmp_path, http_server):
+    http_server.serve_file("/app.zip", DATA)
+    result = _downloader(tmp_path).download(http_server.url("/app.zip"), SHA256.upper())
+
+    assert result.verified and result.sha256 == SHA256 and result.resumed_from == 0
+    with open(result.path, "rb") as f:
+        assert f.read() == DATA
+    assert sorted(os.listdir(tmp_path / "dl")) == ["app.zip"]
+
+
+def test_dropped_connection_resumes_with_range_and_if_range(tmp_path, http_server):
+    http_server.serve_file("/app.zip", DATA, etag='"abc"', drop_after=100 * 1024)
+    result = _downloader(tmp_path).download(http_server.url("/app.zip"), SHA256)
+
+    # 같은 호출 안에서 다시 연결한 부분은 resumed_from(이전 .part 재사용)에 들어가지 않는다
+    assert result.sha256 == SHA256 and result.resumed_from == 0
+    assert len(http_server.requests) == 2
+    _path, headers = http_server.requests[-1]
+    assert headers["Range"] == f"bytes={100 * 1024}-"
+    assert headers["If-Range"] == '"abc"'
+
+
+def test_partial_from_previous_run_is_resumed(tmp_path, http_server):
+    http_server.serve_file("/app.zip", DATA, etag='"abc"')
+    url = http_server.url("/app.zip")
+    target = tmp_path / "dl" / "app.zip"
+    target.parent.mkdir()
+    (tmp_path / "dl" / ("app.zip" + PARTIAL_SUFFIX)).write_bytes(DATA[:50000])
+    (tmp_path / "dl" / ("app.zip" + STATE_SUFFIX)).write_text(
+        json.dumps({"url": url, "sha256": SHA256, "etag": '"abc"', "last_modified": None, "total": len(DATA)}))
+
+    result = _downloader(tmp_path).download(url, SHA256)
+
+    assert result.resumed_from == 50000 and result.sha256 == SHA256
+    assert len(http_server.requests) == 1
+
+
+def test_changed_file_on_server_restarts_from_zero(tmp_path, http_server):
+    # If-Range가 맞지 않으면 서버가 전체(200)를 보낸다
+    http_server.serve_file("/app.zip", DATA, etag='"new"')
+    url = http_server.url("/app.zip")
+    (tmp_path / "dl").mkdir()
+    (tmp_path / "dl" / ("app.zip" + PARTIAL_SUFFIX)).write_bytes(b"x" * 50000)
+    (tmp_path / "dl" / ("app.zip" + STATE_SUFFIX)).write_text(
+        json.dumps({"url": url, "sha256": SHA256, "etag": '"old"', "last_modified": None, "total": len(DATA)}))
+
+    result = _downloader(tmp_path).download(url, SHA256)
+
+    assert result.resumed_from == 0 and result.sha256 == SHA256
+    assert http_server.requests[0][1]["If-Range"] == '"old"'
+
+
+def test_checksum_mismatch_removes_partial(tmp_path, http_server):
+    http_server.serve_file("/app.zip", DATA)
+    with pytest.raises(ChecksumMismatch):
+        _downloader(tmp_path).download(http_server.url("/app.zip"), "0" * 64)
+    assert os.listdir(tmp_path / "dl") == []
+
+
+def test_missing_file_is_not_retried(tmp_path, http_server):
+    with pytest.raises(DownloadError):
+        _downloader(tmp_path).download(http_server.url("/missing.zip"))
+    assert len(http_server.requests) == 1
+
+
+def test_parse_checksums_and_asset_lookup():
+    text = f"{SHA256}  BrowserBookmarks_Portable.zip\n{'1' * 64} *updater.exe\n# comment\n"
+    checksums = parse_checksums(text)
+    assert checksums["browserbookmarks_portable.zip"] == SHA256
+    assert checksums["updater.exe"] == "1" * 64
+    assets = [{"name": "app.zip", "browser_download_url": "u1"},
+              {"name": "SHA256SUMS.txt", "browser_download_url": "u2"}]
+    assert find_checksum_asset(assets) == "u2"
@@ -0,0 +1,316 @@
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+import http.client
+import urllib.request
+import urllib.error
+from file_utils import atomic_write, replace_file
+
+# 업데이트 파일 다운로드 (이어받기 + SHA-256 검증)
+#
+#   downloader = UpdateDownloader(download_dir, chunk_size=64 * 1024)
+#   result = downloader.download(url, expected_sha256=..., progress_callback=on_progress)
+#   result.path, result.size, result.sha256, result.resumed_from
+#
+# - 받는 중인 파일은 <파일>.part, 이어받기 정보(URL, ETag 등)는 <파일>.part.json에 둔다.
+#   연결이 끊기면 retries번까지 Range 요청으로 이어받고, 다음 실행에서도 이어받는다.
+# - 서버가 Range를 지원하지 않거나(200 응답) 파일이 바뀌었으면(If-Range 불일치) 처음부터 다시 받는다.
+# - 받은 바이트를 그대로 SHA-256에 넣어 다 받은 뒤 파일을 다시 읽지 않는다 (이어받을 때는 기존 .part만 먼저 읽음).
+#   체크섬이 다르면 .part를 지우고, 이어받은 파일이었으면 처음부터 한 번 더 받은 뒤에도 다를 때 ChecksumMismatch.
+# - progress_callback(받은 바이트, 전체 바이트 또는 None)은 다운로드 스레드에서
+#   progress_interval초에 한 번만 호출된다. GUI에서는 after()로 메인 스레드에 넘겨야 한다.
+# updater.exe와 마찬가지로 tkinter 없이 쓸 수 있도록 file_utils 외의 다른 프로젝트 모듈을 import하지 않는다.
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+DEFAULT_TIMEOUT = 30
+DEFAULT_RETRIES = 3
+DEFAULT_RETRY_DELAY = 1.0
+DEFAULT_PROGRESS_INTERVAL = 0.1
+
+PARTIAL_SUFFIX = ".part"
+STATE_SUFFIX = ".part.json"
+
+# 릴리스에 함께 올리는 체크섬 파일 (sha256sum 형식: "<해시>  <파일 이름>")
+CHECKSUM_ASSET_NAMES = ("sha256sums.txt", "sha256sums")
+
+_SHA256_RE = re.compile(r"\b([0-9a-fA-F]{64})\b")
+_CONTENT_RANGE_RE = re.compile(r"bytes\s+(\d+)-(\d+)/(\d+|\*)")
+
+# 이어받기를 다시 시도할 네트워크 오류 (HTTPError는 5xx만 다시 시도, 디스크 쓰기 오류는 제외)
+RETRYABLE_ERRORS = (urllib.error.URLError, http.client.HTTPException, ConnectionError, TimeoutError)
+
+
+class DownloadError(Exception):
+    """다운로드 실패"""
+
+
+class ChecksumMismatch(DownloadError):
+    """받은 파일의 SHA-256이 체크섬 파일과 다름"""
+
+
+class DownloadResult:
+    """download()의 결과"""
+
+    def __init__(self, path, size, sha256, resumed_from=0, verified=False):
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+        self.resumed_from = resumed_from  # 이어받기를 시작한 위치 (처음부터 받았으면 0)
+        self.verified = verified          # 체크섬과 비교했으면 True
+
+
+class ProgressThrottle:
+    """진행률 콜백을 interval초에 한 번만 호출 (마지막 값은 finish()로 항상 전달)"""
+
+    def __init__(self, callback, interval=DEFAULT_PROGRESS_INTERVAL):
+        self.callback = callback
+        self.interval = interval
+        self._last = None
+        self._lock = threading.Lock()
+
+    def __call__(self, done, total, force=False):
+        if not self.callback:
+            return
+        now = time.monotonic()
+        with self._lock:
+            if not force and self._last is not None and now - self._last < self.interval:
+                return
+            self._last = now
+        self.callback(done, total)
+
+    def finish(self, done, total):
+        self(done, total, force=True)
+
+
+# 체크섬
+def parse_checksums(text):
+    """체크섬 파일 내용 -> {파일 이름(소문자): 해시(소문자)}
+
+    sha256sum 형식("<해시>  <이름>", "<해시> *<이름>")과 "<이름>: <해시>" 형식을 읽는다.
+    """
+    checksums = {}
+    for line in text.splitlines():
+        line = line.strip()
+        match = _SHA256_RE.search(line)
+        if not line or line.startswith("#") or not match:
+            continue
+        name = (line[:match.start()] + line[match.end():]).strip().lstrip("*").strip(" :")
+        if name:
+            checksums[os.path.basename(name).lower()] = match.group(1).lower()
+    return checksums
+
+
+def find_checksum_asset(assets):
+    """GitHub 릴리스 assets 목록에서 체크섬 파일의 다운로드 URL (없으면 None)"""
+    for asset in assets:
+        if asset.get("name", "").lower() in CHECKSUM_ASSET_NAMES:
+            return asset.get("browser_download_url")
+    return None
+
+
+def fetch_expected_sha256(checksum_url, file_name, timeout=DEFAULT_TIMEOUT):
+    """체크섬 파일을 받아 file_name의 SHA-256을 반환 (목록에 없으면 None)"""
+    with urllib.request.urlopen(checksum_url, timeout=timeout) as response:
+        text = response.read().decode("utf-8-sig", errors="replace")
+    return parse_checksums(text).get(os.path.basename(file_name).lower())
+
+
+def file_name_from_url(url):
+    return urllib.request.url2pathname(url.split("?", 1)[0].rstrip("/").rsplit("/", 1)[-1])
+
+
+class UpdateDownloader:
+    """HTTP(S) 파일 다운로드 (Range 이어받기, 스트리밍 SHA-256 검증)"""
+
+    def __init__(self, download_dir, chunk_size=DEFAULT_CHUNK_SIZE, timeout=DEFAULT_TIMEOUT,
+                 retries=DEFAULT_RETRIES, retry_delay=DEFAULT_RETRY_DELAY,
+                 progress_interval=DEFAULT_PROGRESS_INTERVAL):
+        self.download_dir = download_dir
+        self.chunk_size = max(int(chunk_size), 1024)
+        self.timeout = timeout
+        self.retries = retries
+        self.retry_delay = retry_delay
+        self.progress_interval = progress_interval
+
+    # 이어받기 정보
+    def _load_state(self, path):
+        try:
+            with open(path + STATE_SUFFIX, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save_state(self, path, state):
+        with atomic_write(path + STATE_SUFFIX, "w", encoding="utf-8") as f:
+            json.dump(state, f)
+
+    def _discard_partial(self, path):
+        for suffix in (PARTIAL_SUFFIX, STATE_SUFFIX):
+            try:
+                os.remove(path + suffix)
+            except FileNotFoundError:
+                pass
+
+    def _resume_offset(self, path, url, expected_sha256):
+        """이어받을 수 있는 .part 크기 (다른 URL/체크섬으로 받던 파일이면 지우고 0)"""
+        partial = path + PARTIAL_SUFFIX
+        if not os.path.exists(partial):
+            return 0, {}
+        state = self._load_state(path)
+        if state.get("url") != url or state.get("sha256") != expected_sha256:
+            self._discard_partial(path)
+            return 0, {}
+        return os.path.getsize(partial), state
+
+    @staticmethod
+    def _hash_file(path, hasher, chunk_size):
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(chunk_size), b""):
+                hasher.update(chunk)
+        return hasher
+
+    # 다운로드
+    def download(self, url, expected_sha256=None, progress_callback=None, file_name=None):
+        """url을 download_dir/file_name으로 받아 DownloadResult 반환
+
+        expected_sha256이 있으면 받은 내용과 비교하고, 다르면 ChecksumMismatch.
+        이미 같은 체크섬의 완성된 파일이 있으면 다시 받지 않는다.
+        """
+        expected_sha256 = expected_sha256.lower() if expected_sha256 else None
+        os.makedirs(self.download_dir, exist_ok=True)
+        path = os.path.join(self.download_dir, file_name or file_name_from_url(url))
+        progress = ProgressThrottle(progress_callback, self.progress_interval)
+
+        if expected_sha256 and os.path.exists(path):
+            existing = self._hash_file(path, hashlib.sha256(), self.chunk_size).hexdigest()
+            if existing == expected_sha256:
+                size = os.path.getsize(path)
+                progress.finish(size, size)
+                return DownloadResult(path, size, existing, resumed_from=size, verified=True)
+
+        offset, state = self._resume_offset(path, url, expected_sha256)
+        while True:
+            size, total, hasher, resumed_from = self._download_with_retries(url, path, offset, state,
+                                                                            expected_sha256, progress)
+            digest = hasher.hexdigest()
+            if not expected_sha256 or digest == expected_sha256:
+                break
+            self._discard_partial(path)
+            if resumed_from:
+                # 이어받은 앞부분이 잘못되었을 수 있으므로 처음부터 한 번 더 받는다
+                offset, state = 0, {}
+                continue
+            raise ChecksumMismatch(f"SHA-256 불일치: {digest} (예상 {expected_sha256})")
+
+        replace_file(path + PARTIAL_SUFFIX, path)
+        self._discard_partial(path)
+        progress.finish(size, total if total is not None else size)
+        return DownloadResult(path, size, digest, resumed_from=resumed_from,
+                              verified=bool(expected_sha256))
+
+    def _download_with_retries(self, url, path, offset, state, expected_sha256, progress):
+        """연결이 끊기면 retries번까지 끊긴 위치부터 다시 요청.
+
+        (크기, 전체 크기, 해시, 처음 .part에서 그대로 쓴 바이트 수) 반환
+        """
+        attempt = 0
+        reused = offset
+        while True:
+            try:
+                size, total, hasher, start = self._fetch(url, path, offset, state, expected_sha256, progress)
+            except urllib.error.HTTPError as e:
+                if e.code < 500 or attempt >= self.retries:
+                    raise DownloadError(f"다운로드 실패 (HTTP {e.code}): {url}") from e
+            except RETRYABLE_ERRORS as e:
+                if attempt >= self.retries:
+                    raise DownloadError(f"다운로드 실패 ({attempt + 1}회 시도): {e}") from e
+            else:
+                # 서버가 전체(200)를 다시 보냈으면 기존 .part는 쓰이지 않았다
+                return size, total, hasher, min(reused, start)
+            attempt += 1
+            time.sleep(self.retry_delay * (2 ** (attempt - 1)))
+            offset, state = self._resume_offset(path, url, expected_sha256)
+
+    def _fetch(self, url, path, offset, state, expected_sha256, progress):
+        """요청 한 번으로 .part에 이어 쓰기. (받은 뒤 .part 크기, 전체 크기 또는 None, 해시, 시작 위치) 반환"""
+        partial = path + PARTIAL_SUFFIX
+        headers = {"User-Agent": "BrowserBookmarks-Updater"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            # 서버의 파일이 바뀌었으면 Range를 무시하고 전체(200)를 보내도록
+            validator = state.get("etag") or state.get("last_modified")
+            if validator:
+                headers["If-Range"] = validator
+        request = urllib.request.Request(url, headers=headers)
+        try:
+            response = urllib.request.urlopen(request, timeout=self.timeout)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # 요청 범위가 파일 끝을 넘음: 이미 다 받았으면 그대로, 아니면 처음부터
+            total = _parse_total(e.headers.get("Content-Range"))
+            if total == offset:
+                return offset, total, self._hash_file(partial, hashlib.sha256(), self.chunk_size), offset
+            self._discard_partial(path)
+            return self._fetch(url, path, 0, {}, expected_sha256, progress)
+
+        with response:
+            status = getattr(response, "status", None) or response.getcode()
+            hasher = hashlib.sha256()
+            if status == 206 and offset:
+                start = _parse_range_start(response.headers.get("Content-Range"))
+                if start != offset:
+                    raise DownloadError(f"서버가 다른 위치를 보냈습니다: {start} (요청 {offset})")
+                total = _parse_total(response.headers.get("Content-Range"))
+                # 이어받는 경우 기존 부분을 먼저 해시에 넣어 둔다
+                self._hash_file(partial, hasher, self.chunk_size)
+                mode = "ab"
+            else:
+                # Range 미지원 또는 파일 변경: 처음부터
+                offset = 0
+                length = response.headers.get("Content-Length")
+                total = int(length) if length and length.isdigit() else None
+                mode = "wb"
+
+            start = offset
+            # 이어받기에 필요한 정보는 데이터를 쓰기 전에 저장
+            state = {
+                "url": url,
+                "sha256": expected_sha256,
+                "etag": response.headers.get("ETag"),
+                "last_modified": response.headers.get("Last-Modified"),
+                "total": total,
+            }
+            self._save_state(path, state)
+
+            with open(partial, mode) as f:
+                progress(offset, total)
+                while True:
+                    chunk = response.read(self.chunk_size)
+                    if not chunk:
+                        break
+                    f.write(chunk)
+                    hasher.update(chunk)
+                    offset += len(chunk)
+                    progress(offset, total)
+        if total is not None and offset != total:
+            if offset < total:
+                # Content-Length보다 먼저 연결이 끊김 (read()는 예외 없이 b""를 반환)
+                raise http.client.IncompleteRead(b"", total - offset)
+            raise DownloadError(f"받은 크기가 다릅니다: {offset} / {total} 바이트")
+        return offset, total, hasher, start
+
+
+def _parse_range_start(content_range):
+    match = _CONTENT_RANGE_RE.match(content_range or "")
+    return int(match.group(1)) if match else None
+
+
+def _parse_total(content_range):
+    if not content_range:
+        return None
+    total = content_range.rsplit("/", 1)[-1].strip()
+    return int(total) if total.isdigit() else None
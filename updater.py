@@ -8,9 +8,31 @@ import tkinter as tk
 from tkinter import ttk, messagebox
 import threading
 import traceback
+from metrics import span, configure as configure_metrics, STATUS_ERROR
+from process_utils import wait_for_handoff
+from file_utils import replace_file
 
 # 로그 파일 설정
 LOG_FILE = os.path.join(os.environ.get('TEMP', '.'), 'updater_log.txt')
+# 단계별 소요 시간 (metrics.py JSON lines)
+METRICS_FILE = os.path.join(os.environ.get('TEMP', '.'), 'updater_metrics.jsonl')
+
+# 프로그램 종료 대기 최대 시간 (종료되면 바로 다음 단계로 진행)
+APP_EXIT_TIMEOUT = 30
+
+# Portable ZIP에서 꺼낼 실행 파일 (나머지 파일은 압축을 풀지 않음)
+APP_EXE_NAME = "BrowserBookmarks.exe"
+COPY_BUFFER_SIZE = 1024 * 1024
+
+def extract_member(zip_path, member_name, dest_path):
+    """ZIP에서 이름이 member_name인 파일 하나만 dest_path로 스트리밍 압축 해제 (폴더 위치 무관)"""
+    with zipfile.ZipFile(zip_path, 'r') as zip_ref:
+        for info in zip_ref.infolist():
+            if not info.is_dir() and os.path.basename(info.filename).lower() == member_name.lower():
+                with zip_ref.open(info) as src, open(dest_path, 'wb') as dst:
+                    shutil.copyfileobj(src, dst, COPY_BUFFER_SIZE)
+                return info.file_size
+    raise Exception(f"{member_name}를 찾을 수 없습니다.")
 
 def log(message):
     """로그 기록"""
@@ -22,9 +44,10 @@ def log(message):
         pass
 
 class UpdaterGUI:
-    def __init__(self, downloaded_file, target_file):
+    def __init__(self, downloaded_file, target_file, app_pid=None):
         self.downloaded_file = downloaded_file
         self.target_file = target_file
+        self.app_pid = app_pid
         self.is_alive = True
         
         log(f"Updater 시작: {downloaded_file} -> {target_file}")
@@ -91,75 +114,84 @@ class UpdaterGUI:
             pass
     
     def show_error(self, message):
-        """에러 메시지 표시 (스레드 안전)"""
+        """에러 메시지 표시 후 확인을 누르면 창 닫기 (스레드 안전)"""
         log(f"에러 표시: {message}")
         if self.is_alive:
+            self.is_alive = False
             try:
-                self.root.after(0, lambda: messagebox.showerror("업데이트 실패", message))
+                self.root.after(0, lambda: self._show_error_and_close(message))
             except:
                 pass
     
+    def _show_error_and_close(self, message):
+        try:
+            messagebox.showerror("업데이트 실패", message, parent=self.root)
+        finally:
+            self.root.destroy()
+    
+    def wait_for_app_exit(self):
+        """실행 중인 프로그램이 끝나고 실행 파일 잠금이 풀릴 때까지 대기 (최대 APP_EXIT_TIMEOUT초)"""
+        handoff = wait_for_handoff(self.target_file, self.app_pid, APP_EXIT_TIMEOUT)
+        log(f"실행 중이던 프로그램: {handoff['pids']} (전달받은 PID: {self.app_pid})")
+        if handoff["remaining"]:
+            log(f"종료되지 않은 프로세스: {handoff['remaining']}")
+        if not handoff["unlocked"]:
+            log("실행 파일 잠금이 풀리지 않음")
+        return handoff
+
     def perform_update(self):
-        """업데이트 실행 (백그라운드 스레드) - Portable 버전만 처리"""
+        """업데이트 실행 (백그라운드 스레드) - 전체 소요 시간 기록"""
+        with span("updater") as update_span:
+            if not self._perform_update():
+                update_span.status = STATUS_ERROR
+
+    def _perform_update(self):
+        """업데이트 실행 - Portable 버전만 처리. 성공 여부 반환"""
         try:
             log("업데이트 시작 (Portable 전용)")
             
             # 1. 프로그램 종료 대기
             self.update_status("프로그램 종료 대기 중...", "잠시만 기다려주세요...")
-            for i in range(5):
-                time.sleep(1)
-                self.update_status("프로그램 종료 대기 중...", f"{i+1}/5초")
+            with span("updater_wait") as wait_span:
+                handoff = self.wait_for_app_exit()
+                wait_span.fields.update(pid=self.app_pid, exit_wait=round(handoff["exit_wait"], 3),
+                                        unlock_wait=round(handoff["unlock_wait"], 3))
             
-            log("종료 대기 완료")
+            log(f"종료 대기 완료 ({wait_span.duration:.2f}초)")
             
             # 2. 파일 타입 확인 및 처리 (Portable만)
-            new_exe = None
+            # 새 실행 파일은 대상과 같은 폴더에 먼저 만들고 이름 변경으로 교체한다
+            # (교체 도중 종료되어도 실행 파일이 없어지거나 반쯤 쓰인 상태가 되지 않음)
+            staged_exe = f"{self.target_file}.new"
             
             log(f"파일 타입 확인: {self.downloaded_file}")
             
             if self.downloaded_file.lower().endswith('.zip'):
                 log("ZIP 파일 처리 시작")
-                # ZIP 파일 처리 (Portable)
+                # ZIP 파일 처리 (Portable): 실행 파일만 대상 폴더로 바로 압축 해제
                 self.update_status("ZIP 파일 압축 해제 중...", 
                                   os.path.basename(self.downloaded_file))
                 
-                extract_dir = os.path.join(os.path.dirname(self.downloaded_file), "extracted")
-                if os.path.exists(extract_dir):
-                    shutil.rmtree(extract_dir)
-                os.makedirs(extract_dir)
-                
-                with zipfile.ZipFile(self.downloaded_file, 'r') as zip_ref:
-                    zip_ref.extractall(extract_dir)
-                
-                new_exe = os.path.join(extract_dir, "BrowserBookmarks.exe")
-                if not os.path.exists(new_exe):
-                    raise Exception("BrowserBookmarks.exe를 찾을 수 없습니다.")
+                with span("updater_extract") as extract_span:
+                    extract_span.fields["size"] = extract_member(self.downloaded_file, APP_EXE_NAME, staged_exe)
                 
                 self.update_status("압축 해제 완료", "")
                 log("ZIP 압축 해제 완료")
                 
             elif self.downloaded_file.lower().endswith('.exe'):
                 log("단일 EXE 파일 처리")
-                new_exe = self.downloaded_file
+                shutil.copy2(self.downloaded_file, staged_exe)
             else:
                 raise Exception(f"지원하지 않는 파일 형식: {self.downloaded_file}")
             
-            log(f"파일 타입 확인 완료. new_exe: {new_exe}")
+            log(f"파일 타입 확인 완료. new_exe: {staged_exe}")
             
-            # 3. Portable 파일 교체
+            # 3. Portable 파일 교체 (기존 파일은 복사하지 않고 하드 링크/이름 변경으로 .backup에 보관)
             backup_file = f"{self.target_file}.backup"
-            
-            # 백업
-            self.update_status("기존 파일 백업 중...", "")
-            if os.path.exists(self.target_file):
-                shutil.copy2(self.target_file, backup_file)
-                log("백업 완료")
-            
-            # 파일 교체
             self.update_status("파일 업데이트 중...", "")
-            if os.path.exists(self.target_file):
-                os.remove(self.target_file)
-            shutil.copy2(new_exe, self.target_file)
+            with span("updater_replace"):
+                replace_file(staged_exe, self.target_file, backup_file)
+            replaced = True
             log("파일 교체 완료")
             
             # 임시 파일 정리
@@ -167,61 +199,67 @@ class UpdaterGUI:
             if self.downloaded_file.lower().endswith('.zip'):
                 if os.path.exists(self.downloaded_file):
                     os.remove(self.downloaded_file)
-                if os.path.exists(extract_dir):
-                    shutil.rmtree(extract_dir)
+            elif os.path.exists(self.downloaded_file):
+                # 차분 업데이트로 앱이 만든 실행 파일 (update_temp)
+                os.remove(self.downloaded_file)
             log("임시 파일 정리 완료")
             
-            # 재시작 준비
-            self.update_status("프로그램 재시작 준비 중...", "")
-            time.sleep(2)
-            
             # 프로그램 재시작
             self.update_status("프로그램 재시작 중...", "")
             target_dir = os.path.dirname(self.target_file)
-            subprocess.Popen([self.target_file], shell=False, cwd=target_dir)
+            with span("updater_restart"):
+                subprocess.Popen([self.target_file], shell=False, cwd=target_dir)
             log("프로그램 재시작 완료")
             
-            self.update_status("업데이트 완료!", "프로그램이 시작됩니다.")
-            time.sleep(2)
+            # 새 프로그램 창이 뜨므로 완료 메시지를 보여 주려고 기다리지 않고 바로 닫는다
             self.close_window()
             log("업데이트 프로세스 완료")
+            return True
             
         except Exception as e:
             # 에러 처리
             log(f"업데이트 실패: {str(e)}\n{traceback.format_exc()}")
-            self.show_error(f"업데이트 중 오류가 발생했습니다:\n\n{str(e)}")
             
-            # 롤백 시도
-            if 'backup_file' in locals() and os.path.exists(backup_file):
+            if 'staged_exe' in locals() and os.path.exists(staged_exe):
+                try:
+                    os.remove(staged_exe)
+                except OSError:
+                    pass
+            
+            # 롤백 시도 (교체한 뒤에 실패한 경우만. 교체 전이면 기존 파일이 그대로 있음)
+            if 'replaced' in locals() and os.path.exists(backup_file):
                 try:
                     log("롤백 시도")
-                    if os.path.exists(self.target_file):
-                        os.remove(self.target_file)
-                    shutil.copy2(backup_file, self.target_file)
+                    os.replace(backup_file, self.target_file)
                     subprocess.Popen([self.target_file], shell=False)
                     log("롤백 완료")
                 except Exception as rollback_e:
                     log(f"롤백 실패: {str(rollback_e)}")
             
-            time.sleep(3)
-            self.close_window()
+            # 정리/롤백을 마친 뒤 표시 (확인을 누르면 창이 닫히고 updater가 끝남)
+            self.show_error(f"업데이트 중 오류가 발생했습니다:\n\n{str(e)}")
+            return False
 
 def main():
     if len(sys.argv) < 3:
         root = tk.Tk()
         root.withdraw()
-        messagebox.showerror("오류", "사용법: updater.exe <downloaded_file> <target_file>")
+        messagebox.showerror("오류", "사용법: updater.exe <downloaded_file> <target_file> [app_pid]")
         sys.exit(1)
     
     downloaded_file = sys.argv[1]
     target_file = sys.argv[2]
+    # 프로그램이 넘겨 준 자기 PID (이전 버전 프로그램은 넘기지 않음 -> 이름으로만 찾음)
+    app_pid = int(sys.argv[3]) if len(sys.argv) > 3 and sys.argv[3].isdigit() else None
     
     log(f"=== Updater 시작 ===")
+    configure_metrics(jsonl_path=METRICS_FILE)
     log(f"Downloaded: {downloaded_file}")
     log(f"Target: {target_file}")
+    log(f"App PID: {app_pid}")
     
     # GUI 시작
-    UpdaterGUI(downloaded_file, target_file)
+    UpdaterGUI(downloaded_file, target_file, app_pid)
     
     log("=== Updater 종료 ===")
 
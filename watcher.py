@@ -0,0 +1,276 @@
+import os
+import sys
+import time
+import errno
+import select
+import struct
+import ctypes
+import ctypes.util
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from bookmarks_core import log_message
+from backup_store import wal_signature
+
+# 북마크 파일 변경 감시 (bookmarks_cli.py watch)
+#
+# 브라우저가 북마크를 저장하면 debounce초 동안 추가 쓰기가 없을 때 백업을 실행한다.
+# 계속 쓰기가 이어져도 max_delay초가 지나면 한 번은 백업한다.
+# Linux에서는 inotify로 프로필 폴더를 감시하므로 북마크가 바뀌지 않는 동안에는 아무 작업도 하지 않고,
+# 다른 환경(또는 inotify를 쓸 수 없을 때)에서는 poll_interval초마다 파일 크기/수정 시각을 비교한다.
+#
+# Chromium은 Bookmarks를 임시 파일에 쓴 뒤 이름을 바꾸고, Firefox는 places.sqlite-wal에 먼저 쓰므로
+# 파일이 아니라 폴더를 감시하고 이름으로 걸러낸다.
+
+DEFAULT_DEBOUNCE = 5.0
+DEFAULT_MAX_DELAY = 60.0
+DEFAULT_POLL_INTERVAL = 2.0
+
+# 함께 감시할 파일 접미사 (SQLite -wal/-journal)
+COMPANION_SUFFIXES = ("", "-wal", "-journal")
+
+
+def _watched_names(path):
+    base = os.path.basename(path)
+    return {base + suffix for suffix in COMPANION_SUFFIXES}
+
+
+# 감시 방식
+class PollingBackend:
+    """파일 크기/수정 시각(-wal 포함)을 주기적으로 비교"""
+
+    name = "polling"
+
+    def __init__(self, paths, interval=DEFAULT_POLL_INTERVAL):
+        self.paths = list(paths)
+        self.interval = interval
+        self._signatures = {path: self._signature(path) for path in self.paths}
+        self._wake = threading.Event()
+
+    @staticmethod
+    def _signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_size, st.st_mtime_ns, wal_signature(path)
+
+    def wait(self, timeout):
+        """변경된 경로 집합 반환 (timeout초 또는 폴링 간격 중 짧은 시간 대기, None이면 폴링 간격)"""
+        interval = self.interval if timeout is None else min(timeout, self.interval)
+        self._wake.wait(max(interval, 0))
+        self._wake.clear()
+        changed = set()
+        for path in self.paths:
+            signature = self._signature(path)
+            if signature != self._signatures[path]:
+                self._signatures[path] = signature
+                changed.add(path)
+        return changed
+
+    def wake(self):
+        self._wake.set()
+
+    def close(self):
+        pass
+
+
+class InotifyBackend:
+    """Linux inotify (ctypes). 프로필 폴더마다 watch 하나"""
+
+    name = "inotify"
+
+    IN_MODIFY = 0x00000002
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT_HEADER = struct.Struct("iIII")
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, paths):
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify는 Linux에서만 사용할 수 있습니다.")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 실패")
+        # stop()이 select를 깨울 수 있도록 self-pipe 사용
+        self._wake_r, self._wake_w = os.pipe()
+        self.paths = list(paths)
+        self._dirs = {}      # 폴더 -> {감시할 파일 이름: 원본 경로}
+        for path in self.paths:
+            names = self._dirs.setdefault(os.path.dirname(path), {})
+            for name in _watched_names(path):
+                names[name] = path
+        self._watches = {}   # wd -> 폴더
+        self._unwatched = set(self._dirs)
+        self._add_watches()
+
+    def _add_watches(self):
+        """아직 감시하지 않는 폴더에 watch 추가 (폴더가 없으면 다음에 다시 시도)"""
+        for folder in list(self._unwatched):
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(folder), self.WATCH_MASK)
+            if wd >= 0:
+                self._watches[wd] = folder
+                self._unwatched.discard(folder)
+
+    def wait(self, timeout):
+        """변경된 경로 집합 반환 (timeout초 대기, None이면 이벤트가 올 때까지)"""
+        if self._unwatched:
+            # 없던 프로필 폴더가 생겼는지 가끔 확인
+            self._add_watches()
+            timeout = DEFAULT_POLL_INTERVAL if timeout is None else min(timeout, DEFAULT_POLL_INTERVAL)
+        try:
+            ready, _w, _x = select.select([self._fd, self._wake_r], [], [], timeout)
+        except InterruptedError:
+            return set()
+        if self._wake_r in ready:
+            os.read(self._wake_r, 64)
+        if self._fd not in ready:
+            return set()
+
+        changed = set()
+        while True:
+            try:
+                data = os.read(self._fd, self.READ_SIZE)
+            except BlockingIOError:
+                break
+            except OSError as e:
+                if e.errno == errno.EINTR:
+                    continue
+                raise
+            offset = 0
+            while offset + self.EVENT_HEADER.size <= len(data):
+                wd, mask, _cookie, length = self.EVENT_HEADER.unpack_from(data, offset)
+                name = data[offset + self.EVENT_HEADER.size:offset + self.EVENT_HEADER.size + length]
+                offset += self.EVENT_HEADER.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    # 이벤트가 넘쳐 일부를 잃었으면 전부 바뀐 것으로 본다
+                    changed.update(self.paths)
+                    continue
+                folder = self._watches.get(wd)
+                if folder is None:
+                    continue
+                if mask & self.IN_IGNORED:
+                    # 폴더가 지워짐: 다시 생기면 감시
+                    del self._watches[wd]
+                    self._unwatched.add(folder)
+                    continue
+                path = self._dirs[folder].get(os.fsdecode(name.rstrip(b"\0")))
+                if path is not None:
+                    changed.add(path)
+        return changed
+
+    def wake(self):
+        os.write(self._wake_w, b"x")
+
+    def close(self):
+        for fd in (self._fd, self._wake_r, self._wake_w):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+
+def create_backend(paths, poll_interval=DEFAULT_POLL_INTERVAL, polling=False):
+    """가능하면 inotify, 아니면 폴링"""
+    if not polling:
+        try:
+            return InotifyBackend(paths)
+        except (OSError, AttributeError) as e:
+            log_message(f"[정보] inotify를 사용할 수 없어 {poll_interval}초 간격 폴링으로 감시합니다: {e}")
+    return PollingBackend(paths, poll_interval)
+
+
+class BookmarkWatcher:
+    """북마크 파일이 바뀌면 debounce 후 on_change(profile)를 풀에서 실행
+
+    profiles: 감시할 BrowserProfile 목록
+    on_change: 백업 함수. 같은 프로필은 동시에 한 번만 실행하고, 실행 중에 또 바뀌면 끝난 뒤 다시 예약한다.
+    """
+
+    def __init__(self, profiles, on_change, debounce=DEFAULT_DEBOUNCE, max_delay=DEFAULT_MAX_DELAY,
+                 poll_interval=DEFAULT_POLL_INTERVAL, polling=False, max_workers=1):
+        self.profiles = {os.path.normcase(p.path): p for p in profiles}
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max(max_delay, debounce)
+        self.backend = create_backend([p.path for p in profiles], poll_interval, polling)
+        self.max_workers = max(1, max_workers)
+        self._pending = {}   # 경로 키 -> [첫 변경 시각, 마지막 변경 시각]
+        self._running = set()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self.triggered = 0
+
+    def _key(self, path):
+        return os.path.normcase(path)
+
+    def _mark_changed(self, keys, now):
+        with self._lock:
+            for key in keys:
+                if key in self._pending:
+                    self._pending[key][1] = now
+                else:
+                    self._pending[key] = [now, now]
+
+    def _due(self, now):
+        """debounce/max_delay가 지난 경로 키 목록과 다음 확인까지 남은 시간"""
+        due = []
+        wait = None
+        with self._lock:
+            for key, (first, last) in self._pending.items():
+                if key in self._running:
+                    continue
+                deadline = min(last + self.debounce, first + self.max_delay)
+                if deadline <= now:
+                    due.append(key)
+                else:
+                    remaining = deadline - now
+                    wait = remaining if wait is None else min(wait, remaining)
+            for key in due:
+                del self._pending[key]
+                self._running.add(key)
+        return due, wait
+
+    def _run(self, key):
+        profile = self.profiles[key]
+        try:
+            self.on_change(profile)
+        except Exception as e:
+            log_message(f"[오류] {profile.display_name} 변경 감지 백업 실패: {e}")
+        finally:
+            with self._lock:
+                self._running.discard(key)
+            # 백업하는 동안 또 바뀌었으면 바로 다음 대기 시간을 계산하도록 깨운다
+            self.backend.wake()
+
+    def run_forever(self):
+        """stop()이 호출될 때까지 감시"""
+        names = ", ".join(p.display_name for p in self.profiles.values())
+        log_message(f"[정보] 북마크 변경 감시 시작 ({self.backend.name}, 대기 {self.debounce:g}초): {names}")
+        pool = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="watch")
+        try:
+            wait = None
+            while not self._stop.is_set():
+                changed = self.backend.wait(wait)
+                now = time.monotonic()
+                if changed:
+                    self._mark_changed({self._key(path) for path in changed}, now)
+                due, wait = self._due(now)
+                for key in due:
+                    self.triggered += 1
+                    log_message(f"[정보] {self.profiles[key].display_name} 북마크 변경 감지 - 백업 실행")
+                    pool.submit(self._run, key)
+        finally:
+            pool.shutdown(wait=True)
+            self.backend.close()
+            log_message("[정보] 북마크 변경 감시 종료")
+
+    def stop(self):
+        self._stop.set()
+        self.backend.wake()
@@ -1,22 +1,31 @@
+import time
+STARTUP_STARTED = time.perf_counter()  # --startup-time 측정 기준 (다른 import보다 먼저)
+
 import tkinter as tk
-from tkinter import filedialog, messagebox, ttk, Menu
+from tkinter import filedialog, ttk, Menu
 import os
-import shutil
-from datetime import datetime
 import sys
-import subprocess 
-import time
 import json
 import configparser
-import hashlib
 import threading
-import urllib.request
-import urllib.error
+# 시작 시간을 줄이기 위해 urllib.request, subprocess, backup_engine, bookmark_diff, firefox_places 등은
+# 실제로 쓰는 메서드 안에서 import한다 (python -X importtime winBookmarks.py --startup-time 로 확인)
+from bookmarks_core import (
+    get_appdata_path, ConfigManager, BROWSER_PATHS, BACKUP_FILENAME_MAP, BROWSER_EXE_MAP,
+    log_message, add_log_sink, remove_log_sink, perform_backup, perform_restore, RESTORE_OVERWRITE
+)
+from log_pipeline import LogQueue, RotatingFileSink
+from metrics import span, inc, configure_from_dict as configure_metrics, STATUS_ERROR
 
 # 버전 정보 
 CURRENT_VERSION = "0.0.0"
 GITHUB_REPO = "gloriouslegacy/BrowserBookmarks"
 VERSION_CHECK_URL = f"https://api.github.com/repos/{GITHUB_REPO}/releases/latest"
+UPDATE_CHECK_DELAY_MS = 1000
+
+# 시작 시간 측정
+STARTUP_TIME_ARG = "--startup-time"
+STARTUP_TIME_FILE = "startup_time.jsonl"
 
 # UI 스타일 및 색상 정의
 BG_COLOR = "#f0f0f0"          
@@ -35,6 +44,20 @@ DARK_ENTRY_BG = "#0d0d0d"
 DARK_PRIMARY_COLOR = "#2d5a7b"
 DARK_SECONDARY_COLOR = "#7b2d2d"
 
+# 로그 창 (작업 스레드의 메시지를 큐에 모았다가 메인 루프에서 한 번에 출력)
+LOG_MAX_LINES = 1000
+LOG_DRAIN_INTERVAL_MS = 100
+
+# 복구 미리보기 (변경 종류 표시 기호 -> 글자색)
+PREVIEW_LINE_LIMIT = 500
+PREVIEW_COLORS = {
+    "+": "#2e7d32",
+    "-": "#c62828",
+    ">": "#1565c0",
+    "*": "#8e6d00",
+    "~": "#6a1b9a",
+}
+
 # 커스텀 메시지 다이얼로그
 class CustomMessageBox:
     """다크모드를 지원하는 커스텀 메시지박스"""
@@ -179,57 +202,6 @@ def resource_path(relative_path):
 
     return os.path.join(base_path, relative_path)    
 
-def get_appdata_path():
-    """
-    %APPDATA% 경로 반환
-    """
-    appdata = os.environ.get('APPDATA')
-    app_folder = os.path.join(appdata, 'BrowserBookmarks')
-    os.makedirs(app_folder, exist_ok=True)
-    return app_folder
-
-# 설정 파일 관리 
-class ConfigManager:
-    def __init__(self):
-        self.config_dir = get_appdata_path()
-        self.config_file = os.path.join(self.config_dir, "app_config.json")
-        self.default_config = {
-            "language": "ko",
-            "dark_mode": False,
-            "last_backup_dir": os.path.join(os.getcwd(), "Bookmarks_Backup"),
-            "last_browser": "Edge",
-            "window_width": 600,
-            "window_height": 500,
-            "auto_update_check": True
-        }
-        self.config = self.load_config()
-    
-    def load_config(self):
-        if os.path.exists(self.config_file):
-            try:
-                with open(self.config_file, 'r', encoding='utf-8') as f:
-                    loaded_config = json.load(f)
-                    # 기본 설정과 병합
-                    return {**self.default_config, **loaded_config}
-            except Exception as e:
-                print(f"설정 로드 실패: {e}")
-                return self.default_config.copy()
-        return self.default_config.copy()
-    
-    def save_config(self):
-        try:
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(self.config, f, indent=4, ensure_ascii=False)
-        except Exception as e:
-            print(f"설정 저장 실패: {e}")
-    
-    def get(self, key, default=None):
-        return self.config.get(key, default)
-    
-    def set(self, key, value):
-        self.config[key] = value
-        self.save_config()
-
 # 언어 파일 관리 
 class LanguageManager:
     def __init__(self, config_manager):
@@ -253,7 +225,7 @@ class LanguageManager:
         self.load_language()
     
     def load_language(self):
-        # 언어 파일 항상 재생성 (업데이트된 키 반영)
+        # 언어 파일이 없거나 내용이 바뀐 경우에만 다시 씀 (업데이트된 키 반영)
         self.create_default_language_files()
         
         lang_file = os.path.join(self.lang_dir, f"lang_{self.current_lang}.ini")
@@ -277,6 +249,8 @@ title = 브라우저 북마크 관리
 file = 파일
 language = 언어 변경
 dark_mode = 다크 모드
+backup_all = 모든 브라우저/프로필 백업
+restore_preview = 복구 미리보기 (백업과 비교)
 exit = 종료
 help = 도움말
 check_update = 업데이트 확인
@@ -329,6 +303,14 @@ download_url_error = 다운로드 URL을 찾을 수 없습니다.
 download_failed = 다운로드 실패
 install_failed = 설치 실패
 
+[preview]
+title = 복구 미리보기
+loading = 백업과 현재 북마크를 비교하는 중...
+summary = 백업 이후 변경: 추가 {added}, 삭제 {removed}, 이동 {moved}, 이름 변경 {renamed}, URL 변경 {url_changed}
+no_changes = 백업과 현재 북마크가 같습니다.
+legend = 복구하면 아래 변경 사항이 되돌려집니다. (+ 추가, - 삭제, > 이동, * 이름 변경, ~ URL 변경)
+close = 닫기
+
 [about]
 version = 버전
 developer = 개발자
@@ -343,6 +325,8 @@ title = Browser Bookmark Manager
 file = File
 language = Change Language
 dark_mode = Dark Mode
+backup_all = Back Up All Browsers/Profiles
+restore_preview = Restore Preview (Compare with Backup)
 exit = Exit
 help = Help
 check_update = Check for Updates
@@ -395,17 +379,35 @@ download_url_error = Download URL not found.
 download_failed = Download failed
 install_failed = Installation failed
 
+[preview]
+title = Restore Preview
+loading = Comparing the backup with current bookmarks...
+summary = Changes since backup: added {added}, removed {removed}, moved {moved}, renamed {renamed}, URL changed {url_changed}
+no_changes = The backup matches the current bookmarks.
+legend = Restoring will undo the changes below. (+ added, - removed, > moved, * renamed, ~ URL changed)
+close = Close
+
 [about]
 version = Version
 developer = Developer
 description = Browser Bookmark Backup/Restore Tool for Windows
 """
         
-        with open(os.path.join(self.lang_dir, "lang_ko.ini"), 'w', encoding='utf-8') as f:
-            f.write(ko_content)
-        
-        with open(os.path.join(self.lang_dir, "lang_en.ini"), 'w', encoding='utf-8') as f:
-            f.write(en_content)
+        self._write_if_changed(os.path.join(self.lang_dir, "lang_ko.ini"), ko_content)
+        self._write_if_changed(os.path.join(self.lang_dir, "lang_en.ini"), en_content)
+    
+    @staticmethod
+    def _write_if_changed(path, content):
+        """파일 내용이 content와 다를 때만 쓰기 (시작할 때마다 디스크에 쓰지 않도록)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                if f.read() == content:
+                    return False
+        except (OSError, UnicodeDecodeError):
+            pass
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        return True
     
     def get(self, section, key, default=""):
         return self.translations.get(section, {}).get(key, default)
@@ -417,33 +419,49 @@ description = Browser Bookmark Backup/Restore Tool for Windows
 
 # 업데이트 관리자 
 class UpdateManager:
-    def __init__(self, lang_manager):
+    def __init__(self, lang_manager, config_manager=None):
         self.lang_manager = lang_manager
+        self.config_manager = config_manager
         self.check_url = VERSION_CHECK_URL
         self.current_version = CURRENT_VERSION
         
-    def check_for_updates(self, callback=None):
-        """업데이트 확인 (비동기)"""
-        thread = threading.Thread(target=self._check_updates_thread, args=(callback,))
+    def check_for_updates(self, callback=None, force=False):
+        """업데이트 확인 (비동기)
+        
+        자동 확인은 최근에 확인했으면 저장된 응답을 쓰고, force=True(수동 확인)면 바로 서버에 묻는다.
+        """
+        thread = threading.Thread(target=self._check_updates_thread, args=(callback, force))
         thread.daemon = True
         thread.start()
     
-    def _check_updates_thread(self, callback):
-        try:
-            with urllib.request.urlopen(self.check_url, timeout=10) as response:
-                data = json.loads(response.read().decode('utf-8'))
+    def _release_cache(self):
+        """최신 릴리스 응답 캐시 (app_config.json 옆 release_check.json)"""
+        from release_check import ReleaseCheckCache, CACHE_FILENAME
+        options = (self.config_manager.get("update_check") if self.config_manager else None) or {}
+        return ReleaseCheckCache(os.path.join(get_appdata_path(), CACHE_FILENAME), **options)
+    
+    def _check_updates_thread(self, callback, force=False):
+        with span("update_check") as check_span:
+            try:
+                data, source = self._release_cache().fetch(self.check_url, force=force)
+                check_span.fields["source"] = source
                 latest_version = data.get('tag_name', '').replace('v', '')
-                
+                check_span.fields["latest_version"] = latest_version
+            
                 if latest_version and self._is_newer_version(latest_version):
                     version_info = {
                         'version': latest_version,
                         'download_url': None,
                         'body': data.get('body', '')
                     }
-                    
+                
                     # 다운로드 URL 찾기
                     is_setup_installed = self._is_setup_installed()
-                    
+                    from update_downloader import find_checksum_asset
+                    from delta_update import delta_asset_name
+                    version_info['checksum_url'] = find_checksum_asset(data.get('assets', []))
+                    delta_name = delta_asset_name(self.current_version).lower()
+                
                     for asset in data.get('assets', []):
                         name = asset['name'].lower()
                         if is_setup_installed:
@@ -453,21 +471,24 @@ class UpdateManager:
                                 version_info['is_setup'] = True
                                 break
                         else:
-                            # Portable: ZIP 다운로드
-                            if 'portable' in name and name.endswith('.zip'):
+                            # Portable: ZIP 다운로드 (현재 버전에서 가는 차분 파일이 있으면 먼저 시도)
+                            if name == delta_name:
+                                version_info['delta_url'] = asset['browser_download_url']
+                            elif 'portable' in name and name.endswith('.zip') and not version_info['download_url']:
                                 version_info['download_url'] = asset['browser_download_url']
                                 version_info['is_setup'] = False
-                                break
-                    
+                
                     if callback:
                         callback(True, version_info)
                 else:
                     if callback:
                         callback(False, None)
-        except Exception as e:
-            print(f"업데이트 확인 실패: {e}")
-            if callback:
-                callback(False, None)
+            except Exception as e:
+                check_span.status = STATUS_ERROR
+                check_span.fields["error"] = str(e)
+                print(f"업데이트 확인 실패: {e}")
+                if callback:
+                    callback(False, None)
     
     def _is_newer_version(self, remote_version):
         """버전 비교"""
@@ -488,44 +509,79 @@ class UpdateManager:
         uninstaller = os.path.join(exe_dir, "unins000.exe")
         return os.path.exists(uninstaller)
     
-    def download_update(self, download_url, progress_callback=None):
-        """업데이트 다운로드"""
+    def download_update(self, download_url, progress_callback=None, checksum_url=None):
+        """업데이트 다운로드 (update_temp에 이어받기, checksum_url의 SHA-256으로 검증)
+        
+        progress_callback(percent)는 다운로드 스레드에서 호출된다.
+        """
+        from update_downloader import UpdateDownloader, fetch_expected_sha256, file_name_from_url
+        options = (self.config_manager.get("update_download") if self.config_manager else None) or {}
         try:
             download_path = os.path.join(get_appdata_path(), "update_temp")
-            os.makedirs(download_path, exist_ok=True)
+            file_name = file_name_from_url(download_url)
+            downloader = UpdateDownloader(download_path, **options)
             
-            file_name = download_url.split('/')[-1]
-            local_file = os.path.join(download_path, file_name)
+            expected_sha256 = None
+            if checksum_url:
+                expected_sha256 = fetch_expected_sha256(checksum_url, file_name, downloader.timeout)
+                if not expected_sha256:
+                    raise Exception(f"체크섬 파일에 {file_name} 항목이 없습니다.")
+            else:
+                log_message(f"[정보] 릴리스에 체크섬 파일이 없어 {file_name}을(를) 검증 없이 받습니다.")
             
-            def report_progress(block_num, block_size, total_size):
-                if progress_callback and total_size > 0:
-                    downloaded = block_num * block_size
-                    percent = min(100, int((downloaded / total_size) * 100))
-                    progress_callback(percent)
+            def report_progress(downloaded, total_size):
+                if progress_callback and total_size:
+                    progress_callback(min(100, int(downloaded * 100 / total_size)))
             
-            urllib.request.urlretrieve(download_url, local_file, reporthook=report_progress)
-            return local_file
+            with span("update_download") as download_span:
+                result = downloader.download(download_url, expected_sha256, report_progress, file_name)
+                download_span.fields.update({"file": file_name, "size": result.size,
+                                             "resumed_from": result.resumed_from, "verified": result.verified})
+            if result.resumed_from:
+                log_message(f"[정보] {file_name}: {result.resumed_from:,}바이트부터 이어받음")
+            if result.verified:
+                log_message(f"[성공] {file_name} SHA-256 확인: {result.sha256}")
+            inc("download_bytes_total", result.size - result.resumed_from)
+            return result.path
         except Exception as e:
-            print(f"다운로드 실패: {e}")
+            log_message(f"[오류] 업데이트 다운로드 실패: {e}")
             return None
     
-    def create_backup(self):
-        """현재 실행 파일 백업"""
+    def download_delta_update(self, delta_url, progress_callback=None, checksum_url=None):
+        """차분 파일을 받아 현재 실행 파일에 적용한 새 실행 파일 경로 반환
+        
+        실패하면(차분이 없음, 다른 버전에서 실행 중, 검증 실패 등) None을 반환하므로 전체 ZIP을 받으면 된다.
+        """
+        if not getattr(sys, 'frozen', False):
+            return None
+        delta_file = self.download_update(delta_url, progress_callback, checksum_url)
+        if not delta_file:
+            return None
+        from delta_update import apply_delta, DeltaError
+        new_exe = os.path.join(os.path.dirname(delta_file), os.path.basename(sys.executable))
         try:
-            exe_path = sys.executable if getattr(sys, 'frozen', False) else __file__
-            backup_path = f"{exe_path}.backup"
-            shutil.copy2(exe_path, backup_path)
-            return backup_path
-        except Exception as e:
-            print(f"백업 실패: {e}")
+            with span("update_delta_apply") as apply_span:
+                header = apply_delta(sys.executable, delta_file, new_exe)
+                apply_span.fields.update({"delta_size": os.path.getsize(delta_file), "size": header["new_size"]})
+            log_message(f"[성공] 차분 업데이트 적용 완료 ({os.path.getsize(delta_file):,} / {header['new_size']:,}바이트)")
+            return new_exe
+        except (OSError, DeltaError) as e:
+            log_message(f"[오류] 차분 업데이트 적용 실패, 전체 파일을 받습니다: {e}")
             return None
+        finally:
+            try:
+                os.remove(delta_file)
+            except OSError:
+                pass
     
     
     def install_update(self, update_file, is_setup=False):
         """업데이트 설치
         - Setup: 인스톨러를 직접 실행 (자동 업데이트)
         - Portable: updater.exe를 통해 파일 교체
+        다운로드 스레드에서 호출되므로 실패하면 오류 창 대신 예외를 다시 발생시킨다 (호출하는 쪽이 메인 스레드에서 표시)
         """
+        import subprocess
         try:
             exe_path = sys.executable if getattr(sys, 'frozen', False) else __file__
             exe_dir = os.path.dirname(exe_path)
@@ -557,189 +613,24 @@ class UpdateManager:
                     raise Exception("updater.exe를 찾을 수 없습니다.")
                 
                 log_message("[정보] Portable 업데이트 시작...")
-                # updater.exe 실행: updater.exe <ZIP파일> <현재실행파일>
-                subprocess.Popen([updater_path, update_file, exe_path], shell=False)
+                # updater.exe 실행: updater.exe <ZIP파일> <현재실행파일> <현재PID>
+                # updater는 이 PID가 끝나고 실행 파일 잠금이 풀리는 즉시 교체를 시작한다
+                subprocess.Popen([updater_path, update_file, exe_path, str(os.getpid())], shell=False)
                 return True
                 
         except Exception as e:
-            print(f"설치 실패: {e}")
-            messagebox.showerror("오류", f"업데이트 설치 실패:\n{str(e)}")
-            return False
-
-
-# 브라우저별 북마크 경로 정의 
-def get_browser_paths():
-    """각 브라우저의 기본 북마크 파일 경로를 반환"""
-    user_profile = os.environ.get('USERPROFILE')
-    
-    paths = {
-        "Edge": os.path.join(user_profile, 'AppData', 'Local', 'Microsoft', 'Edge', 'User Data', 'Default', 'Bookmarks'),
-        "Chrome": os.path.join(user_profile, 'AppData', 'Local', 'Google', 'Chrome', 'User Data', 'Default', 'Bookmarks'),
-        "Firefox": None, 
-    }
-    
-    firefox_profile_root = os.path.join(user_profile, 'AppData', 'Roaming', 'Mozilla', 'Firefox', 'Profiles')
-    
-    if os.path.exists(firefox_profile_root):
-        latest_profile_path = None
-        latest_mtime = 0
-        
-        for profile_name in os.listdir(firefox_profile_root):
-            profile_path = os.path.join(firefox_profile_root, profile_name)
-            places_sqlite_path = os.path.join(profile_path, 'places.sqlite')
-            
-            if os.path.isdir(profile_path) and os.path.exists(places_sqlite_path):
-                try:
-                    mtime = os.path.getmtime(places_sqlite_path)
-                    if mtime > latest_mtime:
-                        latest_mtime = mtime
-                        latest_profile_path = places_sqlite_path
-                except OSError:
-                    continue
-        
-        if latest_profile_path:
-            paths["Firefox"] = latest_profile_path
-            
-    return paths
-
-BROWSER_PATHS = get_browser_paths()
-BACKUP_FILENAME_MAP = {
-    "Edge": "Edge_Bookmarks",
-    "Chrome": "Chrome_Bookmarks",
-    "Firefox": "firefox_places.sqlite" 
-}
-BROWSER_EXE_MAP = {
-    "Edge": "msedge.exe",
-    "Chrome": "chrome.exe",
-    "Firefox": "firefox.exe"
-}
-
-# 핵심 로직 함수 
-def perform_backup(browser_name, backup_dir):
-    """지정된 브라우저의 북마크 파일을 지정된 디렉토리에 백업."""
-    src_path = BROWSER_PATHS.get(browser_name)
-    backup_filename = BACKUP_FILENAME_MAP.get(browser_name)
-    
-    if not src_path or not os.path.exists(src_path):
-        display_path = src_path if src_path else "자동 감지 실패"
-        log_message(f"[오류] {browser_name} 북마크 파일을 찾을 수 없습니다.")
-        if gui_instance:
-            gui_instance.master.after(0, lambda: CustomMessageBox.showerror(
-                gui_instance.master, "오류",
-                f"{browser_name} 북마크 파일을 찾을 수 없습니다.\n경로 확인:\n{display_path}",
-                gui_instance.dark_mode))
-        return False
+            log_message(f"[오류] 업데이트 설치 실패: {e}")
+            raise
 
-    if not backup_dir:
-        if gui_instance:
-            gui_instance.master.after(0, lambda: CustomMessageBox.showwarning(
-                gui_instance.master, "경고", "백업 폴더를 선택해주세요.", 
-                gui_instance.dark_mode))
-        return False
-
-    os.makedirs(backup_dir, exist_ok=True)
-    dst_path = os.path.join(backup_dir, backup_filename)
-    
-    try:
-        shutil.copy2(src_path, dst_path)
-        log_message(f"[성공] {browser_name} 백업 완료: {dst_path}")
-        return True
-    except Exception as e:
-        log_message(f"[오류] {browser_name} 백업 실패: {e}")
-        if gui_instance:
-            gui_instance.master.after(0, lambda: CustomMessageBox.showerror(
-                gui_instance.master, "오류", 
-                f"{browser_name} 백업 중 오류 발생: {e}",
-                gui_instance.dark_mode))
-        return False
-
-def perform_restore(browser_name, restore_dir):
-    """지정된 브라우저의 북마크 파일을 백업 디렉토리에서 복구합니다."""
-    dst_path = BROWSER_PATHS.get(browser_name)
-    backup_filename = BACKUP_FILENAME_MAP.get(browser_name)
-    src_path = os.path.join(restore_dir, backup_filename)
-    browser_exe = BROWSER_EXE_MAP.get(browser_name)
-
-    if not os.path.exists(src_path):
-        if gui_instance:
-            gui_instance.master.after(0, lambda: CustomMessageBox.showerror(
-                gui_instance.master, "오류", 
-                f"복구 파일이 백업 폴더에 없습니다.\n필요한 파일: {backup_filename}",
-                gui_instance.dark_mode))
-        return False
-
-    if not dst_path or not os.path.exists(os.path.dirname(dst_path)):
-         log_message(f"[오류] {browser_name} 복구 대상 경로를 찾을 수 없습니다.")
-         if gui_instance:
-             gui_instance.master.after(0, lambda: CustomMessageBox.showerror(
-                 gui_instance.master, "오류", 
-                 f"{browser_name} 복구 대상 경로를 찾을 수 없습니다.\n브라우저를 한 번 실행해 보세요.",
-                 gui_instance.dark_mode))
-         return False
-    
-    
-    # 복구 전 프로세스 종료 로직
-    try:
-        if browser_exe:
-            log_message(f"[정보] {browser_name} 프로세스 ({browser_exe}) 종료 시도...")
-            subprocess.run(['taskkill', '/f', '/im', browser_exe], check=True, capture_output=True, text=True)
-            log_message(f"[정보] {browser_name} 프로세스 종료 완료.")
-            time.sleep(1) 
-    except subprocess.CalledProcessError:
-        log_message(f"[정보] {browser_name} 프로세스가 실행 중이 아니거나 이미 종료되었습니다.")
-    except Exception as e:
-        log_message(f"[오류] 프로세스 종료 중 예외 발생: {e}")
-        if gui_instance:
-            gui_instance.master.after(0, lambda: CustomMessageBox.showwarning(
-                gui_instance.master, "경고", 
-                "브라우저 프로세스 종료에 실패했습니다. 수동으로 종료해 주세요.",
-                gui_instance.dark_mode))
-        
-    
-    # 복구 실행
-    restore_success = False
-    try:
-        if os.path.exists(dst_path):
-            timestamp = datetime.now().strftime("%Y%m%d%H%M%S")
-            backup_old_path = f"{dst_path}.{timestamp}.bak"
-            shutil.copy2(dst_path, backup_old_path)
-            log_message(f"[정보] 기존 북마크 백업: {backup_old_path}")
-            
-        shutil.copy2(src_path, dst_path)
-        log_message(f"[성공] {browser_name} 복구 완료: {dst_path}")
-        restore_success = True
-        
-    except Exception as e:
-        log_message(f"[오류] {browser_name} 복구 실패: {e}")
-        if gui_instance:
-            gui_instance.master.after(0, lambda e=e: CustomMessageBox.showerror(
-                gui_instance.master, "오류", 
-                f"{browser_name} 복구 중 오류 발생: {e}",
-                gui_instance.dark_mode))
-        
-    # 복구 후 프로세스 재실행 로직
-    if restore_success and browser_exe:
-        try:
-            log_message(f"[정보] {browser_name} 재실행 시도...")
-            subprocess.Popen(['start', browser_exe], shell=True)
-            log_message(f"[성공] {browser_name} 재실행 완료.")
-        except Exception as e:
-            log_message(f"[오류] 브라우저 재실행 실패: {e}")
-            if gui_instance:
-                gui_instance.master.after(0, lambda: CustomMessageBox.showwarning(
-                    gui_instance.master, "경고", 
-                    "브라우저 재실행에 실패했습니다. 수동으로 시작해 주세요.",
-                    gui_instance.dark_mode))
-            
-    return restore_success
 
 # GUI 클래스 
 class BookmarkManagerGUI:
     def __init__(self, master):
         self.master = master
         self.config_manager = ConfigManager()
+        configure_metrics(self.config_manager.get("metrics"))
         self.lang_manager = LanguageManager(self.config_manager)
-        self.update_manager = UpdateManager(self.lang_manager)
+        self.update_manager = UpdateManager(self.lang_manager, self.config_manager)
         
         # 창 크기 최적화 (70%)
         screen_width = master.winfo_screenwidth()
@@ -778,9 +669,10 @@ class BookmarkManagerGUI:
         self._create_widgets()
         self._apply_theme()
         
-        # 자동 업데이트 확인
+        # 자동 업데이트 확인 (창이 먼저 그려지도록 잠시 뒤에 시작)
         if self.config_manager.get("auto_update_check", True):
-            self.update_manager.check_for_updates(self._on_update_check_complete)
+            master.after(UPDATE_CHECK_DELAY_MS, self.update_manager.check_for_updates,
+                         self._in_main_thread(self._on_update_check_complete))
         
     def _create_menu(self):
         """메뉴바 생성"""
@@ -802,6 +694,11 @@ class BookmarkManagerGUI:
                                    command=self._toggle_dark_mode,
                                    variable=self.dark_mode_var)
         file_menu.add_separator()
+        file_menu.add_command(label=self.lang_manager.get("menu", "backup_all"),
+                              command=self.handle_backup_all)
+        file_menu.add_command(label=self.lang_manager.get("menu", "restore_preview"),
+                              command=self.show_restore_preview)
+        file_menu.add_separator()
         file_menu.add_command(label=self.lang_manager.get("menu", "exit"), command=self._on_exit)
         
         # Help 메뉴
@@ -898,6 +795,8 @@ class BookmarkManagerGUI:
                                wrap='word', font=('Malgun Gothic', 8))
         self.log_text.pack(fill="both", expand=True, padx=0, pady=5)
         self.widgets['log_text'] = self.log_text
+        self.log_queue = LogQueue()
+        self.master.after(LOG_DRAIN_INTERVAL_MS, self._drain_log)
         
         # 로그 초기화 버튼
         clear_btn = ttk.Button(log_frame, 
@@ -998,19 +897,50 @@ class BookmarkManagerGUI:
             self.config_manager.set("last_backup_dir", chosen_dir)
             log_message(f"[정보] 경로 설정: {chosen_dir}")
             
+    def firefox_backup_options(self):
+        """Firefox places.sqlite 백업 설정과 압축 아카이브 설정"""
+        return {
+            # 설정에 없으면 ConfigManager가 firefox_places/backup_archive의 기본값을 돌려준다
+            "pages_per_step": self.config_manager.get("firefox_pages_per_step"),
+            "step_sleep": self.config_manager.get("firefox_step_sleep"),
+            "firefox_mode": self.config_manager.get("firefox_backup_mode"),
+            "archive_codec": self.config_manager.get("archive_codec"),
+            "archive_level": self.config_manager.get("archive_level"),
+        }
+
     def handle_backup(self):
         browser = self.selected_browser.get()
         dir_path = self.backup_dir.get()
         self.config_manager.set("last_browser", browser)
         
         # 스레드로 백업 작업 실행
+        backup_format = self.config_manager.get("backup_format", "store")
+        firefox_options = self.firefox_backup_options()
+        
         def backup_thread():
-            perform_backup(browser, dir_path)
+            perform_backup(browser, dir_path, backup_format, reporter=self.report, **firefox_options)
         
         thread = threading.Thread(target=backup_thread)
         thread.daemon = True
         thread.start()
         
+    def handle_backup_all(self):
+        """모든 브라우저의 모든 프로필을 병렬로 백업"""
+        dir_path = self.backup_dir.get()
+        backup_format = self.config_manager.get("backup_format", "store")
+        firefox_options = self.firefox_backup_options()
+        
+        def backup_all_thread():
+            from backup_engine import backup_all_profiles
+            batch = backup_all_profiles(dir_path, backup_format, **firefox_options)
+            if batch.failed:
+                failed = ", ".join(f"{r.browser} ({r.profile})" for r in batch.results if not r.success)
+                self.report("warning", f"{batch.failed}개 프로필 백업 실패: {failed}")
+        
+        thread = threading.Thread(target=backup_all_thread)
+        thread.daemon = True
+        thread.start()
+        
     def handle_restore(self):
         browser = self.selected_browser.get()
         dir_path = self.backup_dir.get()
@@ -1036,12 +966,109 @@ class BookmarkManagerGUI:
         if must_proceed:
             # 스레드로 복구 작업 실행
             def restore_thread():
-                perform_restore(browser, dir_path)
+                perform_restore(browser, dir_path, reporter=self.report,
+                                mode=self.config_manager.get("restore_mode", RESTORE_OVERWRITE))
             
             thread = threading.Thread(target=restore_thread)
             thread.daemon = True
             thread.start()
 
+    def show_restore_preview(self):
+        """백업과 현재 북마크의 차이를 복구 전에 미리 보기"""
+        browser = self.selected_browser.get()
+        dir_path = self.backup_dir.get()
+
+        if self.dark_mode:
+            bg, fg, text_bg = DARK_FRAME_BG, DARK_TEXT_COLOR, DARK_ENTRY_BG
+        else:
+            bg, fg, text_bg = BG_COLOR, TEXT_COLOR, 'white'
+
+        window = tk.Toplevel(self.master)
+        window.title(f"{self.lang_manager.get('preview', 'title')} - {browser}")
+        window.geometry("700x450")
+        window.configure(bg=bg)
+        try:
+            if hasattr(self.master, '_icon_path') and self.master._icon_path:
+                window.iconbitmap(self.master._icon_path)
+        except:
+            pass
+
+        summary_label = tk.Label(window, text=self.lang_manager.get("preview", "loading"),
+                                 bg=bg, fg=fg, font=('Malgun Gothic', 9, 'bold'), anchor="w", justify="left")
+        summary_label.pack(padx=10, pady=(10, 0), fill="x")
+        tk.Label(window, text=self.lang_manager.get("preview", "legend"), bg=bg, fg=fg,
+                 font=('Malgun Gothic', 8), anchor="w").pack(padx=10, pady=(0, 5), fill="x")
+
+        text_frame = tk.Frame(window, bg=bg)
+        text_frame.pack(padx=10, pady=5, fill="both", expand=True)
+        preview_text = tk.Text(text_frame, state='disabled', wrap='none', bg=text_bg, fg=fg,
+                               bd=1, relief='flat', font=('Malgun Gothic', 8))
+        scrollbar = ttk.Scrollbar(text_frame, orient="vertical", command=preview_text.yview)
+        preview_text.configure(yscrollcommand=scrollbar.set)
+        scrollbar.pack(side="right", fill="y")
+        preview_text.pack(side="left", fill="both", expand=True)
+        for mark, color in PREVIEW_COLORS.items():
+            preview_text.tag_config(mark, foreground=color)
+
+        ttk.Button(window, text=self.lang_manager.get("preview", "close"),
+                   command=window.destroy).pack(pady=(0, 10))
+
+        def show_result(diff, error):
+            if not window.winfo_exists():
+                return
+            if error is not None:
+                summary_label.config(text=f"{self.lang_manager.get('messages', 'error')}: {error}")
+                return
+            if not diff:
+                summary_label.config(text=self.lang_manager.get("preview", "no_changes"))
+                return
+            summary_label.config(text=self.lang_manager.get("preview", "summary").format(**diff.summary()))
+            preview_text.config(state='normal')
+            for line in diff.lines(limit=PREVIEW_LINE_LIMIT):
+                preview_text.insert(tk.END, line + "\n", line[:1])
+            preview_text.config(state='disabled')
+
+        def preview_thread():
+            try:
+                from bookmark_diff import diff_backup
+                diff = diff_backup(browser, dir_path)
+                log_message(f"[정보] {browser} 복구 미리보기: " +
+                            ", ".join(f"{kind} {count}" for kind, count in diff.summary().items()))
+                self.master.after(0, lambda: show_result(diff, None))
+            except Exception as e:
+                log_message(f"[오류] {browser} 복구 미리보기 실패: {e}")
+                error = e
+                self.master.after(0, lambda: show_result(None, error))
+
+        thread = threading.Thread(target=preview_thread)
+        thread.daemon = True
+        thread.start()
+
+    def report(self, level, message):
+        """핵심 로직의 사용자 알림을 메인 스레드에서 메시지박스로 표시"""
+        title_key = {"error": "error", "warning": "warning"}.get(level, "info")
+        title = self.lang_manager.get("messages", title_key)
+        self.master.after(0, lambda: CustomMessageBox.show(
+            self.master, title, message, level, self.dark_mode))
+    
+    def _drain_log(self):
+        """큐에 쌓인 로그를 한 번에 출력 (LOG_MAX_LINES줄을 넘는 오래된 줄은 삭제)"""
+        messages = self.log_queue.drain()
+        if messages:
+            # 사용자가 위로 스크롤해 보고 있으면 끝으로 이동하지 않는다
+            at_end = self.log_text.yview()[1] >= 1.0
+            self.log_text.config(state='normal')
+            self.log_text.insert(tk.END, "".join(messages))
+            excess = int(self.log_text.index('end-1c').split('.')[0]) - 1 - LOG_MAX_LINES
+            if excess > 0:
+                self.log_text.delete('1.0', f'{excess + 1}.0')
+            self.log_text.config(state='disabled')
+            if at_end:
+                self.log_text.yview(tk.END)
+        # 아직 남아 있으면 바로 이어서, 아니면 다음 주기에 확인
+        delay = 1 if not self.log_queue.empty() else LOG_DRAIN_INTERVAL_MS
+        self.master.after(delay, self._drain_log)
+
     def clear_log(self):
         self.log_text.config(state='normal')
         self.log_text.delete(1.0, tk.END)
@@ -1068,10 +1095,14 @@ class BookmarkManagerGUI:
     def _manual_update_check(self):
         """수동 업데이트 확인"""
         log_message(f"[정보] {self.lang_manager.get('update', 'checking')}")
-        self.update_manager.check_for_updates(self._on_manual_update_check)
+        self.update_manager.check_for_updates(self._in_main_thread(self._on_manual_update_check), force=True)
+    
+    def _in_main_thread(self, func):
+        """백그라운드 스레드에서 호출되는 콜백을 Tk 메인 루프에서 실행하도록 감싸기 (창은 메인 스레드에서만 만든다)"""
+        return lambda *args: self.master.after(0, func, *args)
     
     def _on_update_check_complete(self, has_update, version_info):
-        """자동 업데이트 확인 완료 (백그라운드)"""
+        """자동 업데이트 확인 완료"""
         if has_update:
             self._show_update_dialog(version_info)
     
@@ -1129,27 +1160,35 @@ class BookmarkManagerGUI:
         progress_label = ttk.Label(progress_window, text="0%")
         progress_label.pack()
         
+        def show_progress(percent):
+            if progress_window.winfo_exists():
+                progress_bar['value'] = percent
+                progress_label.config(text=f"{percent}%")
+        
         def update_progress(percent):
-            progress_bar['value'] = percent
-            progress_label.config(text=f"{percent}%")
-            progress_window.update()
+            # 다운로드 스레드에서 호출되므로 위젯 변경은 메인 스레드로 넘긴다
+            self.master.after(0, show_progress, percent)
         
         def download_thread():
             try:
                 # 다운로드
                 download_url = version_info.get('download_url')
                 is_setup = version_info.get('is_setup', False)
-                update_file = self.update_manager.download_update(download_url, update_progress)
+                update_file = None
+                if not is_setup and version_info.get('delta_url'):
+                    update_file = self.update_manager.download_delta_update(
+                        version_info['delta_url'], update_progress, version_info.get('checksum_url'))
+                if not update_file:
+                    update_file = self.update_manager.download_update(
+                        download_url, update_progress, version_info.get('checksum_url'))
                 
                 if not update_file:
                     raise Exception(self.lang_manager.get("update", "download_failed"))
                 
-                # 백업 생성 (Portable만)
-                if not is_setup:
-                    self.update_manager.create_backup()
+                # 기존 실행 파일 백업(.backup)은 updater.exe가 교체하면서 만든다 (Portable만)
                 
                 # 프로그레스 창 닫기
-                progress_window.destroy()
+                self.master.after(0, progress_window.destroy)
                 
                 # 업데이트 실행
                 if self.update_manager.install_update(update_file, is_setup):
@@ -1161,13 +1200,18 @@ class BookmarkManagerGUI:
                     raise Exception(self.lang_manager.get("update", "install_failed"))
                     
             except Exception as e:
-                progress_window.destroy()
-                CustomMessageBox.showerror(
-                    self.master,
-                    self.lang_manager.get("messages", "error"),
-                    f"{self.lang_manager.get('update', 'failed')}\n{str(e)}",
-                    self.dark_mode
-                )
+                message = f"{self.lang_manager.get('update', 'failed')}\n{str(e)}"
+                
+                def show_error():
+                    progress_window.destroy()
+                    CustomMessageBox.showerror(
+                        self.master,
+                        self.lang_manager.get("messages", "error"),
+                        message,
+                        self.dark_mode
+                    )
+                
+                self.master.after(0, show_error)
         
         thread = threading.Thread(target=download_thread)
         thread.daemon = True
@@ -1193,25 +1237,63 @@ class BookmarkManagerGUI:
         self.config_manager.set("last_backup_dir", self.backup_dir.get())
         self.master.quit()
 
-# 전역 로그 함수 
-gui_instance = None
-def log_message(message):
-    timestamp = datetime.now().strftime("[%H:%M:%S]")
-    full_message = f"{timestamp} {message}\n"
-    
-    try:
-        sys.stdout.buffer.write(full_message.encode('utf-8'))
-    except Exception:
-        print(full_message.strip())
-    
-    if gui_instance and gui_instance.log_text:
-        gui_instance.log_text.config(state='normal')
-        gui_instance.log_text.insert(tk.END, full_message)
-        gui_instance.log_text.yview(tk.END)
-        gui_instance.log_text.config(state='disabled')
-        
+# 시작 시간 측정 (--startup-time)
+class StartupTimer:
+    """프로그램 시작부터 단계별 경과 시간"""
+
+    def __init__(self, started=STARTUP_STARTED):
+        self.started = started
+        self.phases = []
+
+    def mark(self, phase):
+        self.phases.append((phase, time.perf_counter() - self.started))
+
+    def report(self):
+        """단계별 경과 시간을 로그에 남기고 %APPDATA%/BrowserBookmarks/startup_time.jsonl에 한 줄 추가"""
+        log_message("[정보] 시작 시간: " +
+                    ", ".join(f"{phase} {elapsed * 1000:.0f}ms" for phase, elapsed in self.phases))
+        record = {
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "version": CURRENT_VERSION,
+            "frozen": bool(getattr(sys, 'frozen', False)),
+            "phases": {phase: round(elapsed, 4) for phase, elapsed in self.phases},
+        }
+        try:
+            with open(os.path.join(get_appdata_path(), STARTUP_TIME_FILE), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(record, ensure_ascii=False) + "\n")
+        except OSError as e:
+            log_message(f"[오류] 시작 시간 기록 실패: {e}")
+
 # 메인 실행
 if __name__ == "__main__":
+    # --startup-time: 창이 처음 그려질 때까지 시간을 재고 기록한 뒤 종료
+    startup_timer = StartupTimer() if STARTUP_TIME_ARG in sys.argv[1:] else None
+    if startup_timer:
+        startup_timer.mark("imports")
     root = tk.Tk()
+    if startup_timer:
+        startup_timer.mark("tk")
     gui_instance = BookmarkManagerGUI(root)
-    root.mainloop()
\ No newline at end of file
+    # GUI 로그 창과 로그 파일 (둘 다 큐에 넣기만 하므로 작업 스레드를 막지 않음)
+    add_log_sink(gui_instance.log_queue)
+    try:
+        file_log_sink = RotatingFileSink()
+        add_log_sink(file_log_sink)
+    except OSError:
+        file_log_sink = None
+    if startup_timer:
+        startup_timer.mark("gui")
+
+        def finish_startup_measure():
+            root.update_idletasks()
+            startup_timer.mark("first_idle")
+            startup_timer.report()
+            root.destroy()
+
+        root.after_idle(finish_startup_measure)
+    try:
+        root.mainloop()
+    finally:
+        if file_log_sink:
+            remove_log_sink(file_log_sink)
+            file_log_sink.close()
\ No newline at end of file